@@ -23,7 +23,8 @@ from .repositories.card_repository import (
     update_user_tracked_card_preferences,
     search_card_names,
     filter_existing_card_names,
-    get_all_tracked_cards
+    get_all_tracked_cards,
+    stream_tracked_cards,
 )
 from .repositories.user_repository import (
     get_user_by_username,
@@ -94,6 +95,7 @@ __all__ = [
     "is_valid_printing_specification",
     "get_user_password_hash",
     "get_all_tracked_cards",
+    "stream_tracked_cards",
     # User Repository
     "get_user_by_username",
     # Store Repository
@@ -17,8 +17,9 @@ Public API:
     to support in-memory SQLite usage across multiple connections in tests.
     After engine creation, init_session(engine) is invoked and
     Base.metadata.create_all()
-    is called to ensure ORM tables exist. Errors during engine creation are
-    logged, and the function returns early on error.
+    is called to ensure ORM tables exist, followed by upgrade_schema() to add
+    columns that were introduced after a table was created. Errors during
+    engine creation are logged, and the function returns early on error.
 
     Parameters:
     - database_url (str): SQLAlchemy database URL (e.g. "sqlite:///db.sqlite"
@@ -28,6 +29,12 @@ Public API:
     - Side effects: sets the module-level engine, initializes sessions, and
       creates database tables.
 
+- upgrade_schema(bind) -> List[str]
+    Add the nullable ORM columns missing from existing tables with
+    ALTER TABLE ... ADD COLUMN. create_all() only creates missing tables, so
+    a column added to a model (e.g. stores.max_concurrency) would otherwise
+    never reach a deployed database. Returns the "table.column" names added.
+
 - get_engine() -> Engine
     Return the initialized SQLAlchemy engine. Raises RuntimeError if
     initialize_database() has not been called yet.
@@ -57,7 +64,9 @@ Notes:
 
 """
 
-from sqlalchemy import create_engine
+from typing import List
+
+from sqlalchemy import create_engine, inspect
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.pool import StaticPool
 
@@ -103,9 +112,48 @@ def initialize_database(database_url: str,
     if create_tables:
         logger.info("🔄 Creating database tables...")
         Base.metadata.create_all(bind=get_engine())
+        upgrade_schema(get_engine())
         logger.info("✅ Database tables created successfully.")
 
 
+def upgrade_schema(bind) -> List[str]:
+    """
+    Adds the ORM columns that are missing from existing tables.
+
+    Only nullable columns without a server default are added, which covers
+    the optional settings added to existing tables; anything else needs a
+    hand-written migration and is logged instead.
+    """
+    inspector = inspect(bind)
+    existing_tables = set(inspector.get_table_names())
+    added = []
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in existing_tables:
+                continue
+            existing = {
+                column["name"] for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable or column.server_default is not None:
+                    logger.error(
+                        f"❌ Column '{table.name}.{column.name}' is missing "
+                        "and cannot be added automatically."
+                    )
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.exec_driver_sql(
+                    f'ALTER TABLE "{table.name}" '
+                    f'ADD COLUMN "{column.name}" {column_type}'
+                )
+                added.append(f"{table.name}.{column.name}")
+    if added:
+        logger.info(f"🔄 Added database columns: {', '.join(added)}")
+    return added
+
+
 def get_engine():
     """Provides the database engine."""
     if not engine:
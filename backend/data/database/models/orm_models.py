@@ -5,6 +5,7 @@ from sqlalchemy import (
     ForeignKey,
     Table,
     Date,
+    Float,
     UniqueConstraint,
 )
 from typing import Any
@@ -249,6 +250,15 @@ class Store(Base):
     homepage = Column(String, nullable=False)  # Store website
     search_url = Column(String, nullable=False)  # Search page URL
     fetch_strategy = Column(String, nullable=False)
+    # Maximum concurrent requests to this store. NULL uses the default.
+    max_concurrency = Column(Integer, nullable=True)
+    # Cluster-wide request budget for this store. NULL uses the defaults;
+    # a rate of 0 disables rate limiting.
+    rate_limit_per_second = Column(Float, nullable=True)
+    rate_limit_burst = Column(Integer, nullable=True)
+    # Seconds after a check before the sweep re-checks a card at this store.
+    # NULL uses the default.
+    stale_after_seconds = Column(Integer, nullable=True)
 
     def __repr__(self):
         return f"<Store(name={self.name},\
@@ -1,10 +1,11 @@
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional, Tuple
+from sqlalchemy import select
 from sqlalchemy.orm.session import Session
 
 # Internal package imports
 
 from schema import orm
-from ..session_manager import db_query
+from ..session_manager import db_query, db_stream
 from .user_repository import get_user_by_username
 from .catalogue_repository import get_set, get_finish
 from ..models import (
@@ -12,7 +13,10 @@ from ..models import (
     Card,
     CardSpecification,
     UserTrackedCards,
+    Finish,
+    Store,
 )
+from ..models.orm_models import user_store_preferences
 from utility import logger
 
 
@@ -189,6 +193,94 @@ def get_all_tracked_cards(*, session: Session) -> List[Dict[str, Any]]:
         return [card.to_dict() for card in tracked_cards]
 
 
+# Rows fetched per round trip while streaming tracked cards.
+TRACKED_CARD_STREAM_BATCH_SIZE = 1000
+
+# (username, card name, amount, specifications, store slugs)
+TrackedCardRow = Tuple[
+    str, str, int, List[Dict[str, Optional[str]]], List[str]
+]
+
+
+@db_stream
+def stream_tracked_cards(
+    batch_size: int = TRACKED_CARD_STREAM_BATCH_SIZE,
+    *,
+    session: Session,
+) -> Iterator[TrackedCardRow]:
+    """
+    Streams every tracked card of every user together with its
+    specifications and the user's selected stores.
+
+    A single join across users, their tracked cards, card specifications and
+    store preferences is read through a server-side cursor `batch_size` rows
+    at a time, so the whole sweep needs a handful of round trips and constant
+    memory. Users without selected stores are skipped, as there is nowhere to
+    check their cards.
+
+    Yields:
+        TrackedCardRow: (username, card name, amount, specifications, store
+            slugs) for one tracked card. Specifications are dicts shaped like
+            `CardSpecification.to_dict()`.
+    """
+    assert session is not None, "Session is injected by @db_stream decorator"
+    logger.debug("📖 Streaming all tracked cards with their stores.")
+    statement = (
+        select(
+            UserTrackedCards.id,
+            User.username,
+            UserTrackedCards.card_name,
+            UserTrackedCards.amount,
+            CardSpecification.id,
+            CardSpecification.set_code,
+            CardSpecification.collector_number,
+            Finish.name,
+            Store.slug,
+        )
+        .join(User, User.id == UserTrackedCards.user_id)
+        .join(
+            user_store_preferences,
+            user_store_preferences.c.user_id == User.id,
+        )
+        .join(Store, Store.id == user_store_preferences.c.store_id)
+        .outerjoin(
+            CardSpecification,
+            CardSpecification.user_card_id == UserTrackedCards.id,
+        )
+        .outerjoin(Finish, Finish.id == CardSpecification.finish_id)
+        .order_by(UserTrackedCards.id, CardSpecification.id, Store.id)
+        .execution_options(yield_per=batch_size)
+    )
+
+    # Rows arrive ordered by tracked card; each card spans one row per
+    # (specification, store) pair and is yielded once its rows are read.
+    current_id = None
+    current: Optional[TrackedCardRow] = None
+    seen_specs: set = set()
+    for (card_id, username, card_name, amount, spec_id, set_code,
+         collector_number, finish, slug) in session.execute(statement):
+        if card_id != current_id:
+            if current is not None:
+                yield current
+            current_id = card_id
+            current = (username, card_name, amount, [], [])
+            seen_specs = set()
+        assert current is not None
+        if spec_id is not None and spec_id not in seen_specs:
+            seen_specs.add(spec_id)
+            current[3].append(
+                {
+                    "set_code": set_code,
+                    "collector_number": collector_number,
+                    "finish": finish,
+                }
+            )
+        if slug and slug not in current[4]:
+            current[4].append(slug)
+    if current is not None:
+        yield current
+
+
 def get_users_cards(username: str) -> Optional[UserTrackedCards]:
     """
     Retrieves all tracked cards for a given user using an
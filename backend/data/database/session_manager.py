@@ -1,4 +1,4 @@
-from typing import Callable, Any
+from typing import Callable, Any, Iterator
 from functools import wraps
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy import text
@@ -34,6 +34,35 @@ def db_query(func: Callable) -> Callable:
     return wrapper
 
 
+def db_stream(func: Callable) -> Callable:
+    """
+    Decorator like `db_query` for repository generators. The session stays
+    open while the caller iterates over the results, and is closed once the
+    generator is exhausted or discarded.
+    """
+
+    @wraps(func)
+    def wrapper(*args, **kwargs) -> Iterator[Any]:
+        session = get_session()
+        try:
+            yield from func(*args, **kwargs, session=session)
+            session.commit()
+        except GeneratorExit:
+            session.rollback()
+            raise
+        except Exception as e:
+            session.rollback()
+            logger.error(f"❌ Database stream failed: {str(e)}")
+            raise
+        finally:
+            remove_session()
+            logger.debug(
+                "🔍 Database session scope finished for db_stream decorator."
+            )
+
+    return wrapper
+
+
 def init_session(engine):
     """Initializes the database session factory."""
     global SessionLocal
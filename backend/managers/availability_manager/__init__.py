@@ -4,18 +4,42 @@ from .availability_manager import (
     trigger_availability_check_for_card,
     get_all_available_items_for_card,
 )
+from .availability_batching import batch_by_store, record_batch_latency
 from .availability_diff import detect_changes
+from .availability_singleflight import (
+    Flight,
+    collect_orphaned_flights,
+    finish_flight,
+    join_flight,
+)
+from .availability_planner import plan_availability_sweep, select_stale_items
 from .availability_storage import (
     get_cached_availability_data,
     cache_availability_data,
+    get_last_checked,
+    get_pending,
+    mark_checked,
+    mark_pending,
 )
 
 __all__ = [
+    "Flight",
+    "batch_by_store",
     "check_availability",
+    "collect_orphaned_flights",
     "detect_changes",
     "get_cached_availability_data",
     "cache_availability_data",
     "get_all_available_items_for_card",
     "fetch_availability",
+    "finish_flight",
+    "plan_availability_sweep",
+    "select_stale_items",
+    "get_last_checked",
+    "join_flight",
+    "get_pending",
+    "mark_checked",
+    "mark_pending",
+    "record_batch_latency",
     "trigger_availability_check_for_card",
 ]
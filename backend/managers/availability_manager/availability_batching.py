@@ -0,0 +1,134 @@
+"""
+Groups sweep items into store batches sized from observed scrape latency.
+
+One RQ job per (store, card) pays for a job dispatch, a store lookup and a
+Socket.IO client for every card. Sweep items are instead queued as one job
+per store and batch of cards, so a worker reuses the store's HTTP session
+and product-detail cache across the whole batch.
+
+The batch size of each store follows how long one card takes to check
+there: workers report the per-card latency of every batch they finish, a
+moving average is kept in Redis (``availability_batch:latency``), and each
+store gets as many cards as fit in `STORE_BATCH_TARGET_SECONDS`. Slow stores
+get small batches, so a batch never holds a worker for long, while fast
+stores get large ones.
+
+Latencies are best-effort: a Redis failure is logged, and batches are then
+sized as if the latency were unknown.
+"""
+
+import os
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from redis.commands.core import Script
+
+from managers import metrics_manager, redis_manager
+from utility import logger
+
+LATENCY_KEY = "availability_batch:latency"
+STORE_BATCH_METRIC = "store_batch"
+
+# How long one batch job should take to run.
+STORE_BATCH_TARGET_SECONDS = float(
+    os.environ.get("STORE_BATCH_TARGET_SECONDS", 60)
+)
+STORE_BATCH_MIN_SIZE = int(os.environ.get("STORE_BATCH_MIN_SIZE", 1))
+STORE_BATCH_MAX_SIZE = int(os.environ.get("STORE_BATCH_MAX_SIZE", 50))
+# Batch size of a store whose latency has not been observed yet.
+STORE_BATCH_DEFAULT_SIZE = int(os.environ.get("STORE_BATCH_DEFAULT_SIZE", 10))
+# Weight of the latest batch in a store's latency average.
+LATENCY_SMOOTHING = 0.3
+
+# KEYS[1]: latencies. ARGV: store, latest per-card latency, smoothing.
+# Folds the latest latency into the store's average in one step, so batches
+# finishing at the same time do not overwrite each other's observations.
+# Returns the new average as a string, as Lua numbers reply as integers.
+_RECORD_LATENCY_SCRIPT = Script(None, b"""
+local latency = tonumber(ARGV[2])
+local previous = redis.call('HGET', KEYS[1], ARGV[1])
+if previous then
+    local weight = tonumber(ARGV[3])
+    latency = weight * latency + (1 - weight) * tonumber(previous)
+end
+latency = string.format('%.17g', latency)
+redis.call('HSET', KEYS[1], ARGV[1], latency)
+return latency
+""")
+
+
+def _card_latencies(stores: List[str]) -> List[Optional[float]]:
+    """Returns the average seconds per card of each store, if known."""
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None or not stores:
+            return [None] * len(stores)
+        return [
+            float(latency) if latency is not None else None
+            for latency in redis_conn.hmget(LATENCY_KEY, stores)
+        ]
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to read store batch latencies: {e}")
+        return [None] * len(stores)
+
+
+def batch_size_for(latency: Optional[float]) -> int:
+    """
+    Computes how many cards to check per job at a store that takes
+    `latency` seconds per card.
+    """
+    if not latency or latency <= 0:
+        size = STORE_BATCH_DEFAULT_SIZE
+    else:
+        size = int(STORE_BATCH_TARGET_SECONDS / latency)
+    return min(max(size, STORE_BATCH_MIN_SIZE), STORE_BATCH_MAX_SIZE)
+
+
+def batch_by_store(
+    items: Iterable[Dict[str, Any]],
+) -> List[Tuple[str, List[Dict[str, Any]]]]:
+    """
+    Splits sweep items into (store slug, items) batches, sized per store
+    from its observed per-card latency.
+    """
+    by_store: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    for item in items:
+        by_store[item["store"]].append(item)
+
+    stores = list(by_store)
+    batches = []
+    for store, latency in zip(stores, _card_latencies(stores)):
+        size = batch_size_for(latency)
+        metrics_manager.set_gauge(
+            STORE_BATCH_METRIC, f"{store}:batch_size", size
+        )
+        store_items = by_store[store]
+        for start in range(0, len(store_items), size):
+            batches.append((store, store_items[start:start + size]))
+    return batches
+
+
+def record_batch_latency(store: str, cards: int, seconds: float) -> None:
+    """
+    Folds the per-card latency of a finished batch into the store's
+    moving average.
+    """
+    if cards <= 0:
+        return
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return
+        latency = float(
+            _RECORD_LATENCY_SCRIPT(
+                keys=[LATENCY_KEY],
+                args=[store, repr(seconds / cards), repr(LATENCY_SMOOTHING)],
+                client=redis_conn,
+            )
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to record batch latency of {store}: {e}")
+        return
+    metrics_manager.set_gauge(
+        STORE_BATCH_METRIC, f"{store}:card_latency_ms", round(latency * 1000)
+    )
@@ -31,6 +31,7 @@ def check_availability(
         card_data=(CardPreferenceSchema(**card_data)
                    if card_data
                    else None),
+        lane=redis_manager.USER_REFRESH_LANE,
     )
     command = AvailabilityRequestCommand(payload=payload)
     redis_manager.publish_pubsub(command)
@@ -85,6 +86,7 @@ def trigger_availability_check_for_card(
             user=UserSchema(username=username),
             store=StoreSchema(slug=store.slug, name=store.name),
             card_data=CardPreferenceSchema(**card_data),
+            lane=redis_manager.INTERACTIVE_LANE,
         )
         command = AvailabilityRequestCommand(payload=payload)
         redis_manager.publish_pubsub(command)
@@ -148,6 +150,7 @@ def fetch_availability(username: str) -> Dict[str, dict]:
                     user=UserSchema(username=username),
                     store=StoreSchema(slug=store.slug, name=store.name),
                     card_data=CardPreferenceSchema(**pref_data),
+                    lane=redis_manager.USER_REFRESH_LANE,
                 )
                 command = AvailabilityRequestCommand(payload=payload)
                 redis_manager.publish_pubsub(command)
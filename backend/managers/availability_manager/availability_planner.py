@@ -0,0 +1,157 @@
+"""
+Plans the system-wide availability sweep.
+
+Checking every user's cards at every one of their stores scrapes the same
+page over and over: if 50 users track "Sol Ring" at the same store, the naive
+sweep searches that store for it 50 times. The planner collapses all tracked
+cards into one work item per (store slug, card name), which:
+
+- carries the merged specifications of every interested user, so the cached
+  result covers all of them, and
+- remembers each interested user's own specifications, so the single scrape
+  can be filtered and fanned out to every user.
+
+A user who tracks a card without specifications wants any printing, so an
+item with such a user is not narrowed by specifications at all.
+
+Items whose (store, card) pair was checked recently, e.g. by a user's own
+check, are dropped until they go stale (see `select_stale_items`).
+"""
+
+import time
+from typing import (
+    Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypedDict
+)
+
+from managers import metrics_manager
+from utility import logger
+
+AVAILABILITY_SWEEP_METRIC = "availability_sweep"
+
+# A printing specification as understood by `filter_listings`.
+Specification = Dict[str, Optional[str]]
+# (username, card name, amount, specifications, store slugs) for one tracked
+# card, as streamed by `database.stream_tracked_cards`.
+TrackedCard = Tuple[str, str, int, List[Specification], Iterable[str]]
+
+
+class SweepItem(TypedDict):
+    """One scrape of a card at a store, and the users waiting for it."""
+
+    store: str
+    card_name: str
+    card_specs: List[Specification]
+    users: Dict[str, List[Specification]]
+
+
+def merge_specifications(
+    spec_lists: Iterable[List[Specification]],
+) -> List[Specification]:
+    """
+    Merges the specifications of several users into one de-duplicated list.
+    Returns an empty list (any printing) if any user has no specifications.
+    """
+    merged: Dict[Tuple[Any, ...], Specification] = {}
+    for specs in spec_lists:
+        if not specs:
+            return []
+        for spec in specs:
+            key = (
+                spec.get("set_code"),
+                spec.get("collector_number"),
+                spec.get("finish"),
+            )
+            merged.setdefault(key, spec)
+    return list(merged.values())
+
+
+def plan_availability_sweep(
+    tracked_cards: Iterable[TrackedCard],
+) -> List[SweepItem]:
+    """
+    Collapses tracked cards into unique (store slug, card name) work items.
+
+    Args:
+        tracked_cards: (username, card name, amount, specifications, store
+            slugs) for every card of every user.
+
+    Returns:
+        List[SweepItem]: One item per store and card, in first-seen order.
+    """
+    items: Dict[Tuple[str, str], Dict[str, List[List[Specification]]]] = {}
+    user_checks = 0
+    for username, card_name, _amount, specs, store_slugs in tracked_cards:
+        if not username or not card_name:
+            continue
+        for store_slug in store_slugs:
+            user_checks += 1
+            interested = items.setdefault((store_slug, card_name), {})
+            interested.setdefault(username, []).append(list(specs or []))
+
+    plan: List[SweepItem] = []
+    for (store_slug, card_name), interested in items.items():
+        users = {
+            username: merge_specifications(spec_lists)
+            for username, spec_lists in interested.items()
+        }
+        plan.append(
+            {
+                "store": store_slug,
+                "card_name": card_name,
+                "card_specs": merge_specifications(users.values()),
+                "users": users,
+            }
+        )
+
+    logger.info(
+        f"🧮 Planned {len(plan)} scrapes for {user_checks} user checks "
+        f"across the availability sweep."
+    )
+    metrics_manager.set_gauge(
+        AVAILABILITY_SWEEP_METRIC, "user_checks", user_checks
+    )
+    metrics_manager.set_gauge(
+        AVAILABILITY_SWEEP_METRIC, "planned_scrapes", len(plan)
+    )
+    return plan
+
+
+def select_stale_items(
+    plan: List[SweepItem],
+    last_checked: Sequence[Optional[float]],
+    stale_after: Callable[[str], float],
+    now: Optional[float] = None,
+) -> List[SweepItem]:
+    """
+    Keeps the sweep items that need a new check.
+
+    Args:
+        plan: The planned sweep items.
+        last_checked: When each item's (store, card) pair was last checked,
+            or None if it never was, in plan order.
+        stale_after: Returns the staleness threshold, in seconds, of a store
+            slug.
+        now: The current time, defaulting to `time.time()`.
+
+    Returns:
+        List[SweepItem]: The items never checked or last checked at least
+            their store's threshold ago.
+    """
+    now = time.time() if now is None else now
+    thresholds: Dict[str, float] = {}
+    stale = []
+    for item, checked_at in zip(plan, last_checked):
+        store_slug = item["store"]
+        if store_slug not in thresholds:
+            thresholds[store_slug] = stale_after(store_slug)
+        if checked_at is None or now - checked_at >= thresholds[store_slug]:
+            stale.append(item)
+
+    logger.info(
+        f"🧮 Skipping {len(plan) - len(stale)} fresh scrapes; "
+        f"{len(stale)} are stale."
+    )
+    metrics_manager.set_gauge(
+        AVAILABILITY_SWEEP_METRIC, "skipped_fresh", len(plan) - len(stale)
+    )
+    return stale
@@ -0,0 +1,294 @@
+"""
+Cluster-wide singleflight for availability scrapes.
+
+When several users ask for the same card at the same store within seconds,
+each request becomes its own job, and each job would scrape the store. A
+flight lets only the first job scrape, while later jobs for the same
+(store slug, normalized card name, specification hash) attach to it:
+
+- `join_flight` takes the ``flight:<key>:lock`` lock with a TTL. A job that
+  gets the lock leads the flight and scrapes. A job that doesn't is added
+  to ``flight:<key>:waiters`` and ends right away, without holding a
+  worker while the scrape runs.
+- `finish_flight` releases the lock, keeps the result briefly in
+  ``flight:<key>:result`` and returns the waiting users, so the leader can
+  send every one of them the listings it found.
+
+A job arriving just after a flight finished reuses its result instead of
+scraping again. Joining and finishing are Lua scripts, so no waiter can
+attach after the leader collected the waiters. If a leader dies mid-scrape,
+its lock expires after `SINGLEFLIGHT_TTL_SECONDS` while its waiters are
+kept for longer. Flights with waiters are indexed by when their lock
+expires (``flight:waiting``), and `collect_orphaned_flights` hands back the
+waiters of those whose lock is gone, so they can be checked again by a new
+job. If Redis cannot be reached, every job simply scrapes on its own.
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from typing import Any, Dict, List, NamedTuple, Optional
+
+from redis.commands.core import Script
+
+from managers import metrics_manager, redis_manager
+from utility import logger
+
+SINGLEFLIGHT_METRIC = "singleflight"
+FLIGHT_KEY_PREFIX = "flight:"
+# Keys of flights with waiters, scored by when their lock expires.
+WAITING_FLIGHTS_KEY = "flight:waiting"
+
+# How long a flight's lock is held before it is presumed dead.
+SINGLEFLIGHT_TTL_SECONDS = int(
+    os.environ.get("SINGLEFLIGHT_TTL_SECONDS", 120)
+)
+# How long a finished flight's result is reused by late requests.
+SINGLEFLIGHT_RESULT_SECONDS = int(
+    os.environ.get("SINGLEFLIGHT_RESULT_SECONDS", 30)
+)
+
+# KEYS[1]: lock, KEYS[2]: waiters, KEYS[3]: result, KEYS[4]: check,
+# KEYS[5]: waiting flights. ARGV: token, username, lock TTL, waiters TTL,
+# check, now, flight key. Returns {2, result} if a finished flight's result
+# can be reused, {1} if the caller leads a new flight, and {0} if it attached
+# as a waiter. A waiter also stores the check to repeat should the leader
+# die, and indexes the flight by when its lock expires.
+_JOIN_SCRIPT = Script(None, b"""
+local result = redis.call('GET', KEYS[3])
+if result then
+    return {2, result}
+end
+if redis.call('SET', KEYS[1], ARGV[1], 'NX', 'EX', ARGV[3]) then
+    return {1}
+end
+redis.call('SADD', KEYS[2], ARGV[2])
+redis.call('EXPIRE', KEYS[2], ARGV[4])
+redis.call('SET', KEYS[4], ARGV[5], 'EX', ARGV[4])
+local ttl = math.max(redis.call('PTTL', KEYS[1]), 0) / 1000
+redis.call('ZADD', KEYS[5], tonumber(ARGV[6]) + ttl, ARGV[7])
+return {0}
+""")
+
+# KEYS[1]: lock, KEYS[2]: waiters, KEYS[3]: result, KEYS[4]: check,
+# KEYS[5]: waiting flights. ARGV: token, result, result TTL, where a TTL of 0
+# keeps no result, flight key. Returns the waiting usernames, unless another
+# leader has since taken the flight over, in which case it will notify them.
+_FINISH_SCRIPT = Script(None, b"""
+local owner = redis.call('GET', KEYS[1])
+if owner and owner ~= ARGV[1] then
+    return {}
+end
+local waiters = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[1], KEYS[2], KEYS[4])
+redis.call('ZREM', KEYS[5], ARGV[4])
+if tonumber(ARGV[3]) > 0 then
+    redis.call('SET', KEYS[3], ARGV[2], 'EX', ARGV[3])
+end
+return waiters
+""")
+
+# KEYS[1]: lock, KEYS[2]: waiters, KEYS[4]: check, KEYS[5]: waiting
+# flights. ARGV: now, flight key. If the flight's lock still exists, e.g.
+# because a new leader took it over, re-indexes it by the lock's expiry and
+# returns {}. Otherwise removes the flight and returns {check, waiters...}.
+_COLLECT_SCRIPT = Script(None, b"""
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl > 0 then
+    redis.call('ZADD', KEYS[5], tonumber(ARGV[1]) + ttl / 1000, ARGV[2])
+    return {}
+end
+local check = redis.call('GET', KEYS[4])
+local waiters = redis.call('SMEMBERS', KEYS[2])
+redis.call('DEL', KEYS[2], KEYS[4])
+redis.call('ZREM', KEYS[5], ARGV[2])
+if not check then
+    return {}
+end
+table.insert(waiters, 1, check)
+return waiters
+""")
+
+
+class Flight(NamedTuple):
+    """A job's place in the flight for one scrape."""
+
+    key: str
+    # Whether this job scrapes and must call `finish_flight`.
+    leads: bool
+    token: Optional[str] = None
+    # Listings of a flight that just finished, when they can be reused.
+    items: Optional[List[Dict[str, Any]]] = None
+
+
+class OrphanedFlight(NamedTuple):
+    """The check of a flight whose leader died, and the users waiting."""
+
+    store_slug: str
+    card: Dict[str, Any]
+    waiters: List[str]
+
+
+def flight_key(
+    store_slug: str,
+    card_name: str,
+    card_specs: Optional[List[Dict[str, Any]]] = None,
+) -> str:
+    """
+    Identifies a scrape by store, normalized card name and a hash of the
+    printing specifications, regardless of their order.
+    """
+    name = " ".join(card_name.split()).casefold()
+    specs = sorted(
+        json.dumps(spec, sort_keys=True, default=str)
+        for spec in card_specs or []
+    )
+    spec_hash = hashlib.sha1(json.dumps(specs).encode("utf-8")).hexdigest()
+    return f"{store_slug}:{name}:{spec_hash[:16]}"
+
+
+def _keys(key: str) -> List[str]:
+    prefix = f"{FLIGHT_KEY_PREFIX}{key}"
+    return [
+        f"{prefix}:lock",
+        f"{prefix}:waiters",
+        f"{prefix}:result",
+        f"{prefix}:check",
+        WAITING_FLIGHTS_KEY,
+    ]
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
+def join_flight(
+    store_slug: str,
+    card_name: str,
+    card_specs: Optional[List[Dict[str, Any]]],
+    username: str,
+) -> Flight:
+    """
+    Leads a new flight for the scrape, attaches `username` to the one in
+    progress, or hands back the result of one that just finished. An
+    attached user is sent the listings by the leader and needs nothing
+    else.
+    """
+    key = flight_key(store_slug, card_name, card_specs)
+    token = uuid.uuid4().hex
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        assert redis_conn is not None, "Redis connection is None"
+        outcome = _JOIN_SCRIPT(
+            keys=_keys(key),
+            # Waiters outlive a dead leader's lock, so they can still be
+            # collected once it has expired.
+            args=[
+                token,
+                username,
+                SINGLEFLIGHT_TTL_SECONDS,
+                SINGLEFLIGHT_TTL_SECONDS * 2,
+                json.dumps(
+                    {
+                        "store": store_slug,
+                        "card": {
+                            "name": card_name,
+                            "card_specs": card_specs or [],
+                        },
+                    },
+                    default=str,
+                ),
+                time.time(),
+                key,
+            ],
+            client=redis_conn,
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not join scrape flight '{key}': {e}")
+        return Flight(key, leads=True)
+
+    if int(outcome[0]) == 2:
+        metrics_manager.increment(
+            SINGLEFLIGHT_METRIC, f"{store_slug}:reused"
+        )
+        return Flight(key, leads=False, items=json.loads(outcome[1]))
+    if int(outcome[0]) == 1:
+        metrics_manager.increment(SINGLEFLIGHT_METRIC, f"{store_slug}:led")
+        return Flight(key, leads=True, token=token)
+    metrics_manager.increment(SINGLEFLIGHT_METRIC, f"{store_slug}:attached")
+    return Flight(key, leads=False)
+
+
+def finish_flight(
+    flight: Flight, items: List[Dict[str, Any]], reusable: bool = True
+) -> List[str]:
+    """
+    Ends a flight led by the caller with the listings it found. Listings
+    that are not `reusable`, such as the partial ones of a scrape cut short,
+    are only handed to the waiters, never to later requests.
+
+    Returns:
+        List[str]: The users who attached to the flight and still need the
+        listings.
+    """
+    if flight.token is None:
+        return []
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        assert redis_conn is not None, "Redis connection is None"
+        waiters = _FINISH_SCRIPT(
+            keys=_keys(flight.key),
+            args=[
+                flight.token,
+                json.dumps(items, default=str),
+                SINGLEFLIGHT_RESULT_SECONDS if reusable else 0,
+                flight.key,
+            ],
+            client=redis_conn,
+        )
+    except Exception as e:
+        logger.warning(
+            f"⚠️ Could not finish scrape flight '{flight.key}': {e}"
+        )
+        return []
+    return sorted(_decode(waiter) for waiter in waiters)
+
+
+def collect_orphaned_flights(
+    now: Optional[float] = None,
+) -> List[OrphanedFlight]:
+    """
+    Collects the flights whose lock expired with users still waiting, which
+    means their leader died. Each flight is collected only once, so the
+    caller must check it again for its waiters.
+    """
+    now = time.time() if now is None else now
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        assert redis_conn is not None, "Redis connection is None"
+        expired = redis_conn.zrangebyscore(WAITING_FLIGHTS_KEY, "-inf", now)
+        orphaned = []
+        for key in map(_decode, expired):
+            collected = _COLLECT_SCRIPT(
+                keys=_keys(key), args=[now, key], client=redis_conn
+            )
+            if not collected:
+                continue
+            check = json.loads(collected[0])
+            orphaned.append(
+                OrphanedFlight(
+                    check["store"],
+                    check["card"],
+                    sorted(_decode(waiter) for waiter in collected[1:]),
+                )
+            )
+    except Exception as e:
+        logger.warning(f"⚠️ Could not collect orphaned scrape flights: {e}")
+        return []
+    for flight in orphaned:
+        metrics_manager.increment(
+            SINGLEFLIGHT_METRIC, f"{flight.store_slug}:orphaned"
+        )
+    return orphaned
@@ -1,7 +1,20 @@
+import time
+from typing import Iterable, List, Optional, Tuple
+
 from data import cache
+from managers import redis_manager
 from utility import logger
 
 CACHE_EXPIRY = 1800  # Cache availability results for 30 minutes
+# Sorted set per store of card name -> when its availability was last checked.
+LAST_CHECKED_KEY_PREFIX = "availability_checked:"
+# Entries older than this are pruned from the last-checked index.
+LAST_CHECKED_RETENTION = 86400
+# Sorted set per store of card name -> when a sweep check was queued for it,
+# until its result is cached.
+PENDING_KEY_PREFIX = "availability_pending:"
+# A queued check without a result after this long is assumed lost.
+PENDING_EXPIRY = 3600
 
 
 def _availability_cache_name(store_name, card_name):
@@ -22,6 +35,7 @@ def cache_availability_data(store_name, card_name, available_items):
         ex=CACHE_EXPIRY,
     )
     logger.info(f"✅ Cached availability results for {card_name}")
+    mark_checked(store_name, card_name)
 
 
 def get_cached_availability_data(store_name, card_name):
@@ -31,3 +45,110 @@ def get_cached_availability_data(store_name, card_name):
     # Retrieve availability data from Redis
     # The cache.load_data function already handles JSON deserialization.
     return cache.load_data(_availability_cache_name(store_name, card_name))
+
+
+def _last_checked_key(store_name):
+    return f"{LAST_CHECKED_KEY_PREFIX}{store_name}"
+
+
+def _pending_key(store_name):
+    return f"{PENDING_KEY_PREFIX}{store_name}"
+
+
+def mark_checked(store_name, card_name, checked_at: Optional[float] = None):
+    """
+    Records when a card's availability at a store was last checked, and
+    prunes entries of that store older than `LAST_CHECKED_RETENTION`.
+    """
+    checked_at = time.time() if checked_at is None else checked_at
+    key = _last_checked_key(store_name)
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        assert redis_conn is not None, "Redis connection is None"
+        with redis_conn.pipeline() as pipe:
+            pipe.zadd(key, {card_name: checked_at})
+            pipe.zremrangebyscore(
+                key, "-inf", checked_at - LAST_CHECKED_RETENTION
+            )
+            pipe.zrem(_pending_key(store_name), card_name)
+            pipe.execute()
+    except Exception as e:
+        logger.error(f"❌ Error recording availability check time: {e}")
+
+
+def get_last_checked(
+    pairs: Iterable[Tuple[str, str]],
+) -> List[Optional[float]]:
+    """
+    Returns when each (store, card) pair was last checked, or None if it
+    never was, in one pipelined round trip. If Redis cannot be reached,
+    every pair is reported as never checked.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        assert redis_conn is not None, "Redis connection is None"
+        with redis_conn.pipeline() as pipe:
+            for store_name, card_name in pairs:
+                pipe.zscore(_last_checked_key(store_name), card_name)
+            return pipe.execute()
+    except Exception as e:
+        logger.error(f"❌ Error loading availability check times: {e}")
+        return [None] * len(pairs)
+
+
+def mark_pending(
+    pairs: Iterable[Tuple[str, str]], queued_at: Optional[float] = None
+):
+    """
+    Records that sweep checks were queued for (store, card) pairs, so more
+    checks of the same pairs can be coalesced until their results arrive.
+    """
+    queued_at = time.time() if queued_at is None else queued_at
+    by_store = {}
+    for store_name, card_name in pairs:
+        by_store.setdefault(store_name, {})[card_name] = queued_at
+    if not by_store:
+        return
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        assert redis_conn is not None, "Redis connection is None"
+        with redis_conn.pipeline() as pipe:
+            for store_name, cards in by_store.items():
+                key = _pending_key(store_name)
+                pipe.zadd(key, cards)
+                pipe.zremrangebyscore(
+                    key, "-inf", queued_at - PENDING_EXPIRY
+                )
+            pipe.execute()
+    except Exception as e:
+        logger.error(f"❌ Error recording queued availability checks: {e}")
+
+
+def get_pending(
+    pairs: Iterable[Tuple[str, str]], now: Optional[float] = None
+) -> List[bool]:
+    """
+    Tells, for each (store, card) pair, whether a sweep check for it is
+    already queued and not yet cached, in one pipelined round trip. If
+    Redis cannot be reached, no pair is reported as queued.
+    """
+    pairs = list(pairs)
+    if not pairs:
+        return []
+    now = time.time() if now is None else now
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        assert redis_conn is not None, "Redis connection is None"
+        with redis_conn.pipeline() as pipe:
+            for store_name, card_name in pairs:
+                pipe.zscore(_pending_key(store_name), card_name)
+            return [
+                queued_at is not None and now - queued_at < PENDING_EXPIRY
+                for queued_at in pipe.execute()
+            ]
+    except Exception as e:
+        logger.error(f"❌ Error loading queued availability checks: {e}")
+        return [False] * len(pairs)
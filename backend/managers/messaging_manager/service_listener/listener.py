@@ -1,9 +1,32 @@
 from utility import logger
-from typing import Callable
+from typing import Callable, List, Optional, Tuple
 import threading
-import json
 import atexit
-from managers import redis_manager
+import os
+import socket
+import time
+from redis.exceptions import ResponseError
+from managers import metrics_manager, redis_manager
+
+STREAM_METRIC = "message_streams"
+# Entries read from a stream per call, and how long a read waits for new
+# ones; the wait also bounds how long `stop` takes.
+STREAM_READ_COUNT = 100
+STREAM_BLOCK_MS = 1000
+# Each consumer's process refreshes a heartbeat key this often, from its
+# own thread so that a long-running handler does not stop it. A consumer
+# whose heartbeat expired is gone.
+STREAM_HEARTBEAT_SECONDS = 10
+STREAM_HEARTBEAT_TTL_SECONDS = 3 * STREAM_HEARTBEAT_SECONDS
+# Entries a gone consumer left unacknowledged for this long are claimed by
+# another consumer, and a gone consumer idle for this long with nothing
+# pending is removed from the group. Entries of live consumers are never
+# claimed, however long their handler runs.
+STREAM_CLAIM_IDLE_MS = int(os.environ.get("STREAM_CLAIM_IDLE_MS", 60000))
+STREAM_RECLAIM_INTERVAL_SECONDS = 30
+# An entry that has been delivered this many times without being
+# acknowledged is moved to the dead-letter queue instead of being retried.
+STREAM_MAX_DELIVERIES = int(os.environ.get("STREAM_MAX_DELIVERIES", 5))
 
 
 class Listener:
@@ -12,15 +35,33 @@ class Listener:
     workers on a Redis Pub/Sub channel.
     This is a generic implementation that can be instantiated
     for different services and channels.
+
+    With the streams transport (see `redis_manager.MESSAGE_TRANSPORT`) the
+    listener instead reads the channel's stream as a member of the
+    service's consumer group. Each message is then handled by one process
+    of the service and acknowledged once handled. Messages published while
+    no listener runs wait in the stream, and those left unacknowledged by a
+    process that died, as told by its expired heartbeat, are reclaimed by
+    the others.
     """
 
-    def __init__(self, service_name: str, channel: str):
+    def __init__(
+        self,
+        service_name: str,
+        channel: str,
+        transport: Optional[str] = None,
+    ):
         self.thread = None
         self.pubsub = None
         self.service_name = service_name
         self.channel = channel
         self.dlq_name = f"{channel}-dlq"
         self.handler_map = {}
+        self.transport = transport or redis_manager.MESSAGE_TRANSPORT
+        self.stream = redis_manager.stream_key(channel)
+        self.group = service_name.lower()
+        self._stopping = threading.Event()
+        self._heartbeat_thread = None
 
     def register_handler(self, command_type: str, handler: Callable):
         """Registers a handler for a specific command type."""
@@ -33,7 +74,13 @@ class Listener:
                 f"{self.service_name} listener thread is already running.")
             return
 
-        self.thread = threading.Thread(target=self._listen, daemon=True)
+        self._stopping.clear()
+        target = (
+            self._listen_stream
+            if self.transport == redis_manager.STREAMS_TRANSPORT
+            else self._listen
+        )
+        self.thread = threading.Thread(target=target, daemon=True)
         self.thread.start()
         # Register the stop method to be called on application exit.
         atexit.register(self.stop)
@@ -41,6 +88,7 @@ class Listener:
     def stop(self):
         """Signals the listener thread to stop and cleans up resources."""
         logger.info(f"🛑 Shutting down {self.service_name} listener...")
+        self._stopping.set()
         if self.pubsub:
             # This will cause the loop in _listen() to exit.
             self.pubsub.close()
@@ -49,6 +97,40 @@ class Listener:
             self.thread.join(timeout=5)
         logger.info(f"✅ {self.service_name} listener shut down gracefully.")
 
+    def _dispatch(self, raw_data):
+        """
+        Hands one message to the handler of its type. A message that cannot
+        be handled is moved to the dead-letter queue.
+        """
+        try:
+            data = redis_manager.decode_message(raw_data)
+            command_type = data.get("type")
+            handler = self.handler_map.get(command_type)
+            logger.debug(f"{self.service_name} "
+                         f"received message: {command_type}")
+            if handler:
+                payload = data.get("payload", {})
+                handler(payload)
+            else:
+                raise ValueError(f"No handler found for command type "
+                                 f"'{command_type}' on "
+                                 f"'{self.channel}' channel.")
+        except Exception as e:
+            logger.error(
+                f"Failed to process {self.channel} message: {e}."
+                f" Message: {raw_data}"
+            )
+            self._dead_letter(raw_data)
+
+    def _dead_letter(self, raw_data):
+        try:
+            # Move the failed message to a dead-letter queue
+            redis_manager.get_redis_connection().rpush(
+                self.dlq_name, raw_data
+            )
+        except Exception as dlq_e:
+            logger.error(f"Failed to push message to DLQ: {dlq_e}")
+
     def _listen(self):
         """The actual listener function that runs in the background thread."""
         self.pubsub = redis_manager.pubsub(ignore_subscribe_messages=True)
@@ -64,33 +146,221 @@ class Listener:
 
         try:
             for message in self.pubsub.listen():
-                try:
-                    data = json.loads(message["data"])
-                    command_type = data.get("type")
-                    handler = self.handler_map.get(command_type)
-                    logger.debug(f"{self.service_name} "
-                                 f"received message: {command_type}")
-                    if handler:
-                        payload = data.get("payload", {})
-                        handler(payload)
-                    else:
-                        raise ValueError(f"No handler found for command type "
-                                         f"'{command_type}' on "
-                                         f"'{self.channel}' channel.")
-                except Exception as e:
-                    logger.error(
-                        f"Failed to process {self.channel} message: {e}."
-                        f" Message: {message.get('data')}"
-                    )
-                    try:
-                        # Move the failed message to a dead-letter queue
-                        redis_manager.get_redis_connection().rpush(
-                            self.dlq_name, message.get("data")
-                        )
-                    except Exception as dlq_e:
-                        logger.error(f"Failed to push message to DLQ: {dlq_e}")
+                self._dispatch(message.get("data"))
 
         except Exception as e:
             # This block will be reached when self.pubsub.close() is called,
             # or if there's a connection error.
             logger.info(f"{self.service_name} listener loop exiting: {e}")
+
+    def _listen_stream(self):
+        """
+        The background thread of the streams transport: reads new entries
+        as this process's consumer and periodically reclaims stale ones.
+        """
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            logger.critical(
+                f"{self.service_name} cannot read streams. Exiting")
+            return
+        # One consumer per process, so the group spreads entries across
+        # every process of the service.
+        consumer = f"{socket.gethostname()}-{os.getpid()}"
+        try:
+            self._ensure_group(redis_conn)
+        except Exception as e:
+            logger.critical(
+                f"{self.service_name} cannot join the '{self.group}' group "
+                f"on '{self.stream}': {e}. Exiting")
+            return
+        logger.info(
+            f"🎧 {self.service_name} listener started. Reading "
+            f"'{self.stream}' as '{consumer}' in group '{self.group}'."
+        )
+        self._beat(redis_conn, consumer)
+        self._heartbeat_thread = threading.Thread(
+            target=self._heartbeat, args=(redis_conn, consumer), daemon=True
+        )
+        self._heartbeat_thread.start()
+
+        next_reclaim = 0.0
+        while not self._stopping.is_set():
+            try:
+                if time.monotonic() >= next_reclaim:
+                    self._reclaim(redis_conn, consumer)
+                    next_reclaim = (
+                        time.monotonic() + STREAM_RECLAIM_INTERVAL_SECONDS
+                    )
+                self._read(redis_conn, consumer, block=STREAM_BLOCK_MS)
+            except Exception as e:
+                logger.error(
+                    f"{self.service_name} failed to read '{self.stream}': "
+                    f"{e}. Retrying."
+                )
+                self._stopping.wait(1)
+        self._leave_group(redis_conn, consumer)
+        logger.info(f"{self.service_name} listener loop exiting.")
+
+    def _heartbeat_key(self, consumer: str) -> str:
+        return f"{self.stream}:{self.group}:alive:{consumer}"
+
+    def _beat(self, redis_conn, consumer: str):
+        """Marks `consumer` as alive for the next heartbeat TTL."""
+        redis_conn.set(
+            self._heartbeat_key(consumer), 1, ex=STREAM_HEARTBEAT_TTL_SECONDS
+        )
+
+    def _heartbeat(self, redis_conn, consumer: str):
+        """Keeps `consumer` marked as alive until the listener stops."""
+        while not self._stopping.wait(STREAM_HEARTBEAT_SECONDS):
+            try:
+                self._beat(redis_conn, consumer)
+            except Exception as e:
+                logger.error(
+                    f"{self.service_name} failed to send its heartbeat: {e}"
+                )
+
+    def _leave_group(self, redis_conn, consumer: str):
+        """
+        Removes a stopping consumer from the group, unless it still has
+        entries pending, which are then reclaimed by the others once its
+        heartbeat has expired.
+        """
+        try:
+            redis_conn.delete(self._heartbeat_key(consumer))
+            pending = redis_conn.xpending_range(
+                self.stream, self.group, min="-", max="+", count=1,
+                consumername=consumer,
+            )
+            if not pending:
+                redis_conn.xgroup_delconsumer(
+                    self.stream, self.group, consumer
+                )
+        except Exception as e:
+            logger.warning(
+                f"{self.service_name} could not leave group "
+                f"'{self.group}': {e}"
+            )
+
+    def _ensure_group(self, redis_conn):
+        """
+        Creates the service's consumer group, starting from the oldest entry
+        kept so nothing published before its first listener is skipped.
+        """
+        try:
+            redis_conn.xgroup_create(
+                self.stream, self.group, id="0", mkstream=True
+            )
+        except ResponseError as e:
+            if "BUSYGROUP" not in str(e):
+                raise
+
+    def _read(self, redis_conn, consumer: str, block: Optional[int] = None):
+        """Handles the next new entries delivered to `consumer`."""
+        response = redis_conn.xreadgroup(
+            self.group,
+            consumer,
+            {self.stream: ">"},
+            count=STREAM_READ_COUNT,
+            block=block,
+        )
+        for _, entries in response or []:
+            self._handle_entries(redis_conn, entries)
+
+    def _handle_entries(self, redis_conn, entries: List[Tuple]):
+        """Dispatches stream entries, acknowledging each once handled."""
+        for entry_id, fields in entries:
+            # Entries trimmed from the stream while pending have no fields.
+            if fields:
+                self._dispatch(fields.get(b"data"))
+            redis_conn.xack(self.stream, self.group, entry_id)
+
+    def _reclaim(self, redis_conn, consumer: str):
+        """
+        Claims the entries of consumers that are gone, and removes gone
+        consumers with nothing pending from the group, such as those of
+        earlier runs of a restarted process.
+        """
+        consumers = [
+            info for info in redis_conn.xinfo_consumers(
+                self.stream, self.group
+            )
+            if self._name(info["name"]) != consumer
+        ]
+        if not consumers:
+            return
+        with redis_conn.pipeline(transaction=False) as pipe:
+            for info in consumers:
+                pipe.exists(self._heartbeat_key(self._name(info["name"])))
+            alive = pipe.execute()
+        removed = 0
+        for info, is_alive in zip(consumers, alive):
+            if is_alive:
+                continue
+            name = self._name(info["name"])
+            if info["pending"]:
+                self._reclaim_from(redis_conn, consumer, name)
+            # Deleting a consumer drops its pending entries, so only one
+            # left with none is removed.
+            if info["idle"] >= STREAM_CLAIM_IDLE_MS and not (
+                redis_conn.xpending_range(
+                    self.stream, self.group, min="-", max="+", count=1,
+                    consumername=name,
+                )
+            ):
+                redis_conn.xgroup_delconsumer(self.stream, self.group, name)
+                removed += 1
+        if removed:
+            logger.info(
+                f"🧹 {self.service_name} removed {removed} gone consumers "
+                f"from group '{self.group}'."
+            )
+            metrics_manager.increment(
+                STREAM_METRIC, f"{self.channel}:consumers_removed", removed
+            )
+
+    @staticmethod
+    def _name(name) -> str:
+        return name.decode("utf-8") if isinstance(name, bytes) else name
+
+    def _reclaim_from(self, redis_conn, consumer: str, gone: str):
+        """
+        Claims entries that the gone consumer left unacknowledged for too
+        long, and dead-letters those that keep failing to be handled.
+        """
+        pending = redis_conn.xpending_range(
+            self.stream,
+            self.group,
+            min="-",
+            max="+",
+            count=STREAM_READ_COUNT,
+            idle=STREAM_CLAIM_IDLE_MS,
+            consumername=gone,
+        )
+        retry = []
+        for entry in pending:
+            if entry["times_delivered"] < STREAM_MAX_DELIVERIES:
+                retry.append(entry["message_id"])
+                continue
+            entry_id = entry["message_id"]
+            for _, fields in redis_conn.xrange(
+                self.stream, entry_id, entry_id
+            ):
+                self._dead_letter(fields.get(b"data"))
+            redis_conn.xack(self.stream, self.group, entry_id)
+            metrics_manager.increment(
+                STREAM_METRIC, f"{self.channel}:dead_lettered"
+            )
+        if not retry:
+            return
+        claimed = redis_conn.xclaim(
+            self.stream, self.group, consumer, STREAM_CLAIM_IDLE_MS, retry
+        )
+        logger.warning(
+            f"♻️ {self.service_name} reclaimed {len(claimed)} stale entries "
+            f"from '{self.stream}'."
+        )
+        metrics_manager.increment(
+            STREAM_METRIC, f"{self.channel}:reclaimed", len(claimed)
+        )
+        self._handle_entries(redis_conn, claimed)
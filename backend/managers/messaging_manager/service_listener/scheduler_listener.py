@@ -1,5 +1,12 @@
 from typing import Callable
-from managers import task_manager, user_manager
+from managers import (
+    availability_manager,
+    metrics_manager,
+    redis_manager,
+    task_manager,
+    user_manager,
+)
+from tasks import refresh_scheduler
 from utility import logger
 from .listener import Listener
 
@@ -20,6 +27,71 @@ def _handle_availability_request(payload: dict):
         payload["username"],
         payload["store"],
         payload["card_data"],
+        lane=payload.get("lane"),
+    )
+
+
+def _handle_availability_sweep_request(payload: dict):
+    items = payload.get("items")
+    if not isinstance(items, list):
+        logger.error(
+            f"Invalid 'availability_sweep_request' payload. Missing "
+            f"'items'. Payload: {payload}"
+        )
+        return
+
+    required_keys = ["store", "card", "users"]
+    sweep_items = []
+    for item in items:
+        if not all(key in item for key in required_keys):
+            logger.error(
+                f"Invalid 'availability_sweep_request' item. Missing "
+                f"required keys. Item: {item}"
+            )
+            continue
+        sweep_items.append({
+            "store": item["store"]["slug"],
+            "card_name": item["card"]["name"],
+            "card_specs": item.get("card_specs") or [],
+            "users": item["users"],
+        })
+
+    # Coalesce checks of pairs that are already queued and not yet cached.
+    pending = availability_manager.get_pending(
+        (item["store"], item["card_name"]) for item in sweep_items
+    )
+    queued = [
+        item for item, is_pending in zip(sweep_items, pending)
+        if not is_pending
+    ]
+    coalesced = len(sweep_items) - len(queued)
+
+    # Sweep checks are the lowest priority work; while the sweep lane is
+    # too far behind, hand them back to the refresh schedule, due again
+    # shortly rather than after the retry interval of a released check.
+    deferred = 0
+    if queued and task_manager.is_backlogged(redis_manager.SWEEP_LANE):
+        logger.warning(
+            f"🚧 Sweep lane is backlogged. Deferring {len(queued)} "
+            f"availability checks by "
+            f"{refresh_scheduler.BACKLOG_RETRY_SECONDS}s."
+        )
+        refresh_scheduler.reschedule(queued)
+        deferred, queued = len(queued), []
+    metrics_manager.increment_many(
+        task_manager.BACKPRESSURE_METRIC,
+        {"sweep:coalesced": coalesced, "sweep:deferred": deferred},
+    )
+    if not queued:
+        return
+
+    # One job per store and batch of cards, sized by the store's latency.
+    task_manager.queue_tasks(
+        task_manager.task_definitions.UPDATE_AVAILABILITY_STORE_BATCH,
+        availability_manager.batch_by_store(queued),
+    )
+    availability_manager.mark_pending(
+        (item["store"], item["card_name"]) for item in queued
     )
 
 
@@ -35,20 +107,23 @@ def _handle_queue_all_availability_checks(payload: dict):
     stores = user_manager.get_user_stores(username)
     user_cards = user_manager.load_card_list(username)
 
-    for store in stores:
-        for card in user_cards:
-            # Pass the full card data model, not just the name.
-            task_manager.queue_task(
-                task_manager.task_definitions.UPDATE_AVAILABILITY_SINGLE_CARD,
-                username,
-                store.slug,
-                card,
-            )
+    # Pass the full card data model, not just the name.
+    task_manager.queue_tasks(
+        task_manager.task_definitions.UPDATE_AVAILABILITY_SINGLE_CARD,
+        (
+            (username, store.slug, card)
+            for store in stores
+            for card in user_cards
+        ),
+        lane=redis_manager.USER_REFRESH_LANE,
+    )
 
 
 HANDLER_MAP: dict[str, Callable] = {
     "availability_request":
     _handle_availability_request,
+    "availability_sweep_request":
+    _handle_availability_sweep_request,
     "queue_all_availability_checks":
     _handle_queue_all_availability_checks,
 }
@@ -1,26 +1,61 @@
-from managers import availability_manager
+from itertools import islice
+
+from managers import availability_manager, redis_manager
 from data import database
 from utility import logger
 from .listener import Listener
 
 
+def _cache_availability_result(result: dict):
+    """
+    Caches one availability result under the store's slug and the card's
+    name, the same keys it is looked up and indexed by.
+
+    Raises:
+        KeyError, TypeError: If the result is not shaped like an
+        `AvailabilityResultPayload`.
+    """
+    availability_manager.cache_availability_data(
+        result["store"]["slug"],
+        result["card"]["card"]["name"],
+        result["items"],
+    )
+
+
 def _handle_availability_result(payload: dict):
     """
     Handler for processing 'availability_result' messages from workers.
     Caches the availability data.
     """
-    if all(k in payload for k in ["store", "card", "items"]):
+    try:
         logger.info(
-            f"Received availability result for '{payload['card']}' at "
-            f"'{payload['store']}' from worker."
-        )
-        availability_manager.cache_availability_data(
-            payload["store"], payload["card"], payload["items"]
+            f"Received availability result for "
+            f"'{payload['card']['card']['name']}' at "
+            f"'{payload['store']['slug']}' from worker."
         )
-    else:
+        _cache_availability_result(payload)
+    except (KeyError, TypeError):
         logger.error(f"Invalid availability result payload: {payload}")
 
 
+def _handle_availability_result_batch(payload: dict):
+    """
+    Handler for 'availability_result_batch' messages from workers, which
+    carry the results of several cards checked at one store.
+    """
+    results = payload.get("results")
+    if not isinstance(results, list):
+        logger.error(f"Invalid availability result batch payload: {payload}")
+        return
+
+    logger.info(f"Received {len(results)} availability results from worker.")
+    for result in results:
+        try:
+            _cache_availability_result(result)
+        except (KeyError, TypeError):
+            logger.error(f"Invalid availability result in batch: {result}")
+
+
 def _handle_catalog_card_names_result(payload: dict):
     """Handler for 'catalog_card_names_result' from workers."""
     card_names = payload.get("names")
@@ -63,7 +98,11 @@ def _handle_catalog_printings_chunk_result(payload: dict):
 
     logger.info(f"Processing chunk of {len(printings_chunk)} printings\
                  from worker.")
+    _add_printings(printings_chunk)
+
 
+def _add_printings(printings_chunk: list):
+    """Adds card printings and the finishes they come in."""
     # First, add all unique finishes to the database
     finishes_in_chunk = {finish for card in printings_chunk
                          for finish in card.get("finishes", [])}
@@ -79,14 +118,59 @@ def _handle_catalog_printings_chunk_result(payload: dict):
     database.bulk_add_card_printings(printings_to_add)
 
 
+# Catalog records read from a blob are written to the database in batches
+# of this many, so a chunk is never held in memory whole.
+CATALOG_BLOB_BATCH_SIZE = 5000
+
+_CATALOG_BLOB_WRITERS = {
+    "card_names": database.add_card_names_to_catalog,
+    "printings": _add_printings,
+}
+
+
+def _handle_catalog_blob_result(payload: dict):
+    """
+    Handler for 'catalog_blob_result' messages, which reference catalog
+    records a worker wrote to a compressed blob. The blob is read and
+    decoded incrementally and its records are stored batch by batch.
+    """
+    add_records = _CATALOG_BLOB_WRITERS.get(payload.get("kind"))
+    key = payload.get("key")
+    if add_records is None or not key:
+        logger.error(f"Invalid catalog blob payload: {payload}")
+        return
+
+    logger.info(
+        f"Reading {payload.get('records')} {payload['kind']} records from "
+        f"blob '{key}' ({payload.get('compressed_bytes')} bytes)."
+    )
+    records = redis_manager.read_blob(
+        redis_manager.get_redis_connection(), key
+    )
+    stored = 0
+    try:
+        while True:
+            batch = list(islice(records, CATALOG_BLOB_BATCH_SIZE))
+            if not batch:
+                break
+            add_records(batch)
+            stored += len(batch)
+    except redis_manager.BlobNotFoundError as e:
+        logger.error(f"Catalog blob is gone after {stored} records: {e}")
+        return
+    logger.info(f"Stored {stored} {payload['kind']} records from '{key}'.")
+
+
 # A map of event types to their corresponding handler functions.
 HANDLER_MAP = {
     "availability_result": _handle_availability_result,
+    "availability_result_batch": _handle_availability_result_batch,
     "catalog_card_names_result": _handle_catalog_card_names_result,
     "catalog_set_data_result": _handle_catalog_set_data_result,
     "catalog_finishes_result": _handle_catalog_finishes_result,
     "catalog_finishes_chunk_result": _handle_catalog_finishes_result,
     "catalog_printings_chunk_result": _handle_catalog_printings_chunk_result,
+    "catalog_blob_result": _handle_catalog_blob_result,
 }
 
 
@@ -0,0 +1,19 @@
+from .metrics_manager import (
+    increment,
+    increment_many,
+    set_gauge,
+    set_gauges,
+    get_metric,
+    get_all_metrics,
+    reset_metric,
+)
+
+__all__ = [
+    "increment",
+    "increment_many",
+    "set_gauge",
+    "set_gauges",
+    "get_metric",
+    "get_all_metrics",
+    "reset_metric",
+]
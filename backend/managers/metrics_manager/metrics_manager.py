@@ -0,0 +1,143 @@
+"""
+Lightweight, Redis-backed operational metrics.
+
+Workers run each job in a short-lived process, so in-process counters vanish
+as soon as a job finishes. Metrics are therefore kept in Redis hashes
+(``metrics:<name>``), where every process in the cluster can update them
+atomically and the web server can read them back for the `/api/metrics`
+endpoint.
+
+Metric writes are best-effort: a Redis failure is logged and swallowed so
+that instrumentation can never break the code path being measured.
+"""
+from typing import Dict, Optional
+
+from managers import redis_manager
+from utility import logger
+
+METRICS_KEY_PREFIX = "metrics:"
+
+
+def _metric_key(name: str) -> str:
+    """Builds the Redis key holding the hash for a metric."""
+    return f"{METRICS_KEY_PREFIX}{name}"
+
+
+def increment(name: str, field: str, amount: float = 1) -> None:
+    """
+    Atomically increments a counter field of a metric.
+
+    Args:
+        name: The metric name (e.g. 'http_connections').
+        field: The field within the metric (e.g. 'my_store:requests').
+        amount: The amount to add. Floats are supported for durations.
+    """
+    if not amount:
+        return
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return
+        if isinstance(amount, int):
+            redis_conn.hincrby(_metric_key(name), field, amount)
+        else:
+            redis_conn.hincrbyfloat(_metric_key(name), field, amount)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to increment metric {name}[{field}]: {e}")
+
+
+def increment_many(name: str, values: Dict[str, float]) -> None:
+    """Increments several fields of a metric in a single round trip."""
+    values = {field: amount for field, amount in values.items() if amount}
+    if not values:
+        return
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return
+        pipe = redis_conn.pipeline(transaction=False)
+        for field, amount in values.items():
+            if isinstance(amount, int):
+                pipe.hincrby(_metric_key(name), field, amount)
+            else:
+                pipe.hincrbyfloat(_metric_key(name), field, amount)
+        pipe.execute()
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to increment metric {name}: {e}")
+
+
+def set_gauge(name: str, field: str, value: float) -> None:
+    """Sets a gauge field of a metric to an absolute value."""
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return
+        redis_conn.hset(_metric_key(name), field, value)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to set metric {name}[{field}]: {e}")
+
+
+def set_gauges(name: str, values: Dict[str, float]) -> None:
+    """Sets several gauge fields of a metric in a single round trip."""
+    if not values:
+        return
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return
+        redis_conn.hset(_metric_key(name), mapping=values)
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to set metric {name}: {e}")
+
+
+def get_metric(name: str) -> Dict[str, float]:
+    """Returns all fields of a metric as numbers."""
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return {}
+        raw = redis_conn.hgetall(_metric_key(name))
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to read metric {name}: {e}")
+        return {}
+    return {
+        _decode(field): _to_number(value) for field, value in raw.items()
+    }
+
+
+def get_all_metrics() -> Dict[str, Dict[str, float]]:
+    """Returns every metric currently stored, keyed by metric name."""
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return {}
+        keys = list(redis_conn.scan_iter(match=f"{METRICS_KEY_PREFIX}*"))
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to list metrics: {e}")
+        return {}
+    names = sorted(_decode(key)[len(METRICS_KEY_PREFIX):] for key in keys)
+    return {name: get_metric(name) for name in names}
+
+
+def reset_metric(name: str) -> None:
+    """Deletes all fields of a metric."""
+    try:
+        redis_conn = redis_manager.get_redis_connection()
+        if redis_conn is None:
+            return
+        redis_conn.delete(_metric_key(name))
+    except Exception as e:
+        logger.warning(f"⚠️ Failed to reset metric {name}: {e}")
+
+
+def _decode(value) -> str:
+    return value.decode("utf-8") if isinstance(value, bytes) else str(value)
+
+
+def _to_number(value) -> Optional[float]:
+    text = _decode(value)
+    try:
+        number = float(text)
+    except ValueError:
+        return None
+    return int(number) if number.is_integer() else number
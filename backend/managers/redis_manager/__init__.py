@@ -5,8 +5,19 @@ from .redis_manager import (
     health_check,
     pubsub,
     publish_pubsub,
+    stream_key,
     get_redis_connection,
+    get_queue,
+    INTERACTIVE_LANE,
+    USER_REFRESH_LANE,
+    SWEEP_LANE,
+    CATALOG_LANE,
+    PRIORITY_LANES,
+    MESSAGE_TRANSPORT,
+    STREAMS_TRANSPORT,
 )
+from .codec import decode_message, encode_message
+from .blob_transfer import BlobNotFoundError, BlobWriter, read_blob
 
 
 __all__ = [
@@ -16,5 +27,19 @@ __all__ = [
     "health_check",
     "pubsub",
     "publish_pubsub",
+    "stream_key",
     "get_redis_connection",
+    "get_queue",
+    "INTERACTIVE_LANE",
+    "USER_REFRESH_LANE",
+    "SWEEP_LANE",
+    "CATALOG_LANE",
+    "PRIORITY_LANES",
+    "MESSAGE_TRANSPORT",
+    "STREAMS_TRANSPORT",
+    "decode_message",
+    "encode_message",
+    "BlobNotFoundError",
+    "BlobWriter",
+    "read_blob",
 ]
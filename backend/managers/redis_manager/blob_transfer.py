@@ -0,0 +1,146 @@
+"""
+Hands large record sets between services through compressed Redis blobs.
+
+Publishing a catalog chunk as one pub/sub message makes Redis buffer the
+whole message on the output buffer of every subscriber, and a subscriber
+whose buffer grows past Redis' limit is disconnected. Instead, a producer
+writes the records to a transient blob and publishes only a small reference
+to it:
+
+- `BlobWriter` encodes each record as one line of JSON and feeds it to a
+  zlib stream. Every `BLOB_SEGMENT_BYTES` of compressed output is appended
+  to the blob's Redis list (``blob:<id>``) as it is produced, so neither
+  side ever holds the whole record set, raw or compressed.
+- `read_blob` fetches the list one segment at a time, decompresses it
+  incrementally and yields the records back, deleting the blob once it has
+  been read to the end.
+
+Blobs expire after `BLOB_TTL_SECONDS`, so one whose reference is lost, or
+whose reader fails, does not linger in Redis.
+"""
+
+import os
+import uuid
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import msgspec
+
+from utility import logger
+
+BLOB_KEY_PREFIX = "blob:"
+BLOB_TTL_SECONDS = int(os.environ.get("BLOB_TTL_SECONDS", 3600))
+# Compressed bytes per list element.
+BLOB_SEGMENT_BYTES = int(os.environ.get("BLOB_SEGMENT_BYTES", 256 * 1024))
+BLOB_COMPRESSION_LEVEL = 6
+
+
+class BlobNotFoundError(LookupError):
+    """Raised when a referenced blob has expired or was never written."""
+
+
+class BlobWriter:
+    """
+    Streams records into a new compressed blob.
+
+    Usage:
+        with BlobWriter(redis_conn) as writer:
+            for record in records:
+                writer.write(record)
+        publish(writer.reference())
+    """
+
+    def __init__(self, redis_conn, key: Optional[str] = None):
+        self.redis_conn = redis_conn
+        self.key = key or f"{BLOB_KEY_PREFIX}{uuid.uuid4().hex}"
+        self.records = 0
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+        self._encoder = msgspec.json.Encoder()
+        self._compressor = zlib.compressobj(BLOB_COMPRESSION_LEVEL)
+        self._pending = bytearray()
+        self._closed = False
+
+    def write(self, record: Any) -> None:
+        """Appends one record to the blob."""
+        line = self._encoder.encode(record) + b"\n"
+        self.records += 1
+        self.raw_bytes += len(line)
+        self._pending += self._compressor.compress(line)
+        if len(self._pending) >= BLOB_SEGMENT_BYTES:
+            self._push_segment()
+
+    def write_all(self, records: Iterable[Any]) -> None:
+        """Appends every record of an iterable to the blob."""
+        for record in records:
+            self.write(record)
+
+    def close(self) -> None:
+        """Flushes the compressor and writes the final segment."""
+        if self._closed:
+            return
+        self._closed = True
+        self._pending += self._compressor.flush()
+        self._push_segment()
+
+    def discard(self) -> None:
+        """Deletes whatever has been written, e.g. after a failure."""
+        self._closed = True
+        self.redis_conn.delete(self.key)
+
+    def reference(self) -> Dict[str, Any]:
+        """The small description of the blob that is published instead."""
+        return {
+            "key": self.key,
+            "records": self.records,
+            "compressed_bytes": self.compressed_bytes,
+        }
+
+    def _push_segment(self) -> None:
+        if not self._pending:
+            return
+        segment = bytes(self._pending)
+        self._pending.clear()
+        self.compressed_bytes += len(segment)
+        with self.redis_conn.pipeline() as pipe:
+            pipe.rpush(self.key, segment)
+            pipe.expire(self.key, BLOB_TTL_SECONDS)
+            pipe.execute()
+
+    def __enter__(self) -> "BlobWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def read_blob(redis_conn, key: str) -> Iterator[Any]:
+    """
+    Yields the records of a blob, fetching and decompressing one segment at
+    a time. The blob is deleted once every record has been read.
+
+    Raises:
+        BlobNotFoundError: If the blob does not exist (anymore).
+    """
+    segments = redis_conn.llen(key)
+    if not segments:
+        raise BlobNotFoundError(f"Blob '{key}' does not exist.")
+    decoder = msgspec.json.Decoder()
+    decompressor = zlib.decompressobj()
+    remainder = b""
+    for index in range(segments):
+        segment = redis_conn.lindex(key, index)
+        if segment is None:
+            raise BlobNotFoundError(f"Blob '{key}' expired while read.")
+        data = remainder + decompressor.decompress(segment)
+        lines = data.split(b"\n")
+        remainder = lines.pop()
+        for line in lines:
+            yield decoder.decode(line)
+    remainder += decompressor.flush()
+    if remainder:
+        logger.warning(f"⚠️ Blob '{key}' ends with an incomplete record.")
+    redis_conn.delete(key)
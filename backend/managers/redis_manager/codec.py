@@ -0,0 +1,138 @@
+"""
+Wire codecs for service messages.
+
+Every message travels as a versioned envelope,
+``{"v": ENVELOPE_VERSION, "type": <message name>, "payload": <payload>}``,
+encoded by the codec chosen with `MESSAGE_CODEC`:
+
+- ``json`` (the default) stays readable by anything that understands the
+  old JSON messages. The payload is serialized by pydantic straight to JSON
+  bytes and spliced into the envelope, without building the intermediate
+  dicts of a ``model_dump``.
+- ``msgpack`` encodes with msgspec. A payload's own fields are encoded as
+  they are, so the large lists of plain values in catalog messages are
+  never dumped by pydantic, and messages are about a fifth smaller. Nested
+  models are dumped one by one, which makes model-heavy messages (sweep
+  commands, result batches) slower to encode than with ``json``; see
+  ``utilities/benchmark_codecs.py``.
+
+Decoding does not depend on `MESSAGE_CODEC`: a JSON envelope always starts
+with ``{``, which no msgpack map does, so listeners accept both codecs and
+publishers can switch codecs without a coordinated restart. Envelopes
+without a version are the untagged JSON messages of earlier releases.
+"""
+
+import os
+from typing import Any, Dict, Optional, Union
+
+import msgspec
+import pydantic_core
+from pydantic import BaseModel
+
+ENVELOPE_VERSION = 1
+JSON_CODEC = "json"
+MSGPACK_CODEC = "msgpack"
+MESSAGE_CODEC = os.environ.get("MESSAGE_CODEC", JSON_CODEC)
+
+
+def _enc_hook(obj: Any) -> Any:
+    """Lets msgspec encode nested pydantic models and other stray types."""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    return str(obj)
+
+
+class Codec:
+    """Turns message envelopes into bytes and back."""
+
+    name: str
+
+    def encode(self, message_type: str, payload: Any) -> bytes:
+        raise NotImplementedError  # pragma: no cover
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        raise NotImplementedError  # pragma: no cover
+
+
+class JsonCodec(Codec):
+    name = JSON_CODEC
+
+    def __init__(self):
+        self._encoder = msgspec.json.Encoder()
+
+    def encode(self, message_type: str, payload: Any) -> bytes:
+        return self._encoder.encode({
+            "v": ENVELOPE_VERSION,
+            "type": message_type,
+            "payload": msgspec.Raw(pydantic_core.to_json(payload)),
+        })
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return msgspec.json.decode(data)
+
+
+class MsgpackCodec(Codec):
+    name = MSGPACK_CODEC
+
+    def __init__(self):
+        self._encoder = msgspec.msgpack.Encoder(enc_hook=_enc_hook)
+
+    def encode(self, message_type: str, payload: Any) -> bytes:
+        # Only the payload's own fields are taken as they are; msgspec
+        # encodes large lists of plain values far faster than pydantic dumps
+        # them, while nested models are dumped by `_enc_hook`.
+        if isinstance(payload, BaseModel):
+            payload = dict(payload)
+        return self._encoder.encode({
+            "v": ENVELOPE_VERSION,
+            "type": message_type,
+            "payload": payload,
+        })
+
+    def decode(self, data: bytes) -> Dict[str, Any]:
+        return msgspec.msgpack.decode(data)
+
+
+CODECS: Dict[str, Codec] = {
+    codec.name: codec for codec in (JsonCodec(), MsgpackCodec())
+}
+
+
+def get_codec(name: str) -> Codec:
+    """Returns a codec by name, raising ValueError for unknown ones."""
+    try:
+        return CODECS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown message codec '{name}'. Use one of: {', '.join(CODECS)}"
+        ) from None
+
+
+def encode_message(
+    message_type: str, payload: Any, codec: Optional[str] = None
+) -> bytes:
+    """Encodes a message envelope with `codec` (`MESSAGE_CODEC` if None)."""
+    return get_codec(codec or MESSAGE_CODEC).encode(message_type, payload)
+
+
+def decode_message(data: Union[bytes, str]) -> Dict[str, Any]:
+    """
+    Decodes a message envelope of either codec.
+
+    Raises:
+        ValueError: If the message is not an envelope, or was written by a
+        newer envelope version than this release understands.
+    """
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    codec = CODECS[JSON_CODEC if data[:1] == b"{" else MSGPACK_CODEC]
+    try:
+        envelope = codec.decode(data)
+    except msgspec.DecodeError as e:
+        raise ValueError(f"Malformed {codec.name} message: {e}") from e
+    if not isinstance(envelope, dict):
+        raise ValueError("Message is not an envelope.")
+    version = envelope.get("v", 0)
+    if not isinstance(version, int) or version > ENVELOPE_VERSION:
+        raise ValueError(f"Unsupported message envelope version {version!r}.")
+    return envelope
@@ -10,11 +10,11 @@ from redis import Redis
 from redis.client import PubSub
 from rq import Queue
 from rq_scheduler import Scheduler
-import json
 import os
 from schema.messaging.messages import PubSubMessages
 
 from utility import logger
+from .codec import encode_message
 
 # --- Redis Connection ---
 # Use an environment variable for the URL, falling back to a default
@@ -22,6 +22,18 @@ from utility import logger
 REDIS_URL = os.environ.get("REDIS_URL", "redis://redis:6379")
 _redis_connections = {}
 
+# --- Message Transport ---
+# Service messages travel over plain pub/sub by default. With the "streams"
+# transport every channel is a Redis Stream (``stream:<channel>``) read by a
+# consumer group per service, so messages outlive a restarting listener and
+# each one is handled by only one of the service's processes.
+PUBSUB_TRANSPORT = "pubsub"
+STREAMS_TRANSPORT = "streams"
+MESSAGE_TRANSPORT = os.environ.get("MESSAGE_TRANSPORT", PUBSUB_TRANSPORT)
+STREAM_KEY_PREFIX = "stream:"
+# Approximate number of entries kept per stream; older ones are trimmed.
+STREAM_MAXLEN = int(os.environ.get("STREAM_MAXLEN", 10000))
+
 
 def get_redis_connection(decode_responses=False) -> Optional[Redis]:
     """
@@ -54,6 +66,32 @@ def get_redis_connection(decode_responses=False) -> Optional[Redis]:
 queue = Queue(connection=get_redis_connection())
 scheduler = Scheduler(queue=queue, connection=get_redis_connection())
 
+# --- Priority Lanes ---
+# Jobs are routed to a named queue ("lane") by how urgently someone is
+# waiting on them, so a user who just added a card is never stuck behind
+# thousands of sweep jobs. Workers listen to the lanes in this order, and
+# to the 'default' queue last.
+INTERACTIVE_LANE = "interactive"
+USER_REFRESH_LANE = "user-refresh"
+SWEEP_LANE = "sweep"
+CATALOG_LANE = "catalog"
+PRIORITY_LANES = [
+    INTERACTIVE_LANE,
+    USER_REFRESH_LANE,
+    SWEEP_LANE,
+    CATALOG_LANE,
+]
+
+
+def get_queue(lane: Optional[str] = None) -> Queue:
+    """
+    Returns the RQ queue for a priority lane, or the default queue if no
+    lane is given.
+    """
+    if not lane:
+        return queue
+    return Queue(lane, connection=get_redis_connection())
+
 
 def pubsub(**kwargs) -> Optional[PubSub]:
     """
@@ -65,23 +103,35 @@ def pubsub(**kwargs) -> Optional[PubSub]:
     return redis_conn.pubsub(**kwargs)
 
 
+def stream_key(channel: str) -> str:
+    """Returns the Redis Stream that carries a channel's messages."""
+    return f"{STREAM_KEY_PREFIX}{channel}"
+
+
 def publish_pubsub(message: PubSubMessages):
     """
     Publishes a JSON payload to a specified Redis channel using
     the job connection.
-    This abstracts the direct Redis publish operation.
+    This abstracts the direct Redis publish operation, and appends the
+    message to the channel's stream instead when the streams transport is
+    enabled. The message is encoded with the configured codec (see
+    `codec.MESSAGE_CODEC`).
     """
     logger.info(f"Publishing {message.payload} to {message.channel}")
     redis_conn = get_redis_connection()
     if redis_conn is None:
         return None
 
-    payload_data = message.payload
-    if not isinstance(payload_data, dict):
-        payload_data = payload_data.model_dump(mode="json")
-
-    data = {"type": message.name, "payload": payload_data}
-    redis_conn.publish(message.channel, json.dumps(data))
+    data = encode_message(message.name, message.payload)
+    if MESSAGE_TRANSPORT == STREAMS_TRANSPORT:
+        redis_conn.xadd(
+            stream_key(message.channel),
+            {"data": data},
+            maxlen=STREAM_MAXLEN,
+            approximate=True,
+        )
+        return
+    redis_conn.publish(message.channel, data)
 
 
 def health_check():
@@ -13,6 +13,17 @@ from managers.redis_manager import REDIS_URL
 from managers import user_manager
 from schema.messaging import messages
 
+# Worker-side Socket.IO client, created on first use and reused for every
+# emit so each event doesn't pay for a new Redis message queue connection.
+_external_socketio = None
+
+
+def _get_external_socketio() -> SocketIO:
+    global _external_socketio
+    if _external_socketio is None:
+        _external_socketio = SocketIO(message_queue=REDIS_URL)
+    return _external_socketio
+
 
 def log_and_emit(level: str, message: str, room: str = ""):
     """Logs a message and emits it to a specific room or all clients."""
@@ -33,8 +44,7 @@ def emit_from_worker(event: str, data: dict, room: str = ""):
     target = f"to room '{room}'" if room else "as a broadcast"
     logger.info(f"📢 Worker emitting event '{event}' {target} via Redis.")
     try:
-        external_socketio = SocketIO(message_queue=REDIS_URL)
-        external_socketio.emit(event, data, to=room)
+        _get_external_socketio().emit(event, data, to=room)
         logger.info(f"📢 Worker dispatched event '{event}' {target} via Redis.")
     except Exception as e:
         logger.error(
@@ -1,10 +1,11 @@
-from .store_manager import get_store
+from .store_manager import check_availability_concurrently, get_store
 
 """
 This module initializes and exposes key components for store management.
 
 It provides:
 - `get_store`: A function to retrieve store instances.
+- `check_availability_concurrently`: Checks many (store, card) pairs at once.
 - `Store`: The base class representing a store.
 - `Listing`: The class representing a product listing within a store.
 - `STORE_REGISTRY`: A registry containing available store implementations.
@@ -15,4 +16,7 @@ application for managing store-related operations.
 from .stores.store import Store
 from .stores import STORE_REGISTRY
 
-__all__ = ["get_store", "Store", "STORE_REGISTRY"]
+__all__ = [
+    "get_store",
+    "check_availability_concurrently",
+    "Store", "STORE_REGISTRY"]
@@ -1,7 +1,10 @@
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 from .stores import STORE_REGISTRY
 from .stores import Store
+from .stores.storefronts.crystal_commerce_async_store import (
+    fetch_availability_concurrently,
+)
 
 
 def get_store(store_name: str = "") -> Optional[Store]:
@@ -19,3 +22,36 @@ def get_store(store_name: str = "") -> Optional[Store]:
 
 def get_stores() -> list[Store]:
     return list(STORE_REGISTRY.get_registry().values())
+
+
+def check_availability_concurrently(
+    checks: Iterable[Tuple[str, str, Optional[List[Dict[str, Any]]]]],
+) -> List[List[Dict[str, Any]]]:
+    """
+    Checks many (store slug, card name, specifications) triples at once.
+
+    Stores using an async fetch strategy share a single event loop, so one
+    caller can keep many requests in flight. Unknown store slugs, and stores
+    whose circuit breaker is open, produce an empty result. Results are
+    returned in the same order as `checks`.
+
+    No worker job calls this yet; the sweep's store batches use
+    `Store.fetch_listings_many` instead.
+    """
+    checks = list(checks)
+    known = []
+    allowed = {}
+    for index, (store_slug, card_name, specifications) in enumerate(checks):
+        store = get_store(store_slug)
+        if store is None:
+            continue
+        if store_slug not in allowed:
+            allowed[store_slug] = store.circuit_breaker.allow_request()
+        if allowed[store_slug]:
+            known.append((index, (store, card_name, specifications)))
+
+    results: List[List[Dict[str, Any]]] = [[] for _ in checks]
+    fetched = fetch_availability_concurrently(check for _, check in known)
+    for (index, _), items in zip(known, fetched):
+        results[index] = items
+    return results
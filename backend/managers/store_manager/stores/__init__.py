@@ -8,6 +8,9 @@ the `STORE_REGISTRY`, making them available to the rest of the application.
 """
 
 from utility import logger
+from .storefronts.crystal_commerce_async_store import (
+    AsyncCrystalCommerceStore,
+)
 from .storefronts.crystal_commerce_store import CrystalCommerceStore
 from .storefronts.default import DefaultStore
 from ..stores.store import Store
@@ -27,6 +30,7 @@ class LazyStoreRegistry:
         self._registry: dict[str, Store] = {}
         self._strategy_map = {
             "crystal_commerce": CrystalCommerceStore,
+            "crystal_commerce_async": AsyncCrystalCommerceStore,
             "default": DefaultStore,
         }
         self._loaded = False
@@ -55,6 +59,10 @@ class LazyStoreRegistry:
                     slug=store_model.slug,
                     homepage=store_model.homepage,
                     search_url=store_model.search_url,
+                    max_concurrency=store_model.max_concurrency,
+                    rate_limit_per_second=store_model.rate_limit_per_second,
+                    rate_limit_burst=store_model.rate_limit_burst,
+                    stale_after_seconds=store_model.stale_after_seconds,
                 )
                 self._registry[instance.slug] = instance
         self._loaded = True
@@ -0,0 +1,217 @@
+"""
+Adaptive, cluster-wide backoff for stores that push back on our requests.
+
+When a store rate limits us, every worker scraping it should slow down, not
+just the request that happened to be refused. `AdaptiveBackoff` keeps one
+small Redis hash per store (`backoff:<slug>`) with:
+
+- `paused_until`: when requests to the store may resume. It is set from
+  the store's `Retry-After` header when there is one, and otherwise grows
+  exponentially with the number of recent rate-limit events (`strikes`).
+- `multiplier`: the fraction of the configured request rate that is
+  currently used. Each rate-limit event halves it (multiplicative
+  decrease), and each successful request adds a small step back, up to
+  the full rate (additive increase).
+
+The token bucket in `rate_limiter` reads the same hash, so the pause and
+the reduced rate apply to every worker. The resulting effective request
+rate of each store is published as the `store_request_rate` metric.
+"""
+
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+from managers import metrics_manager, redis_manager
+from utility import logger
+
+STORE_REQUEST_RATE_METRIC = "store_request_rate"
+
+# Delay after the first rate limit without a Retry-After header; doubles
+# with every further strike.
+BASE_DELAY_SECONDS = 0.5
+MAX_DELAY_SECONDS = 300.0
+# Multiplicative decrease and additive increase of the request rate.
+DECREASE_FACTOR = 0.5
+INCREASE_STEP = 0.05
+MIN_MULTIPLIER = 0.1
+# Forget a store's backoff state after an hour without rate limits.
+STATE_TTL_SECONDS = 60 * 60
+
+# KEYS[1]: backoff hash. ARGV: Retry-After seconds (negative when absent),
+# base delay, max delay, decrease factor, min multiplier, ttl.
+# Returns {delay, multiplier} as strings.
+_RECORD_RATE_LIMIT_SCRIPT = """
+local retry_after = tonumber(ARGV[1])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'strikes', 'multiplier',
+                         'paused_until')
+local strikes = (tonumber(state[1]) or 0) + 1
+local multiplier = tonumber(state[2]) or 1
+local paused_until = tonumber(state[3]) or 0
+
+local delay = retry_after
+if delay < 0 then
+    delay = tonumber(ARGV[2]) * 2 ^ (strikes - 1)
+end
+delay = math.min(delay, tonumber(ARGV[3]))
+multiplier = math.max(tonumber(ARGV[5]), multiplier * tonumber(ARGV[4]))
+paused_until = math.max(paused_until, now + delay)
+
+redis.call('HSET', KEYS[1], 'strikes', strikes,
+           'multiplier', tostring(multiplier),
+           'paused_until', tostring(paused_until))
+redis.call('HINCRBY', KEYS[1], 'rate_limit_events', 1)
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[6]))
+return {tostring(paused_until - now), tostring(multiplier)}
+"""
+
+# KEYS[1]: backoff hash. ARGV: increase step, ttl.
+# Returns the new multiplier as a string, or false if nothing changed.
+_RECORD_SUCCESS_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'strikes', 'multiplier')
+local strikes = tonumber(state[1]) or 0
+local multiplier = tonumber(state[2]) or 1
+if strikes == 0 and multiplier >= 1 then
+    return false
+end
+multiplier = math.min(1, multiplier + tonumber(ARGV[1]))
+redis.call('HSET', KEYS[1], 'strikes', math.max(0, strikes - 1),
+           'multiplier', tostring(multiplier))
+redis.call('EXPIRE', KEYS[1], tonumber(ARGV[2]))
+return tostring(multiplier)
+"""
+
+# KEYS[1]: backoff hash. Returns the seconds left in the shared pause.
+_PAUSE_REMAINING_SCRIPT = """
+local paused_until = tonumber(redis.call('HGET', KEYS[1], 'paused_until'))
+if paused_until == nil then
+    return '0'
+end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+return tostring(math.max(0, paused_until - now))
+"""
+
+
+def backoff_key(store_slug: str) -> str:
+    """Generates the Redis key of a store's backoff state."""
+    return f"backoff:{store_slug}"
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parses a `Retry-After` header given either as a number of seconds or as
+    an HTTP date. Returns None if the header is missing or malformed.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    value = value.strip()
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at is None:
+        return None
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+class AdaptiveBackoff:
+    """
+    Shared rate-limit history and request-rate controller for one store.
+
+    Args:
+        store_slug: The store whose backoff state is tracked.
+        base_rate: The store's configured requests per second. Only used to
+            report the effective rate; 0 means the store has no rate limit.
+    """
+
+    def __init__(self, store_slug: str, base_rate: float = 0.0):
+        self.store_slug = store_slug
+        self.base_rate = base_rate
+        self.key = backoff_key(store_slug)
+        self._scripts = {}
+
+    def _script(self, source: str):
+        script = self._scripts.get(source)
+        if script is None:
+            redis_conn = redis_manager.get_redis_connection()
+            if redis_conn is None:
+                raise ConnectionError("Redis connection is None")
+            script = redis_conn.register_script(source)
+            self._scripts[source] = script
+        return script
+
+    def pause_remaining(self) -> float:
+        """Returns the seconds left in the store's shared pause."""
+        try:
+            return float(
+                self._script(_PAUSE_REMAINING_SCRIPT)(keys=[self.key])
+            )
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Could not read backoff state for '{self.store_slug}': "
+                f"{e}"
+            )
+            return 0.0
+
+    def record_rate_limit(self, retry_after: Optional[float] = None) -> float:
+        """
+        Records that the store rate limited a request and slows every worker
+        down accordingly.
+
+        Returns:
+            float: How long requests to the store are now paused for. If the
+            shared state cannot be updated, a local estimate is returned.
+        """
+        try:
+            delay, multiplier = self._script(_RECORD_RATE_LIMIT_SCRIPT)(
+                keys=[self.key],
+                args=[
+                    -1 if retry_after is None else retry_after,
+                    BASE_DELAY_SECONDS,
+                    MAX_DELAY_SECONDS,
+                    DECREASE_FACTOR,
+                    MIN_MULTIPLIER,
+                    STATE_TTL_SECONDS,
+                ],
+            )
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Could not record rate limit for '{self.store_slug}': {e}"
+            )
+            if retry_after is not None:
+                return min(retry_after, MAX_DELAY_SECONDS)
+            return BASE_DELAY_SECONDS
+
+        self._report_rate(float(multiplier))
+        return float(delay)
+
+    def record_success(self) -> None:
+        """
+        Records a successful request, letting the store's request rate
+        recover one step towards its configured value.
+        """
+        try:
+            multiplier = self._script(_RECORD_SUCCESS_SCRIPT)(
+                keys=[self.key], args=[INCREASE_STEP, STATE_TTL_SECONDS]
+            )
+        except Exception as e:
+            logger.debug(
+                f"Could not record success for '{self.store_slug}': {e}"
+            )
+            return
+        if multiplier is not None:
+            self._report_rate(float(multiplier))
+
+    def _report_rate(self, multiplier: float) -> None:
+        values = {f"{self.store_slug}:multiplier": multiplier}
+        if self.base_rate > 0:
+            values[self.store_slug] = self.base_rate * multiplier
+        for field, value in values.items():
+            metrics_manager.set_gauge(STORE_REQUEST_RATE_METRIC, field, value)
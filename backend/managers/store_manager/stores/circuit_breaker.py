@@ -0,0 +1,199 @@
+"""
+A per-store circuit breaker shared by every worker through Redis.
+
+When a store is down, every availability job for it would otherwise spend
+three retries and their timeouts before giving up, tying up workers that
+healthy stores are waiting for. `CircuitBreaker` counts consecutive store
+failures (connection errors, timeouts and 5xx responses) in the
+`circuit:<slug>` hash:
+
+- closed: requests flow normally. `failure_threshold` consecutive failures
+  open the circuit.
+- open: jobs for the store fail fast without any network I/O. After
+  `reset_timeout` seconds, one caller wins the `circuit:<slug>:probe` lock
+  and is let through as a probe; the circuit is then half-open.
+- half-open: every other caller keeps failing fast. The probe's first
+  success closes the circuit; a failure opens it again. If the probe's
+  worker dies, the probe lock expires and another caller may probe.
+
+A success anywhere resets the failure count. If Redis cannot be reached
+the breaker stays closed, so scraping degrades to the old behaviour.
+"""
+
+import os
+
+from managers import metrics_manager, redis_manager
+from utility import logger
+
+CIRCUIT_BREAKER_METRIC = "circuit_breaker"
+
+DEFAULT_FAILURE_THRESHOLD = int(
+    os.environ.get("STORE_CIRCUIT_FAILURE_THRESHOLD", 5)
+)
+DEFAULT_RESET_TIMEOUT_SECONDS = float(
+    os.environ.get("STORE_CIRCUIT_RESET_SECONDS", 60)
+)
+# How long a probe may take before another caller is allowed to probe.
+PROBE_TIMEOUT_SECONDS = 120
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# KEYS[1]: circuit hash, KEYS[2]: probe lock. ARGV: reset timeout, probe
+# timeout. Returns 1 if the caller may contact the store, 2 if it may do so
+# as the half-open probe, and 0 if it must fail fast.
+_ALLOW_REQUEST_SCRIPT = """
+local state = redis.call('HMGET', KEYS[1], 'state', 'opened_at')
+if state[1] ~= 'open' and state[1] ~= 'half_open' then
+    return 1
+end
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+if state[1] == 'open' and now - tonumber(state[2]) < tonumber(ARGV[1]) then
+    return 0
+end
+if redis.call('SET', KEYS[2], now, 'NX', 'EX', ARGV[2]) then
+    redis.call('HSET', KEYS[1], 'state', 'half_open')
+    return 2
+end
+return 0
+"""
+
+# KEYS[1]: circuit hash, KEYS[2]: probe lock. ARGV: failure threshold.
+# Returns the circuit state after the failure, and whether it just opened.
+_RECORD_FAILURE_SCRIPT = """
+local state = redis.call('HGET', KEYS[1], 'state') or 'closed'
+local failures = redis.call('HINCRBY', KEYS[1], 'failures', 1)
+if state == 'half_open'
+        or (state == 'closed' and failures >= tonumber(ARGV[1])) then
+    local clock = redis.call('TIME')
+    local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+    redis.call('HSET', KEYS[1], 'state', 'open', 'opened_at', tostring(now))
+    redis.call('DEL', KEYS[2])
+    return {'open', 1}
+end
+return {state, 0}
+"""
+
+
+def circuit_key(store_slug: str) -> str:
+    """Generates the Redis key of a store's circuit breaker state."""
+    return f"circuit:{store_slug}"
+
+
+class CircuitBreaker:
+    """
+    Opens after repeated store failures so jobs for that store fail fast.
+
+    Args:
+        store_slug: The store guarded by the breaker.
+        failure_threshold: Consecutive failures that open the circuit.
+        reset_timeout: Seconds an open circuit waits before a probe.
+    """
+
+    def __init__(
+        self,
+        store_slug: str,
+        failure_threshold: int = DEFAULT_FAILURE_THRESHOLD,
+        reset_timeout: float = DEFAULT_RESET_TIMEOUT_SECONDS,
+    ):
+        self.store_slug = store_slug
+        self.failure_threshold = max(int(failure_threshold), 1)
+        self.reset_timeout = reset_timeout
+        self.key = circuit_key(store_slug)
+        self.probe_key = f"{self.key}:probe"
+        self._scripts = {}
+
+    def _script(self, source: str):
+        script = self._scripts.get(source)
+        if script is None:
+            redis_conn = redis_manager.get_redis_connection()
+            if redis_conn is None:
+                raise ConnectionError("Redis connection is None")
+            script = redis_conn.register_script(source)
+            self._scripts[source] = script
+        return script
+
+    def state(self) -> str:
+        """Returns the circuit's current state: closed, open or half_open."""
+        try:
+            redis_conn = redis_manager.get_redis_connection()
+            state = redis_conn.hget(self.key, "state")
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Could not read circuit state for '{self.store_slug}': {e}"
+            )
+            return CLOSED
+        if isinstance(state, bytes):
+            state = state.decode("utf-8")
+        return state or CLOSED
+
+    def allow_request(self) -> bool:
+        """
+        Returns True if a job may contact the store. While the circuit is
+        half-open, only the single probe is allowed through.
+        """
+        try:
+            decision = int(
+                self._script(_ALLOW_REQUEST_SCRIPT)(
+                    keys=[self.key, self.probe_key],
+                    args=[self.reset_timeout, PROBE_TIMEOUT_SECONDS],
+                )
+            )
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Circuit breaker for '{self.store_slug}' is unavailable, "
+                f"allowing request: {e}"
+            )
+            return True
+
+        if decision == 2:
+            logger.info(
+                f"🔌 Circuit for '{self.store_slug}' is half-open. "
+                f"Sending a probe."
+            )
+            metrics_manager.increment(
+                CIRCUIT_BREAKER_METRIC, f"{self.store_slug}:probes"
+            )
+        elif decision == 0:
+            metrics_manager.increment(
+                CIRCUIT_BREAKER_METRIC, f"{self.store_slug}:short_circuited"
+            )
+        return decision != 0
+
+    def record_success(self) -> None:
+        """Closes the circuit and clears the store's failure count."""
+        try:
+            redis_manager.get_redis_connection().delete(
+                self.key, self.probe_key
+            )
+        except Exception as e:
+            logger.debug(
+                f"Could not record success for '{self.store_slug}': {e}"
+            )
+
+    def record_failure(self) -> None:
+        """
+        Counts a failed request to the store, opening the circuit once the
+        threshold is reached or when the half-open probe fails.
+        """
+        try:
+            state, opened = self._script(_RECORD_FAILURE_SCRIPT)(
+                keys=[self.key, self.probe_key],
+                args=[self.failure_threshold],
+            )
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Could not record failure for '{self.store_slug}': {e}"
+            )
+            return
+
+        if int(opened):
+            logger.warning(
+                f"🔌 Circuit for '{self.store_slug}' opened. Jobs for this "
+                f"store will fail fast for {self.reset_timeout:.0f} seconds."
+            )
+            metrics_manager.increment(
+                CIRCUIT_BREAKER_METRIC, f"{self.store_slug}:opened"
+            )
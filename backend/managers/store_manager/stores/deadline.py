@@ -0,0 +1,120 @@
+"""
+Per-job time budgets for store scrapes.
+
+A single card check can otherwise run for minutes: one search plus a
+product page per match, each with several retries, request timeouts and
+backoff sleeps. A job opens a `job_deadline`, and every request the scrape
+makes in that context consults it:
+
+- request timeouts and throttle waits are clamped to the time remaining,
+- a retry or backoff sleep that would end past the deadline is abandoned,
+- once the deadline has passed, no new request is sent at all.
+
+Whenever work is skipped this way the deadline is marked `exceeded`, so the
+job knows its listings are partial. The deadline lives in a context
+variable, which asyncio tasks inherit; threads of a pool do not, so work
+submitted to one is wrapped with `propagate`.
+"""
+
+import contextvars
+import functools
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Iterator, Optional, TypeVar
+
+# How long one card check may scrape a store before it returns what it has.
+SCRAPE_JOB_DEADLINE_SECONDS = float(
+    os.environ.get("SCRAPE_JOB_DEADLINE_SECONDS", 60)
+)
+
+T = TypeVar("T")
+
+
+class Deadline:
+    """The time budget of one job."""
+
+    def __init__(self, seconds: float):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+        # Set once any request, retry or wait was skipped for lack of time.
+        self.exceeded = False
+
+    def remaining(self) -> float:
+        """Returns the number of seconds left before the deadline."""
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def clamp(self, seconds: Optional[float]) -> float:
+        """Limits a timeout or wait to the time remaining."""
+        if seconds is None:
+            return self.remaining()
+        return min(seconds, self.remaining())
+
+    def cuts(self, seconds: float = 0.0) -> bool:
+        """
+        Tells whether waiting `seconds` would run into the deadline, and
+        marks the deadline exceeded if so.
+        """
+        if seconds < self.remaining():
+            return False
+        self.exceeded = True
+        return True
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar(
+    "scrape_deadline", default=None
+)
+
+
+def current() -> Optional[Deadline]:
+    """Returns the deadline of the running job, if it set one."""
+    return _current.get()
+
+
+@contextmanager
+def job_deadline(seconds: Optional[float] = None) -> Iterator[Deadline]:
+    """
+    Bounds every store request made inside the block to `seconds` in total
+    (`SCRAPE_JOB_DEADLINE_SECONDS` by default).
+    """
+    deadline = Deadline(
+        SCRAPE_JOB_DEADLINE_SECONDS if seconds is None else seconds
+    )
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def clamp(seconds: Optional[float]) -> Optional[float]:
+    """Limits a timeout or wait to the current deadline, if there is one."""
+    deadline = current()
+    return seconds if deadline is None else deadline.clamp(seconds)
+
+
+def cuts(seconds: float = 0.0) -> bool:
+    """
+    Tells whether waiting `seconds` would run into the current deadline,
+    marking it exceeded if so. Always False outside a deadline.
+    """
+    deadline = current()
+    return deadline is not None and deadline.cuts(seconds)
+
+
+def propagate(func: Callable[..., T]) -> Callable[..., T]:
+    """
+    Binds the current deadline to `func`, so it still applies when `func`
+    runs on another thread.
+    """
+    deadline = current()
+
+    @functools.wraps(func)
+    def bound(*args, **kwargs) -> T:
+        token = _current.set(deadline)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return bound
@@ -0,0 +1,82 @@
+"""
+HTML parsing backends for store scrapers.
+
+Building a full `BeautifulSoup` tree with the pure-Python `html.parser` is
+the main CPU cost of a scrape, yet the scrapers only read a few subtrees of
+each page. This module parses pages with the fastest available tree builder
+(lxml when it is installed) and uses `SoupStrainer`s so that only the parts
+we read are built:
+
+- search result pages: the `li.product` blocks,
+- product pages: the `div.product-more-info` block.
+
+The parser can be forced with the `STORE_HTML_PARSER` environment variable
+(e.g. `html.parser`), and every helper accepts a `parser` argument so
+backends can be compared side by side.
+"""
+
+import os
+from typing import Optional
+
+from bs4 import BeautifulSoup, FeatureNotFound, SoupStrainer
+
+from utility import logger
+
+HTML_PARSER = "html.parser"
+LXML_PARSER = "lxml"
+
+SEARCH_RESULTS_STRAINER = SoupStrainer("li", class_="product")
+PRODUCT_DETAILS_STRAINER = SoupStrainer("div", class_="product-more-info")
+
+
+def _lxml_available() -> bool:
+    try:
+        import lxml  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _default_parser() -> str:
+    configured = os.environ.get("STORE_HTML_PARSER")
+    if configured:
+        return configured
+    return LXML_PARSER if _lxml_available() else HTML_PARSER
+
+
+DEFAULT_PARSER = _default_parser()
+
+
+def parse_html(
+    markup: str,
+    parse_only: Optional[SoupStrainer] = None,
+    parser: Optional[str] = None,
+) -> BeautifulSoup:
+    """
+    Parses `markup` with the given (or default) parser, building only the
+    elements matched by `parse_only` when a strainer is given. Falls back to
+    `html.parser` if the requested parser is not installed.
+    """
+    parser = parser or DEFAULT_PARSER
+    try:
+        return BeautifulSoup(markup, parser, parse_only=parse_only)
+    except FeatureNotFound:
+        logger.warning(
+            f"⚠️ HTML parser '{parser}' is not installed. "
+            f"Falling back to '{HTML_PARSER}'."
+        )
+        return BeautifulSoup(markup, HTML_PARSER, parse_only=parse_only)
+
+
+def parse_search_results(
+    markup: str, parser: Optional[str] = None
+) -> BeautifulSoup:
+    """Parses only the `li.product` blocks of a search result page."""
+    return parse_html(markup, SEARCH_RESULTS_STRAINER, parser)
+
+
+def parse_product_page(
+    markup: str, parser: Optional[str] = None
+) -> BeautifulSoup:
+    """Parses only the `div.product-more-info` block of a product page."""
+    return parse_html(markup, PRODUCT_DETAILS_STRAINER, parser)
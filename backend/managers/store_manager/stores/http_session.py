@@ -0,0 +1,144 @@
+"""
+Pooled, keep-alive HTTP sessions for store scrapers.
+
+Each `Store` owns one `requests.Session` built by `create_session`. The
+session keeps TCP/TLS connections alive between requests, caps the number of
+connections per host, and negotiates compressed responses (gzip, deflate and
+brotli when the `brotli` package is installed).
+
+Event-loop based scrapers use `create_async_session` instead, which builds
+an `aiohttp.ClientSession` with the same identity and per-host connection cap.
+
+`connection_stats` reads the counters that urllib3 keeps on every connection
+pool, which lets us confirm that requests are reusing connections instead of
+paying for a new handshake every time.
+"""
+
+from typing import Dict, Optional
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import make_headers
+
+# Number of distinct hosts whose connection pools are cached per session.
+POOL_CONNECTIONS = 4
+# Maximum number of keep-alive connections kept open per host.
+POOL_MAXSIZE = 8
+# Identify ourselves consistently to the stores we scrape.
+USER_AGENT = "LGS-Stock-Checker/1.0"
+
+
+def create_session(pool_maxsize: int = POOL_MAXSIZE) -> requests.Session:
+    """
+    Creates a `requests.Session` configured for long-lived, pooled use.
+
+    Args:
+        pool_maxsize: The maximum number of connections kept open per host.
+            Requests beyond this limit block until a connection is free,
+            which enforces a hard per-host connection cap.
+
+    Returns:
+        requests.Session: A session with keep-alive connection pooling and
+        compressed transfer negotiation enabled.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {
+            # make_headers only advertises 'br' when a brotli decoder is
+            # installed, so we never ask for an encoding we cannot decode.
+            "Accept-Encoding": make_headers(accept_encoding=True)[
+                "accept-encoding"
+            ],
+            "Connection": "keep-alive",
+            "User-Agent": USER_AGENT,
+        }
+    )
+    return session
+
+
+def create_async_session(
+    limit_per_host: int = POOL_MAXSIZE,
+    stats: Optional[Dict[str, int]] = None,
+) -> aiohttp.ClientSession:
+    """
+    Creates an `aiohttp.ClientSession` for scraping from an event loop.
+
+    The session must be created, used and closed on the same running event
+    loop. aiohttp negotiates gzip/deflate (and brotli when available) and
+    keeps connections alive by default.
+
+    Args:
+        limit_per_host: The maximum number of simultaneous connections per
+            host. Further requests wait for a free connection.
+        stats: Counters, shaped like those of `connection_stats`, that the
+            session's requests and connections are added to.
+
+    Returns:
+        aiohttp.ClientSession: A session with pooled keep-alive connections.
+    """
+    connector = aiohttp.TCPConnector(limit_per_host=limit_per_host)
+    trace_configs = []
+    if stats is not None:
+        trace_configs.append(_connection_stats_tracer(stats))
+    return aiohttp.ClientSession(
+        connector=connector,
+        headers={"User-Agent": USER_AGENT},
+        trace_configs=trace_configs,
+    )
+
+
+def _connection_stats_tracer(stats: Dict[str, int]) -> aiohttp.TraceConfig:
+    """Counts an aiohttp session's requests and connections into `stats`."""
+
+    def counter(key: str):
+        async def count(session, context, params):
+            stats[key] = stats.get(key, 0) + 1
+        return count
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(counter("requests"))
+    trace_config.on_connection_create_end.append(counter("new_connections"))
+    trace_config.on_connection_reuseconn.append(
+        counter("reused_connections")
+    )
+    return trace_config
+
+
+def connection_stats(session: requests.Session) -> Dict[str, int]:
+    """
+    Summarises connection usage across all pools of a session.
+
+    Returns:
+        Dict[str, int]: The total number of `requests` sent, the number of
+        `new_connections` opened, and how many requests `reused_connections`
+        from the pool instead.
+    """
+    total_requests = 0
+    new_connections = 0
+    seen_adapters = set()
+    for adapter in session.adapters.values():
+        if id(adapter) in seen_adapters:
+            continue
+        seen_adapters.add(id(adapter))
+        pool_manager = getattr(adapter, "poolmanager", None)
+        if pool_manager is None:
+            continue
+        for pool_key in list(pool_manager.pools.keys()):
+            pool = pool_manager.pools.get(pool_key)
+            if pool is None:
+                continue
+            total_requests += pool.num_requests
+            new_connections += pool.num_connections
+    return {
+        "requests": total_requests,
+        "new_connections": new_connections,
+        "reused_connections": max(total_requests - new_connections, 0),
+    }
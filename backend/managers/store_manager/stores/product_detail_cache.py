@@ -0,0 +1,106 @@
+"""
+Two-tier cache for canonical product details scraped from product pages.
+
+A product page only tells us the set code and collector number of a listing,
+and those never change for a given product URL. Re-fetching the page on every
+availability check is therefore pure overhead. `ProductDetailCache` keeps the
+parsed details in:
+
+1. A small in-process LRU, for repeated lookups within one worker process.
+2. Redis, with a long TTL, so every worker shares what any worker has seen.
+
+Hits and misses are counted per store in the `product_detail_cache` metric.
+"""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+from data import cache
+from managers import metrics_manager
+
+# Product details are effectively immutable, so keep them for a week.
+PRODUCT_DETAIL_TTL_SECONDS = 7 * 24 * 60 * 60
+# Number of products kept in each store's in-process LRU.
+LRU_MAX_SIZE = 512
+PRODUCT_DETAIL_CACHE_METRIC = "product_detail_cache"
+
+
+def _product_detail_cache_name(store_slug: str, product_url: str) -> str:
+    """Generates the Redis key for a store's product details."""
+    return f"product_details:{store_slug}:{product_url}"
+
+
+class ProductDetailCache:
+    """
+    An LRU-fronted, Redis-backed cache of product details for one store.
+
+    Keys are the product URLs of that store, so together with the store slug
+    every entry is keyed by (store slug, product URL).
+    """
+
+    def __init__(
+        self,
+        store_slug: str,
+        max_size: int = LRU_MAX_SIZE,
+        ttl: int = PRODUCT_DETAIL_TTL_SECONDS,
+    ):
+        self.store_slug = store_slug
+        self.max_size = max_size
+        self.ttl = ttl
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "redis_hits": 0, "misses": 0}
+
+    def get(self, product_url: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the cached details for a product, or None on a miss.
+        A Redis hit is promoted into the in-process LRU.
+        """
+        with self._lock:
+            details = self._lru.get(product_url)
+            if details is not None:
+                self._lru.move_to_end(product_url)
+        if details is not None:
+            self._count("memory_hits")
+            return dict(details)
+
+        details = cache.load_data(
+            _product_detail_cache_name(self.store_slug, product_url)
+        )
+        if details:
+            self._remember(product_url, details)
+            self._count("redis_hits")
+            return dict(details)
+
+        self._count("misses")
+        return None
+
+    def set(self, product_url: str, details: Dict[str, Any]) -> None:
+        """Stores a product's details in both cache tiers."""
+        self._remember(product_url, details)
+        cache.save_data(
+            _product_detail_cache_name(self.store_slug, product_url),
+            details,
+            ex=self.ttl,
+        )
+
+    def hit_ratio(self) -> float:
+        """Returns the fraction of lookups served from either tier."""
+        hits = self.stats["memory_hits"] + self.stats["redis_hits"]
+        total = hits + self.stats["misses"]
+        return hits / total if total else 0.0
+
+    def _remember(self, product_url: str, details: Dict[str, Any]) -> None:
+        with self._lock:
+            self._lru[product_url] = dict(details)
+            self._lru.move_to_end(product_url)
+            while len(self._lru) > self.max_size:
+                self._lru.popitem(last=False)
+
+    def _count(self, outcome: str) -> None:
+        with self._lock:
+            self.stats[outcome] += 1
+        metrics_manager.increment(
+            PRODUCT_DETAIL_CACHE_METRIC, f"{self.store_slug}:{outcome}"
+        )
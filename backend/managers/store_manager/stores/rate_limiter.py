@@ -0,0 +1,136 @@
+"""
+A cluster-wide token bucket per store, kept in Redis.
+
+Every worker replica scrapes the same stores. Without coordination each one
+sends requests at its own pace, and a store that has had enough answers all
+of them with "too many searches". `RedisTokenBucket` keeps one bucket per
+store slug in Redis, so every process that scrapes a store draws on the same
+budget of `rate` requests per second, with bursts of up to `burst` requests.
+
+Taking a token is a single atomic Lua script that refills the bucket from
+Redis' own clock, so the result does not depend on the clocks of the
+workers. The same script applies the store's shared `AdaptiveBackoff`
+state: no tokens are handed out while the store is paused, and the refill
+rate and burst are scaled down by the backoff multiplier. If Redis cannot be
+reached, the limiter lets requests through rather than stopping all
+scraping.
+"""
+
+from managers import metrics_manager, redis_manager
+from utility import logger
+from .backoff import backoff_key
+
+RATE_LIMITER_METRIC = "rate_limiter"
+
+# KEYS[1]: bucket hash, KEYS[2]: backoff hash. ARGV: rate per second,
+# burst size, tokens wanted. Returns "0" when the tokens were taken,
+# otherwise the number of seconds to wait before asking again (as a string,
+# since Lua numbers are truncated to integers when returned to Redis).
+_TAKE_TOKENS_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local wanted = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+
+local backoff = redis.call('HMGET', KEYS[2], 'paused_until', 'multiplier')
+local paused_until = tonumber(backoff[1]) or 0
+if paused_until > now then
+    return tostring(paused_until - now)
+end
+local multiplier = tonumber(backoff[2]) or 1
+rate = rate * multiplier
+burst = math.max(wanted, math.floor(burst * multiplier))
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1])
+local updated_at = tonumber(state[2])
+if tokens == nil or updated_at == nil then
+    tokens = burst
+    updated_at = now
+end
+
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+local wait = 0
+if tokens >= wanted then
+    tokens = tokens - wanted
+else
+    wait = (wanted - tokens) / rate
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens),
+           'updated_at', tostring(now))
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 60)
+return tostring(wait)
+"""
+
+
+def _bucket_key(store_slug: str) -> str:
+    """Generates the Redis key of a store's token bucket."""
+    return f"rate_limit:{store_slug}"
+
+
+class RedisTokenBucket:
+    """
+    A token bucket shared by every process that scrapes one store.
+
+    Args:
+        store_slug: The store whose requests are limited.
+        rate: Tokens added to the bucket per second.
+        burst: The bucket's capacity, i.e. the largest burst of requests
+            that can be sent at once after a quiet period.
+    """
+
+    def __init__(self, store_slug: str, rate: float, burst: int):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.store_slug = store_slug
+        self.rate = float(rate)
+        self.burst = max(int(burst), 1)
+        self._script = None
+
+    def _take_script(self):
+        if self._script is None:
+            redis_conn = redis_manager.get_redis_connection()
+            if redis_conn is None:
+                return None
+            self._script = redis_conn.register_script(_TAKE_TOKENS_SCRIPT)
+        return self._script
+
+    def try_acquire(self, tokens: int = 1) -> float:
+        """
+        Tries to take `tokens` from the bucket.
+
+        Returns:
+            float: 0.0 if the tokens were taken and the request may be sent,
+            otherwise the number of seconds to wait before trying again.
+        """
+        try:
+            script = self._take_script()
+            if script is None:
+                return 0.0
+            wait = float(
+                script(
+                    keys=[
+                        _bucket_key(self.store_slug),
+                        backoff_key(self.store_slug),
+                    ],
+                    args=[self.rate, self.burst, tokens],
+                )
+            )
+        except Exception as e:
+            logger.warning(
+                f"⚠️ Rate limiter for '{self.store_slug}' is unavailable, "
+                f"allowing request: {e}"
+            )
+            return 0.0
+
+        if wait > 0:
+            metrics_manager.increment_many(
+                RATE_LIMITER_METRIC,
+                {
+                    f"{self.store_slug}:throttled": 1,
+                    f"{self.store_slug}:wait_seconds": wait,
+                },
+            )
+        return wait
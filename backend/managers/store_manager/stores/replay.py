@@ -0,0 +1,209 @@
+"""
+Record and replay store traffic for offline scraper runs.
+
+Scrapers send every request through their store's `requests.Session`, so
+recording and replaying happen at the transport adapter level:
+
+- `create_recording_session` returns a normal pooled session whose adapter
+  also saves every response it receives into a `ResponseCorpus`.
+- `create_replay_session` returns a session that never touches the
+  network. Its adapter answers each request from the corpus, keyed by the
+  request's full URL (including the query string).
+
+Either session is plugged into a store by assigning it to `Store.session`.
+A corpus is saved as gzipped JSON, so search and product pages captured
+from a real store once can be replayed at full speed for benchmarks and
+parser regression checks.
+"""
+
+import gzip
+import json
+from typing import Any, Dict, Iterator, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from . import http_session
+
+CORPUS_VERSION = 1
+# Bodies are stored decoded, so transfer headers no longer describe them.
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding"}
+
+
+def request_key(url: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Returns the corpus key of a GET request: its fully prepared URL, with
+    `params` encoded into the query string the same way `requests` does.
+    """
+    return requests.Request("GET", url, params=params).prepare().url
+
+
+class ResponseCorpus:
+    """
+    A collection of recorded responses, keyed by request URL.
+
+    Args:
+        responses: Recorded responses by request key, as produced by `add`.
+        metadata: Free-form details about the recording, such as the store
+            and the card names that were searched.
+    """
+
+    def __init__(
+        self,
+        responses: Optional[Dict[str, Dict[str, Any]]] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ):
+        self.responses = responses or {}
+        self.metadata = metadata or {}
+
+    def __len__(self) -> int:
+        return len(self.responses)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.responses)
+
+    def add(
+        self,
+        url: str,
+        body: str,
+        status_code: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        encoding: str = "utf-8",
+        params: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Adds (or replaces) the response to a GET request."""
+        key = request_key(url, params)
+        self.responses[key] = {
+            "status_code": status_code,
+            "headers": {
+                name: value
+                for name, value in (headers or {}).items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+            "encoding": encoding,
+            "body": body,
+        }
+        return key
+
+    def record(self, response: requests.Response) -> str:
+        """Adds a response received from a store."""
+        encoding = response.encoding or response.apparent_encoding or "utf-8"
+        return self.add(
+            response.request.url if response.request else response.url,
+            response.content.decode(encoding, errors="replace"),
+            status_code=response.status_code,
+            headers=dict(response.headers),
+            encoding=encoding,
+        )
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Returns the recorded response to a prepared request URL."""
+        return self.responses.get(url)
+
+    def save(self, path: str) -> None:
+        """Writes the corpus to `path` as gzipped JSON."""
+        with gzip.open(path, "wt", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "version": CORPUS_VERSION,
+                    "metadata": self.metadata,
+                    "responses": self.responses,
+                },
+                f,
+            )
+
+    @classmethod
+    def load(cls, path: str) -> "ResponseCorpus":
+        """Reads a corpus written by `save`."""
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != CORPUS_VERSION:
+            raise ValueError(
+                f"Unsupported corpus version {data.get('version')!r} "
+                f"in {path}."
+            )
+        return cls(data.get("responses"), data.get("metadata"))
+
+
+class RecordingAdapter(HTTPAdapter):
+    """A pooled HTTP adapter that saves every response into a corpus."""
+
+    def __init__(self, corpus: ResponseCorpus, **kwargs):
+        super().__init__(**kwargs)
+        self.corpus = corpus
+
+    def send(self, request, **kwargs):
+        response = super().send(request, **kwargs)
+        # Reading the content here keeps it available to the caller.
+        self.corpus.record(response)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """
+    Answers requests from a corpus without any network I/O. Requests that
+    were not recorded get a 404 response and are counted in `misses`.
+    """
+
+    def __init__(self, corpus: ResponseCorpus):
+        super().__init__()
+        self.corpus = corpus
+        self.hits = 0
+        self.misses = 0
+
+    def send(self, request, **kwargs):
+        recorded = self.corpus.get(request.url)
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        if recorded is None:
+            self.misses += 1
+            response.status_code = 404
+            response.reason = "Not Recorded"
+            response.encoding = "utf-8"
+            response._content = b""
+            return response
+
+        self.hits += 1
+        response.status_code = recorded["status_code"]
+        response.headers = CaseInsensitiveDict(recorded["headers"])
+        response.encoding = recorded["encoding"]
+        response._content = recorded["body"].encode(recorded["encoding"])
+        return response
+
+    def close(self):
+        pass
+
+
+def create_recording_session(
+    corpus: ResponseCorpus, pool_maxsize: int = http_session.POOL_MAXSIZE
+) -> requests.Session:
+    """
+    Creates a store session, configured like `http_session.create_session`,
+    that also records every response into `corpus`.
+    """
+    session = http_session.create_session(pool_maxsize=pool_maxsize)
+    adapter = RecordingAdapter(
+        corpus,
+        pool_connections=http_session.POOL_CONNECTIONS,
+        pool_maxsize=pool_maxsize,
+        pool_block=True,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def create_replay_session(corpus: ResponseCorpus) -> requests.Session:
+    """
+    Creates a session that serves every request from `corpus`. The replay
+    adapter is available as `session.replay_adapter` for its hit and miss
+    counters.
+    """
+    session = requests.Session()
+    adapter = ReplayAdapter(corpus)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.replay_adapter = adapter
+    return session
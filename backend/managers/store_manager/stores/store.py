@@ -1,21 +1,141 @@
+import os
+import threading
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
 
 import requests
 from schema.blocks import CardListingSchema
 
+from managers import metrics_manager
 from managers.store_manager.filtering import filter_listings
 from utility import logger
+from . import deadline, http_session
+from .backoff import AdaptiveBackoff
+from .circuit_breaker import CircuitBreaker
+from .rate_limiter import RedisTokenBucket
+from .throttle import StoreThrottle
+
+# Redis metric that aggregates connection pool usage across all workers.
+HTTP_CONNECTIONS_METRIC = "http_connections"
+# Concurrent requests allowed per store when its row does not set a limit.
+DEFAULT_MAX_CONCURRENCY = int(os.environ.get("STORE_MAX_CONCURRENCY", 4))
+# Cluster-wide request budget per store when its row does not set one.
+# A rate of 0 disables the shared rate limiter.
+DEFAULT_RATE_LIMIT_PER_SECOND = float(
+    os.environ.get("STORE_RATE_LIMIT_PER_SECOND", 2)
+)
+DEFAULT_RATE_LIMIT_BURST = int(os.environ.get("STORE_RATE_LIMIT_BURST", 5))
+# How long a checked card stays fresh before the sweep checks it again, when
+# the store's row does not set it. Just under the 30 minute availability
+# cache, so a 15 minute sweep re-checks each card every other run.
+DEFAULT_STALE_AFTER_SECONDS = int(
+    os.environ.get("STORE_STALE_AFTER_SECONDS", 1500)
+)
 
 
 class Store(ABC):
     """Abstract base class for all store implementations."""
 
-    def __init__(self, name: str, slug: str, homepage: str, search_url: str):
+    def __init__(
+        self,
+        name: str,
+        slug: str,
+        homepage: str,
+        search_url: str,
+        max_concurrency: Optional[int] = None,
+        rate_limit_per_second: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        stale_after_seconds: Optional[int] = None,
+    ):
         self.name = name
         self.slug = slug
         self.homepage = homepage
         self.search_url = search_url
+        self.max_concurrency = max_concurrency or DEFAULT_MAX_CONCURRENCY
+        self.rate_limit_per_second = (
+            DEFAULT_RATE_LIMIT_PER_SECOND
+            if rate_limit_per_second is None
+            else rate_limit_per_second
+        )
+        self.rate_limit_burst = rate_limit_burst or DEFAULT_RATE_LIMIT_BURST
+        self.stale_after_seconds = (
+            DEFAULT_STALE_AFTER_SECONDS
+            if stale_after_seconds is None
+            else stale_after_seconds
+        )
+        rate_limiter = None
+        if self.rate_limit_per_second > 0:
+            rate_limiter = RedisTokenBucket(
+                slug, self.rate_limit_per_second, self.rate_limit_burst
+            )
+        self.circuit_breaker = CircuitBreaker(slug)
+        self.throttle = StoreThrottle(
+            slug,
+            rate_limiter=rate_limiter,
+            backoff=AdaptiveBackoff(slug, self.rate_limit_per_second),
+            circuit_breaker=self.circuit_breaker,
+        )
+        self._session: Optional[requests.Session] = None
+        # Guards the lazy session and the connection stats last reported, as
+        # a worker's threads scrape through the same store instance.
+        self._session_lock = threading.Lock()
+        self._reported_connection_stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+        }
+
+    @property
+    def session(self) -> requests.Session:
+        """
+        The store's long-lived, pooled HTTP session.
+
+        It is created on first use and then shared by every request this
+        store instance makes, so connections are kept alive across searches,
+        product pages and jobs running in the same process.
+        """
+        with self._session_lock:
+            if self._session is None:
+                self._session = http_session.create_session(
+                    pool_maxsize=max(
+                        http_session.POOL_MAXSIZE, self.max_concurrency
+                    )
+                )
+            return self._session
+
+    @session.setter
+    def session(self, session: requests.Session) -> None:
+        """
+        Replaces the store's session, e.g. with a recording or replaying
+        session from `replay`.
+        """
+        with self._session_lock:
+            self._session = session
+            self._reported_connection_stats = (
+                http_session.connection_stats(session)
+            )
+
+    def connection_stats(self) -> Dict[str, int]:
+        """Returns connection reuse counters for this store's session."""
+        if self._session is None:
+            return dict(self._reported_connection_stats)
+        return http_session.connection_stats(self._session)
+
+    def _report_connection_stats(self) -> None:
+        """
+        Publishes connection usage since the last report to the shared
+        `http_connections` metric, keyed by store slug.
+        """
+        with self._session_lock:
+            stats = self.connection_stats()
+            delta = {
+                f"{self.slug}:{key}": value
+                - self._reported_connection_stats.get(key, 0)
+                for key, value in stats.items()
+            }
+            self._reported_connection_stats = stats
+        metrics_manager.increment_many(HTTP_CONNECTIONS_METRIC, delta)
 
     @abstractmethod
     def _scrape_listings(self, card_name: str) -> List[CardListingSchema]:
@@ -25,10 +145,12 @@ class Store(ABC):
         """
         pass  # pragma: no cover
 
-    def fetch_card_availability(
-        self, card_name: str, specifications: List[Dict[str, Any]] = []
-    ) -> List[Dict[str, Any]]:
-        """Fetches and filters card availability from the store."""
+    def fetch_listings(self, card_name: str) -> List[CardListingSchema]:
+        """
+        Scrapes the store once for all listings of a card, without any
+        filtering. Returns an empty list if the store cannot be reached, so
+        callers can filter the same listings for several specifications.
+        """
         logger.info(
             f"🔄 Starting availability check for '{card_name}' at"
             f"{self.name}"
@@ -39,7 +161,7 @@ class Store(ABC):
                 f"✅ Found {len(raw_listings)} raw listings for "
                 f"'{card_name}' at {self.name}"
             )
-            return filter_listings(card_name, raw_listings, specifications)
+            return raw_listings
         except requests.exceptions.RequestException as e:
             logger.error(f"❌ Error connecting to {self.name}: {e}")
             return []
@@ -49,3 +171,34 @@ class Store(ABC):
                 f"'{card_name}' at {self.name}: {e}"
             )
             return []
+        finally:
+            self._report_connection_stats()
+
+    def fetch_listings_many(
+        self, card_names: List[str]
+    ) -> List[List[CardListingSchema]]:
+        """
+        Scrapes the store for the listings of several cards, returned in the
+        order of `card_names`. Up to `max_concurrency` cards are searched for
+        at once, on threads that keep the caller's deadline. Stores with a
+        cheaper way to overlap their requests override this.
+        """
+        workers = min(len(card_names), self.max_concurrency)
+        if workers <= 1:
+            return [self.fetch_listings(name) for name in card_names]
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix=f"{self.slug}-searches"
+        ) as executor:
+            return list(
+                executor.map(
+                    deadline.propagate(self.fetch_listings), card_names
+                )
+            )
+
+    def fetch_card_availability(
+        self, card_name: str, specifications: List[Dict[str, Any]] = []
+    ) -> List[Dict[str, Any]]:
+        """Fetches and filters card availability from the store."""
+        return filter_listings(
+            card_name, self.fetch_listings(card_name), specifications
+        )
@@ -0,0 +1,514 @@
+"""
+An asyncio implementation of the Crystal Commerce scraper.
+
+`AsyncCrystalCommerceStore` sends its search and product page requests from
+an event loop with aiohttp instead of blocking a thread per request. Parsing
+is shared with `CrystalCommerceStore`, so both strategies produce identical
+listings for the same pages.
+
+Every scrape runs on one event loop per worker process, on a thread of its
+own, so a store's aiohttp session and its keep-alive connections last from
+one job to the next. Redis calls (throttle, circuit breaker, product cache)
+are sent to worker threads, so they never block the loop.
+
+A store selected with the `crystal_commerce_async` fetch strategy still
+works through the regular, synchronous `fetch_card_availability` entry
+point. The main benefit comes from `fetch_listings_many`, which the sweep's
+store batches use to search for all their cards at once while the network
+does the waiting, and from `fetch_availability_concurrently`, which checks
+many (card, store) pairs from one caller.
+"""
+
+import asyncio
+import atexit
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+
+from managers.store_manager.filtering import filter_listings
+from schema.blocks import CardListingSchema
+from utility import logger
+
+from .. import deadline, html_parser, http_session
+from ..backoff import parse_retry_after
+from ..store import Store
+from ..throttle import StoreThrottle
+from .crystal_commerce_store import (
+    MAX_INLINE_WAIT_SECONDS,
+    MIN_REQUEST_TIMEOUT,
+    CrystalCommerceStore,
+    RateLimitError,
+)
+
+# Per-request timeout, matching the blocking scraper.
+REQUEST_TIMEOUT_SECONDS = 10
+
+
+class _EventLoopThread:
+    """
+    An event loop running on a daemon thread for the life of the process.
+
+    aiohttp sessions are bound to the loop they were created on, so keeping
+    one loop alive lets every async store keep its session, and the
+    connections it pools, across jobs. Coroutines submitted with `run` see
+    the caller's context variables, such as its job deadline. A forked
+    process, which does not inherit the thread, starts a loop of its own.
+    Sessions created with `create_session` are closed when the process
+    exits.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pid: Optional[int] = None
+        self._sessions: List[aiohttp.ClientSession] = []
+
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None or self._pid != os.getpid():
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever,
+                    name="async-store-loop",
+                    daemon=True,
+                ).start()
+                if self._loop is None:
+                    atexit.register(self.close)
+                self._loop, self._pid = loop, os.getpid()
+                self._sessions = []
+            return self._loop
+
+    def create_session(
+        self, limit_per_host: int, stats: Optional[Dict[str, int]] = None
+    ) -> aiohttp.ClientSession:
+        """Creates an aiohttp session on the loop; call it from the loop."""
+        session = http_session.create_async_session(
+            limit_per_host=limit_per_host, stats=stats
+        )
+        self._sessions.append(session)
+        return session
+
+    def close(self) -> None:
+        """Closes the sessions created on the loop and stops it."""
+        with self._lock:
+            loop, sessions = self._loop, self._sessions
+            if loop is None or self._pid != os.getpid():
+                return
+            self._loop, self._sessions = None, []
+
+        async def close_sessions():
+            await asyncio.gather(
+                *(session.close() for session in sessions),
+                return_exceptions=True,
+            )
+
+        try:
+            asyncio.run_coroutine_threadsafe(close_sessions(), loop).result(
+                timeout=5
+            )
+        except Exception as e:
+            logger.debug(f"Could not close async store sessions: {e!r}")
+        loop.call_soon_threadsafe(loop.stop)
+
+    def run(self, coro):
+        """
+        Runs a coroutine on the loop and blocks the calling thread until it
+        returns. Must not be called from the loop's own thread.
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop()).result()
+
+
+_event_loop = _EventLoopThread()
+
+
+async def _wait_for_throttle(
+    throttle: StoreThrottle, max_wait: Optional[float] = None
+) -> bool:
+    """
+    The event-loop counterpart of `StoreThrottle.wait`: sleeps, without
+    blocking the loop, until a request may be sent to the store, and claims
+    it. Returns False if the wait would exceed `max_wait`.
+    """
+    delay = await asyncio.to_thread(throttle.acquire)
+    while delay > 0:
+        if max_wait is not None and delay > max_wait:
+            return False
+        await asyncio.sleep(delay)
+        delay = await asyncio.to_thread(throttle.acquire)
+    return True
+
+
+def _is_store_failure(error: Exception) -> bool:
+    """
+    Returns True for errors that suggest the store itself is unavailable:
+    connection errors, timeouts and 5xx responses.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status >= 500
+    return isinstance(
+        error, (aiohttp.ClientConnectionError, asyncio.TimeoutError)
+    )
+
+
+async def _fetch_text_with_retries(
+    client: aiohttp.ClientSession,
+    url: str,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    throttle: Optional[StoreThrottle] = None,
+    **kwargs,
+) -> Optional[str]:
+    """
+    Fetches a page body with the same retry, backoff and rate-limit handling
+    as `_make_request_with_retries`, but without blocking the event loop.
+    It honours the job's deadline the same way, too.
+    """
+    for i in range(retries):
+        try:
+            if deadline.cuts():
+                logger.warning(
+                    f"Job deadline passed. Skipping request for {url}."
+                )
+                return None
+            if throttle is not None and not await _wait_for_throttle(
+                throttle, max_wait=deadline.clamp(MAX_INLINE_WAIT_SECONDS)
+            ):
+                if deadline.cuts(MAX_INLINE_WAIT_SECONDS):
+                    logger.warning(
+                        f"Store is backing off past the job deadline. "
+                        f"Skipping request for {url}."
+                    )
+                    return None
+                logger.warning(
+                    f"Store is backing off for more than "
+                    f"{MAX_INLINE_WAIT_SECONDS:.0f} seconds. "
+                    f"Skipping request for {url}."
+                )
+                return None
+            timeout = aiohttp.ClientTimeout(
+                total=max(
+                    deadline.clamp(REQUEST_TIMEOUT_SECONDS),
+                    MIN_REQUEST_TIMEOUT,
+                )
+            )
+            async with client.get(url, timeout=timeout, **kwargs) as response:
+                retry_after = parse_retry_after(
+                    response.headers.get("Retry-After")
+                )
+                if response.status == 429:
+                    raise RateLimitError(
+                        "Rate limit signalled by HTTP 429.",
+                        retry_after=retry_after,
+                    )
+                # Raise ClientResponseError for bad responses (4xx or 5xx)
+                response.raise_for_status()
+                text = await response.text()
+
+            # Crystal Commerce returns a 200 OK with an error message
+            # in the body for rate limits.
+            if "too many searches" in text:
+                raise RateLimitError(
+                    "Rate limit detected by custom check.",
+                    retry_after=retry_after,
+                )
+
+            if throttle is not None:
+                await asyncio.to_thread(throttle.record_success)
+            return text
+
+        except (
+            aiohttp.ClientError, asyncio.TimeoutError, RateLimitError
+        ) as e:
+            if deadline.cuts():
+                logger.warning(
+                    f"Request failed for {url} with error: {e!r}. "
+                    f"Job deadline passed, not retrying."
+                )
+                return None
+            shared_backoff = (
+                throttle is not None and isinstance(e, RateLimitError)
+            )
+            if shared_backoff:
+                wait_time = await asyncio.to_thread(
+                    throttle.record_rate_limit, e.retry_after
+                )
+            else:
+                retry_after = None
+                if isinstance(e, aiohttp.ClientResponseError) and e.headers:
+                    retry_after = parse_retry_after(
+                        e.headers.get("Retry-After")
+                    )
+                wait_time = min(
+                    retry_after
+                    if retry_after is not None
+                    else backoff_factor * (2**i),
+                    MAX_INLINE_WAIT_SECONDS,
+                )
+            if i < retries - 1:
+                if not shared_backoff and deadline.cuts(wait_time):
+                    logger.warning(
+                        f"Request failed for {url} with error: {e!r}. "
+                        f"Backoff would pass the job deadline, not retrying."
+                    )
+                    return None
+                logger.warning(
+                    f"Request failed for {url} with error: {e!r}. "
+                    f"Retrying in {wait_time:.2f} seconds..."
+                    f" (Attempt {i + 1}/{retries})"
+                )
+                if not shared_backoff:
+                    await asyncio.sleep(wait_time)
+            else:
+                logger.error(
+                    f"Request failed for {url} after {retries} attempts. "
+                    f"Error: {e!r}"
+                )
+                if throttle is not None and _is_store_failure(e):
+                    await asyncio.to_thread(throttle.record_failure)
+                return None
+    return None
+
+
+class AsyncCrystalCommerceStore(CrystalCommerceStore):
+    """
+    A Crystal Commerce scraper that performs its I/O on an event loop.
+
+    Every request the store makes is bounded by an `asyncio.Semaphore` of
+    the store's `max_concurrency`, and waits on the same `StoreThrottle` as
+    the blocking scraper. The session and the semaphore belong to the
+    process-wide loop and are kept for later jobs.
+
+    Methods:
+        fetch_listings_async(card_name) -> List[CardListingSchema]:
+            The coroutine counterpart of `fetch_listings`.
+        fetch_card_availability_async(card_name, specifications)
+          -> List[Dict[str, Any]]:
+            The coroutine counterpart of `fetch_card_availability`.
+        fetch_listings_many(card_names) -> List[List[CardListingSchema]]:
+            Searches for several cards at once on the shared loop.
+        _scrape_listings(card_name: str) -> List[CardListingSchema]:
+            Runs the async scrape on the shared loop for callers that use
+            the synchronous `Store` interface.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._client: Optional[aiohttp.ClientSession] = None
+        self._limiter: Optional[asyncio.Semaphore] = None
+        self._client_loop: Optional[asyncio.AbstractEventLoop] = None
+        # Usage of every aiohttp session the store has had, counted on the
+        # loop and published like the synchronous session's.
+        self._async_connection_stats = {
+            "requests": 0,
+            "new_connections": 0,
+            "reused_connections": 0,
+        }
+
+    def connection_stats(self) -> Dict[str, int]:
+        """
+        Returns connection reuse counters for this store's aiohttp sessions,
+        plus those of its synchronous session if it has one.
+        """
+        stats = dict(self._async_connection_stats)
+        if self._session is not None:
+            for key, value in http_session.connection_stats(
+                self._session
+            ).items():
+                stats[key] = stats.get(key, 0) + value
+        return stats
+
+    def _loop_resources(
+        self,
+    ) -> Tuple[aiohttp.ClientSession, asyncio.Semaphore]:
+        """
+        Returns the store's aiohttp session and concurrency limit on the
+        running loop, creating them on first use. Only called from the
+        loop's thread, so no lock is needed.
+        """
+        loop = asyncio.get_running_loop()
+        if (
+            self._client is None
+            or self._client.closed
+            or self._client_loop is not loop
+        ):
+            self._client = _event_loop.create_session(
+                limit_per_host=max(
+                    http_session.POOL_MAXSIZE, self.max_concurrency
+                ),
+                stats=self._async_connection_stats,
+            )
+            self._limiter = asyncio.Semaphore(self.max_concurrency)
+            self._client_loop = loop
+        return self._client, self._limiter
+
+    async def _fetch_text(self, url: str, **kwargs) -> Optional[str]:
+        """Fetches a page from this store within its concurrency limit."""
+        client, limiter = self._loop_resources()
+        async with limiter:
+            return await _fetch_text_with_retries(
+                client, url, throttle=self.throttle, **kwargs
+            )
+
+    async def _get_product_details_async(
+        self, product_url: str
+    ) -> Dict[str, Any]:
+        """
+        The coroutine counterpart of `_get_product_details`: serves product
+        details from the cache and only fetches the page on a miss.
+        """
+        full_url = urljoin(self.homepage, product_url)
+        cached_details = await asyncio.to_thread(
+            self.product_cache.get, full_url
+        )
+        if cached_details is not None:
+            return cached_details
+
+        logger.debug(f"Fetching product page for {self.name}. URL: {full_url}")
+        text = await self._fetch_text(full_url)
+        soup = (
+            html_parser.parse_product_page(text, self.html_parser)
+            if text
+            else None
+        )
+        details = self._parse_product_page_details(soup)
+        if details.get("set_code"):
+            await asyncio.to_thread(self.product_cache.set, full_url, details)
+        return details
+
+    async def _scrape_listings_async(
+        self, card_name: str
+    ) -> List[CardListingSchema]:
+        """
+        Searches the store for `card_name` and resolves the product details
+        of every matching product concurrently.
+        """
+        text = await self._fetch_text(
+            self.search_url, params={"q": card_name, "c": 1}
+        )
+        if not text:
+            return []
+
+        soup = html_parser.parse_search_results(text, self.html_parser)
+        matching_products = self._find_matching_products(soup, card_name)
+        unique_urls = list(
+            dict.fromkeys(url for _, _, url in matching_products)
+        )
+        resolved = await asyncio.gather(
+            *(self._get_product_details_async(url) for url in unique_urls)
+        )
+        details_by_url = dict(zip(unique_urls, resolved))
+        return self._build_listings(
+            matching_products,
+            [details_by_url[url] for _, _, url in matching_products],
+        )
+
+    def _scrape_listings(self, card_name: str) -> List[CardListingSchema]:
+        """
+        Scrapes listings through the synchronous `Store` interface by running
+        the async scrape on the shared event loop.
+        """
+        return _event_loop.run(self._scrape_listings_async(card_name))
+
+    async def fetch_listings_async(
+        self, card_name: str
+    ) -> List[CardListingSchema]:
+        """
+        The coroutine counterpart of `fetch_listings`: returns every listing
+        of a card, or an empty list if the store cannot be scraped.
+        """
+        logger.info(
+            f"🔄 Starting async availability check for '{card_name}' at "
+            f"{self.name}"
+        )
+        try:
+            raw_listings = await self._scrape_listings_async(card_name)
+            logger.info(
+                f"✅ Found {len(raw_listings)} raw listings for "
+                f"'{card_name}' at {self.name}"
+            )
+            return raw_listings
+        except Exception as e:
+            logger.error(
+                f"❌ An error occurred while checking availability for "
+                f"'{card_name}' at {self.name}: {e!r}"
+            )
+            return []
+        finally:
+            await asyncio.to_thread(self._report_connection_stats)
+
+    def fetch_listings_many(
+        self, card_names: List[str]
+    ) -> List[List[CardListingSchema]]:
+        """
+        Searches for every card at once on the shared event loop, within the
+        store's concurrency limit.
+        """
+
+        async def fetch_all():
+            return await asyncio.gather(
+                *(self.fetch_listings_async(name) for name in card_names)
+            )
+
+        return list(_event_loop.run(fetch_all()))
+
+    async def fetch_card_availability_async(
+        self,
+        card_name: str,
+        specifications: Optional[List[Dict[str, Any]]] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Fetches and filters card availability from the store on the running
+        event loop.
+        """
+        return filter_listings(
+            card_name,
+            await self.fetch_listings_async(card_name),
+            specifications or [],
+        )
+
+
+async def _gather_availability(
+    checks: List[Tuple[Store, str, List[Dict[str, Any]]]],
+) -> List[List[Dict[str, Any]]]:
+    loop = asyncio.get_running_loop()
+
+    async def check(store, card_name, specifications):
+        if isinstance(store, AsyncCrystalCommerceStore):
+            return await store.fetch_card_availability_async(
+                card_name, specifications
+            )
+        # Blocking stores run on the default thread pool so they still
+        # overlap with the async checks, within the caller's job deadline.
+        return await loop.run_in_executor(
+            None,
+            deadline.propagate(store.fetch_card_availability),
+            card_name,
+            specifications,
+        )
+
+    return list(
+        await asyncio.gather(*(check(*checked) for checked in checks))
+    )
+
+
+def fetch_availability_concurrently(
+    checks: Iterable[Tuple[Store, str, Optional[List[Dict[str, Any]]]]],
+) -> List[List[Dict[str, Any]]]:
+    """
+    Checks many (store, card name, specifications) triples concurrently from
+    a single caller, such as one RQ job.
+
+    Async stores are checked on the shared event loop, each with its own
+    session and concurrency limit; any other store is checked on a worker
+    thread. Results are returned in the same order as `checks`.
+    """
+    normalized = [
+        (store, card_name, specifications or [])
+        for store, card_name, specifications in checks
+    ]
+    if not normalized:
+        return []
+    return _event_loop.run(_gather_availability(normalized))
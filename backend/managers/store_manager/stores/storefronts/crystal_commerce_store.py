@@ -6,7 +6,9 @@ This class encapsulates the common logic for fetching and parsing product data,
 allowing new Crystal Commerce stores to be added with minimal code.
 """
 
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import threading
 import time
 from urllib.parse import urljoin
 
@@ -16,47 +18,178 @@ from pydantic import ValidationError
 from managers import set_manager
 from utility import logger
 
+from .. import deadline, html_parser
+from ..backoff import parse_retry_after
 from ..store import Store
+from ..product_detail_cache import ProductDetailCache
+from ..throttle import StoreThrottle
 from schema.blocks import CardListingSchema
 
 
+# A job never sleeps longer than this waiting for a store to accept
+# requests again; it gives up and leaves the shared backoff to keep other
+# workers away until the store recovers.
+MAX_INLINE_WAIT_SECONDS = 30.0
+# Shortest timeout a request is sent with when a job deadline is near.
+MIN_REQUEST_TIMEOUT = 0.1
+
+
+class RateLimitError(requests.exceptions.HTTPError):
+    """Raised when a store signals that we are sending too many requests."""
+
+    def __init__(self, *args, retry_after: Optional[float] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.retry_after = retry_after
+
+
+def _retry_after(response: Optional[requests.Response]) -> Optional[float]:
+    """Returns the response's `Retry-After` delay in seconds, if any."""
+    if response is None:
+        return None
+    return parse_retry_after(response.headers.get("Retry-After"))
+
+
+def _is_store_failure(error: requests.exceptions.RequestException) -> bool:
+    """
+    Returns True for errors that suggest the store itself is unavailable:
+    connection errors, timeouts and 5xx responses.
+    """
+    if isinstance(error, RateLimitError):
+        return False
+    if isinstance(
+        error,
+        (requests.exceptions.ConnectionError, requests.exceptions.Timeout),
+    ):
+        return True
+    response = getattr(error, "response", None)
+    return response is not None and response.status_code >= 500
+
+
 def _make_request_with_retries(
-    url: str, retries: int = 3, backoff_factor: float = 0.5, **kwargs
+    url: str,
+    retries: int = 3,
+    backoff_factor: float = 0.5,
+    session: Optional[requests.Session] = None,
+    throttle: Optional[StoreThrottle] = None,
+    **kwargs,
 ) -> Optional[requests.Response]:
     """
-    Makes an HTTP request with a retry mechanism and exponential backoff.
+    Makes an HTTP request with a retry mechanism.
     This is specifically designed to handle Crystal Commerce's rate limiting.
+
+    When a `session` is given, the request is sent through its keep-alive
+    connection pool instead of opening a fresh connection.
+
+    When a `throttle` is given, every attempt waits for it first (including
+    for a token from the store's cluster-wide rate limiter). Rate-limit
+    responses are reported to the throttle's adaptive backoff, which honours
+    `Retry-After`, pauses every worker's requests to the store and lowers
+    its request rate; successful responses let the rate recover. Without a
+    throttle, and for other errors, the attempt itself sleeps for the
+    `Retry-After` delay or an exponential backoff. A request that still
+    fails because the store is unavailable counts towards opening the
+    store's circuit breaker.
+
+    Inside a job's `deadline`, the request timeout and every wait are
+    clamped to the time the job has left, and the request is given up once
+    the deadline has passed or a backoff would run past it.
     """
+    http = session if session is not None else requests
     for i in range(retries):
         try:
-            response = requests.get(url, **kwargs)
+            if deadline.cuts():
+                logger.warning(
+                    f"Job deadline passed. Skipping request for {url}."
+                )
+                return None
+            if throttle is not None and not throttle.wait(
+                max_wait=deadline.clamp(MAX_INLINE_WAIT_SECONDS)
+            ):
+                if deadline.cuts(MAX_INLINE_WAIT_SECONDS):
+                    logger.warning(
+                        f"Store is backing off past the job deadline. "
+                        f"Skipping request for {url}."
+                    )
+                    return None
+                logger.warning(
+                    f"Store is backing off for more than "
+                    f"{MAX_INLINE_WAIT_SECONDS:.0f} seconds. "
+                    f"Skipping request for {url}."
+                )
+                return None
+            if "timeout" in kwargs:
+                kwargs["timeout"] = max(
+                    deadline.clamp(kwargs["timeout"]), MIN_REQUEST_TIMEOUT
+                )
+            response = http.get(url, **kwargs)
+            if response.status_code == 429:
+                raise RateLimitError(
+                    "Rate limit signalled by HTTP 429.",
+                    retry_after=_retry_after(response),
+                    response=response,
+                )
             # Raise HTTPError for bad responses (4xx or 5xx)
             response.raise_for_status()
 
             # Crystal Commerce returns a 200 OK with an error message
             # in the body for rate limits.
             if "too many searches" in response.text:
-                raise requests.exceptions.HTTPError(
-                    "Rate limit detected by custom check."
+                raise RateLimitError(
+                    "Rate limit detected by custom check.",
+                    retry_after=_retry_after(response),
+                    response=response,
                 )
 
+            if throttle is not None:
+                throttle.record_success()
             return response
 
         except requests.exceptions.RequestException as e:
+            if deadline.cuts():
+                # The job ran out of time, not the store; a timeout cut
+                # short by the deadline says nothing about its health.
+                logger.warning(
+                    f"Request failed for {url} with error: {e}. "
+                    f"Job deadline passed, not retrying."
+                )
+                return None
+            shared_backoff = (
+                throttle is not None and isinstance(e, RateLimitError)
+            )
+            if shared_backoff:
+                # The next attempt waits on the throttle, along with every
+                # other request to this store.
+                wait_time = throttle.record_rate_limit(e.retry_after)
+            else:
+                retry_after = _retry_after(getattr(e, "response", None))
+                # Exponential backoff: 0.5s, 1s, 2s for successive retries
+                wait_time = min(
+                    retry_after
+                    if retry_after is not None
+                    else backoff_factor * (2**i),
+                    MAX_INLINE_WAIT_SECONDS,
+                )
             if i < retries - 1:
-                # Calculate wait time: 0.5s, 1s, 2s for successive retries
-                wait_time = backoff_factor * (2**i)
+                if not shared_backoff and deadline.cuts(wait_time):
+                    logger.warning(
+                        f"Request failed for {url} with error: {e}. "
+                        f"Backoff would pass the job deadline, not retrying."
+                    )
+                    return None
                 logger.warning(
                     f"Request failed for {url} with error: {e}. "
                     f"Retrying in {wait_time:.2f} seconds..."
                     f" (Attempt {i + 1}/{retries})"
                 )
-                time.sleep(wait_time)
+                if not shared_backoff:
+                    time.sleep(wait_time)
             else:
                 logger.error(
                     f"Request failed for {url} after {retries} attempts. "
                     f"Error: {e}"
                 )
+                if throttle is not None and _is_store_failure(e):
+                    throttle.record_failure()
                 return None
     return None
 
@@ -72,9 +205,20 @@ class CrystalCommerceStore(Store):
     Methods:
         _get_product_page(product_url: str) -> Optional[BeautifulSoup]:
             Fetches the individual product page to find the collector number.
+        _get_product_details(product_url: str) -> Dict[str, Any]:
+            Returns a product's canonical details, preferring the cache over
+            fetching its product page.
+        _get_all_product_details(product_urls: List[str]) -> List[Dict]:
+            Resolves details for many products concurrently, in order.
         _scrape_listings(card_name: str) -> List[Dict[str, Any]]:
             Scrapes the store's website for raw card listings based on the
             provided card name.
+        _find_matching_products(soup, card_name) -> List[Tuple]:
+            Collects the search results that exactly match the card name.
+        _build_listings(matching_products, all_static_details) -> List:
+            Builds validated listings from matching products and details.
+        _validate_listing(url, name, static_details, variant) -> Optional:
+            Builds the validated listing of a single variant.
         _get_product_listings(soup: BeautifulSoup) -> List[Any]:
             Finds all product listing elements on a search results page.
         _parse_product_page_details(soup: Optional[BeautifulSoup]) -> Dict[str,
@@ -85,15 +229,105 @@ class CrystalCommerceStore(Store):
             Parses all in-stock variants from a product listing element.
     """
 
+    # The tree builder used for store pages; None uses the fastest one
+    # installed (see `html_parser`).
+    html_parser: Optional[str] = None
+
+    def __init__(
+        self,
+        name: str,
+        slug: str,
+        homepage: str,
+        search_url: str,
+        max_concurrency: Optional[int] = None,
+        rate_limit_per_second: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        stale_after_seconds: Optional[int] = None,
+    ):
+        super().__init__(
+            name,
+            slug,
+            homepage,
+            search_url,
+            max_concurrency=max_concurrency,
+            rate_limit_per_second=rate_limit_per_second,
+            rate_limit_burst=rate_limit_burst,
+            stale_after_seconds=stale_after_seconds,
+        )
+        self.product_cache = ProductDetailCache(slug)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        The store's product page thread pool. It is sized to the store's
+        concurrency limit and shared by every scrape this instance runs, so
+        the limit holds across concurrent searches as well.
+        """
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_concurrency,
+                    thread_name_prefix=f"{self.slug}-product-pages",
+                )
+            return self._executor
+
     def _get_product_page(self, product_url: str) -> Optional[BeautifulSoup]:
         """Fetches the individual product page to find the collector number."""
         full_url = urljoin(self.homepage, product_url)
         logger.debug(f"Fetching product page for {self.name}. URL: {full_url}")
-        response = _make_request_with_retries(full_url, timeout=10)
+        response = _make_request_with_retries(
+            full_url, session=self.session, throttle=self.throttle, timeout=10
+        )
         if response:
-            return BeautifulSoup(response.text, "html.parser")
+            return html_parser.parse_product_page(
+                response.text, self.html_parser
+            )
         return None
 
+    def _get_product_details(self, product_url: str) -> Dict[str, Any]:
+        """
+        Returns the canonical details (set code, collector number) of a
+        product. Details never change for a product URL, so they are served
+        from the product detail cache and the product page is only fetched
+        on a miss.
+        """
+        full_url = urljoin(self.homepage, product_url)
+        cached_details = self.product_cache.get(full_url)
+        if cached_details is not None:
+            return cached_details
+
+        details = self._parse_product_page_details(
+            self._get_product_page(product_url)
+        )
+        # Only cache fully resolved details; an unknown set name may resolve
+        # once the set catalog is refreshed.
+        if details.get("set_code"):
+            self.product_cache.set(full_url, details)
+        return details
+
+    def _get_all_product_details(
+        self, product_urls: List[str]
+    ) -> List[Dict[str, Any]]:
+        """
+        Resolves the details of several products, fetching their product
+        pages in parallel under the store's concurrency limit. The results
+        are returned in the same order as `product_urls`.
+        """
+        unique_urls = list(dict.fromkeys(product_urls))
+        if len(unique_urls) <= 1 or self.max_concurrency <= 1:
+            resolved = [self._get_product_details(url) for url in unique_urls]
+        else:
+            resolved = list(
+                self.executor.map(
+                    deadline.propagate(self._get_product_details),
+                    unique_urls,
+                )
+            )
+        details_by_url = dict(zip(unique_urls, resolved))
+        return [details_by_url[url] for url in product_urls]
+
     def _scrape_listings(self, card_name: str) -> List[CardListingSchema]:
         """
         Scrapes the store's website for raw card listings based on the
@@ -113,77 +347,125 @@ class CrystalCommerceStore(Store):
         """
         search_params = {"q": card_name, "c": 1}
         response = _make_request_with_retries(
-            self.search_url, params=search_params, timeout=10
+            self.search_url,
+            params=search_params,
+            session=self.session,
+            throttle=self.throttle,
+            timeout=10,
         )
 
         if not response:
             return []
 
-        soup = BeautifulSoup(response.text, "html.parser")
-        product_listings = self._get_product_listings(soup)
-        available_products = []
-        seen_listings = set()  # To track and prevent duplicate listings
-
-        if product_listings:
-            for product in product_listings:
-                name_element = product.select_one("h4.name")
-                scraped_card_name = ""
-                if name_element:
-                    scraped_card_name = name_element.get("title", "").strip()
-                scraped_card_name = scraped_card_name.split(" - ")[0]
-
-                if (
-                    not scraped_card_name
-                    or scraped_card_name.lower() != card_name.lower()
-                ):
-                    logger.debug(
-                        f"Found non-matching result '{scraped_card_name}'. "
-                        f"Assuming no more exact matches and stopping search."
-                    )
-                    break
+        soup = html_parser.parse_search_results(
+            response.text, self.html_parser
+        )
+        matching_products = self._find_matching_products(soup, card_name)
+        all_static_details = self._get_all_product_details(
+            [product_url for _, _, product_url in matching_products]
+        )
+        return self._build_listings(matching_products, all_static_details)
 
-                product_link_tag = product.select_one("a[itemprop='url']")
-                product_url = (
-                    product_link_tag.get("href") if product_link_tag else ""
+    def _find_matching_products(
+        self, soup: BeautifulSoup, card_name: str
+    ) -> List[Tuple[Any, str, str]]:
+        """
+        Collects the leading run of search results whose name exactly
+        matches `card_name`, as (product element, scraped name, product URL)
+        tuples. Results are sorted by relevance, so the first non-matching
+        product ends the search.
+        """
+        matching_products = []
+        for product in self._get_product_listings(soup) or []:
+            name_element = product.select_one("h4.name")
+            scraped_card_name = ""
+            if name_element:
+                scraped_card_name = name_element.get("title", "").strip()
+            scraped_card_name = scraped_card_name.split(" - ")[0]
+
+            if (
+                not scraped_card_name
+                or scraped_card_name.lower() != card_name.lower()
+            ):
+                logger.debug(
+                    f"Found non-matching result '{scraped_card_name}'. "
+                    f"Assuming no more exact matches and stopping search."
                 )
-                full_product_url = urljoin(self.homepage, product_url)
+                break
+
+            product_link_tag = product.select_one("a[itemprop='url']")
+            product_url = (
+                product_link_tag.get("href") if product_link_tag else ""
+            )
+            matching_products.append((product, scraped_card_name, product_url))
+        return matching_products
 
-                product_page_soup = self._get_product_page(product_url)
-                static_details = self._parse_product_page_details(
-                    product_page_soup
+    def _build_listings(
+        self,
+        matching_products: List[Tuple[Any, str, str]],
+        all_static_details: List[Dict[str, Any]],
+    ) -> List[CardListingSchema]:
+        """
+        Builds validated, de-duplicated listings from matching products and
+        their resolved product details, keeping search result order.
+        """
+        available_products = []
+        seen_listings = set()  # To track and prevent duplicate listings
+        for (product, scraped_card_name, product_url), static_details in zip(
+            matching_products, all_static_details
+        ):
+            full_product_url = urljoin(self.homepage, product_url)
+            variants = self._parse_variants(product)
+            for variant_details in variants:
+                listing = self._validate_listing(
+                    full_product_url,
+                    scraped_card_name,
+                    static_details,
+                    variant_details,
                 )
+                if listing is None:
+                    continue
+                listing_key = (listing.url, listing.condition, listing.finish)
 
-                variants = self._parse_variants(product)
-                for variant_details in variants:
-                    price = float(variant_details.get("price", 0.0))
-                    quantity = int(variant_details.get("quantity", 0))
-
-                    if quantity <= 0 or price <= 0:
-                        continue
-
-                    try:
-                        listing = CardListingSchema(
-                            url=full_product_url,
-                            name=scraped_card_name,
-                            set_code=static_details.get("set_code") or "",
-                            collector_number=static_details.get(
-                                "collector_number") or "",
-                            finish=variant_details.get("finish", "non-foil"),
-                            price=price,
-                            condition=variant_details.get("condition") or "",
-                            quantity=quantity
-                        )
-                        listing_key = (
-                            listing.url, listing.condition, listing.finish)
-
-                        if listing_key not in seen_listings:
-                            available_products.append(listing)
-                            seen_listings.add(listing_key)
-                    except ValidationError as e:
-                        logger.debug("Skipping invalid variant for "
-                                     f"{scraped_card_name}: {e}")
+                if listing_key not in seen_listings:
+                    available_products.append(listing)
+                    seen_listings.add(listing_key)
         return available_products
 
+    def _validate_listing(
+        self,
+        full_product_url: str,
+        scraped_card_name: str,
+        static_details: Dict[str, Any],
+        variant_details: Dict[str, Any],
+    ) -> Optional[CardListingSchema]:
+        """
+        Builds the validated listing of one in-stock variant, or returns
+        None if the variant is out of stock, unpriced or invalid.
+        """
+        price = float(variant_details.get("price", 0.0))
+        quantity = int(variant_details.get("quantity", 0))
+
+        if quantity <= 0 or price <= 0:
+            return None
+
+        try:
+            return CardListingSchema(
+                url=full_product_url,
+                name=scraped_card_name,
+                set_code=static_details.get("set_code") or "",
+                collector_number=static_details.get(
+                    "collector_number") or "",
+                finish=variant_details.get("finish", "non-foil"),
+                price=price,
+                condition=variant_details.get("condition") or "",
+                quantity=quantity
+            )
+        except ValidationError as e:
+            logger.debug("Skipping invalid variant for "
+                         f"{scraped_card_name}: {e}")
+            return None
+
     def _get_product_listings(self, soup: BeautifulSoup) -> List[Any]:
         """Finds all product listing elements on a search results page."""
         return soup.find_all("li", class_="product")
@@ -7,7 +7,7 @@ implementation for `_scrape_listings` that always returns an empty list,
 effectively indicating that no listings can be found for such stores.
 """
 
-from typing import List
+from typing import List, Optional
 
 from ..store import Store
 from schema.blocks import CardListingSchema
@@ -25,10 +25,29 @@ class DefaultStore(Store):
     when an unknown `fetch_strategy` is encountered.
     """
 
-    def __init__(self, name: str, slug: str, homepage: str, search_url: str):
+    def __init__(
+        self,
+        name: str,
+        slug: str,
+        homepage: str,
+        search_url: str,
+        max_concurrency: Optional[int] = None,
+        rate_limit_per_second: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        stale_after_seconds: Optional[int] = None,
+    ):
         # Default stores don't have a meaningful search_url for scraping,
         # but the base class requires it. We can pass an empty string.
-        super().__init__(name, slug, homepage, search_url=search_url)
+        super().__init__(
+            name,
+            slug,
+            homepage,
+            search_url=search_url,
+            max_concurrency=max_concurrency,
+            rate_limit_per_second=rate_limit_per_second,
+            rate_limit_burst=rate_limit_burst,
+            stale_after_seconds=stale_after_seconds,
+        )
         logger.warning(
             f"⚠️ Initialized DefaultStore for '{name}' (slug: {slug}). "
             "This store does not have a specific scraping strategy and will "
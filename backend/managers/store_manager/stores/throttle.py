@@ -0,0 +1,142 @@
+"""
+Request pacing shared by every concurrent request to a single store.
+
+Product pages for one search are fetched in parallel, but a store that
+starts answering "too many searches" has to be backed off as a whole: if one
+request is rate limited, its siblings must not keep hammering the store. A
+`StoreThrottle` is owned by each `Store` instance and is consulted before
+every request that store makes.
+
+A throttle can also carry a `RedisTokenBucket`, in which case every request
+must additionally take a token from the store's cluster-wide budget, and an
+`AdaptiveBackoff`, which shares rate-limit pauses and the store's reduced
+request rate with every other worker. Request outcomes are also fed to the
+store's `CircuitBreaker`, if it has one.
+"""
+
+import threading
+import time
+from typing import Optional
+
+from .backoff import AdaptiveBackoff
+from .circuit_breaker import CircuitBreaker
+from .rate_limiter import RedisTokenBucket
+
+
+class StoreThrottle:
+    """
+    Coordinates a group pause across all threads talking to one store.
+
+    `pause` pushes back the time at which requests may resume, and `delay`
+    reports how long a caller still has to wait. `acquire` also takes a
+    token from the rate limiter, if there is one. Callers choose how to wait
+    (`wait` blocks the current thread), which keeps the throttle usable from
+    both threaded and event-loop based scrapers.
+
+    Request outcomes are reported back with `record_rate_limit`,
+    `record_success` and `record_failure`, which drive the store's adaptive
+    backoff and circuit breaker.
+    """
+
+    def __init__(
+        self,
+        store_slug: str,
+        rate_limiter: Optional[RedisTokenBucket] = None,
+        backoff: Optional[AdaptiveBackoff] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        self.store_slug = store_slug
+        self.rate_limiter = rate_limiter
+        self.backoff = backoff
+        self.circuit_breaker = circuit_breaker
+        self._lock = threading.Lock()
+        self._resume_at = 0.0
+
+    def delay(self) -> float:
+        """Returns the number of seconds until requests may be sent."""
+        with self._lock:
+            return max(self._resume_at - time.monotonic(), 0.0)
+
+    def acquire(self) -> float:
+        """
+        Claims permission to send one request.
+
+        Returns:
+            float: 0.0 if the request may be sent now, otherwise the number
+            of seconds to wait before calling `acquire` again.
+        """
+        delay = self.delay()
+        if delay > 0:
+            return delay
+        if self.rate_limiter is not None:
+            # The token bucket also honours the shared backoff pause.
+            return self.rate_limiter.try_acquire()
+        if self.backoff is not None:
+            return self.backoff.pause_remaining()
+        return 0.0
+
+    def wait(self, max_wait: Optional[float] = None) -> bool:
+        """
+        Blocks the calling thread until a request may be sent to the store,
+        and claims it.
+
+        Args:
+            max_wait: Give up instead of sleeping when the store asks us to
+                wait longer than this many seconds.
+
+        Returns:
+            bool: True if the request may be sent, False if waiting was
+            abandoned because of `max_wait`.
+        """
+        delay = self.acquire()
+        while delay > 0:
+            if max_wait is not None and delay > max_wait:
+                return False
+            time.sleep(delay)
+            delay = self.acquire()
+        return True
+
+    def pause(self, seconds: float) -> None:
+        """
+        Pauses all requests to the store for at least `seconds`. Overlapping
+        pauses extend, rather than shorten, the current one.
+        """
+        with self._lock:
+            self._resume_at = max(
+                self._resume_at, time.monotonic() + seconds
+            )
+
+    def record_rate_limit(self, retry_after: Optional[float] = None) -> float:
+        """
+        Backs the store off after it rate limited a request, honouring its
+        `Retry-After` value when one was sent.
+
+        Returns:
+            float: The number of seconds requests to the store are paused.
+        """
+        if self.backoff is not None:
+            delay = self.backoff.record_rate_limit(retry_after)
+        else:
+            delay = retry_after if retry_after is not None else 0.0
+        # Also pause locally, so this process backs off even if the shared
+        # state is unavailable.
+        self.pause(delay)
+        return delay
+
+    def record_success(self) -> None:
+        """
+        Lets the store's request rate recover after a good response, and
+        closes its circuit.
+        """
+        if self.backoff is not None:
+            self.backoff.record_success()
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_success()
+
+    def record_failure(self) -> None:
+        """
+        Counts a request the store failed to answer (connection error,
+        timeout or server error) towards opening its circuit.
+        """
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.record_failure()
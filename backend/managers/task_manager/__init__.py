@@ -2,15 +2,31 @@ from .task_manager import (
     init_task_manager,
     trigger_scheduled_task,
     queue_task,
+    queue_tasks,
+    job_id_for,
     register_task,
     task,
 )
+from .backpressure import (
+    BACKPRESSURE_METRIC,
+    LANE_LATENCY_METRIC,
+    LaneBacklog,
+    is_backlogged,
+    lane_backlog,
+)
 from . import task_definitions
 
 __all__ = [
+    "BACKPRESSURE_METRIC",
+    "LANE_LATENCY_METRIC",
+    "LaneBacklog",
+    "is_backlogged",
+    "lane_backlog",
     "init_task_manager",
     "trigger_scheduled_task",
     "queue_task",
+    "queue_tasks",
+    "job_id_for",
     "register_task",
     "task_definitions",
     "task",
@@ -0,0 +1,116 @@
+"""
+Tells whether a priority lane has fallen too far behind to take more work.
+
+A lane's backlog is its queue depth together with the rate workers drain
+it at. The rate is derived from the `<lane>:jobs` counter that workers add
+to the `lane_latency` metric for every job they start: each time a backlog
+is read, the counter is sampled and the jobs per second since the previous
+sample are folded into a moving average kept in Redis
+(``lane_throughput:<lane>``).
+
+A lane is backlogged when its depth exceeds `LANE_MAX_DEPTH`, or when the
+expected wait for a newly queued job exceeds `LANE_MAX_WAIT_SECONDS`.
+Producers of low-priority work (the availability sweep) defer or drop it
+while their lane is backlogged, so results never come back hours stale.
+"""
+
+import math
+import os
+import time
+from typing import NamedTuple, Optional
+
+from managers import metrics_manager, redis_manager
+
+# Redis metric holding how long jobs waited in each lane before starting.
+LANE_LATENCY_METRIC = "lane_latency"
+BACKPRESSURE_METRIC = "backpressure"
+THROUGHPUT_KEY_PREFIX = "lane_throughput:"
+
+LANE_MAX_DEPTH = int(os.environ.get("LANE_MAX_DEPTH", 5000))
+LANE_MAX_WAIT_SECONDS = float(os.environ.get("LANE_MAX_WAIT_SECONDS", 600))
+# Samples closer together than this reuse the last rate instead.
+THROUGHPUT_MIN_SAMPLE_SECONDS = 10
+# Weight of the latest sample in a lane's throughput average.
+THROUGHPUT_SMOOTHING = 0.3
+
+
+class LaneBacklog(NamedTuple):
+    """The queue depth of a lane and how long it takes to drain."""
+
+    depth: int
+    jobs_per_second: Optional[float]
+    wait_seconds: Optional[float]
+
+    @property
+    def over_limit(self) -> bool:
+        return self.depth > LANE_MAX_DEPTH or (
+            self.wait_seconds is not None
+            and self.wait_seconds > LANE_MAX_WAIT_SECONDS
+        )
+
+
+def _sample_throughput(lane: str, now: float) -> Optional[float]:
+    """
+    Samples the lane's started-jobs counter and returns its smoothed rate
+    in jobs per second, or None until two samples have been taken.
+    """
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        return None
+    jobs = metrics_manager.get_metric(LANE_LATENCY_METRIC).get(
+        f"{lane}:jobs", 0
+    )
+    key = f"{THROUGHPUT_KEY_PREFIX}{lane}"
+    previous = {
+        field.decode(): float(value)
+        for field, value in redis_conn.hgetall(key).items()
+        if value != b""
+    }
+    rate = previous.get("rate")
+    if "at" in previous:
+        elapsed = now - previous["at"]
+        if elapsed < THROUGHPUT_MIN_SAMPLE_SECONDS:
+            return rate
+        # A reset counter reads as no progress rather than negative rate.
+        sample = max(jobs - previous["jobs"], 0) / elapsed
+        rate = sample if rate is None else (
+            THROUGHPUT_SMOOTHING * sample
+            + (1 - THROUGHPUT_SMOOTHING) * rate
+        )
+    redis_conn.hset(
+        key,
+        mapping={
+            "at": now,
+            "jobs": jobs,
+            "rate": "" if rate is None else rate,
+        },
+    )
+    return rate
+
+
+def lane_backlog(lane: str, now: Optional[float] = None) -> LaneBacklog:
+    """
+    Measures a lane's backlog and reports it in the `backpressure` metric.
+    """
+    now = time.time() if now is None else now
+    depth = redis_manager.get_queue(lane).count
+    rate = _sample_throughput(lane, now)
+    if depth == 0:
+        wait = 0.0
+    elif rate is None:
+        wait = None
+    else:
+        wait = depth / rate if rate > 0 else math.inf
+    gauges = {
+        f"{lane}:depth": depth,
+        f"{lane}:jobs_per_second": round(rate or 0.0, 3),
+    }
+    if wait is not None and not math.isinf(wait):
+        gauges[f"{lane}:wait_seconds"] = round(wait)
+    metrics_manager.set_gauges(BACKPRESSURE_METRIC, gauges)
+    return LaneBacklog(depth, rate, wait)
+
+
+def is_backlogged(lane: str) -> bool:
+    """Tells whether a lane is too far behind for more low-priority work."""
+    return lane_backlog(lane).over_limit
@@ -12,7 +12,9 @@ SET_CATALOG_TASK_ID = "scheduled_set_catalog_update"
 CARD_CATALOG_TASK_ID = "scheduled_card_catalog_update"
 FULL_CATALOG_TASK_ID = "scheduled_full_catalog_update"
 AVAILABILITY_TASK_ID = "scheduled_availability_update"
+REFRESH_TICK_TASK_ID = "scheduled_availability_refresh"
 
 # --- One-Off Task IDs ---
 UPDATE_WANTED_CARDS_AVAILABILITY = "update_wanted_cards_availability"
 UPDATE_AVAILABILITY_SINGLE_CARD = "update_availability_single_card"
+UPDATE_AVAILABILITY_STORE_BATCH = "update_availability_store_batch"
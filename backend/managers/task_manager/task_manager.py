@@ -1,3 +1,10 @@
+import hashlib
+import json
+from typing import Any, Iterable, Optional, Sequence
+
+from rq import Queue
+from rq.job import Job, JobStatus
+
 from managers import redis_manager
 from utility import logger
 
@@ -5,9 +12,12 @@ from utility import logger
 # This dictionary will be populated by task modules at application startup.
 # This avoids circular imports by allowing tasks to register themselves.
 TASK_REGISTRY = {}
+# The priority lane (see `redis_manager.PRIORITY_LANES`) each task is queued
+# on unless the caller picks one. Tasks without a lane use the default queue.
+TASK_LANES = {}
 
 
-def task(task_id: str = None):
+def task(task_id: str = None, lane: Optional[str] = None):
     """
     A decorator that registers a function as a background task with both
     RQ and our internal task manager.
@@ -21,13 +31,15 @@ def task(task_id: str = None):
     Args:
         task_id (str, optional): The ID to register the task with. If None,
         the function's name is used.
+        lane (str, optional): The priority lane the task is queued on by
+        default.
     """
 
     def decorator(func):
         # Use the provided task_id or default to the function's name
         _task_id = task_id or func.__name__
         # 1. Register with our internal registry for queuing by ID
-        register_task(_task_id, func)
+        register_task(_task_id, func, lane)
         # 2. Return the original function, as RQ does not require
         # pre-decoration.
         return func
@@ -35,7 +47,7 @@ def task(task_id: str = None):
     return decorator
 
 
-def register_task(task_id: str, func: callable):
+def register_task(task_id: str, func: callable, lane: Optional[str] = None):
     """
     Allows task modules to register their functions with the task manager.
     """
@@ -45,12 +57,14 @@ def register_task(task_id: str, func: callable):
             f"This may be unintentional."
         )
     TASK_REGISTRY[task_id] = func
+    if lane:
+        TASK_LANES[task_id] = lane
     logger.debug(
         f"✅ Registered task '{task_id}' to function '{func.__name__}'."
     )
 
 
-def queue_task(task_id: str, *args, **kwargs):
+def queue_task(task_id: str, *args, lane: Optional[str] = None, **kwargs):
     """
     Queues a task by its ID to be executed by an RQ worker.
 
@@ -58,6 +72,8 @@ def queue_task(task_id: str, *args, **kwargs):
         task_id (str): The ID of the task to execute,
             as defined in the TASK_REGISTRY.
         *args: Positional arguments to pass to the function.
+        lane (str, optional): The priority lane to queue the task on,
+            overriding the task's own lane.
         **kwargs: Keyword arguments to pass to the function.
     """
     func = TASK_REGISTRY.get(task_id)
@@ -66,13 +82,101 @@ def queue_task(task_id: str, *args, **kwargs):
         return
 
     try:
-        redis_manager.queue.enqueue(func, *args, **kwargs)
+        queue = redis_manager.get_queue(lane or TASK_LANES.get(task_id))
+        queue.enqueue(func, *args, **kwargs)
         # Use func.__name__ to get the name of the function for logging.
-        logger.info(f"📌 Queued task '{task_id}' ({func.__name__})")
+        logger.info(
+            f"📌 Queued task '{task_id}' ({func.__name__}) on '{queue.name}'"
+        )
     except Exception as e:
         logger.error(f"❌ Failed to queue task '{task_id}': {e}")
 
 
+# A job with one of these statuses has not finished yet. Queuing the same job
+# ID again would only run the same work twice, and would overwrite the hash
+# (status, result, meta) of a job that is running.
+PENDING_JOB_STATUSES = {
+    JobStatus.QUEUED.value,
+    JobStatus.DEFERRED.value,
+    JobStatus.SCHEDULED.value,
+    JobStatus.STARTED.value,
+}
+
+
+def job_id_for(task_id: str, *args) -> str:
+    """
+    Builds a deterministic RQ job ID from a task ID and its arguments, so
+    the same work always maps to the same job.
+    """
+    encoded = json.dumps(args, sort_keys=True, default=str)
+    digest = hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+    return f"{task_id}-{digest}"
+
+
+def queue_tasks(
+    task_id: str,
+    job_args: Iterable[Sequence[Any]],
+    lane: Optional[str] = None,
+) -> int:
+    """
+    Queues many runs of a task in one pipelined Redis operation.
+
+    Each run gets a deterministic job ID (see `job_id_for`). Duplicate runs
+    in the batch, and runs whose job from an earlier batch is still waiting
+    in the queue or running, are skipped.
+
+    Args:
+        task_id (str): The ID of the task to execute,
+            as defined in the TASK_REGISTRY.
+        job_args: The positional arguments of each run.
+        lane (str, optional): The priority lane to queue the tasks on,
+            overriding the task's own lane.
+
+    Returns:
+        int: The number of jobs queued.
+    """
+    func = TASK_REGISTRY.get(task_id)
+    if not func:
+        logger.error(f"❌ Attempted to queue unknown task with ID: '{task_id}'")
+        return 0
+
+    jobs = {}
+    for args in job_args:
+        args = tuple(args)
+        jobs.setdefault(job_id_for(task_id, *args), args)
+    if not jobs:
+        return 0
+
+    queue = redis_manager.get_queue(lane or TASK_LANES.get(task_id))
+    try:
+        with queue.connection.pipeline() as pipe:
+            for job_id in jobs:
+                pipe.hget(Job.key_for(job_id), "status")
+            statuses = pipe.execute()
+        job_datas = [
+            Queue.prepare_data(func, args=args, job_id=job_id)
+            for (job_id, args), status in zip(jobs.items(), statuses)
+            if _decode(status) not in PENDING_JOB_STATUSES
+        ]
+        if job_datas:
+            with queue.connection.pipeline() as pipe:
+                queue.enqueue_many(job_datas, pipeline=pipe)
+                pipe.execute()
+    except Exception as e:
+        logger.error(f"❌ Failed to queue tasks '{task_id}': {e}")
+        return 0
+
+    logger.info(
+        f"📌 Queued {len(job_datas)} '{task_id}' tasks ({func.__name__}) on "
+        f"'{queue.name}', {len(jobs) - len(job_datas)} already pending"
+    )
+    return len(job_datas)
+
+
+def _decode(value: Any) -> Any:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
 def trigger_scheduled_task(task_id: str):
     """
     Manually triggers a specific scheduled task to run immediately.
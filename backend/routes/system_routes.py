@@ -1,9 +1,10 @@
-from flask import Blueprint
+from flask import Blueprint, jsonify
 
 from data import database
 from managers import socket_manager
 from managers import redis_manager
 from managers import flask_manager
+from managers import metrics_manager
 
 
 from utility import logger
@@ -59,3 +60,13 @@ def health_check():
         )  # exc_info=False to keep logs clean
         # Return a 503 Service Unavailable status to make the healthcheck fail.
         return "Service Unavailable", 503
+
+
+@system_bp.route("/api/metrics")
+def metrics():
+    """
+    Returns the operational metrics collected by workers and the scheduler
+    (e.g. HTTP connection reuse per store) as a JSON object keyed by metric
+    name.
+    """
+    return jsonify(metrics_manager.get_all_metrics())
@@ -1,7 +1,9 @@
 from .messages import (
     AvailabilityRequestCommand,
     QueueAllAvailabilityChecksCommand,
+    AvailabilitySweepCommand,
     AvailabilityResultMessage,
+    AvailabilityResultBatchMessage,
     GetCardPrintingsMessage,
     ParseCardListMessage,
     AddCardMessage,
@@ -14,13 +16,17 @@ from .messages import (
 
 from .generator import (
     GenerateAvailabilityRequestCommand,
+    GenerateAvailabilityResultBatch,
+    GenerateAvailabilitySweepCommand,
 )
 
 
 __all__ = [
     "AvailabilityRequestCommand",
     "AvailabilityResultMessage",
+    "AvailabilityResultBatchMessage",
     "QueueAllAvailabilityChecksCommand",
+    "AvailabilitySweepCommand",
     "GetCardPrintingsMessage",
     "ParseCardListMessage",
     "AddCardMessage",
@@ -31,4 +37,6 @@ __all__ = [
     "CatalogCardNamesResultMessage",
     # Generators
     "GenerateAvailabilityRequestCommand",
+    "GenerateAvailabilityResultBatch",
+    "GenerateAvailabilitySweepCommand",
 ]
@@ -1,14 +1,24 @@
 from .messages import (
     AvailabilityRequestCommand,
     AvailabilityResultMessage,
+    AvailabilityResultBatchMessage,
+    AvailabilitySweepCommand,
 )
 
 from .payload import (
     AvailabilityRequestPayload,
     AvailabilityResultPayload,
+    AvailabilityResultBatchPayload,
+    AvailabilitySweepItemPayload,
+    AvailabilitySweepPayload,
 )
 
-from ..blocks import UserSchema, CardPreferenceSchema, StoreSchema
+from ..blocks import (
+    CardPreferenceSchema,
+    CardSchema,
+    StoreSchema,
+    UserSchema,
+)
 
 
 def GenerateAvailabilityRequestCommand(
@@ -31,3 +41,36 @@ def GenerateAvailabilityResult(
         items=items,
     )
     return AvailabilityResultMessage(payload=payload)
+
+
+def GenerateAvailabilityResultBatch(
+    results: list[dict],
+) -> AvailabilityResultBatchMessage:
+    payload = AvailabilityResultBatchPayload(
+        results=[
+            AvailabilityResultPayload(
+                card=CardPreferenceSchema.model_validate(result["card"]),
+                store=StoreSchema.model_validate(result["store"]),
+                items=result["items"],
+            )
+            for result in results
+        ]
+    )
+    return AvailabilityResultBatchMessage(payload=payload)
+
+
+def GenerateAvailabilitySweepCommand(
+    items: list[dict],
+) -> AvailabilitySweepCommand:
+    payload = AvailabilitySweepPayload(
+        items=[
+            AvailabilitySweepItemPayload(
+                store=StoreSchema(slug=item["store"]),
+                card=CardSchema(name=item["card_name"]),
+                card_specs=item["card_specs"],
+                users=item["users"],
+            )
+            for item in items
+        ]
+    )
+    return AvailabilitySweepCommand(payload=payload)
@@ -5,12 +5,15 @@ from .payload import (
     Payload,
     AvailabilityRequestPayload,
     AvailabilityResultPayload,
+    AvailabilityResultBatchPayload,
+    AvailabilitySweepPayload,
     GetPrintingsRequestPayload,
     UpdateCardRequestPayload,
     CatalogPrintingsChunkResultPayload,
     CatalogFinishesChunkResultPayload,
     CatalogCardNamesResultPayload,
     CatalogSetDataResultPayload,
+    CatalogBlobResultPayload,
     UpdateStoresPayload,
     LoginUserPayload,
     CardListPayload,
@@ -57,6 +60,17 @@ class QueueAllAvailabilityChecksCommand(PubSubMessage[Payload]):
     channel: ClassVar[str] = "scheduler-requests"
 
 
+class AvailabilitySweepCommand(PubSubMessage[AvailabilitySweepPayload]):
+    """
+    A command to check a batch of cards, each at one store for every
+    interested user, as planned by the system-wide availability sweep.
+    """
+
+    name: ClassVar[str] = "availability_sweep_request"
+    channel: ClassVar[str] = "scheduler-requests"
+    payload: AvailabilitySweepPayload
+
+
 class AvailabilityResultMessage(PubSubMessage[AvailabilityResultPayload]):
     """
     Defines the structure for a message published by a worker to the
@@ -68,6 +82,20 @@ class AvailabilityResultMessage(PubSubMessage[AvailabilityResultPayload]):
     payload: AvailabilityResultPayload
 
 
+class AvailabilityResultBatchMessage(
+    PubSubMessage[AvailabilityResultBatchPayload]
+):
+    """
+    Defines the structure for a message published by a worker to the
+    'worker-results' Redis channel after checking a batch of cards at one
+    store.
+    """
+
+    name: ClassVar[str] = "availability_result_batch"
+    channel: ClassVar[str] = "worker-results"
+    payload: AvailabilityResultBatchPayload
+
+
 class CatalogCardNamesResultMessage(
         PubSubMessage[CatalogCardNamesResultPayload]):
     """
@@ -119,6 +147,18 @@ class CatalogFinishesChunkResultMessage(
     payload: CatalogFinishesChunkResultPayload
 
 
+class CatalogBlobResultMessage(PubSubMessage[CatalogBlobResultPayload]):
+    """
+    Defines the structure for a message published by a worker to the
+    'worker-results' Redis channel after writing catalog records to a
+    compressed blob (see `redis_manager.blob_transfer`).
+    """
+
+    name: ClassVar[str] = "catalog_blob_result"
+    channel: ClassVar[str] = "worker-results"
+    payload: CatalogBlobResultPayload
+
+
 # --- End Pub-Sub Message Definitions ---
 
 
@@ -288,11 +328,14 @@ PubSubMessages = Annotated[
     Union[
         AvailabilityRequestCommand,
         QueueAllAvailabilityChecksCommand,
+        AvailabilitySweepCommand,
         AvailabilityResultMessage,
+        AvailabilityResultBatchMessage,
         CatalogCardNamesResultMessage,
         CatalogSetDataResultMessage,
         CatalogPrintingsChunkResultMessage,
         CatalogFinishesChunkResultMessage,
+        CatalogBlobResultMessage,
     ],
     Field(discriminator="name"),
 ]
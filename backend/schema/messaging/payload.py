@@ -30,6 +30,11 @@ class AvailabilityRequestPayload(Payload):
         None,
         description="The card details, including name and specifications."
     )
+    lane: Optional[str] = Field(
+        None,
+        description="The priority lane to queue the check on. Defaults to "
+        "the task's own lane.",
+    )
 
 
 class AvailabilityResultPayload(Payload):
@@ -50,6 +55,46 @@ class AvailabilityResultPayload(Payload):
     )
 
 
+class AvailabilityResultBatchPayload(Payload):
+    """
+    Defines the payload for a message published by a worker to the
+    'worker-results' Redis channel after checking a batch of cards at one
+    store.
+    """
+    results: List[AvailabilityResultPayload] = Field(
+        ..., description="The result of each card checked in the batch."
+    )
+
+
+class AvailabilitySweepItemPayload(Payload):
+    """
+    Defines the payload for a command sent to the Scheduler to check one
+    card at one store on behalf of every user who tracks it there.
+    """
+    store: StoreSchema = Field(..., description="The store to check.")
+    card: CardSchema = Field(..., description="The card to check.")
+    card_specs: List[Dict[str, Optional[str]]] = Field(
+        default_factory=list,
+        description="The merged specifications of every interested user. "
+        "An empty list matches any printing.",
+    )
+    users: Dict[str, List[Dict[str, Optional[str]]]] = Field(
+        ...,
+        description="The specifications of each interested user, "
+        "by username.",
+    )
+
+
+class AvailabilitySweepPayload(Payload):
+    """
+    Defines the payload for a batch of availability sweep items, so a whole
+    sweep is sent to the Scheduler in a few messages.
+    """
+    items: List[AvailabilitySweepItemPayload] = Field(
+        ..., description="The (store, card) checks to queue."
+    )
+
+
 class GetPrintingsRequestPayload(Payload):
     """
     Validates the payload for the 'get_card_printings' event.
@@ -154,6 +199,22 @@ class CatalogFinishesChunkResultPayload(Payload):
     finishes: list[str] = Field(..., description="A list of finishes.")
 
 
+class CatalogBlobResultPayload(Payload):
+    """
+    Payload referencing catalog records that a worker wrote to a compressed
+    Redis blob instead of publishing them inline.
+    """
+
+    kind: Literal["card_names", "printings"] = Field(
+        ..., description="What the blob's records are."
+    )
+    key: str = Field(..., description="The Redis key of the blob.")
+    records: int = Field(..., description="The number of records written.")
+    compressed_bytes: int = Field(
+        ..., description="The compressed size of the blob in bytes."
+    )
+
+
 class LoginUserPayload(Payload):
     """
     Payload for the result of fetching user data.
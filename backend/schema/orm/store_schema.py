@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 from pydantic import ConfigDict, Field
 from .base_schema import DatabaseSchema
 
@@ -15,6 +15,10 @@ class StoreSchema(DatabaseSchema):
     homepage: str
     search_url: str
     fetch_strategy: str
+    max_concurrency: Optional[int] = None
+    rate_limit_per_second: Optional[float] = None
+    rate_limit_burst: Optional[int] = None
+    stale_after_seconds: Optional[int] = None
 
     model_config = ConfigDict(from_attributes=True)
 
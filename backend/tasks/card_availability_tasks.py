@@ -11,9 +11,16 @@ time.
 
 Key responsibilities
 - Aggregate wanted cards across users.
-- Fan-out availability check requests for all users or a single user.
+- Fan-out availability check requests for all users or a single user. The
+    system-wide sweep is planned as one check per (store, card) pair, shared
+    by every user who tracks that card at that store.
 - Execute a worker task to fetch availability for a single card/store pair,
     publish results for backend consumption, and emit live updates to clients.
+- Check a batch of sweep items at one store in a single job, reusing the
+    store's session and caches, and publish all of its results at once.
+- Bound each single-card check by a deadline. A check cut short sends its
+    partial listings to its users without caching them, and re-queues the
+    rest at a lower priority.
 
 Important side-effects
 - Publishes commands and results to Redis topics (e.g. "scheduler-requests",
@@ -28,12 +35,33 @@ Important side-effects
 This module fulfills requirements [5.1.7] and related functionality.
     """
 
+import time
+from typing import List, Optional
+
 from data import database
-from managers import store_manager, user_manager, task_manager, redis_manager
+from managers import (
+    availability_manager,
+    redis_manager,
+    store_manager,
+    task_manager,
+    user_manager,
+)
 from managers.socket_manager import socket_emit
+from managers.store_manager.filtering import filter_listings
+from managers.store_manager.stores.deadline import job_deadline
 from schema import messaging
+from tasks import refresh_scheduler
 from utility import logger
 
+# (store, card) checks sent to the Scheduler per 'availability_sweep_request'
+# command; each command is queued in one pipelined batch.
+SWEEP_COMMAND_BATCH_SIZE = 500
+# Lane a single-card check cut short by its deadline finishes on, behind
+# every interactive check.
+DEADLINE_REQUEUE_LANE = redis_manager.USER_REFRESH_LANE
+# Lane the check of a scrape whose job died is repeated on for its waiters.
+ORPHANED_FLIGHT_LANE = redis_manager.USER_REFRESH_LANE
+
 
 def get_wanted_cards(users: list):
     """Aggregates all cards that users have in their wanted lists."""
@@ -69,31 +97,119 @@ def get_wanted_cards(users: list):
     return list(wanted_cards)
 
 
-@task_manager.task()
+def _stale_after_seconds(store_slug: str) -> float:
+    """Returns how long checks at a store stay fresh (never, if unknown)."""
+    store = store_manager.get_store(store_slug)
+    return store.stale_after_seconds if store else 0
+
+
+def _select_stale(items: List[dict]) -> List[dict]:
+    """
+    Leaves out items checked more recently than their store's staleness
+    threshold, e.g. by a user's own check.
+    """
+    return availability_manager.select_stale_items(
+        items,
+        availability_manager.get_last_checked(
+            (item["store"], item["card_name"]) for item in items
+        ),
+        _stale_after_seconds,
+    )
+
+
+def _publish_sweep_items(items: List[dict]) -> int:
+    """
+    Publishes sweep items as 'availability_sweep_request' commands, in
+    batches of (store, card) checks.
+
+    Returns:
+        int: The number of (store, card) checks published.
+    """
+    for start in range(0, len(items), SWEEP_COMMAND_BATCH_SIZE):
+        batch = items[start:start + SWEEP_COMMAND_BATCH_SIZE]
+        redis_manager.publish_pubsub(
+            messaging.GenerateAvailabilitySweepCommand(batch)
+        )
+        logger.debug(
+            f"📢 Published 'availability_sweep_request' command for "
+            f"{len(batch)} (store, card) checks."
+        )
+    return len(items)
+
+
+def _publish_availability_sweep() -> int:
+    """
+    Plans the sweep from the streamed tracked cards and publishes every
+    stale (store, card) check at once, bypassing the refresh schedule.
+
+    Returns:
+        int: The number of (store, card) checks published.
+    """
+    plan = availability_manager.plan_availability_sweep(
+        database.stream_tracked_cards()
+    )
+    return _publish_sweep_items(_select_stale(plan))
+
+
+def _release_due_checks() -> int:
+    """
+    Publishes the (store, card) checks the refresh schedule says are due.
+    Due pairs that a user checked recently are pushed back until they go
+    stale instead. While the sweep lane is backlogged nothing is released,
+    so due pairs wait in the schedule rather than in the queue.
+
+    Returns:
+        int: The number of (store, card) checks published.
+    """
+    if task_manager.is_backlogged(redis_manager.SWEEP_LANE):
+        logger.warning(
+            "🚧 Sweep lane is backlogged. Deferring due availability checks."
+        )
+        return 0
+    due = refresh_scheduler.release_due()
+    stale = _select_stale(due)
+    stale_pairs = {(item["store"], item["card_name"]) for item in stale}
+    fresh = [
+        item for item in due
+        if (item["store"], item["card_name"]) not in stale_pairs
+    ]
+    checked_at = availability_manager.get_last_checked(
+        (item["store"], item["card_name"]) for item in fresh
+    )
+    refresh_scheduler.defer(
+        (
+            item["store"],
+            item["card_name"],
+            (at or 0) + _stale_after_seconds(item["store"]),
+        )
+        for item, at in zip(fresh, checked_at)
+    )
+    return _publish_sweep_items(stale)
+
+
+@task_manager.task(lane=redis_manager.SWEEP_LANE)
 def update_all_tracked_cards_availability():
     """
     System-wide task to re-check availability for all tracked cards for
-    all users. This acts as a fan-out task, enqueuing specific checks for each
-    user/card/store combo.
+    all users. The sweep planner collapses every user/card/store combo into
+    one check per (store, card) pair, which the refresh schedule then checks
+    as often as its demand and volatility call for; each check's result is
+    fanned out to every interested user.
     This fulfills requirement [5.1.7].
     """
     logger.info(
         "🚀 Starting system-wide availability check for all tracked cards."
     )
     try:
-        all_users = database.get_all_users()
-        if not all_users:
+        plan = availability_manager.plan_availability_sweep(
+            database.stream_tracked_cards()
+        )
+        refresh_scheduler.sync_schedule(plan)
+        if not _release_due_checks():
             logger.info(
-                "No users found. Skipping system-wide availability check."
-            )
-            return
-
-        for user in all_users:
-            logger.debug(
-                f"Queueing availability checks for user: {user.username}"
+                "No due tracked cards found. Skipping system-wide "
+                "availability check."
             )
-            # This re-uses the existing on-demand logic for a specific user.
-            update_availability_for_user(user.username)
 
     except Exception as e:
         logger.error(
@@ -103,7 +219,55 @@ def update_all_tracked_cards_availability():
 
 
 @task_manager.task(
-    task_manager.task_definitions.UPDATE_WANTED_CARDS_AVAILABILITY
+    task_manager.task_definitions.REFRESH_TICK_TASK_ID,
+    lane=redis_manager.SWEEP_LANE,
+)
+def release_due_availability_checks():
+    """
+    Scheduled task that publishes the (store, card) checks that have come
+    due in the refresh schedule since the last tick, and re-queues the
+    checks whose scrape died with users still waiting for it.
+    """
+    try:
+        released = _release_due_checks()
+        logger.info(f"⏰ Released {released} due availability checks.")
+    except Exception as e:
+        logger.error(
+            f"❌ An error occurred while releasing due availability checks: "
+            f"{e}",
+            exc_info=True,
+        )
+    _requeue_orphaned_flights()
+
+
+def _requeue_orphaned_flights() -> int:
+    """
+    Queues the check of every scrape whose job died once more, for the
+    users who attached to it, as a continuation sent to all of them.
+    """
+    orphaned = availability_manager.collect_orphaned_flights()
+    for flight in orphaned:
+        if not flight.waiters:
+            continue
+        logger.warning(
+            f"⚠️ The check of {flight.card.get('name')} at "
+            f"{flight.store_slug} died. Re-queuing it for "
+            f"{len(flight.waiters)} waiting user(s)."
+        )
+        task_manager.queue_task(
+            task_manager.task_definitions.UPDATE_AVAILABILITY_SINGLE_CARD,
+            flight.waiters[0],
+            flight.store_slug,
+            flight.card,
+            lane=ORPHANED_FLIGHT_LANE,
+            resumed_for=flight.waiters[1:],
+        )
+    return len(orphaned)
+
+
+@task_manager.task(
+    task_manager.task_definitions.UPDATE_WANTED_CARDS_AVAILABILITY,
+    lane=redis_manager.USER_REFRESH_LANE,
 )
 def update_availability_for_user(username: str):
     """
@@ -139,13 +303,34 @@ def update_availability_for_user(username: str):
 
 
 @task_manager.task(
-    task_manager.task_definitions.UPDATE_AVAILABILITY_SINGLE_CARD
+    task_manager.task_definitions.UPDATE_AVAILABILITY_SINGLE_CARD,
+    lane=redis_manager.INTERACTIVE_LANE,
 )
 def update_availability_single_card(username: str,
                                     store_name: str,
-                                    card: dict) -> bool:
+                                    card: dict,
+                                    resumed_for: Optional[List[str]] = None
+                                    ) -> bool:
     """
     Background task to update the availability for a single card at a store.
+
+    A job for a scrape already in flight elsewhere attaches to it and ends
+    at once; the job leading the scrape sends it the listings. Only the
+    leading job consults the store's circuit breaker; if the circuit is
+    open, it and its waiters are sent an 'availability_check_failed' event
+    instead.
+
+    The scrape runs under a job deadline. If the deadline cuts it short, the
+    listings found so far are sent flagged as incomplete but not published
+    for caching, so they neither replace a complete cached result nor mark
+    the card as freshly checked. The check is then queued once more on
+    `DEADLINE_REQUEUE_LANE`, with `resumed_for` naming the other users to
+    send its result to. Product details resolved before the deadline are
+    cached, so the continuation only fetches the pages that were left.
+
+    A complete check with the same specifications as the pair's scheduled
+    sweep check is recorded in the refresh schedule, so the next sweep
+    check is timed from it.
     """
     if not store_name:
         logger.warning(f"🚨 Invalid store name: {store_name}. Task aborted.")
@@ -176,13 +361,61 @@ def update_availability_single_card(username: str,
             f"🚨 Store '{store_name}' is not configured or missing "
             f"from STORE_REGISTRY. Task aborted."
         )
+        _emit_check_failed([username], store_name, card_name, "unknown_store")
+        return False
+
+    # Identical scrapes already in flight elsewhere are joined, not repeated.
+    # A continuation's flight ended with the check it continues.
+    card_specs = card.get("card_specs")
+    flight = None
+    if resumed_for is None:
+        flight = availability_manager.join_flight(
+            store_name, card_name, card_specs, username
+        )
+        if flight.items is not None:
+            logger.info(
+                f"♻️ Reusing a scrape of {card_name} at {store_name} that "
+                f"just finished."
+            )
+            _emit_card_availability(
+                [username], store_name, card_name, flight.items
+            )
+            return True
+        if not flight.leads:
+            logger.info(
+                f"🛬 {card_name} at {store_name} is already being checked. "
+                f"Its result will be sent to '{username}' too."
+            )
+            return True
+
+    # Fail fast while the store's circuit is open, without touching the
+    # network or overwriting its last known availability. Only the job that
+    # scrapes asks, so a half-open circuit's single probe is never spent on
+    # a job that joins another's scrape.
+    if not store.circuit_breaker.allow_request():
+        logger.warning(
+            f"🔌 Circuit for '{store_name}' is open. Skipping availability "
+            f"check for {card_name}."
+        )
+        others = _other_waiters(
+            flight, resumed_for, username, [], reusable=False
+        )
+        _emit_check_failed(
+            [username] + others,
+            store_name,
+            card_name,
+            "circuit_open",
+        )
         return False
 
     logger.info(f"🔍 Checking availability for {card_name} at {store_name}")
 
     # Fetch availability using the specific store's implementation
-    card_specs = card.get("card_specs")
-    available_items = store.fetch_card_availability(card_name, card_specs)
+    with job_deadline() as deadline:
+        available_items = store.fetch_card_availability(
+            card_name, card_specs
+        )
+    incomplete = deadline.exceeded
 
     if available_items:
         logger.info(
@@ -195,65 +428,291 @@ def update_availability_single_card(username: str,
             f"at {store_name}. Caching empty result."
         )
 
-    redis_manager.publish_pubsub(
-        messaging.generator.GenerateAvailabilityResult(
-            card={"card": {
-                "name": card_name,
-                "card_specs": card_specs or []
-            }
-            },
-            store={
-                "slug": store_name},
-            items=available_items
+    # Compared with the cache before the result is published to replace it,
+    # so a scheduled pair's next check follows this one too. Listings found
+    # with other specifications than the sweep's say nothing about change.
+    if not incomplete and refresh_scheduler.matches_scheduled_check(
+        store_name, card_name, card_specs
+    ):
+        refresh_scheduler.record_check(
+            store_name,
+            card_name,
+            refresh_scheduler.listings_changed(
+                availability_manager.get_cached_availability_data(
+                    store_name, card_name
+                ),
+                available_items or [],
+            ),
+        )
+    if not incomplete:
+        redis_manager.publish_pubsub(
+            messaging.generator.GenerateAvailabilityResult(
+                card={"card": {
+                    "name": card_name,
+                    "card_specs": card_specs or []
+                }
+                },
+                store={
+                    "slug": store_name},
+                items=available_items
+            )
         )
-    )
 
     # --- Emit results to the client ---
-    # The worker still emits directly to the client for real-time UI updates.
-    event_data = {
-        "username": username,
-        "store": store_name,
-        "card": card_name,
-        "items": available_items or [],
-    }
-    socket_emit.emit_from_worker(
-        "card_availability_data", event_data, room=username
+    # The worker still emits directly to the client for real-time UI updates,
+    # to its own user and to every user who attached to this scrape.
+    # Partial listings go to the waiters but are not reused.
+    others = _other_waiters(
+        flight,
+        resumed_for,
+        username,
+        available_items or [],
+        reusable=not incomplete,
     )
+    _emit_card_availability(
+        [username] + others,
+        store_name,
+        card_name,
+        available_items or [],
+        incomplete=incomplete,
+    )
+
+    if incomplete:
+        if resumed_for is None:
+            logger.warning(
+                f"⏱️ Checking {card_name} at {store_name} ran past its "
+                f"deadline. Re-queuing the rest on "
+                f"'{DEADLINE_REQUEUE_LANE}'."
+            )
+            task_manager.queue_task(
+                task_manager.task_definitions.UPDATE_AVAILABILITY_SINGLE_CARD,
+                username,
+                store_name,
+                card,
+                lane=DEADLINE_REQUEUE_LANE,
+                resumed_for=others,
+            )
+        else:
+            logger.warning(
+                f"⏱️ Continued check of {card_name} at {store_name} ran past "
+                f"its deadline again. Leaving the rest to the next refresh."
+            )
     return True
 
 
+def _other_waiters(
+    flight: Optional[availability_manager.Flight],
+    resumed_for: Optional[List[str]],
+    username: str,
+    items: list,
+    reusable: bool = True,
+) -> List[str]:
+    """
+    Ends the flight a check leads with `items`, and returns the users other
+    than `username` who wait for its result: the flight's waiters, or those
+    a continuation was queued for.
+    """
+    if flight is not None:
+        waiters = availability_manager.finish_flight(
+            flight, items, reusable=reusable
+        )
+    else:
+        waiters = resumed_for or []
+    return [waiter for waiter in waiters if waiter != username]
+
+
+def _emit_check_failed(
+    usernames: List[str], store_name: str, card_name: str, reason: str
+):
+    """Tells users that a card's check at a store ended without listings."""
+    for username in usernames:
+        socket_emit.emit_from_worker(
+            "availability_check_failed",
+            {"store": store_name, "card": card_name, "reason": reason},
+            room=username,
+        )
+
+
+def _emit_card_availability(
+    usernames: List[str],
+    store_name: str,
+    card_name: str,
+    items: list,
+    incomplete: bool = False,
+):
+    """
+    Sends each user the listings found for a card at a store, flagged as
+    incomplete if the scrape was cut short.
+    """
+    for username in usernames:
+        event_data = {
+            "username": username,
+            "store": store_name,
+            "card": card_name,
+            "items": items,
+        }
+        if incomplete:
+            event_data["incomplete"] = True
+        socket_emit.emit_from_worker(
+            "card_availability_data", event_data, room=username
+        )
+
+
+def _specification_schema(spec: dict) -> dict:
+    """Shapes a filter specification like a `CardSpecificationSchema`."""
+    return {
+        "set_code": spec.get("set_code"),
+        "collector_number": spec.get("collector_number"),
+        "finish": {"name": spec["finish"]} if spec.get("finish") else None,
+    }
+
+
+def _start_sweep_item(item: dict):
+    """Tells every user who tracks a sweep item that its check started."""
+    for username in item.get("users") or {}:
+        socket_emit.emit_from_worker(
+            "availability_check_started",
+            {"store": item["store"], "card": item["card_name"]},
+            room=username,
+        )
+
+
+def _finish_sweep_item(item: dict, listings: list) -> dict:
+    """
+    Emits each user who tracks a sweep item the listings matching their
+    own specifications, and records the check in the refresh schedule.
+
+    Returns:
+        dict: The availability result to publish for caching, holding the
+        listings that match any user's specifications.
+    """
+    store_name = item["store"]
+    card_name = item["card_name"]
+    users = item.get("users") or {}
+    card_specs = item.get("card_specs") or []
+    available_items = [
+        listing.model_dump()
+        for listing in filter_listings(card_name, listings, card_specs)
+    ]
+
+    refresh_scheduler.record_check(
+        store_name,
+        card_name,
+        refresh_scheduler.listings_changed(
+            availability_manager.get_cached_availability_data(
+                store_name, card_name
+            ),
+            available_items,
+        ),
+    )
+
+    for username, user_specs in users.items():
+        event_data = {
+            "username": username,
+            "store": store_name,
+            "card": card_name,
+            "items": [
+                listing.model_dump()
+                for listing in filter_listings(
+                    card_name, listings, user_specs
+                )
+            ],
+        }
+        socket_emit.emit_from_worker(
+            "card_availability_data", event_data, room=username
+        )
+
+    return {
+        "card": {
+            "card": {"name": card_name},
+            "card_specs": [
+                _specification_schema(spec) for spec in card_specs
+            ],
+        },
+        "store": {"slug": store_name},
+        "items": available_items,
+    }
+
+
 @task_manager.task(
-    task_manager.task_definitions.AVAILABILITY_TASK_ID
+    task_manager.task_definitions.UPDATE_AVAILABILITY_STORE_BATCH,
+    lane=redis_manager.SWEEP_LANE,
 )
-def queue_all_availability_checks():
-    tracked_cards = database.get_all_tracked_cards()
-    if not tracked_cards:
-        logger.info("No cards tracked")
-        return
-
-    all_users = database.get_all_users()
-    if not all_users:
-        logger.info("No users found")
-        return
-
-    for card in tracked_cards:
-        username = database.get_user_orm_by_id(card.user_id).username
-        if not username:
-            logger.warning("username does not exist")
-
-        card_data = {
-            "card_name": card.card_name,
-            "amount": card.amount,
-            # Hardcoded for now. Will be updated when specifications are more
-            #  implemented
-            "specifications": None
-        }
-        store_name = card.store.slug
+def update_availability_store_batch(store_name: str, items: list) -> int:
+    """
+    Background task to check a batch of sweep items at one store in a
+    single job. The store, with its HTTP session and product-detail cache,
+    is looked up once for the whole batch. Its cards are searched for in
+    groups of the store's `max_concurrency`, which stores that can overlap
+    their requests fetch at once; each user receives a group's listings as
+    soon as it is checked, and all results are published for caching in one
+    message at the end.
+
+    The per-card latency of the batch is recorded so later batches for the
+    store can be sized to match.
+
+    Returns:
+        int: The number of cards checked.
+    """
+    store = store_manager.get_store(store_name)
+    if not store:
+        logger.warning(
+            f"🚨 Store '{store_name}' is not configured or missing "
+            f"from STORE_REGISTRY. Task aborted."
+        )
+        return 0
+
+    checks = []
+    for item in items:
+        if not item.get("card_name"):
+            logger.error(
+                f"❌ Store batch for '{store_name}' has an item without a "
+                f"card. Skipping. Item: {item}"
+            )
+            continue
+        checks.append({**item, "store": store_name})
+
+    results = []
+    started = time.monotonic()
+    group_size = max(int(store.max_concurrency), 1)
+    for start in range(0, len(checks), group_size):
+        # Stop at an open circuit; the rest stay due in the schedule.
+        if not store.circuit_breaker.allow_request():
+            logger.warning(
+                f"🔌 Circuit for '{store_name}' is open. Skipping "
+                f"{len(checks) - start} remaining availability checks."
+            )
+            break
+        group = checks[start:start + group_size]
+        for item in group:
+            _start_sweep_item(item)
+        fetched = store.fetch_listings_many(
+            [item["card_name"] for item in group]
+        )
+        for item, listings in zip(group, fetched):
+            results.append(_finish_sweep_item(item, listings))
 
+    if results:
         redis_manager.publish_pubsub(
-            messaging.GenerateAvailabilityRequestCommand(
-                username,
-                store_name,
-                card_data
-            )
+            messaging.GenerateAvailabilityResultBatch(results)
+        )
+        availability_manager.record_batch_latency(
+            store_name, len(results), time.monotonic() - started
         )
+    logger.info(
+        f"✅ Checked {len(results)} of {len(items)} cards at {store_name}."
+    )
+    return len(results)
+
+
+@task_manager.task(
+    task_manager.task_definitions.AVAILABILITY_TASK_ID,
+    lane=redis_manager.SWEEP_LANE,
+)
+def queue_all_availability_checks():
+    """
+    Queues an availability check for every tracked card at every store its
+    user selected, reading all of them in one streamed query.
+    """
+    if not _publish_availability_sweep():
+        logger.info("No stale cards tracked")
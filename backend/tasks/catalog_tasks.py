@@ -8,6 +8,7 @@ from managers import redis_manager
 from utility import logger
 from datetime import datetime
 import time
+from typing import Optional
 from schema.messaging import messages
 
 
@@ -15,8 +16,38 @@ from schema.messaging import messages
 CHUNK_SIZE = 20000
 
 
+# --- Helpers ---
+def _new_catalog_blob() -> Optional[redis_manager.BlobWriter]:
+    """
+    Starts a compressed blob for catalog records, which are too large to
+    publish inline (see `redis_manager.blob_transfer`).
+    """
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        logger.error("❌ Cannot write catalog blob: Redis is unavailable.")
+        return None
+    return redis_manager.BlobWriter(redis_conn)
+
+
+def _publish_catalog_blob(kind: str, writer: redis_manager.BlobWriter):
+    """Finishes a catalog blob and publishes the reference to it."""
+    writer.close()
+    logger.info(
+        f"Publishing {writer.records} {kind} records as a "
+        f"{writer.compressed_bytes / 1024:.0f} KiB blob "
+        f"({writer.raw_bytes / 1024:.0f} KiB uncompressed)."
+    )
+    redis_manager.publish_pubsub(
+        messages.CatalogBlobResultMessage(
+            payload=messages.CatalogBlobResultPayload(
+                kind=kind, **writer.reference()
+            )
+        )
+    )
+
+
 # --- Tasks ---
-@task_manager.task()
+@task_manager.task(lane=redis_manager.CATALOG_LANE)
 def update_card_catalog():
     """
     Task to fetch all card names from Scryfall and update the
@@ -31,16 +62,16 @@ def update_card_catalog():
             f"🗂️ Fetched {len(card_names)} card names from source. "
             f"Updating database catalog..."
         )
-        redis_manager.publish_pubsub(
-            messages.CatalogCardNamesResultMessage(
-                payload=(messages
-                         .CatalogCardNamesResultPayload(names=card_names)))
-        )
+        writer = _new_catalog_blob()
+        if writer is not None:
+            with writer:
+                writer.write_all(card_names)
+            _publish_catalog_blob("card_names", writer)
 
     logger.info("🏁 Finished background task: update_card_catalog")
 
 
-@task_manager.task()
+@task_manager.task(lane=redis_manager.CATALOG_LANE)
 def update_set_catalog():
     """
     Task to fetch all set data from Scryfall and update the local database
@@ -90,7 +121,7 @@ def update_set_catalog():
     logger.info("🏁 Finished background task: update_set_catalog")
 
 
-@task_manager.task()
+@task_manager.task(lane=redis_manager.CATALOG_LANE)
 def update_full_catalog():
     """
     Task to fetch all card printings from Scryfall and populate the
@@ -108,6 +139,7 @@ def update_full_catalog():
     start_time = time.monotonic()
 
     total_cards_processed = 0
+    writer = None
     try:
         card_data_stream = fetch_all_card_data()
         if not card_data_stream:
@@ -116,9 +148,11 @@ def update_full_catalog():
             )
             return
 
-        # Process the stream in chunks to keep memory usage low.
+        # Process the stream in chunks to keep memory usage low. Each
+        # chunk's printings are streamed into a compressed blob as they are
+        # read, and only a reference to the blob is published.
         all_finishes_found = set()
-        printings_chunk = []
+        chunk_printings = 0
 
         logger.info(f"Processing card data stream in chunks of "
                     f"{CHUNK_SIZE}...")
@@ -136,7 +170,11 @@ def update_full_catalog():
                 and card.get("collector_number")
                 and card.get("finishes")
             ):
-                printings_chunk.append(
+                if writer is None:
+                    writer = _new_catalog_blob()
+                    if writer is None:
+                        return
+                writer.write(
                     {
                         "card_name": card["name"],
                         "set_code": card["set"],
@@ -144,32 +182,23 @@ def update_full_catalog():
                         "finishes": card["finishes"],
                     }
                 )
+                chunk_printings += 1
 
             # When a chunk is full, process it.
-            if i % CHUNK_SIZE == 0:
+            if i % CHUNK_SIZE == 0 and writer is not None:
                 chunk_duration = time.monotonic() - chunk_start_time
-                logger.info(f"Publishing chunk of {len(printings_chunk)}\
+                logger.info(f"Publishing chunk of {chunk_printings}\
                              printings... (took {chunk_duration:.2f}s)")
-                redis_manager.publish_pubsub(
-                    messages.CatalogPrintingsChunkResultMessage(
-                        payload=messages.CatalogPrintingsChunkResultPayload(
-                            printings=printings_chunk
-                        )
-                    )
-                )
-                printings_chunk = []
+                _publish_catalog_blob("printings", writer)
+                writer = None
+                chunk_printings = 0
                 chunk_start_time = time.monotonic()
 
         # Process any remaining items in the last partial chunk
-        if printings_chunk:
+        if writer is not None:
             logger.info("Processing final chunk...")
-            redis_manager.publish_pubsub(
-                messages.CatalogPrintingsChunkResultMessage(
-                    payload=messages.CatalogPrintingsChunkResultPayload(
-                        printings=printings_chunk
-                    )
-                )
-            )
+            _publish_catalog_blob("printings", writer)
+            writer = None
 
         # Add all unique finishes found across all chunks at the end
         if all_finishes_found:
@@ -188,6 +217,8 @@ def update_full_catalog():
         logger.error(
             f"An error occurred during update_full_catalog: {e}", exc_info=True
         )
+        if writer is not None:
+            writer.discard()
     finally:
         total_duration = time.monotonic() - start_time
         logger.info(
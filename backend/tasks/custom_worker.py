@@ -1,18 +1,133 @@
-from rq.worker import Worker
+import contextlib
+import os
+import signal
+import threading
+from datetime import datetime, timezone
+from typing import Dict, List, Optional
 
+from rq.defaults import DEFAULT_WORKER_TTL
+from rq.timeouts import TimerDeathPenalty
+from rq.worker import Worker, WorkerStatus
+
+from managers import metrics_manager
 from managers.socket_manager import socket_emit
+from managers.task_manager import LANE_LATENCY_METRIC
 from utility import logger
 
 
+def parse_lane_weights(value: Optional[str]) -> Dict[str, int]:
+    """
+    Parses lane weights such as "interactive=8,user-refresh=4,sweep=1".
+    Malformed entries are logged and skipped.
+    """
+    weights = {}
+    for entry in (value or "").split(","):
+        if not entry.strip():
+            continue
+        lane, _, weight = entry.partition("=")
+        try:
+            weights[lane.strip()] = int(weight)
+        except ValueError:
+            logger.warning(f"⚠️ Ignoring malformed lane weight '{entry}'.")
+    return weights
+
+
+# Lane weights for workers; when unset, lanes are drained in strict priority.
+LANE_WEIGHTS = parse_lane_weights(os.environ.get("WORKER_LANE_WEIGHTS"))
+# "fork" runs every job in a fresh child process; "threads" runs jobs on
+# warm slots sharing one long-lived process (see `WarmWorkerPool`).
+WORKER_MODE = os.environ.get("WORKER_MODE", "fork")
+# Number of warm slots per worker process in "threads" mode.
+WORKER_SLOTS = int(os.environ.get("WORKER_SLOTS", 4))
+# How often an idle warm slot wakes up to check for a stop request.
+SLOT_POLL_SECONDS = 5
+
+
 class LGSWorker(Worker):
     """
-    A custom RQ Worker class that enhances the default shutdown behavior.
+    A custom RQ Worker class that drains priority lanes and enhances the
+    default shutdown behavior.
+
+    Queues are listened to in the order given, highest priority first. By
+    default a lower lane is only served while every higher lane is empty.
+    With `lane_weights`, lanes instead take turns in proportion to their
+    weight, so a busy interactive lane cannot starve the sweep entirely.
 
     This worker overrides the warm shutdown handler to emit a Socket.IO event
     to the frontend when a shutdown is initiated mid-job. This allows the UI
     to reflect that a background task was interrupted and may be retried.
     """
 
+    def __init__(
+        self,
+        queues,
+        *args,
+        lane_weights: Optional[Dict[str, int]] = None,
+        **kwargs,
+    ):
+        super().__init__(queues, *args, **kwargs)
+        self.lane_weights = {
+            lane: weight
+            for lane, weight in (lane_weights or {}).items()
+            if weight > 0
+        }
+        self._lane_credit: Dict[str, int] = {}
+
+    def reorder_queues(self, reference_queue):
+        """
+        Picks which lane is tried first on the next dequeue, using smooth
+        weighted round robin over `lane_weights`. The remaining lanes keep
+        their priority order, so an idle lane's turn falls through to the
+        next one. Without weights the queue order is never changed.
+        """
+        if not self.lane_weights:
+            return super().reorder_queues(reference_queue)
+
+        total = 0
+        for queue in self.queues:
+            weight = self.lane_weights.get(queue.name, 0)
+            self._lane_credit[queue.name] = (
+                self._lane_credit.get(queue.name, 0) + weight
+            )
+            total += weight
+        first = max(
+            self.queues, key=lambda queue: self._lane_credit[queue.name]
+        )
+        self._lane_credit[first.name] -= total
+        self._ordered_queues = [first] + [
+            queue for queue in self.queues if queue is not first
+        ]
+
+    def execute_job(self, job, queue):
+        self._record_lane_latency(job, queue)
+        return super().execute_job(job, queue)
+
+    def _record_lane_latency(self, job, queue):
+        """
+        Records how long the job waited in its lane, as a job count and total
+        wait per lane plus the most recent wait.
+        """
+        enqueued_at = job.enqueued_at
+        if enqueued_at is None:
+            return
+        if enqueued_at.tzinfo is None:
+            enqueued_at = enqueued_at.replace(tzinfo=timezone.utc)
+        wait_ms = round(
+            max(
+                0.0,
+                (datetime.now(timezone.utc) - enqueued_at).total_seconds(),
+            )
+            * 1000,
+            1,
+        )
+        metrics_manager.increment_many(
+            LANE_LATENCY_METRIC,
+            {f"{queue.name}:jobs": 1, f"{queue.name}:wait_ms": wait_ms},
+        )
+        metrics_manager.set_gauge(
+            LANE_LATENCY_METRIC, f"{queue.name}:last_wait_ms", wait_ms
+        )
+
     def handle_warm_shutdown_request(self):
         """
         Handles a warm shutdown request (SIGTERM).
@@ -69,3 +184,138 @@ class LGSWorker(Worker):
 
         # After our custom logic, call the original shutdown handler.
         super().handle_warm_shutdown_request()
+
+
+class WarmSlotWorker(LGSWorker):
+    """
+    An `LGSWorker` that runs each job on its own thread instead of forking a
+    child for it.
+
+    Whatever a job warms up stays alive for the next one: the store registry,
+    each store's pooled HTTP session and product-detail cache, the Redis and
+    database connection pools and the Socket.IO client. Job timeouts are
+    enforced by a timer that raises `JobTimeoutException` in the slot's
+    thread, since SIGALRM can only interrupt the main thread. A job blocked
+    inside a single C call, such as a socket read, is interrupted once that
+    call returns, so store requests keep their own HTTP timeouts.
+
+    Slots don't install signal handlers; `WarmWorkerPool` handles signals for
+    all of its slots.
+    """
+
+    death_penalty_class = TimerDeathPenalty
+
+    def execute_job(self, job, queue):
+        self._record_lane_latency(job, queue)
+        self.prepare_execution(job)
+        self.perform_job(job, queue)
+        self.set_state(WorkerStatus.IDLE)
+
+    def get_heartbeat_ttl(self, job) -> int:
+        # Nothing heartbeats while the job runs in this thread, so the TTL
+        # has to outlast the whole job.
+        if job.timeout == -1:
+            return DEFAULT_WORKER_TTL
+        return int(job.timeout or DEFAULT_WORKER_TTL) + 60
+
+    def _install_signal_handlers(self):
+        pass
+
+    def dequeue_job_and_maintain_ttl(self, timeout, max_idle_time=None):
+        """
+        Waits for a job in rounds of `SLOT_POLL_SECONDS`, so an idle slot
+        notices a stop request without a signal to interrupt its wait.
+        """
+        if timeout is None or max_idle_time is not None:
+            return super().dequeue_job_and_maintain_ttl(timeout, max_idle_time)
+        while not self._stop_requested:
+            result = super().dequeue_job_and_maintain_ttl(
+                min(timeout, SLOT_POLL_SECONDS), SLOT_POLL_SECONDS
+            )
+            if result is not None:
+                return result
+        return None
+
+    def request_warm_stop(self):
+        """
+        Asks the slot to stop once its current job, if any, has finished.
+        """
+        self._shutdown_requested_date = datetime.now(timezone.utc)
+        self.handle_warm_shutdown_request()
+        self._stop_requested = True
+        if self.get_state() == WorkerStatus.BUSY:
+            self.set_shutdown_requested_date()
+
+
+class WarmWorkerPool:
+    """
+    Runs several `WarmSlotWorker`s on threads of one process.
+
+    SIGTERM or SIGINT asks every slot for a warm shutdown, as it would a
+    forking worker: running jobs finish, and clients are still told about
+    interrupted availability checks, while idle slots stop within
+    `SLOT_POLL_SECONDS`. A second signal exits at once.
+    """
+
+    def __init__(
+        self,
+        queues,
+        connection,
+        slots: int = WORKER_SLOTS,
+        lane_weights: Optional[Dict[str, int]] = None,
+        app=None,
+    ):
+        self.app = app
+        self.workers: List[WarmSlotWorker] = [
+            WarmSlotWorker(
+                queues, connection=connection, lane_weights=lane_weights
+            )
+            for _ in range(max(slots, 1))
+        ]
+        self._stopping = False
+
+    def work(self, burst: bool = False) -> None:
+        """Runs every slot until all of them stop."""
+        previous_handlers = {
+            signum: signal.signal(signum, self.request_stop)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+        threads = [
+            threading.Thread(
+                target=self._run_slot,
+                args=(worker, burst),
+                name=f"slot-{worker.name}",
+                daemon=True,
+            )
+            for worker in self.workers
+        ]
+        logger.info(f"🔥 Starting {len(threads)} warm worker slots.")
+        try:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                # Join in short rounds so signals are handled promptly.
+                while thread.is_alive():
+                    thread.join(timeout=1)
+        finally:
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def request_stop(self, signum=None, frame=None):
+        """Warm-stops every slot, or exits at once on a repeated request."""
+        if self._stopping:
+            logger.warning("🛑 Cold shutdown of warm worker slots.")
+            raise SystemExit()
+        self._stopping = True
+        logger.warning(
+            f"🚦 Warm shutdown requested for {len(self.workers)} slots."
+        )
+        for worker in self.workers:
+            worker.request_warm_stop()
+
+    def _run_slot(self, worker: WarmSlotWorker, burst: bool) -> None:
+        context = (
+            self.app.app_context() if self.app else contextlib.nullcontext()
+        )
+        with context:
+            worker.work(burst=burst)
@@ -0,0 +1,419 @@
+"""
+Adaptive refresh schedule for (store, card) availability checks.
+
+Rather than re-checking every pair on one flat interval, each pair gets its
+own next-check time, kept in a Redis sorted set per store
+(``refresh:due:<slug>``). The interval shrinks with the number of users
+watching the card and with how often its listings changed in recent checks,
+and a card whose listings just changed is checked again soon:
+
+- `sync_schedule` mirrors the planned sweep into Redis. New pairs are
+  spread evenly, with jitter, across `REFRESH_SPREAD_SECONDS`, and pairs
+  nobody tracks any more are dropped.
+- `release_due` hands out the pairs that are due, at most a fixed budget per
+  store per tick; the rest stay due for the next tick. It reports the
+  planned and actual dispatch rate of every store.
+- `record_check` updates a pair's statistics after a check and sets its next
+  due time, jittered so pairs checked together drift apart. A user's own
+  check is only recorded when `matches_scheduled_check` confirms it used the
+  same specifications as the scheduled one.
+
+So popular, volatile cards refresh often while the long tail is checked
+rarely, and each store sees a steady request rate within its budget rather
+than a burst at the start of every sweep.
+"""
+
+import json
+import math
+import os
+import random
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from managers import metrics_manager, redis_manager
+from utility import logger
+
+DUE_KEY_PREFIX = "refresh:due:"
+ITEMS_KEY_PREFIX = "refresh:items:"
+WATCHERS_KEY_PREFIX = "refresh:watchers:"
+STATS_KEY_PREFIX = "refresh:stats:"
+STORES_KEY = "refresh:stores"
+
+# How often due checks are released.
+REFRESH_TICK_SECONDS = int(os.environ.get("REFRESH_TICK_SECONDS", 60))
+# Checks released per store per tick.
+REFRESH_BUDGET_PER_STORE = int(
+    os.environ.get("REFRESH_BUDGET_PER_STORE", 20)
+)
+# Interval of a pair with one watcher and average volatility.
+REFRESH_BASE_INTERVAL = int(os.environ.get("REFRESH_BASE_INTERVAL", 1800))
+REFRESH_MIN_INTERVAL = int(os.environ.get("REFRESH_MIN_INTERVAL", 300))
+REFRESH_MAX_INTERVAL = int(os.environ.get("REFRESH_MAX_INTERVAL", 21600))
+# New pairs are spread over this window instead of all being due at once.
+REFRESH_SPREAD_SECONDS = int(os.environ.get("REFRESH_SPREAD_SECONDS", 900))
+# Each next-check interval is moved by up to this fraction either way.
+REFRESH_JITTER = float(os.environ.get("REFRESH_JITTER", 0.1))
+# A released check is due again after this long if its result never comes.
+RELEASE_RETRY_SECONDS = REFRESH_BASE_INTERVAL
+# A check turned away by a backlogged sweep lane is due again after this long.
+BACKLOG_RETRY_SECONDS = 2 * REFRESH_TICK_SECONDS
+# Redis metric comparing the planned and actual dispatch rate of each store.
+DISPATCH_METRIC = "refresh_dispatch"
+# Weight of the latest check in a pair's volatility average.
+VOLATILITY_SMOOTHING = 0.3
+# Volatility assumed for a pair that has no history yet.
+DEFAULT_VOLATILITY = 0.5
+
+_random = random.Random()
+
+
+def next_check_interval(
+    watchers: int,
+    volatility: float,
+    since_change: Optional[float] = None,
+) -> float:
+    """
+    Computes how long to wait before checking a pair again.
+
+    Args:
+        watchers: Users tracking the card at the store.
+        volatility: Smoothed fraction of recent checks that found the
+            listings changed, from 0 to 1.
+        since_change: Seconds since the listings last changed, if known.
+
+    Returns:
+        float: The interval in seconds, between `REFRESH_MIN_INTERVAL` and
+            `REFRESH_MAX_INTERVAL`.
+    """
+    demand = 1 + math.log2(max(watchers, 1))
+    churn = 0.25 + 1.5 * min(max(volatility, 0.0), 1.0)
+    interval = REFRESH_BASE_INTERVAL / (demand * churn)
+    if since_change is not None and since_change < interval:
+        # Listings that just moved are likely to move again.
+        interval = since_change
+    return min(max(interval, REFRESH_MIN_INTERVAL), REFRESH_MAX_INTERVAL)
+
+
+def listings_changed(
+    previous: Optional[List[Dict[str, Any]]],
+    current: List[Dict[str, Any]],
+) -> Optional[bool]:
+    """
+    Tells whether a check found different listings than the cached ones, or
+    None if there is nothing cached to compare with.
+    """
+    if previous is None:
+        return None
+
+    def signature(items):
+        return sorted(json.dumps(item, sort_keys=True) for item in items)
+
+    return signature(previous) != signature(current)
+
+
+def _spec_signature(specs: Optional[List[Dict[str, Any]]]):
+    return {
+        (
+            spec.get("set_code"),
+            str(spec["collector_number"])
+            if spec.get("collector_number") is not None else None,
+            spec.get("finish"),
+        )
+        for spec in specs or []
+    }
+
+
+def matches_scheduled_check(
+    store: str, card: str, card_specs: Optional[List[Dict[str, Any]]]
+) -> bool:
+    """
+    Tells whether a check of a pair with `card_specs` finds the same
+    listings as its scheduled check, which uses the merged specifications of
+    everyone tracking the card there. Only such a check can be compared with
+    the cached sweep result to tell whether the listings changed.
+    """
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        return False
+    raw_item = redis_conn.hget(f"{ITEMS_KEY_PREFIX}{store}", card)
+    if raw_item is None:
+        return False
+    scheduled_specs = json.loads(raw_item).get("card_specs")
+    return _spec_signature(scheduled_specs) == _spec_signature(card_specs)
+
+
+def sync_schedule(plan: List[Dict[str, Any]], now: Optional[float] = None):
+    """
+    Mirrors a planned sweep into the refresh schedule.
+
+    Every item's payload and watcher count are stored. Pairs not yet
+    scheduled at a store get one slot each of `REFRESH_SPREAD_SECONDS`
+    split evenly, and are due at a random point within their slot.
+    Scheduled pairs missing from the plan are removed.
+    """
+    now = time.time() if now is None else now
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        return
+
+    by_store: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    for item in plan:
+        by_store[item["store"]][item["card_name"]] = item
+    stores = set(by_store) | {
+        _decode(slug) for slug in redis_conn.smembers(STORES_KEY)
+    }
+
+    with redis_conn.pipeline() as pipe:
+        for store in stores:
+            pipe.zrange(f"{DUE_KEY_PREFIX}{store}", 0, -1)
+        scheduled = dict(zip(stores, pipe.execute()))
+
+    with redis_conn.pipeline() as pipe:
+        for store in stores:
+            items = by_store.get(store, {})
+            known = set(map(_decode, scheduled[store]))
+            gone = [card for card in known if card not in items]
+            if gone:
+                pipe.zrem(f"{DUE_KEY_PREFIX}{store}", *gone)
+                for prefix in (
+                    ITEMS_KEY_PREFIX, WATCHERS_KEY_PREFIX, STATS_KEY_PREFIX
+                ):
+                    pipe.hdel(f"{prefix}{store}", *gone)
+            if not items:
+                pipe.srem(STORES_KEY, store)
+                continue
+            pipe.sadd(STORES_KEY, store)
+            pipe.hset(
+                f"{ITEMS_KEY_PREFIX}{store}",
+                mapping={
+                    card: json.dumps(item) for card, item in items.items()
+                },
+            )
+            pipe.hset(
+                f"{WATCHERS_KEY_PREFIX}{store}",
+                mapping={
+                    card: len(item["users"]) for card, item in items.items()
+                },
+            )
+            new = [card for card in items if card not in known]
+            if new:
+                slot = REFRESH_SPREAD_SECONDS / len(new)
+                pipe.zadd(
+                    f"{DUE_KEY_PREFIX}{store}",
+                    {
+                        card: now + slot * (index + _random.random())
+                        for index, card in enumerate(new)
+                    },
+                    nx=True,
+                )
+        pipe.execute()
+    logger.info(
+        f"🗓️ Refresh schedule synced: {len(plan)} pairs across "
+        f"{len(by_store)} stores."
+    )
+
+
+def release_due(
+    now: Optional[float] = None,
+    budget: int = REFRESH_BUDGET_PER_STORE,
+) -> List[Dict[str, Any]]:
+    """
+    Claims the pairs that are due, at most `budget` per store, earliest
+    first. Claimed pairs are pushed back by `RELEASE_RETRY_SECONDS` until
+    `record_check` reschedules them.
+
+    The planned rate of each store (pairs due within the next
+    `REFRESH_SPREAD_SECONDS`) and the rate actually released this tick are
+    reported per minute in the `refresh_dispatch` metric.
+
+    Returns:
+        The sweep items of the claimed pairs.
+    """
+    now = time.time() if now is None else now
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        return []
+
+    stores = sorted(_decode(slug) for slug in redis_conn.smembers(STORES_KEY))
+    with redis_conn.pipeline() as pipe:
+        for store in stores:
+            key = f"{DUE_KEY_PREFIX}{store}"
+            pipe.zrangebyscore(key, "-inf", now, start=0, num=budget)
+            pipe.zcount(key, "-inf", now + REFRESH_SPREAD_SECONDS)
+        results = pipe.execute()
+    due = {
+        store: [_decode(card) for card in cards]
+        for store, cards in zip(stores, results[::2])
+        if cards
+    }
+    _report_dispatch_rates(
+        {
+            store: (upcoming, len(due.get(store, [])))
+            for store, upcoming in zip(stores, results[1::2])
+        }
+    )
+    if not due:
+        return []
+
+    with redis_conn.pipeline() as pipe:
+        for store, cards in due.items():
+            pipe.hmget(f"{ITEMS_KEY_PREFIX}{store}", cards)
+            pipe.zadd(
+                f"{DUE_KEY_PREFIX}{store}",
+                {card: now + RELEASE_RETRY_SECONDS for card in cards},
+                xx=True,
+            )
+        results = pipe.execute()
+
+    released = [
+        json.loads(raw)
+        for raw_items in results[::2]
+        for raw in raw_items
+        if raw is not None
+    ]
+    logger.info(
+        f"⏰ Released {len(released)} due refreshes across {len(due)} stores."
+    )
+    return released
+
+
+def defer(pairs: Iterable[Tuple[str, str, float]]):
+    """Moves (store, card, due time) pairs that are still scheduled."""
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        return
+    with redis_conn.pipeline() as pipe:
+        for store, card, due_at in pairs:
+            pipe.zadd(f"{DUE_KEY_PREFIX}{store}", {card: due_at}, xx=True)
+        pipe.execute()
+
+
+def reschedule(
+    items: Iterable[Dict[str, Any]],
+    delay: float = BACKLOG_RETRY_SECONDS,
+    now: Optional[float] = None,
+):
+    """
+    Makes sweep items due again after `delay`, e.g. checks that were
+    released but could not be queued. Items that are not scheduled yet, such
+    as those of a sweep that bypassed the schedule, are added to it.
+    """
+    now = time.time() if now is None else now
+    by_store: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+    for item in items:
+        by_store[item["store"]][item["card_name"]] = item
+    if not by_store:
+        return
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        return
+
+    with redis_conn.pipeline() as pipe:
+        for store, items_by_card in by_store.items():
+            pipe.sadd(STORES_KEY, store)
+            pipe.hset(
+                f"{ITEMS_KEY_PREFIX}{store}",
+                mapping={
+                    card: json.dumps(item)
+                    for card, item in items_by_card.items()
+                },
+            )
+            pipe.hset(
+                f"{WATCHERS_KEY_PREFIX}{store}",
+                mapping={
+                    card: len(item["users"])
+                    for card, item in items_by_card.items()
+                },
+            )
+            pipe.zadd(
+                f"{DUE_KEY_PREFIX}{store}",
+                {card: now + delay for card in items_by_card},
+            )
+        pipe.execute()
+
+
+def record_check(
+    store: str,
+    card: str,
+    changed: Optional[bool],
+    now: Optional[float] = None,
+) -> Optional[float]:
+    """
+    Updates a pair's statistics after a check and schedules its next check.
+
+    Args:
+        store: The store slug.
+        card: The card name.
+        changed: Whether the listings changed since the previous check, or
+            None if unknown.
+        now: The time of the check, defaulting to `time.time()`.
+
+    Returns:
+        The interval until the next check, or None if Redis is unavailable.
+    """
+    now = time.time() if now is None else now
+    redis_conn = redis_manager.get_redis_connection()
+    if redis_conn is None:
+        return None
+
+    with redis_conn.pipeline() as pipe:
+        pipe.hget(f"{STATS_KEY_PREFIX}{store}", card)
+        pipe.hget(f"{WATCHERS_KEY_PREFIX}{store}", card)
+        raw_stats, raw_watchers = pipe.execute()
+    stats = json.loads(raw_stats) if raw_stats else {
+        "checks": 0,
+        "volatility": DEFAULT_VOLATILITY,
+        "last_change": None,
+    }
+    stats["checks"] += 1
+    if changed is not None:
+        stats["volatility"] = (
+            (1 - VOLATILITY_SMOOTHING) * stats["volatility"]
+            + VOLATILITY_SMOOTHING * (1.0 if changed else 0.0)
+        )
+    if changed:
+        stats["last_change"] = now
+
+    since_change = (
+        now - stats["last_change"] if stats["last_change"] else None
+    )
+    interval = next_check_interval(
+        int(raw_watchers or 1), stats["volatility"], since_change
+    ) * (1 + _random.uniform(-REFRESH_JITTER, REFRESH_JITTER))
+    with redis_conn.pipeline() as pipe:
+        pipe.hset(f"{STATS_KEY_PREFIX}{store}", card, json.dumps(stats))
+        pipe.zadd(f"{DUE_KEY_PREFIX}{store}", {card: now + interval}, xx=True)
+        pipe.execute()
+    logger.debug(
+        f"🗓️ Next check of '{card}' at '{store}' in {interval:.0f}s."
+    )
+    return interval
+
+
+def _report_dispatch_rates(rates: Dict[str, Tuple[int, int]]):
+    """
+    Sets the planned and actual dispatch rate, per minute, of each store
+    and of all stores together, from (upcoming pairs, released pairs).
+    """
+    window = max(REFRESH_SPREAD_SECONDS, REFRESH_TICK_SECONDS)
+    gauges: Dict[str, float] = {}
+    total_upcoming = total_released = 0
+    for store, (upcoming, released) in rates.items():
+        gauges[f"{store}:planned_per_minute"] = round(
+            upcoming * 60 / window, 2
+        )
+        gauges[f"{store}:actual_per_minute"] = round(
+            released * 60 / REFRESH_TICK_SECONDS, 2
+        )
+        total_upcoming += upcoming
+        total_released += released
+    gauges["all:planned_per_minute"] = round(total_upcoming * 60 / window, 2)
+    gauges["all:actual_per_minute"] = round(
+        total_released * 60 / REFRESH_TICK_SECONDS, 2
+    )
+    metrics_manager.set_gauges(DISPATCH_METRIC, gauges)
+
+
+def _decode(value: Any) -> Any:
+    return value.decode("utf-8") if isinstance(value, bytes) else value
@@ -1,15 +1,17 @@
-from typing import Callable, Union
+from typing import Callable, Optional, Union
 from datetime import timedelta, datetime
 
 from managers import redis_manager
 from managers import task_manager
+from tasks.refresh_scheduler import REFRESH_TICK_SECONDS
 from utility import logger
 
 # --- Configuration ---
 # Run the catalog update once every 24 hours
 CATALOG_UPDATE_INTERVAL_HOURS = 24
 
-# Run the availability check every 15 minutes
+# Sync the refresh schedule with tracked cards every 15 minutes; due checks
+# are released every REFRESH_TICK_SECONDS (see `refresh_scheduler`).
 AVAILABILITY_UPDATE_INTERVAL_MINUTES = 15
 
 
@@ -19,6 +21,7 @@ def _schedule_if_not_exists(
     interval_seconds: float,
     description: str,
     initial_run_time: datetime,
+    queue_name: Optional[str] = None,
 ):
     """
     Checks if a task is already scheduled and schedules it if not.
@@ -29,6 +32,7 @@ def _schedule_if_not_exists(
         interval_seconds: The execution interval in seconds.
         description: A description of the task.
         initial_run_time: The time for the first run.
+        queue_name: The priority lane each run is queued on.
     """
     if task_id not in redis_manager.scheduler:
         logger.info(
@@ -41,6 +45,7 @@ def _schedule_if_not_exists(
             interval=interval_seconds,
             id=task_id,
             description=description,
+            queue_name=queue_name,
         )
 
 
@@ -73,6 +78,7 @@ def schedule_recurring_tasks():
             description="Periodically updates the full card, set, printing, "
                         "and finish catalog from Scryfall.",
             initial_run_time=initial_run_time,
+            queue_name=redis_manager.CATALOG_LANE,
         )
         logger.info("✅ Successfully scheduled the main catalog update task.")
 
@@ -85,8 +91,22 @@ def schedule_recurring_tasks():
             description="Periodically checks for card availability "
                         "for all users.",
             initial_run_time=initial_run_time,
+            queue_name=redis_manager.SWEEP_LANE,
         )
         logger.info("✅ Successfully scheduled the availability check task.")
+
+        # --- Schedule Refresh Ticks ---
+        _schedule_if_not_exists(
+            task_id=task_manager.task_definitions.REFRESH_TICK_TASK_ID,
+            func="tasks.card_availability_tasks."
+            "release_due_availability_checks",
+            interval_seconds=REFRESH_TICK_SECONDS,
+            description="Releases the availability checks that are due in "
+                        "the adaptive refresh schedule.",
+            initial_run_time=initial_run_time,
+            queue_name=redis_manager.SWEEP_LANE,
+        )
+        logger.info("✅ Successfully scheduled the refresh tick task.")
     except Exception as e:
         logger.error(f"❌ Failed to schedule tasks: {e}")
     logger.info("🏁 Finished setting up scheduled tasks.")
@@ -0,0 +1,60 @@
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.pool import StaticPool
+
+from data.database.db_config import upgrade_schema
+from data.database.models.orm_models import Base
+
+
+def _engine_with_old_stores_table():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(
+        bind=engine,
+        tables=[t for t in Base.metadata.sorted_tables if t.name != "stores"],
+    )
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "CREATE TABLE stores (id INTEGER PRIMARY KEY, name VARCHAR, "
+            "slug VARCHAR, homepage VARCHAR, search_url VARCHAR, "
+            "fetch_strategy VARCHAR)"
+        )
+        connection.exec_driver_sql(
+            "INSERT INTO stores VALUES (1, 'Store', 'store', 'h', 's', "
+            "'default')"
+        )
+    return engine
+
+
+def test_upgrade_schema_adds_missing_store_columns():
+    """
+    Tests that columns added to the Store model after the table was created
+    are added to the existing table, keeping its rows.
+    """
+    engine = _engine_with_old_stores_table()
+
+    added = upgrade_schema(engine)
+
+    assert set(added) == {
+        "stores.max_concurrency",
+        "stores.rate_limit_per_second",
+        "stores.rate_limit_burst",
+        "stores.stale_after_seconds",
+    }
+    columns = {c["name"] for c in inspect(engine).get_columns("stores")}
+    assert {"max_concurrency", "stale_after_seconds"} <= columns
+    with engine.connect() as connection:
+        row = connection.exec_driver_sql(
+            "SELECT slug, max_concurrency FROM stores"
+        ).one()
+    assert tuple(row) == ("store", None)
+
+
+def test_upgrade_schema_is_a_no_op_on_a_current_schema():
+    """Tests that nothing is altered once the schema matches the models."""
+    engine = _engine_with_old_stores_table()
+    upgrade_schema(engine)
+
+    assert upgrade_schema(engine) == []
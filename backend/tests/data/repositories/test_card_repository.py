@@ -4,6 +4,7 @@ from data.database.models.orm_models import CardSpecification, UserTrackedCards
 from data.database.repositories.card_repository import (
     get_users_cards,
     modify_user_tracked_card,
+    stream_tracked_cards,
     update_user_tracked_card_preferences,
 )
 from data.database.repositories.catalogue_repository import (
@@ -244,6 +245,63 @@ def test_update_user_tracked_card_preferences_card_not_found(
     assert card.amount == 4
 
 
+def test_stream_tracked_cards_joins_specs_and_stores(
+    db_session, user_factory, store_factory, printing_factory
+):
+    """
+    Each tracked card is streamed once with all of its specifications and
+    its user's stores; users without stores are skipped.
+    """
+    printing_factory(card_name="Sol Ring", set_code="C21",
+                     collector_number="125", finishes=["foil"])
+    printing_factory(card_name="Brainstorm", set_code="ICE",
+                     collector_number="61", finishes=["non-foil"])
+    stores = [
+        store_factory(name="Test Store", slug="test_store"),
+        store_factory(name="Another Store", slug="another_store"),
+    ]
+    user = user_factory(username="testuser")
+    user.selected_stores.extend(stores)
+    user_factory(username="storeless")
+    db_session.commit()
+    modify_user_tracked_card(
+        "add",
+        "testuser",
+        {
+            "card_name": "Sol Ring",
+            "amount": 2,
+            "specifications": [
+                {"set_code": {"code": "C21"}, "finish": {"name": "foil"}},
+                {"collector_number": "125"},
+            ],
+        },
+    )
+    modify_user_tracked_card(
+        "add", "testuser", {"card_name": "Brainstorm", "amount": 1}
+    )
+    modify_user_tracked_card(
+        "add", "storeless", {"card_name": "Sol Ring", "amount": 1}
+    )
+
+    rows = list(stream_tracked_cards(batch_size=2))
+
+    assert rows == [
+        (
+            "testuser",
+            "Sol Ring",
+            2,
+            [
+                {"set_code": "C21", "collector_number": None,
+                 "finish": "foil"},
+                {"set_code": None, "collector_number": "125",
+                 "finish": None},
+            ],
+            ["test_store", "another_store"],
+        ),
+        ("testuser", "Brainstorm", 1, [], ["test_store", "another_store"]),
+    ]
+
+
 @pytest.fixture
 def sol_ring_printings(printing_factory):
     """Sets up Sol Ring printings for validation tests."""
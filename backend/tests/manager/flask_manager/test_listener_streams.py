@@ -0,0 +1,213 @@
+import json
+import time
+
+from managers import redis_manager
+from managers.messaging_manager.service_listener.listener import Listener
+from schema.messaging import messages
+
+LISTENER_MODULE = "managers.messaging_manager.service_listener.listener"
+
+
+def stream_listener(handled):
+    listener = Listener(
+        service_name="Server",
+        channel="worker-results",
+        transport=redis_manager.STREAMS_TRANSPORT,
+    )
+    listener.register_handler(
+        "test_result", lambda payload: handled.append(payload["n"])
+    )
+    return listener
+
+
+def add_entries(fake_redis, *numbers):
+    for n in numbers:
+        fake_redis.xadd(
+            "stream:worker-results",
+            {"data": json.dumps({"type": "test_result", "payload": {"n": n}})},
+        )
+
+
+def test_publish_appends_to_bounded_stream(mocker, fake_redis):
+    """
+    GIVEN the streams transport
+    WHEN a message is published
+    THEN it is appended to the channel's stream instead of being broadcast
+    """
+    mocker.patch(
+        "managers.redis_manager.redis_manager.MESSAGE_TRANSPORT",
+        redis_manager.STREAMS_TRANSPORT,
+    )
+    mocker.patch("managers.redis_manager.redis_manager.STREAM_MAXLEN", 10)
+    mock_publish = mocker.spy(fake_redis, "publish")
+
+    for _ in range(3):
+        redis_manager.publish_pubsub(
+            messages.CatalogCardNamesResultMessage(payload={"names": ["x"]})
+        )
+
+    entries = fake_redis.xrange("stream:worker-results")
+    assert len(entries) == 3
+    envelope = redis_manager.decode_message(entries[0][1][b"data"])
+    assert envelope["type"] == "catalog_card_names_result"
+    assert envelope["payload"] == {"names": ["x"]}
+    mock_publish.assert_not_called()
+
+
+def test_messages_published_before_listener_starts_are_handled_once(
+    fake_redis,
+):
+    """
+    GIVEN messages published while no listener was running
+    WHEN two processes of the service read the stream
+    THEN every message is handled exactly once and acknowledged
+    """
+    handled = []
+    listener = stream_listener(handled)
+    add_entries(fake_redis, 1, 2, 3)
+
+    listener._ensure_group(fake_redis)
+    listener._ensure_group(fake_redis)
+    listener._read(fake_redis, "server-1")
+    listener._read(fake_redis, "server-2")
+
+    assert sorted(handled) == [1, 2, 3]
+    assert fake_redis.xpending("stream:worker-results", "server")[
+        "pending"
+    ] == 0
+
+
+def test_entries_left_by_dead_consumer_are_reclaimed(mocker, fake_redis):
+    """
+    GIVEN an entry delivered to a consumer that died before acknowledging it
+    WHEN another consumer reclaims stale entries
+    THEN it handles and acknowledges the entry
+    """
+    mocker.patch(f"{LISTENER_MODULE}.STREAM_CLAIM_IDLE_MS", 0)
+    handled = []
+    listener = stream_listener(handled)
+    listener._ensure_group(fake_redis)
+    add_entries(fake_redis, 1)
+    fake_redis.xreadgroup(
+        "server", "dead-server", {"stream:worker-results": ">"}
+    )
+    time.sleep(0.01)
+
+    listener._reclaim(fake_redis, "server-1")
+
+    assert handled == [1]
+    assert fake_redis.xpending("stream:worker-results", "server")[
+        "pending"
+    ] == 0
+
+
+def test_entries_of_a_live_consumer_are_not_reclaimed(mocker, fake_redis):
+    """
+    GIVEN an entry whose handler is still running in a live consumer
+    WHEN another consumer reclaims stale entries
+    THEN the entry is left to the consumer handling it
+    """
+    mocker.patch(f"{LISTENER_MODULE}.STREAM_CLAIM_IDLE_MS", 0)
+    handled = []
+    listener = stream_listener(handled)
+    listener._ensure_group(fake_redis)
+    add_entries(fake_redis, 1)
+    fake_redis.xreadgroup(
+        "server", "busy-server", {"stream:worker-results": ">"}
+    )
+    listener._beat(fake_redis, "busy-server")
+    time.sleep(0.01)
+
+    listener._reclaim(fake_redis, "server-1")
+
+    assert handled == []
+    assert fake_redis.xpending("stream:worker-results", "server")[
+        "pending"
+    ] == 1
+
+
+def test_gone_consumers_without_entries_are_removed(mocker, fake_redis):
+    """
+    GIVEN consumers left in the group by processes that restarted
+    WHEN a consumer reclaims stale entries
+    THEN the gone consumers are removed once their entries are handled,
+    while live ones stay
+    """
+    mocker.patch(f"{LISTENER_MODULE}.STREAM_CLAIM_IDLE_MS", 0)
+    handled = []
+    listener = stream_listener(handled)
+    listener._ensure_group(fake_redis)
+    add_entries(fake_redis, 1)
+    fake_redis.xreadgroup(
+        "server", "old-server", {"stream:worker-results": ">"}
+    )
+    fake_redis.xgroup_createconsumer(
+        "stream:worker-results", "server", "older-server"
+    )
+    fake_redis.xgroup_createconsumer(
+        "stream:worker-results", "server", "other-server"
+    )
+    listener._beat(fake_redis, "other-server")
+    time.sleep(0.01)
+
+    listener._reclaim(fake_redis, "server-1")
+
+    assert handled == [1]
+    assert sorted(
+        info["name"] for info in fake_redis.xinfo_consumers(
+            "stream:worker-results", "server"
+        )
+    ) == [b"other-server", b"server-1"]
+
+
+def test_entries_delivered_too_often_are_dead_lettered(mocker, fake_redis):
+    """
+    GIVEN an entry that keeps being delivered without being acknowledged
+    WHEN it reaches the delivery limit
+    THEN it is moved to the dead-letter queue instead of handled again
+    """
+    mocker.patch(f"{LISTENER_MODULE}.STREAM_CLAIM_IDLE_MS", 0)
+    mocker.patch(f"{LISTENER_MODULE}.STREAM_MAX_DELIVERIES", 1)
+    handled = []
+    listener = stream_listener(handled)
+    listener._ensure_group(fake_redis)
+    add_entries(fake_redis, 1)
+    fake_redis.xreadgroup(
+        "server", "dead-server", {"stream:worker-results": ">"}
+    )
+    time.sleep(0.01)
+
+    listener._reclaim(fake_redis, "server-1")
+
+    assert handled == []
+    assert len(fake_redis.lrange("worker-results-dlq", 0, -1)) == 1
+    assert fake_redis.xpending("stream:worker-results", "server")[
+        "pending"
+    ] == 0
+
+
+def test_stream_listener_thread_handles_new_messages(mocker, fake_redis):
+    """
+    GIVEN a running stream listener
+    WHEN a message is added to its stream
+    THEN the listener thread handles it and stops cleanly
+    """
+    mocker.patch(f"{LISTENER_MODULE}.STREAM_BLOCK_MS", 50)
+    mocker.patch(f"{LISTENER_MODULE}.atexit.register")
+    handled = []
+    listener = stream_listener(handled)
+
+    listener.start()
+    add_entries(fake_redis, 7)
+    deadline = time.monotonic() + 5
+    while not handled and time.monotonic() < deadline:
+        time.sleep(0.02)
+    alive = fake_redis.keys("stream:worker-results:server:alive:*")
+    listener.stop()
+
+    assert handled == [7]
+    assert not listener.thread.is_alive()
+    # A consumer that stops with nothing pending leaves the group.
+    assert len(alive) == 1
+    assert not fake_redis.exists(*alive)
+    assert fake_redis.xinfo_consumers("stream:worker-results", "server") == []
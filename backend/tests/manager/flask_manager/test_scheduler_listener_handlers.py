@@ -0,0 +1,102 @@
+import time
+
+from managers import availability_manager, metrics_manager, task_manager
+from managers.messaging_manager.service_listener.scheduler_listener import (
+    _handle_availability_sweep_request,
+)
+from tasks import refresh_scheduler
+
+HANDLER_MODULE = "managers.messaging_manager.service_listener" \
+    ".scheduler_listener"
+
+
+def sweep_payload(*card_names):
+    return {
+        "items": [
+            {
+                "store": {"slug": "test-store"},
+                "card": {"name": card_name},
+                "card_specs": [],
+                "users": {"alice": []},
+            }
+            for card_name in card_names
+        ]
+    }
+
+
+def test_sweep_request_coalesces_pairs_already_queued(mocker):
+    """
+    GIVEN a sweep check for one pair is already queued
+    WHEN a sweep request for that pair and a new one arrives
+    THEN only the new pair is queued, and it is marked as queued too
+    """
+    mock_queue_tasks = mocker.patch(
+        f"{HANDLER_MODULE}.task_manager.queue_tasks"
+    )
+    availability_manager.mark_pending([("test-store", "Sol Ring")])
+
+    _handle_availability_sweep_request(sweep_payload("Sol Ring", "Opt"))
+
+    [(store, items)] = mock_queue_tasks.call_args.args[1]
+    assert store == "test-store"
+    assert [item["card_name"] for item in items] == ["Opt"]
+    assert availability_manager.get_pending([("test-store", "Opt")]) == [True]
+    assert metrics_manager.get_metric(task_manager.BACKPRESSURE_METRIC)[
+        "sweep:coalesced"
+    ] == 1
+
+
+def test_sweep_request_is_deferred_while_lane_is_backlogged(mocker):
+    """
+    GIVEN a scheduled pair that was just released, and one that bypassed
+    the schedule
+    WHEN their sweep request arrives while the sweep lane is backlogged
+    THEN neither is queued, and both are released again shortly instead of
+    after the retry interval of a released check
+    """
+    mock_queue_tasks = mocker.patch(
+        f"{HANDLER_MODULE}.task_manager.queue_tasks"
+    )
+    mocker.patch(
+        f"{HANDLER_MODULE}.task_manager.is_backlogged", return_value=True
+    )
+    mocker.patch("tasks.refresh_scheduler.REFRESH_SPREAD_SECONDS", 0)
+    now = time.time()
+    refresh_scheduler.sync_schedule(
+        [
+            {
+                "store": "test-store",
+                "card_name": "Sol Ring",
+                "card_specs": [],
+                "users": {"alice": []},
+            }
+        ],
+        now=now - 1,
+    )
+    assert len(refresh_scheduler.release_due(now=now)) == 1
+
+    _handle_availability_sweep_request(sweep_payload("Sol Ring", "Opt"))
+
+    mock_queue_tasks.assert_not_called()
+    assert metrics_manager.get_metric(task_manager.BACKPRESSURE_METRIC) == {
+        "sweep:deferred": 2,
+    }
+    assert refresh_scheduler.release_due(
+        now=now + refresh_scheduler.BACKLOG_RETRY_SECONDS - 5
+    ) == []
+    released = refresh_scheduler.release_due(
+        now=now + refresh_scheduler.BACKLOG_RETRY_SECONDS + 5
+    )
+    assert sorted(item["card_name"] for item in released) == [
+        "Opt", "Sol Ring"
+    ]
+
+
+def test_cached_result_clears_queued_pair():
+    availability_manager.mark_pending([("test-store", "Sol Ring")])
+
+    availability_manager.cache_availability_data("test-store", "Sol Ring", [])
+
+    assert availability_manager.get_pending(
+        [("test-store", "Sol Ring")]
+    ) == [False]
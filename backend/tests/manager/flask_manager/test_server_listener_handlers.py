@@ -1,11 +1,13 @@
 from unittest.mock import patch
-from managers import availability_manager
+from managers import availability_manager, redis_manager
 from managers.messaging_manager.service_listener.server_listener import (
     _handle_availability_result,
+    _handle_availability_result_batch,
     _handle_catalog_card_names_result,
     _handle_catalog_set_data_result,
     _handle_catalog_finishes_result,
-    _handle_catalog_printings_chunk_result
+    _handle_catalog_printings_chunk_result,
+    _handle_catalog_blob_result,
 )
 from data.database.models.orm_models import Card, Set
 
@@ -13,14 +15,15 @@ from data.database.models.orm_models import Card, Set
 # This is now an integration test and doesn't need mocks for the cache.
 def test_handle_availability_result():
     """
-    GIVEN an availability result payload
+    GIVEN an availability result payload as published by a worker
     WHEN _handle_availability_result is called
-    THEN it should write the data to the cache, which can then be retrieved.
+    THEN it should write the data to the cache under the store slug and card
+         name, and record when the card was checked there.
     """
     # Arrange
     mock_result = {
-        "store": "TestStore",
-        "card": "Sol Ring",
+        "store": {"slug": "TestStore"},
+        "card": {"card": {"name": "Sol Ring"}, "card_specs": []},
         "items": [{"price": 9.99, "stock": 5}],
     }
 
@@ -32,6 +35,40 @@ def test_handle_availability_result():
         "TestStore", "Sol Ring"
     )
     assert cached_data == [{"price": 9.99, "stock": 5}]
+    last_checked = availability_manager.get_last_checked(
+        [("TestStore", "Sol Ring")]
+    )
+    assert last_checked[0] is not None
+
+
+def test_handle_availability_result_batch():
+    """
+    GIVEN a batch of availability results from one store
+    WHEN _handle_availability_result_batch is called
+    THEN every valid result is cached under its store slug and card name.
+    """
+    _handle_availability_result_batch({
+        "results": [
+            {
+                "store": {"slug": "test-store"},
+                "card": {"card": {"name": "Sol Ring"}},
+                "items": [{"price": 1.99}],
+            },
+            {"store": {"slug": "test-store"}},
+            {
+                "store": {"slug": "test-store"},
+                "card": {"card": {"name": "Opt"}},
+                "items": [],
+            },
+        ]
+    })
+
+    assert availability_manager.get_cached_availability_data(
+        "test-store", "Sol Ring"
+    ) == [{"price": 1.99}]
+    assert availability_manager.get_cached_availability_data(
+        "test-store", "Opt"
+    ) == []
 
 
 @patch("managers.messaging_manager.service_listener.server_listener"
@@ -135,6 +172,46 @@ def test_handle_catalog_printings_chunk_result(
         }
     ])
 
+
+@patch("managers.messaging_manager.service_listener.server_listener"
+       ".database.bulk_add_card_printings")
+@patch("managers.messaging_manager.service_listener.server_listener"
+       ".database.bulk_add_finishes")
+@patch("managers.messaging_manager.service_listener.server_listener"
+       ".CATALOG_BLOB_BATCH_SIZE", 2)
+def test_handle_catalog_blob_result(
+    mock_add_finishes, mock_add_printings, fake_redis
+):
+    """
+    GIVEN a reference to a blob of card printings
+    WHEN _handle_catalog_blob_result is called
+    THEN it should read the blob and add the printings batch by batch.
+    """
+    # Arrange
+    printings = [
+        {
+            "card_name": f"Card {n}",
+            "set_code": "C21",
+            "collector_number": str(n),
+            "finishes": ["foil"],
+        }
+        for n in range(3)
+    ]
+    with redis_manager.BlobWriter(fake_redis) as writer:
+        writer.write_all(printings)
+
+    # Act
+    _handle_catalog_blob_result({"kind": "printings", **writer.reference()})
+
+    # Assert
+    assert mock_add_finishes.call_count == 2
+    assert [len(c.args[0]) for c in mock_add_printings.call_args_list] == [
+        2, 1
+    ]
+    assert "finishes" not in mock_add_printings.call_args_list[0].args[0][0]
+    assert not fake_redis.exists(writer.key)
+
+
 # --- Integration Tests ---
 
 
@@ -8,7 +8,7 @@ def test_emit_from_worker(mocker):
     """
     GIVEN an event name, data payload, and a room name
     WHEN the emit_from_worker function is called
-    THEN it should initialize a new SocketIO instance with the correct Redis
+    THEN it should initialize a SocketIO instance with the correct Redis
          message queue
     AND call the 'emit' method on that instance with the correct arguments.
     """
@@ -18,6 +18,9 @@ def test_emit_from_worker(mocker):
     mock_socketio_class = mocker.patch(
         "managers.socket_manager.socket_emit.SocketIO"
     )
+    mocker.patch(
+        "managers.socket_manager.socket_emit._external_socketio", None
+    )
 
     # The constructor of SocketIO returns an instance, so we create a mock for
     # that instance.
@@ -32,7 +35,7 @@ def test_emit_from_worker(mocker):
     emit_from_worker(test_event, test_data, test_room)
 
     # Assert
-    # 1. Verify that a new SocketIO instance was created with the
+    # 1. Verify that a SocketIO instance was created with the
     # message_queue pointing to our Redis URL.
     mock_socketio_class.assert_called_once_with(message_queue=REDIS_URL)
 
@@ -41,3 +44,23 @@ def test_emit_from_worker(mocker):
     mock_socketio_instance.emit.assert_called_once_with(
         test_event, test_data, to=test_room
     )
+
+
+def test_emit_from_worker_reuses_socketio_client(mocker):
+    """
+    GIVEN several events emitted from a worker
+    WHEN emit_from_worker is called for each
+    THEN a single SocketIO client is created and reused for all of them.
+    """
+    mock_socketio_class = mocker.patch(
+        "managers.socket_manager.socket_emit.SocketIO"
+    )
+    mocker.patch(
+        "managers.socket_manager.socket_emit._external_socketio", None
+    )
+
+    emit_from_worker("first_event", {}, "user123")
+    emit_from_worker("second_event", {}, "user456")
+
+    mock_socketio_class.assert_called_once_with(message_queue=REDIS_URL)
+    assert mock_socketio_class.return_value.emit.call_count == 2
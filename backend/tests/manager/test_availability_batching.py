@@ -0,0 +1,108 @@
+"""
+Tests for sizing store batches from observed per-card latency.
+"""
+
+import threading
+
+import pytest
+
+from managers import availability_manager, metrics_manager
+from managers.availability_manager import availability_batching
+from managers.availability_manager.availability_batching import (
+    STORE_BATCH_DEFAULT_SIZE,
+    STORE_BATCH_MAX_SIZE,
+    STORE_BATCH_METRIC,
+    batch_size_for,
+)
+
+
+def sweep_items(store, count):
+    return [
+        {"store": store, "card_name": f"Card {i}", "users": {"alice": []}}
+        for i in range(count)
+    ]
+
+
+def test_batch_size_follows_card_latency():
+    assert batch_size_for(None) == STORE_BATCH_DEFAULT_SIZE
+    assert batch_size_for(0.001) == STORE_BATCH_MAX_SIZE
+    assert batch_size_for(600.0) == 1
+    assert batch_size_for(6.0) < batch_size_for(3.0)
+
+
+def test_batch_by_store_sizes_batches_per_store(fake_redis, mocker):
+    """
+    GIVEN a slow store and a store whose latency is unknown
+    WHEN sweep items for both are batched
+    THEN the slow store gets smaller batches, and no batch mixes stores
+    """
+    mocker.patch.object(
+        availability_batching, "STORE_BATCH_TARGET_SECONDS", 10.0
+    )
+    availability_manager.record_batch_latency("slow", cards=2, seconds=10.0)
+
+    batches = availability_manager.batch_by_store(
+        sweep_items("slow", 5) + sweep_items("new", 12)
+    )
+
+    assert [(store, len(items)) for store, items in batches] == [
+        ("slow", 2), ("slow", 2), ("slow", 1),
+        ("new", STORE_BATCH_DEFAULT_SIZE),
+        ("new", 12 - STORE_BATCH_DEFAULT_SIZE),
+    ]
+    assert metrics_manager.get_metric(STORE_BATCH_METRIC) == {
+        "slow:card_latency_ms": 5000,
+        "slow:batch_size": 2,
+        "new:batch_size": STORE_BATCH_DEFAULT_SIZE,
+    }
+
+
+def test_record_batch_latency_smooths_observations(fake_redis):
+    availability_manager.record_batch_latency("store_a", cards=1, seconds=1.0)
+    availability_manager.record_batch_latency("store_a", cards=1, seconds=2.0)
+
+    latency = float(fake_redis.hget(availability_batching.LATENCY_KEY,
+                                    "store_a"))
+    assert 1.0 < latency < 2.0
+    assert latency == 0.3 * 2.0 + 0.7 * 1.0
+
+
+def test_record_batch_latency_keeps_concurrent_observations(fake_redis):
+    """
+    GIVEN batches of one store that finish at the same time
+    WHEN each records its latency
+    THEN every observation is folded into the average
+    """
+    availability_manager.record_batch_latency("store_a", cards=1, seconds=1.0)
+    threads = [
+        threading.Thread(
+            target=availability_manager.record_batch_latency,
+            args=("store_a", 1, 2.0),
+        )
+        for _ in range(20)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latency = float(fake_redis.hget(availability_batching.LATENCY_KEY,
+                                    "store_a"))
+    assert latency == pytest.approx(2.0 - 0.7 ** 20)
+
+
+def test_latencies_are_best_effort(fake_redis, mocker):
+    """
+    GIVEN a Redis connection that fails
+    WHEN a batch latency is recorded and batches are sized
+    THEN nothing is raised, and batches get the default size
+    """
+    mocker.patch.object(fake_redis, "evalsha", side_effect=ConnectionError)
+    mocker.patch.object(fake_redis, "hmget", side_effect=ConnectionError)
+
+    availability_manager.record_batch_latency("store_a", cards=1, seconds=1.0)
+    batches = availability_manager.batch_by_store(sweep_items("store_a", 12))
+
+    assert [len(items) for _, items in batches] == [
+        STORE_BATCH_DEFAULT_SIZE, 12 - STORE_BATCH_DEFAULT_SIZE
+    ]
@@ -0,0 +1,107 @@
+"""
+Tests for the availability sweep planner.
+"""
+
+from managers.availability_manager.availability_planner import (
+    merge_specifications,
+    plan_availability_sweep,
+    select_stale_items,
+)
+from managers.availability_manager.availability_storage import (
+    cache_availability_data,
+    get_last_checked,
+)
+
+FOIL_C21 = {"set_code": "C21", "collector_number": "125", "finish": "foil"}
+ANY_M21 = {"set_code": "M21", "collector_number": None, "finish": None}
+
+
+def test_plan_collapses_users_into_one_item_per_store_and_card():
+    """
+    GIVEN many users tracking the same card at the same stores
+    WHEN the sweep is planned
+    THEN there is one item per (store, card), listing every interested user
+    """
+    tracked = [
+        (f"user_{n}", "Sol Ring", 1, [], ["store_a", "store_b"])
+        for n in range(50)
+    ]
+    tracked.append(("user_0", "Brainstorm", 1, [], ["store_a"]))
+
+    plan = plan_availability_sweep(tracked)
+
+    assert [(item["store"], item["card_name"]) for item in plan] == [
+        ("store_a", "Sol Ring"),
+        ("store_b", "Sol Ring"),
+        ("store_a", "Brainstorm"),
+    ]
+    assert len(plan[0]["users"]) == 50
+    assert plan[2]["users"] == {"user_0": []}
+
+
+def test_plan_merges_specifications_and_keeps_each_users_own():
+    """
+    GIVEN users tracking the same card with different specifications
+    WHEN the sweep is planned
+    THEN the item carries the merged specifications and each user's own
+    """
+    plan = plan_availability_sweep(
+        [
+            ("alice", "Sol Ring", 1, [FOIL_C21], ["store_a"]),
+            ("bob", "Sol Ring", 2, [ANY_M21, FOIL_C21], ["store_a"]),
+        ]
+    )
+
+    assert plan[0]["card_specs"] == [FOIL_C21, ANY_M21]
+    assert plan[0]["users"] == {
+        "alice": [FOIL_C21],
+        "bob": [ANY_M21, FOIL_C21],
+    }
+
+
+def test_merge_specifications_widens_to_any_printing():
+    """
+    GIVEN one user who tracks a card without specifications
+    WHEN specifications are merged
+    THEN the merged item matches any printing
+    """
+    assert merge_specifications([[FOIL_C21], []]) == []
+    assert merge_specifications([[FOIL_C21], [FOIL_C21]]) == [FOIL_C21]
+
+
+def test_select_stale_items_uses_each_stores_threshold():
+    """
+    GIVEN items checked at different times at stores with different
+    staleness thresholds
+    WHEN stale items are selected
+    THEN only never-checked items and items past their store's threshold
+    are kept
+    """
+    plan = plan_availability_sweep(
+        [
+            ("alice", "Sol Ring", 1, [], ["fast", "slow"]),
+            ("alice", "Brainstorm", 1, [], ["fast", "slow"]),
+        ]
+    )
+    last_checked = [1000.0, 1000.0, 1500.0, None]
+    thresholds = {"fast": 300, "slow": 900}
+
+    stale = select_stale_items(
+        plan, last_checked, thresholds.__getitem__, now=1600.0
+    )
+
+    assert [(item["store"], item["card_name"]) for item in stale] == [
+        ("fast", "Sol Ring"),
+        ("slow", "Brainstorm"),
+    ]
+
+
+def test_caching_results_records_when_the_pair_was_checked():
+    cache_availability_data("store_a", "Sol Ring", [])
+
+    checked_at, never_checked = get_last_checked(
+        [("store_a", "Sol Ring"), ("store_a", "Brainstorm")]
+    )
+
+    assert checked_at is not None
+    assert never_checked is None
@@ -0,0 +1,117 @@
+"""
+Tests for deduplicating identical in-flight availability scrapes.
+"""
+
+import time
+
+from managers import availability_manager, metrics_manager
+from managers.availability_manager.availability_singleflight import (
+    SINGLEFLIGHT_METRIC,
+    SINGLEFLIGHT_TTL_SECONDS,
+    OrphanedFlight,
+    _keys,
+    flight_key,
+)
+
+FOIL = {"set_code": "C21", "finish": "foil"}
+NON_FOIL = {"set_code": "M21", "finish": "non-foil"}
+
+
+def test_flight_key_normalizes_name_and_spec_order():
+    assert flight_key("store_a", "Sol  Ring ", [FOIL, NON_FOIL]) == (
+        flight_key("store_a", "sol ring", [NON_FOIL, FOIL])
+    )
+    assert flight_key("store_a", "Sol Ring", [FOIL]) != (
+        flight_key("store_a", "Sol Ring", [NON_FOIL])
+    )
+    assert flight_key("store_a", "Sol Ring") != (
+        flight_key("store_b", "Sol Ring")
+    )
+
+
+def test_later_requests_attach_to_the_running_scrape(fake_redis):
+    """
+    GIVEN a scrape led by one user's job
+    WHEN two more users request the same scrape before it finishes
+    THEN they attach to it, the leader gets both of them back when it
+    finishes, and a request right after that reuses the result
+    """
+    leader = availability_manager.join_flight(
+        "store_a", "Sol Ring", [], "alice"
+    )
+    bob = availability_manager.join_flight("store_a", "sol ring", [], "bob")
+    carol = availability_manager.join_flight(
+        "store_a", "Sol Ring", None, "carol"
+    )
+
+    waiters = availability_manager.finish_flight(leader, [{"price": 1.0}])
+    late = availability_manager.join_flight("store_a", "Sol Ring", [], "dan")
+
+    assert leader.leads
+    assert not bob.leads and bob.items is None
+    assert not carol.leads
+    assert waiters == ["bob", "carol"]
+    assert not late.leads and late.items == [{"price": 1.0}]
+    assert metrics_manager.get_metric(SINGLEFLIGHT_METRIC) == {
+        "store_a:led": 1,
+        "store_a:attached": 2,
+        "store_a:reused": 1,
+    }
+
+
+def test_orphaned_flights_are_collected_once_their_lock_expired(
+    fake_redis
+):
+    """
+    GIVEN waiters attached to a flight whose leader died
+    WHEN orphaned flights are collected before and after its lock expired
+    THEN the flight is collected once, after the lock expired, with its
+    check and waiters
+    """
+    leader = availability_manager.join_flight(
+        "store_a", "Opt", [FOIL], "alice"
+    )
+    availability_manager.join_flight("store_a", "Opt", [FOIL], "carol")
+    availability_manager.join_flight("store_a", "Opt", [FOIL], "bob")
+
+    later = time.time() + SINGLEFLIGHT_TTL_SECONDS + 1
+    early = availability_manager.collect_orphaned_flights(now=later)
+    fake_redis.delete(_keys(leader.key)[0])
+    later += SINGLEFLIGHT_TTL_SECONDS + 1
+    orphaned = availability_manager.collect_orphaned_flights(now=later)
+
+    assert early == []
+    assert orphaned == [
+        OrphanedFlight(
+            "store_a",
+            {"name": "Opt", "card_specs": [FOIL]},
+            ["bob", "carol"],
+        )
+    ]
+    assert availability_manager.collect_orphaned_flights(now=later) == []
+    assert metrics_manager.get_metric(SINGLEFLIGHT_METRIC)[
+        "store_a:orphaned"
+    ] == 1
+
+
+def test_finished_flights_are_never_collected_as_orphaned(fake_redis):
+    leader = availability_manager.join_flight("store_a", "Opt", [], "alice")
+    availability_manager.join_flight("store_a", "Opt", [], "bob")
+    availability_manager.finish_flight(leader, [], reusable=False)
+
+    assert availability_manager.collect_orphaned_flights(
+        now=time.time() + SINGLEFLIGHT_TTL_SECONDS + 1
+    ) == []
+
+
+def test_flight_degrades_to_scraping_without_redis(mocker):
+    mocker.patch(
+        "managers.availability_manager.availability_singleflight"
+        ".redis_manager.get_redis_connection",
+        return_value=None,
+    )
+
+    flight = availability_manager.join_flight("store_a", "Opt", [], "alice")
+
+    assert flight.leads
+    assert availability_manager.finish_flight(flight, []) == []
@@ -0,0 +1,68 @@
+import uuid
+
+import pytest
+
+from managers import redis_manager
+from managers.redis_manager import blob_transfer
+
+RECORDS = [
+    {
+        "card_name": f"Card {n}",
+        "set_code": "c21",
+        "collector_number": str(n),
+        "finishes": ["nonfoil", "foil"],
+        # Hard to compress, so zlib emits output before it is flushed.
+        "id": uuid.uuid4().hex,
+    }
+    for n in range(2000)
+]
+
+
+def test_records_round_trip_through_segmented_blob(mocker, fake_redis):
+    """
+    GIVEN records larger than one blob segment
+    WHEN they are written to a blob and read back
+    THEN the blob spans several compressed segments, every record comes back
+         in order, and the blob is deleted once read.
+    """
+    mocker.patch(f"{blob_transfer.__name__}.BLOB_SEGMENT_BYTES", 1024)
+
+    with redis_manager.BlobWriter(fake_redis) as writer:
+        writer.write_all(RECORDS)
+    reference = writer.reference()
+
+    assert reference["records"] == len(RECORDS)
+    assert fake_redis.llen(reference["key"]) > 1
+    assert 0 < fake_redis.ttl(reference["key"])
+    assert reference["compressed_bytes"] < writer.raw_bytes
+    assert list(redis_manager.read_blob(fake_redis, reference["key"])) == (
+        RECORDS
+    )
+    assert not fake_redis.exists(reference["key"])
+
+
+def test_reading_missing_blob_raises(fake_redis):
+    """
+    GIVEN a reference to a blob that expired or was never written
+    WHEN it is read
+    THEN BlobNotFoundError is raised.
+    """
+    with pytest.raises(redis_manager.BlobNotFoundError):
+        list(redis_manager.read_blob(fake_redis, "blob:missing"))
+
+
+def test_failed_write_discards_blob(mocker, fake_redis):
+    """
+    GIVEN records are being written to a blob
+    WHEN the producer fails part-way through
+    THEN the segments written so far are deleted.
+    """
+    mocker.patch(f"{blob_transfer.__name__}.BLOB_SEGMENT_BYTES", 1)
+
+    with pytest.raises(RuntimeError):
+        with redis_manager.BlobWriter(fake_redis) as writer:
+            writer.write_all(RECORDS[:10])
+            assert fake_redis.exists(writer.key)
+            raise RuntimeError("source failed")
+
+    assert not fake_redis.exists(writer.key)
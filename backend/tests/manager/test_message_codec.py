@@ -0,0 +1,113 @@
+import datetime
+
+import pytest
+
+from managers import redis_manager
+from managers.redis_manager import codec
+from schema.blocks import CardPreferenceSchema, StoreSchema
+from schema.messaging import messages
+from schema.messaging.payload import (
+    AvailabilityResultPayload,
+    CatalogSetDataResultPayload,
+)
+
+
+def availability_result():
+    return messages.AvailabilityResultMessage(
+        payload=AvailabilityResultPayload(
+            card=CardPreferenceSchema.model_validate({
+                "card": {"name": "Sol Ring"},
+                "card_specs": [
+                    {"set_code": "c21", "finish": {"name": "foil"}}
+                ],
+            }),
+            store=StoreSchema(slug="test-store"),
+            items=[{"price": 1.99, "quantity": 2}],
+        )
+    )
+
+
+@pytest.mark.parametrize("codec_name", ["json", "msgpack"])
+def test_codecs_decode_to_the_json_view_of_the_payload(codec_name):
+    """
+    GIVEN a message with nested models and a date
+    WHEN it is encoded with either codec and decoded again
+    THEN handlers see a versioned envelope holding the same dicts a JSON
+    dump of the payload produces
+    """
+    for message in (
+        availability_result(),
+        messages.CatalogSetDataResultMessage(
+            payload=CatalogSetDataResultPayload(sets=[{
+                "code": "c21",
+                "release_date": datetime.date(2021, 4, 23),
+            }])
+        ),
+    ):
+        data = redis_manager.encode_message(
+            message.name, message.payload, codec_name
+        )
+
+        assert redis_manager.decode_message(data) == {
+            "v": codec.ENVELOPE_VERSION,
+            "type": message.name,
+            "payload": message.payload.model_dump(mode="json"),
+        }
+
+
+def test_msgpack_messages_are_smaller_than_json():
+    message = availability_result()
+
+    json_data = codec.encode_message(message.name, message.payload, "json")
+    msgpack_data = codec.encode_message(
+        message.name, message.payload, "msgpack"
+    )
+
+    assert json_data.startswith(b"{")
+    assert len(msgpack_data) < len(json_data)
+
+
+def test_untagged_json_messages_are_still_decoded():
+    """Messages published by releases without envelope versions decode."""
+    assert redis_manager.decode_message(
+        '{"type": "catalog_card_names_result", "payload": {"names": []}}'
+    ) == {"type": "catalog_card_names_result", "payload": {"names": []}}
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        b'{"v": 99, "type": "x", "payload": {}}',
+        b"[1, 2]",
+        b"\xc1",
+        b"",
+    ],
+)
+def test_unreadable_messages_raise_value_error(data):
+    with pytest.raises(ValueError):
+        redis_manager.decode_message(data)
+
+
+def test_unknown_codec_is_rejected():
+    with pytest.raises(ValueError, match="Unknown message codec"):
+        codec.encode_message("x", {}, "xml")
+
+
+def test_publish_uses_configured_codec(mocker, fake_redis):
+    """
+    GIVEN the msgpack codec
+    WHEN a message is published
+    THEN subscribers receive msgpack bytes that decode to the message
+    """
+    mocker.patch.object(codec, "MESSAGE_CODEC", codec.MSGPACK_CODEC)
+    mock_publish = mocker.spy(fake_redis, "publish")
+    message = availability_result()
+
+    redis_manager.publish_pubsub(message)
+
+    channel, data = mock_publish.call_args.args
+    assert channel == "worker-results"
+    assert not data.startswith(b"{")
+    assert redis_manager.decode_message(data)["payload"] == (
+        message.payload.model_dump(mode="json")
+    )
@@ -0,0 +1,91 @@
+"""
+Unit tests for the Redis-backed metrics manager.
+"""
+
+from managers import metrics_manager
+
+
+def test_increment_and_get_metric(fake_redis):
+    """
+    GIVEN an empty metrics store
+    WHEN counters are incremented
+    THEN get_metric returns their accumulated numeric values.
+    """
+    metrics_manager.increment("scrapes", "store_a")
+    metrics_manager.increment("scrapes", "store_a", 2)
+    metrics_manager.increment("scrapes", "latency", 0.25)
+
+    assert metrics_manager.get_metric("scrapes") == {
+        "store_a": 3,
+        "latency": 0.25,
+    }
+
+
+def test_increment_many_skips_zero_values(fake_redis):
+    """
+    GIVEN a batch of counter updates including zero deltas
+    WHEN increment_many is called
+    THEN only the non-zero fields are written.
+    """
+    metrics_manager.increment_many("batch", {"a": 1, "b": 0, "c": 1.5})
+
+    assert metrics_manager.get_metric("batch") == {"a": 1, "c": 1.5}
+
+
+def test_set_gauge_and_get_all_metrics(fake_redis):
+    """
+    GIVEN gauges and counters in different metrics
+    WHEN get_all_metrics is called
+    THEN every metric is returned keyed by name.
+    """
+    metrics_manager.set_gauge("rates", "store_a", 2.5)
+    metrics_manager.increment("scrapes", "store_a")
+
+    assert metrics_manager.get_all_metrics() == {
+        "rates": {"store_a": 2.5},
+        "scrapes": {"store_a": 1},
+    }
+
+    metrics_manager.reset_metric("rates")
+    assert metrics_manager.get_metric("rates") == {}
+
+
+def test_set_gauges_writes_every_field(fake_redis):
+    metrics_manager.set_gauge("rates", "store_a", 2.5)
+    metrics_manager.set_gauges("rates", {"store_b": 1.0, "store_a": 3})
+    metrics_manager.set_gauges("rates", {})
+
+    assert metrics_manager.get_metric("rates") == {
+        "store_a": 3,
+        "store_b": 1.0,
+    }
+
+
+def test_metrics_are_best_effort(mocker):
+    """
+    GIVEN Redis is unavailable
+    WHEN metrics are written or read
+    THEN no exception propagates to the caller.
+    """
+    mocker.patch(
+        "managers.metrics_manager.metrics_manager.redis_manager"
+        ".get_redis_connection",
+        side_effect=ConnectionError("down"),
+    )
+
+    metrics_manager.increment("scrapes", "store_a")
+    assert metrics_manager.get_metric("scrapes") == {}
+
+
+def test_metrics_endpoint(client, fake_redis):
+    """
+    GIVEN recorded metrics
+    WHEN GET /api/metrics is requested
+    THEN the metrics are returned as JSON.
+    """
+    metrics_manager.increment("http_connections", "store_a:requests", 4)
+
+    response = client.get("/api/metrics")
+
+    assert response.status_code == 200
+    assert response.json == {"http_connections": {"store_a:requests": 4}}
@@ -0,0 +1,157 @@
+"""
+Tests for queuing tasks in bulk through the task manager, and for lane
+backpressure.
+"""
+
+import pytest
+from rq import Queue
+from rq.job import Job
+
+from managers import metrics_manager, task_manager
+from managers.task_manager import backpressure
+from managers.task_manager import task_manager as task_manager_module
+
+
+def check_card(username, store, card_name):
+    return username, store, card_name
+
+
+@pytest.fixture
+def queue(mocker, fake_redis):
+    queue = Queue(connection=fake_redis)
+    mocker.patch("managers.redis_manager.redis_manager.queue", queue)
+    mocker.patch.dict(
+        task_manager_module.TASK_REGISTRY, {"check_card": check_card}
+    )
+    return queue
+
+
+def test_queue_tasks_enqueues_batch_with_deterministic_ids(queue):
+    """
+    GIVEN a batch of runs for a registered task, with one repeated run
+    WHEN they are queued in bulk
+    THEN each distinct run is queued once under its deterministic job ID
+    """
+    job_args = [
+        ("alice", "store_a", "Sol Ring"),
+        ("alice", "store_b", "Sol Ring"),
+        ("alice", "store_a", "Sol Ring"),
+    ]
+
+    queued = task_manager.queue_tasks("check_card", job_args)
+
+    expected_ids = [
+        task_manager.job_id_for("check_card", *args) for args in job_args[:2]
+    ]
+    assert queued == 2
+    assert queue.job_ids == expected_ids
+    job = Job.fetch(expected_ids[1], connection=queue.connection)
+    assert job.args == ("alice", "store_b", "Sol Ring")
+
+
+def test_queue_tasks_skips_jobs_that_are_still_pending(queue):
+    """
+    GIVEN a run that is already waiting in the queue
+    WHEN the same run is queued again
+    THEN it is skipped until the earlier job has left the queue
+    """
+    args = ("alice", "store_a", "Sol Ring")
+    task_manager.queue_tasks("check_card", [args])
+
+    assert task_manager.queue_tasks("check_card", [args]) == 0
+    assert queue.count == 1
+
+    job = queue.dequeue_any([queue], None, connection=queue.connection)[0]
+    job.set_status("finished")
+
+    assert task_manager.queue_tasks("check_card", [args]) == 1
+
+
+def test_queue_tasks_skips_jobs_that_are_running(queue):
+    """
+    GIVEN a run whose job a worker has started
+    WHEN the same run is queued again
+    THEN it is skipped, leaving the running job's hash untouched
+    """
+    args = ("alice", "store_a", "Sol Ring")
+    task_manager.queue_tasks("check_card", [args])
+    job = queue.dequeue_any([queue], None, connection=queue.connection)[0]
+    job.set_status("started")
+    job.meta["progress"] = 1
+    job.save_meta()
+
+    assert task_manager.queue_tasks("check_card", [args]) == 0
+    assert queue.count == 0
+    job = Job.fetch(job.id, connection=queue.connection)
+    assert job.get_status() == "started"
+    assert job.meta == {"progress": 1}
+
+
+def test_queue_tasks_ignores_unknown_tasks(queue):
+    assert task_manager.queue_tasks("missing", [("alice",)]) == 0
+    assert queue.count == 0
+
+
+def test_tasks_are_queued_on_their_lane(queue, mocker, fake_redis):
+    """
+    GIVEN a task registered on the sweep lane
+    WHEN it is queued, with and without a lane override
+    THEN each job lands on the requested lane instead of the default queue
+    """
+    mocker.patch.dict(
+        task_manager_module.TASK_LANES, {"check_card": "sweep"}
+    )
+
+    task_manager.queue_tasks("check_card", [("alice", "store_a", "Sol Ring")])
+    task_manager.queue_task(
+        "check_card", "bob", "store_a", "Sol Ring", lane="interactive"
+    )
+
+    assert queue.count == 0
+    assert Queue("sweep", connection=fake_redis).count == 1
+    assert Queue("interactive", connection=fake_redis).count == 1
+
+
+def test_lane_is_backlogged_beyond_max_depth(queue, mocker, fake_redis):
+    mocker.patch.object(backpressure, "LANE_MAX_DEPTH", 2)
+    sweep = Queue("sweep", connection=fake_redis)
+    for card_name in ("Sol Ring", "Opt"):
+        sweep.enqueue(check_card, "alice", "store_a", card_name)
+
+    assert not task_manager.is_backlogged("sweep")
+
+    sweep.enqueue(check_card, "alice", "store_a", "Brainstorm")
+
+    assert task_manager.is_backlogged("sweep")
+
+
+def test_lane_backlog_estimates_wait_from_throughput(
+    queue, mocker, fake_redis
+):
+    """
+    GIVEN a lane with ten queued jobs whose workers started five jobs in the
+    last ten seconds
+    WHEN its backlog is measured
+    THEN the wait is estimated from the sampled throughput, and the lane is
+    backlogged once that wait exceeds the limit
+    """
+    mocker.patch.object(backpressure, "LANE_MAX_WAIT_SECONDS", 15)
+    sweep = Queue("sweep", connection=fake_redis)
+    for number in range(10):
+        sweep.enqueue(check_card, "alice", "store_a", f"Card {number}")
+
+    first = task_manager.lane_backlog("sweep", now=1000.0)
+    metrics_manager.increment(
+        task_manager.LANE_LATENCY_METRIC, "sweep:jobs", 5
+    )
+    second = task_manager.lane_backlog("sweep", now=1010.0)
+
+    assert first == (10, None, None)
+    assert not first.over_limit
+    assert second == (10, 0.5, 20.0)
+    assert second.over_limit
+    assert metrics_manager.get_metric(task_manager.BACKPRESSURE_METRIC) == {
+        "sweep:depth": 10,
+        "sweep:jobs_per_second": 0.5,
+        "sweep:wait_seconds": 20,
+    }
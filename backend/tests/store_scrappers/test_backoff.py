@@ -0,0 +1,124 @@
+"""
+Unit tests for the shared, adaptive per-store backoff.
+"""
+
+from email.utils import formatdate
+import time
+
+import pytest
+
+from managers.store_manager.stores import backoff
+from managers.store_manager.stores.backoff import (
+    AdaptiveBackoff,
+    parse_retry_after,
+)
+from managers.store_manager.stores.rate_limiter import RedisTokenBucket
+from managers.store_manager.stores.throttle import StoreThrottle
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [("12", 12.0), (" 1.5 ", 1.5), ("-3", 0.0), (None, None), ("soon", None)],
+)
+def test_parse_retry_after_seconds(value, expected):
+    assert parse_retry_after(value) == expected
+
+
+def test_parse_retry_after_http_date():
+    retry_at = formatdate(time.time() + 60, usegmt=True)
+
+    assert 55 < parse_retry_after(retry_at) <= 60
+
+
+def test_rate_limits_grow_pause_and_shrink_rate(fake_redis):
+    """
+    GIVEN a store limited to 4 requests per second
+    WHEN it rate limits us twice without a Retry-After header
+    THEN the pause doubles, the rate halves each time, and the effective
+         rate is published as a metric.
+    """
+    store_backoff = AdaptiveBackoff("test_store", base_rate=4)
+
+    first = store_backoff.record_rate_limit()
+    second = store_backoff.record_rate_limit()
+
+    assert 0.4 < first <= 0.5
+    assert 0.9 < second <= 1.0
+    state = fake_redis.hgetall("backoff:test_store")
+    assert float(state[b"multiplier"]) == 0.25
+    assert state[b"rate_limit_events"] == b"2"
+    metric = fake_redis.hgetall("metrics:store_request_rate")
+    assert float(metric[b"test_store"]) == 1.0
+    assert float(metric[b"test_store:multiplier"]) == 0.25
+
+
+def test_retry_after_sets_shared_pause(fake_redis):
+    """
+    GIVEN a Retry-After value from the store
+    WHEN the rate limit is recorded by one worker
+    THEN another worker sees the same pause.
+    """
+    AdaptiveBackoff("test_store").record_rate_limit(retry_after=20)
+
+    other_worker = AdaptiveBackoff("test_store")
+
+    assert 19 < other_worker.pause_remaining() <= 20
+
+
+def test_successes_recover_rate_gradually(fake_redis, mocker):
+    """
+    GIVEN a store whose rate was halved
+    WHEN requests succeed again
+    THEN the rate recovers one step per success, up to the full rate, and
+         a healthy store is not written to at all.
+    """
+    mocker.patch.object(backoff, "INCREASE_STEP", 0.25)
+    store_backoff = AdaptiveBackoff("test_store", base_rate=2)
+    store_backoff.record_rate_limit()
+
+    store_backoff.record_success()
+    assert float(fake_redis.hget("backoff:test_store", "multiplier")) == 0.75
+
+    store_backoff.record_success()
+    store_backoff.record_success()
+    assert float(fake_redis.hget("backoff:test_store", "multiplier")) == 1.0
+    assert fake_redis.hget("backoff:test_store", "strikes") == b"0"
+
+    healthy = AdaptiveBackoff("healthy_store")
+    healthy.record_success()
+    assert not fake_redis.exists("backoff:healthy_store")
+
+
+def test_token_bucket_honours_backoff(fake_redis):
+    """
+    GIVEN a store with a token bucket
+    WHEN the store is paused and later resumes at a reduced rate
+    THEN no tokens are given out while paused, and the burst shrinks.
+    """
+    bucket = RedisTokenBucket("test_store", rate=10, burst=4)
+    store_backoff = AdaptiveBackoff("test_store", base_rate=10)
+
+    store_backoff.record_rate_limit(retry_after=5)
+    assert 4 < bucket.try_acquire() <= 5
+
+    fake_redis.hset("backoff:test_store", "paused_until", 0)
+    waits = [bucket.try_acquire() for _ in range(3)]
+    assert waits[:2] == [0.0, 0.0]
+    assert waits[2] > 0
+
+
+def test_throttle_records_rate_limit_locally_and_shared(fake_redis):
+    """
+    GIVEN a throttle with a shared backoff
+    WHEN a rate limit is recorded
+    THEN this process pauses too, so it backs off even without Redis.
+    """
+    throttle = StoreThrottle(
+        "test_store", backoff=AdaptiveBackoff("test_store")
+    )
+
+    delay = throttle.record_rate_limit(retry_after=3)
+
+    assert delay == pytest.approx(3, abs=0.1)
+    assert 2.5 < throttle.delay() <= 3
+    assert 2.5 < throttle.acquire() <= 3
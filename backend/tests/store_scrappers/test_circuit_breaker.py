@@ -0,0 +1,159 @@
+"""
+Unit tests for the Redis-backed per-store circuit breaker.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from managers.store_manager.stores.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+)
+from managers.store_manager.stores.throttle import StoreThrottle
+from managers.store_manager.stores.storefronts.crystal_commerce_store import (
+    _make_request_with_retries,
+)
+
+MODULE = "managers.store_manager.stores.storefronts.crystal_commerce_store"
+
+
+def test_circuit_opens_after_consecutive_failures(fake_redis):
+    """
+    GIVEN a breaker with a threshold of 3
+    WHEN the store fails 3 times in a row
+    THEN the circuit opens and requests fail fast.
+    """
+    breaker = CircuitBreaker("test_store", failure_threshold=3)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state() == CLOSED
+    assert breaker.allow_request() is True
+
+    breaker.record_failure()
+
+    assert breaker.state() == OPEN
+    assert breaker.allow_request() is False
+    metric = fake_redis.hgetall("metrics:circuit_breaker")
+    assert metric[b"test_store:opened"] == b"1"
+    assert metric[b"test_store:short_circuited"] == b"1"
+
+
+def test_success_resets_failure_count(fake_redis):
+    """
+    GIVEN a store that failed just below the threshold
+    WHEN a request succeeds
+    THEN the count starts over.
+    """
+    breaker = CircuitBreaker("test_store", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state() == CLOSED
+
+
+def test_single_half_open_probe_closes_circuit(fake_redis):
+    """
+    GIVEN an open circuit whose reset timeout has passed
+    WHEN several workers ask to contact the store
+    THEN only one probe is let through, and its success closes the circuit.
+    """
+    breaker = CircuitBreaker("test_store", failure_threshold=1,
+                             reset_timeout=0)
+    other_worker = CircuitBreaker("test_store", failure_threshold=1,
+                                  reset_timeout=0)
+    breaker.record_failure()
+
+    assert breaker.allow_request() is True
+    assert breaker.state() == HALF_OPEN
+    assert other_worker.allow_request() is False
+
+    breaker.record_success()
+
+    assert other_worker.state() == CLOSED
+    assert other_worker.allow_request() is True
+
+
+def test_failed_probe_reopens_circuit(fake_redis):
+    """
+    GIVEN a half-open circuit
+    WHEN the probe fails
+    THEN the circuit opens again and waits a full reset timeout.
+    """
+    breaker = CircuitBreaker("test_store", failure_threshold=1,
+                             reset_timeout=0)
+    breaker.record_failure()
+    assert breaker.allow_request() is True
+
+    breaker.reset_timeout = 60
+    breaker.record_failure()
+
+    assert breaker.state() == OPEN
+    assert breaker.allow_request() is False
+
+
+def test_breaker_allows_requests_without_redis(mocker):
+    """
+    GIVEN Redis is unavailable
+    WHEN the breaker is consulted
+    THEN requests are allowed and the circuit reports closed.
+    """
+    mocker.patch(
+        "managers.store_manager.stores.circuit_breaker.redis_manager"
+        ".get_redis_connection",
+        side_effect=ConnectionError("down"),
+    )
+    breaker = CircuitBreaker("test_store")
+
+    breaker.record_failure()
+
+    assert breaker.allow_request() is True
+    assert breaker.state() == CLOSED
+
+
+@patch(f"{MODULE}.time.sleep")
+def test_unreachable_store_counts_as_failure(mock_sleep, fake_redis):
+    """
+    GIVEN a store that cannot be reached
+    WHEN a request exhausts its retries
+    THEN one failure is recorded against the store's circuit.
+    """
+    breaker = CircuitBreaker("test_store", failure_threshold=1)
+    throttle = StoreThrottle("test_store", circuit_breaker=breaker)
+    session = MagicMock()
+    session.get.side_effect = requests.exceptions.ConnectionError("refused")
+
+    response = _make_request_with_retries(
+        "https://test.com/search", session=session, throttle=throttle
+    )
+
+    assert response is None
+    assert session.get.call_count == 3
+    assert breaker.state() == OPEN
+
+
+@patch(f"{MODULE}.time.sleep")
+def test_client_errors_do_not_count_as_failures(mock_sleep, fake_redis):
+    """
+    GIVEN a product page that no longer exists
+    WHEN the request fails with a 404
+    THEN the store's circuit is not affected.
+    """
+    breaker = CircuitBreaker("test_store", failure_threshold=1)
+    throttle = StoreThrottle("test_store", circuit_breaker=breaker)
+    not_found = MagicMock(status_code=404, headers={})
+    not_found.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        "404 Not Found", response=not_found
+    )
+    session = MagicMock()
+    session.get.return_value = not_found
+
+    _make_request_with_retries(
+        "https://test.com/products/1", session=session, throttle=throttle
+    )
+
+    assert breaker.state() == CLOSED
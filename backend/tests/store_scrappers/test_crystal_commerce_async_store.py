@@ -0,0 +1,268 @@
+"""
+Unit tests for the asyncio Crystal Commerce scraper.
+"""
+
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock
+
+import pytest
+
+from managers import store_manager
+from managers.store_manager.stores import deadline
+from managers.store_manager.stores.storefronts import (
+    crystal_commerce_async_store,
+)
+from managers.store_manager.stores.storefronts.crystal_commerce_async_store import (  # noqa: E501
+    AsyncCrystalCommerceStore,
+    fetch_availability_concurrently,
+)
+from managers.store_manager.stores.storefronts.crystal_commerce_store import (
+    CrystalCommerceStore,
+)
+from tests.store_scrappers.test_crystal_commerce_store import (
+    PRODUCT_PAGE_HTML,
+    SEARCH_RESULTS_MULTIPLE_PRINTINGS_HTML,
+)
+
+
+class _StorefrontHandler(BaseHTTPRequestHandler):
+    """Serves canned Crystal Commerce pages, optionally rate limiting."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.paths.append(self.path)
+            rate_limited = server.rate_limited_requests > 0
+            server.rate_limited_requests -= int(rate_limited)
+        if rate_limited:
+            body = b"Sorry, too many searches"
+        elif self.path.startswith("/products/search"):
+            body = SEARCH_RESULTS_MULTIPLE_PRINTINGS_HTML.encode()
+        else:
+            body = PRODUCT_PAGE_HTML.encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def storefront():
+    """Runs a local fake Crystal Commerce store for the test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StorefrontHandler)
+    server.lock = threading.Lock()
+    server.paths = []
+    server.rate_limited_requests = 0
+    server.url = f"http://127.0.0.1:{server.server_address[1]}"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _make_store(store_class, storefront, slug="test_store"):
+    return store_class(
+        name="Test Store",
+        slug=slug,
+        homepage=storefront.url,
+        search_url=f"{storefront.url}/products/search",
+        max_concurrency=2,
+        rate_limit_per_second=0,
+    )
+
+
+def test_async_store_matches_blocking_store(storefront):
+    """
+    GIVEN the same store pages
+    WHEN they are scraped by the blocking and the async scraper
+    THEN both produce identical listings.
+    """
+    blocking = _make_store(CrystalCommerceStore, storefront)
+    async_store = _make_store(AsyncCrystalCommerceStore, storefront)
+
+    expected = blocking._scrape_listings("Test Card")
+    actual = async_store._scrape_listings("Test Card")
+
+    assert [listing.price for listing in actual] == [1.0, 2.0, 3.0]
+    assert actual == expected
+
+
+def test_fetch_availability_concurrently_keeps_order(storefront, mocker):
+    """
+    GIVEN an async store and a blocking store
+    WHEN several cards are checked concurrently
+    THEN one result per check is returned in the order of the checks.
+    """
+    mocker.patch.object(
+        crystal_commerce_async_store,
+        "filter_listings",
+        side_effect=lambda name, listings, specs: [
+            listing.model_dump() for listing in listings
+        ],
+    )
+    async_store = _make_store(AsyncCrystalCommerceStore, storefront)
+    blocking_store = MagicMock()
+    blocking_store.slug = "blocking_store"
+    blocking_store.max_concurrency = 1
+    blocking_store.fetch_card_availability.return_value = [{"price": 9.0}]
+
+    results = fetch_availability_concurrently(
+        [
+            (async_store, "Test Card", None),
+            (blocking_store, "Other Card", [{"set_code": "TST"}]),
+            (async_store, "Test Card", []),
+        ]
+    )
+
+    assert len(results) == 3
+    assert [item["price"] for item in results[0]] == [1.0, 2.0, 3.0]
+    assert results[1] == [{"price": 9.0}]
+    assert results[2] == results[0]
+    blocking_store.fetch_card_availability.assert_called_once_with(
+        "Other Card", [{"set_code": "TST"}]
+    )
+
+
+def test_async_rate_limit_pauses_store_throttle(storefront, mocker):
+    """
+    GIVEN a store that answers 'too many searches' once
+    WHEN the async scraper searches it
+    THEN the shared throttle is paused and the search is retried.
+    """
+    storefront.rate_limited_requests = 1
+    store = _make_store(AsyncCrystalCommerceStore, storefront)
+    pause = mocker.spy(store.throttle, "pause")
+
+    listings = store._scrape_listings("Test Card")
+
+    pause.assert_called_once_with(0.5)
+    assert len(listings) == 3
+    assert storefront.paths[0] == storefront.paths[1]
+
+
+def test_check_availability_concurrently_skips_unknown_stores(mocker):
+    """
+    GIVEN a check for a store that is not configured
+    WHEN check_availability_concurrently is called
+    THEN that check yields an empty result and the others still run.
+    """
+    known_store = MagicMock()
+    mocker.patch(
+        "managers.store_manager.store_manager.get_store",
+        side_effect=lambda slug: known_store if slug == "known" else None,
+    )
+    fetch = mocker.patch(
+        "managers.store_manager.store_manager."
+        "fetch_availability_concurrently",
+        return_value=[[{"price": 1.0}]],
+    )
+
+    results = store_manager.check_availability_concurrently(
+        [("missing", "Card A", None), ("known", "Card B", [])]
+    )
+
+    assert results == [[], [{"price": 1.0}]]
+    assert list(fetch.call_args.args[0]) == [(known_store, "Card B", [])]
+
+
+def test_fetch_listings_many_reuses_session_across_jobs(storefront):
+    """
+    GIVEN an async store
+    WHEN two jobs each search for several cards
+    THEN each gets its listings in order, and both use the same session.
+    """
+    store = _make_store(AsyncCrystalCommerceStore, storefront)
+
+    first = store.fetch_listings_many(["Test Card", "Test Card"])
+    client = store._client
+    second = store.fetch_listings_many(["Test Card"])
+
+    assert [len(listings) for listings in first] == [3, 3]
+    assert second == first[:1]
+    assert store._client is client and not client.closed
+
+
+def test_async_store_reports_connection_stats(storefront, fake_redis):
+    """
+    GIVEN an async store
+    WHEN it searches for cards
+    THEN its requests and connections are published to the
+    'http_connections' metric like those of the blocking stores.
+    """
+    store = _make_store(AsyncCrystalCommerceStore, storefront)
+
+    store.fetch_listings_many(["Test Card", "Test Card"])
+
+    metric = {
+        key.decode(): int(value)
+        for key, value in fake_redis.hgetall(
+            "metrics:http_connections"
+        ).items()
+    }
+    assert metric["test_store:requests"] == len(storefront.paths)
+    assert metric["test_store:new_connections"] >= 1
+    assert (
+        metric["test_store:new_connections"]
+        + metric.get("test_store:reused_connections", 0)
+        == len(storefront.paths)
+    )
+
+
+def test_redis_calls_do_not_run_on_the_event_loop(storefront, mocker):
+    """
+    GIVEN an async store
+    WHEN it scrapes a card
+    THEN its throttle and product cache are called from worker threads,
+    never on the event loop.
+    """
+    store = _make_store(AsyncCrystalCommerceStore, storefront)
+    on_loop = []
+
+    def record(func):
+        def wrapper(*args, **kwargs):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            return func(*args, **kwargs)
+        return wrapper
+
+    for name in ("acquire", "record_success"):
+        mocker.patch.object(
+            store.throttle, name, record(getattr(store.throttle, name))
+        )
+    for name in ("get", "set"):
+        mocker.patch.object(
+            store.product_cache, name,
+            record(getattr(store.product_cache, name)),
+        )
+
+    store._scrape_listings("Test Card")
+
+    assert on_loop and not any(on_loop)
+
+
+def test_job_deadline_reaches_the_event_loop(storefront):
+    """
+    GIVEN a job whose deadline has passed
+    WHEN an async store scrapes on the shared event loop
+    THEN the scrape sees the job's deadline and sends no request.
+    """
+    store = _make_store(AsyncCrystalCommerceStore, storefront)
+
+    with deadline.job_deadline(0) as job:
+        listings = store._scrape_listings("Test Card")
+
+    assert listings == []
+    assert storefront.paths == []
+    assert job.exceeded is True
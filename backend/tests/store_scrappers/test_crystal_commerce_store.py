@@ -2,6 +2,8 @@
 Unit tests for the CrystalCommerceStore base scraper.
 """
 
+import threading
+import time
 import unittest
 from unittest.mock import patch, MagicMock
 from schema.blocks import CardListingSchema
@@ -94,6 +96,23 @@ SEARCH_RESULTS_WITH_NON_MATCHING_HTML = """
   </li>
 </ul>
 """
+# Three printings of the same card, each with its own product page.
+SEARCH_RESULTS_MULTIPLE_PRINTINGS_HTML = "<ul class=\"products\">" + "".join(
+    f"""
+  <li class="product">
+    <a itemprop="url" href="/products/{number}-test-card"></a>
+    <h4 class="name" title="Test Card">Test Card</h4>
+    <div class="variants">
+      <div class="variant-row in-stock">
+        <div class="variant-description">Near Mint</div>
+        <div class="price">${number}.00</div>
+        <div class="variant-qty">1 In Stock</div>
+      </div>
+    </div>
+  </li>"""
+    for number in (1, 2, 3)
+) + "</ul>"
+
 # This HTML is missing the 'variants' div entirely.
 SEARCH_RESULTS_NO_VARIANTS = """
 <ul class="products">
@@ -141,7 +160,7 @@ class TestCrystalCommerceStore(
             )
         )
 
-    def mock_requests_get(self, url, params=None, timeout=None):
+    def mock_requests_get(self, url, params=None, timeout=None, **kwargs):
         """
         A custom mock function for requests.get.
         It returns different HTML based on the URL being requested.
@@ -423,6 +442,148 @@ class TestCrystalCommerceStore(
             "Should return an empty list if no variants are found",
         )
 
+    @patch(
+        "managers.store_manager.stores.storefronts.crystal_commerce_store."
+        "set_manager.set_code"
+    )
+    @patch(
+        "managers.store_manager.stores.storefronts.crystal_commerce_store."
+        "_make_request_with_retries"
+    )
+    def test_scrape_listings_warm_cache_makes_one_request(
+        self, mock_make_request, mock_set_manager_set_code
+    ):
+        """
+        Test that a repeat scrape with a warm product detail cache costs
+        exactly one search request, even from a fresh store instance.
+        """
+        mock_make_request.side_effect = self.mock_requests_get
+        mock_set_manager_set_code.return_value = "tst"
+
+        first_listings = self.scraper._scrape_listings("Test Card")
+        self.assertEqual(mock_make_request.call_count, 2)
+
+        # A second instance has an empty in-process LRU, so this exercises
+        # the shared Redis tier as another worker would.
+        other_worker_scraper = CrystalCommerceStore(
+            name=self.scraper.name,
+            slug=self.scraper.slug,
+            homepage=self.scraper.homepage,
+            search_url=self.scraper.search_url,
+        )
+        for scraper in (self.scraper, other_worker_scraper):
+            mock_make_request.reset_mock()
+            listings = scraper._scrape_listings("Test Card")
+
+            self.assertEqual(mock_make_request.call_count, 1)
+            self.assertIn(
+                "products/search", mock_make_request.call_args.args[0]
+            )
+            self.assertEqual(listings, first_listings)
+
+        self.assertEqual(self.scraper.product_cache.stats["memory_hits"], 1)
+        self.assertEqual(
+            other_worker_scraper.product_cache.stats["redis_hits"], 1
+        )
+
+    @patch(
+        "managers.store_manager.stores.storefronts."
+        "crystal_commerce_store._make_request_with_retries"
+    )
+    def test_product_details_not_cached_when_page_fails(
+        self, mock_make_request
+    ):
+        """
+        Test that a failed product page fetch is not cached, so the next
+        scrape tries the product page again.
+        """
+        mock_search_response = MagicMock()
+        mock_search_response.text = SEARCH_RESULTS_HTML
+        mock_make_request.side_effect = [mock_search_response, None] * 2
+
+        self.scraper._scrape_listings("Test Card")
+        self.scraper._scrape_listings("Test Card")
+
+        self.assertEqual(mock_make_request.call_count, 4)
+        self.assertEqual(self.scraper.product_cache.stats["misses"], 2)
+
+    @patch(
+        "managers.store_manager.stores.storefronts."
+        "crystal_commerce_store._make_request_with_retries"
+    )
+    def test_scrape_listings_fetches_product_pages_concurrently(
+        self, mock_make_request
+    ):
+        """
+        Test that product pages are fetched in parallel, never above the
+        store's concurrency limit, and that listings keep search order even
+        when later pages finish first.
+        """
+        scraper = CrystalCommerceStore(
+            name="Test Store",
+            slug="test_store",
+            homepage="https://test.com",
+            search_url="https://test.com/products/search",
+            max_concurrency=2,
+        )
+        lock = threading.Lock()
+        in_flight = {"now": 0, "peak": 0}
+
+        def mock_request_router(url, *args, **kwargs):
+            mock_resp = MagicMock()
+            if "search" in url:
+                mock_resp.text = SEARCH_RESULTS_MULTIPLE_PRINTINGS_HTML
+                return mock_resp
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            # Earlier products answer more slowly than later ones.
+            time.sleep(0.05 * (4 - int(url.rsplit("/", 1)[1][0])))
+            with lock:
+                in_flight["now"] -= 1
+            mock_resp.text = PRODUCT_PAGE_HTML
+            return mock_resp
+
+        mock_make_request.side_effect = mock_request_router
+
+        listings = scraper._scrape_listings("Test Card")
+
+        self.assertEqual([listing.price for listing in listings],
+                         [1.0, 2.0, 3.0])
+        self.assertEqual(mock_make_request.call_count, 4)
+        self.assertEqual(in_flight["peak"], 2)
+
+    def test_fetch_listings_many_searches_under_concurrency_limit(self):
+        """
+        Test that a batch of cards is searched for in parallel, never above
+        the store's concurrency limit, with listings in card order.
+        """
+        scraper = CrystalCommerceStore(
+            name="Test Store",
+            slug="test_store",
+            homepage="https://test.com",
+            search_url="https://test.com/products/search",
+            max_concurrency=2,
+        )
+        lock = threading.Lock()
+        in_flight = {"now": 0, "peak": 0}
+
+        def fetch_listings(card_name):
+            with lock:
+                in_flight["now"] += 1
+                in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            time.sleep(0.05)
+            with lock:
+                in_flight["now"] -= 1
+            return [card_name]
+
+        with patch.object(scraper, "fetch_listings",
+                          side_effect=fetch_listings):
+            listings = scraper.fetch_listings_many(["A", "B", "C", "D"])
+
+        self.assertEqual(listings, [["A"], ["B"], ["C"], ["D"]])
+        self.assertEqual(in_flight["peak"], 2)
+
     def test_parse_variants_handles_missing_data(self):
         """
         Test that _parse_variants can handle a row with missing price/qty and
@@ -0,0 +1,161 @@
+"""
+Unit tests for per-job scrape deadlines.
+"""
+
+import threading
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from managers.store_manager.stores import deadline
+from managers.store_manager.stores.storefronts.crystal_commerce_store import (
+    _make_request_with_retries,
+)
+
+MODULE = "managers.store_manager.stores.storefronts.crystal_commerce_store"
+
+
+def _response(text="ok", status_code=200):
+    response = MagicMock()
+    response.text = text
+    response.status_code = status_code
+    response.headers = {}
+    return response
+
+
+def test_no_deadline_leaves_timeouts_alone():
+    """
+    GIVEN no job deadline
+    WHEN a timeout is clamped or a wait is checked
+    THEN the timeout is unchanged and nothing is cut short.
+    """
+    assert deadline.current() is None
+    assert deadline.clamp(10) == 10
+    assert deadline.cuts(3600) is False
+
+
+def test_request_timeout_and_throttle_wait_are_clamped():
+    """
+    GIVEN a job with a few seconds left
+    WHEN a request is made with a longer timeout
+    THEN the request timeout and throttle wait are clamped to the time left.
+    """
+    session = MagicMock()
+    session.get.return_value = _response()
+    throttle = MagicMock()
+    throttle.wait.return_value = True
+
+    with deadline.job_deadline(5) as job:
+        _make_request_with_retries(
+            "https://test.com/search",
+            session=session,
+            throttle=throttle,
+            timeout=10,
+        )
+
+    assert 0 < session.get.call_args.kwargs["timeout"] <= 5
+    assert 0 < throttle.wait.call_args.kwargs["max_wait"] <= 5
+    assert job.exceeded is False
+
+
+def test_expired_deadline_skips_the_request():
+    """
+    GIVEN a job whose deadline has passed
+    WHEN a request is made
+    THEN it is not sent and the deadline is marked exceeded.
+    """
+    session = MagicMock()
+
+    with deadline.job_deadline(0) as job:
+        response = _make_request_with_retries(
+            "https://test.com/search", session=session, timeout=10
+        )
+
+    assert response is None
+    session.get.assert_not_called()
+    assert job.exceeded is True
+
+
+@patch(f"{MODULE}.time.sleep")
+def test_backoff_past_the_deadline_gives_up(mock_sleep):
+    """
+    GIVEN a failing request whose backoff would end after the job deadline
+    WHEN it is retried
+    THEN the request is given up without sleeping or blaming the store.
+    """
+    failing = _response(status_code=500)
+    failing.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        "500 Server Error"
+    )
+    session = MagicMock()
+    session.get.return_value = failing
+    throttle = MagicMock()
+    throttle.wait.return_value = True
+
+    with deadline.job_deadline(0.2) as job:
+        response = _make_request_with_retries(
+            "https://test.com/search",
+            session=session,
+            throttle=throttle,
+            backoff_factor=1,
+        )
+
+    assert response is None
+    assert session.get.call_count == 1
+    mock_sleep.assert_not_called()
+    throttle.record_failure.assert_not_called()
+    assert job.exceeded is True
+
+
+def test_timeout_cut_short_by_deadline_is_not_a_store_failure():
+    """
+    GIVEN a request that times out because the job deadline clamped it
+    WHEN the deadline has passed by the time it fails
+    THEN it is not retried and does not count towards the circuit breaker.
+    """
+    session = MagicMock()
+    throttle = MagicMock()
+    throttle.wait.return_value = True
+
+    with deadline.job_deadline(0.05) as job:
+        def time_out(url, **kwargs):
+            job.expires_at = 0
+            raise requests.exceptions.Timeout("read timed out")
+
+        session.get.side_effect = time_out
+        response = _make_request_with_retries(
+            "https://test.com/search",
+            session=session,
+            throttle=throttle,
+            timeout=10,
+        )
+
+    assert response is None
+    assert session.get.call_count == 1
+    throttle.record_failure.assert_not_called()
+    assert job.exceeded is True
+
+
+def test_propagate_carries_the_deadline_to_other_threads():
+    """
+    GIVEN a job deadline
+    WHEN work bound with `propagate` runs on another thread
+    THEN it sees the job's deadline, while unbound work does not.
+    """
+    seen = {}
+
+    def record(name):
+        seen[name] = deadline.current()
+
+    with deadline.job_deadline(30) as job:
+        bound = threading.Thread(
+            target=deadline.propagate(record), args=("bound",)
+        )
+        unbound = threading.Thread(target=record, args=("unbound",))
+        bound.start()
+        unbound.start()
+        bound.join()
+        unbound.join()
+
+    assert seen == {"bound": job, "unbound": None}
+    assert deadline.current() is None
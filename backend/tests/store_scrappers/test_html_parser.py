@@ -0,0 +1,123 @@
+"""
+Tests that the fast HTML parsing backends give exactly the same results as
+a full `html.parser` tree on the scraper fixtures.
+"""
+
+import pytest
+from bs4 import BeautifulSoup
+
+from managers.store_manager.stores import html_parser
+from managers.store_manager.stores.storefronts.crystal_commerce_store import (
+    CrystalCommerceStore,
+)
+from tests.store_scrappers import test_crystal_commerce_store as fixtures
+
+SEARCH_PAGES = [
+    "SEARCH_RESULTS_HTML",
+    "SEARCH_RESULTS_HTML_WITH_DUPLICATES",
+    "SEARCH_RESULTS_WITH_NON_MATCHING_HTML",
+    "SEARCH_RESULTS_MULTIPLE_PRINTINGS_HTML",
+    "SEARCH_RESULTS_NO_VARIANTS",
+    "SEARCH_RESULTS_WITH_DATA_PRICE",
+]
+BACKENDS = [html_parser.HTML_PARSER, html_parser.LXML_PARSER]
+
+
+@pytest.fixture
+def scraper():
+    return CrystalCommerceStore(
+        name="Test Store",
+        slug="test_store",
+        homepage="https://test.com",
+        search_url="https://test.com/products/search",
+    )
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("page", SEARCH_PAGES)
+def test_search_results_match_full_parse(scraper, page, backend):
+    """
+    GIVEN a search result fixture
+    WHEN it is parsed with a strainer by each backend
+    THEN the product blocks serialize byte for byte like a full
+         html.parser tree, and yield the same scraped data.
+    """
+    markup = getattr(fixtures, page)
+    reference = scraper._get_product_listings(
+        BeautifulSoup(markup, "html.parser")
+    )
+
+    products = scraper._get_product_listings(
+        html_parser.parse_search_results(markup, backend)
+    )
+
+    assert [str(p).encode() for p in products] == [
+        str(p).encode() for p in reference
+    ]
+    assert [scraper._parse_variants(p) for p in products] == [
+        scraper._parse_variants(p) for p in reference
+    ]
+    assert [
+        (name, url)
+        for _, name, url in scraper._find_matching_products(
+            html_parser.parse_search_results(markup, backend), "Test Card"
+        )
+    ] == [
+        (name, url)
+        for _, name, url in scraper._find_matching_products(
+            BeautifulSoup(markup, "html.parser"), "Test Card"
+        )
+    ]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_product_page_matches_full_parse(scraper, backend, mocker):
+    """
+    GIVEN the product page fixture
+    WHEN it is parsed with a strainer by each backend
+    THEN the details block and the parsed details match a full parse.
+    """
+    mocker.patch(
+        "managers.store_manager.stores.storefronts.crystal_commerce_store"
+        ".set_manager.set_code",
+        return_value="TST",
+    )
+    markup = fixtures.PRODUCT_PAGE_HTML
+    reference = BeautifulSoup(markup, "html.parser")
+
+    soup = html_parser.parse_product_page(markup, backend)
+
+    assert str(soup.find("div", class_="product-more-info")).encode() == (
+        str(reference.find("div", class_="product-more-info")).encode()
+    )
+    assert scraper._parse_product_page_details(soup) == (
+        scraper._parse_product_page_details(reference)
+    )
+
+
+def test_strainer_skips_unread_markup():
+    """
+    GIVEN a page with content outside the product blocks
+    WHEN it is parsed for search results
+    THEN only the product blocks are built.
+    """
+    markup = (
+        "<html><head><script>var x = 1;</script></head><body>"
+        "<nav><a href='/'>Home</a></nav>"
+        + fixtures.SEARCH_RESULTS_HTML
+        + "<footer>Footer</footer></body></html>"
+    )
+
+    soup = html_parser.parse_search_results(markup)
+
+    assert soup.find("nav") is None
+    assert soup.find("script") is None
+    assert len(soup.find_all("li", class_="product")) == 1
+
+
+def test_unknown_parser_falls_back_to_html_parser():
+    soup = html_parser.parse_product_page(
+        fixtures.PRODUCT_PAGE_HTML, parser="not-a-parser"
+    )
+
+    assert soup.find("div", class_="product-more-info") is not None
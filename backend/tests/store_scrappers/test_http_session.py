@@ -0,0 +1,203 @@
+"""
+Unit tests for the pooled HTTP session used by store scrapers.
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from managers.store_manager.stores import http_session
+from managers.store_manager.stores.storefronts.crystal_commerce_store import (
+    CrystalCommerceStore,
+    _make_request_with_retries,
+)
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    """A tiny HTTP/1.1 handler that keeps connections open."""
+
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b"<html></html>"
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    """Runs a local keep-alive HTTP server for the duration of a test."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_create_session_configures_pooling_and_compression():
+    """
+    GIVEN a new store session
+    WHEN it is created
+    THEN it should cap connections per host and negotiate compression.
+    """
+    session = http_session.create_session(pool_maxsize=3)
+
+    adapter = session.get_adapter("https://example.com")
+    assert adapter._pool_maxsize == 3
+    assert adapter._pool_block is True
+    assert "gzip" in session.headers["Accept-Encoding"]
+    assert session.headers["Connection"] == "keep-alive"
+
+
+def test_connection_stats_counts_reused_connections(local_server):
+    """
+    GIVEN a session talking to a keep-alive server
+    WHEN several requests are made to the same host
+    THEN only one new connection is opened and the rest are reused.
+    """
+    session = http_session.create_session()
+
+    for _ in range(3):
+        session.get(f"{local_server}/products/search").raise_for_status()
+
+    stats = http_session.connection_stats(session)
+    assert stats == {
+        "requests": 3,
+        "new_connections": 1,
+        "reused_connections": 2,
+    }
+
+
+def test_make_request_with_retries_uses_given_session():
+    """
+    GIVEN a session
+    WHEN _make_request_with_retries is called with it
+    THEN the request goes through the session rather than requests.get.
+    """
+    session = MagicMock()
+    session.get.return_value.text = "ok"
+
+    response = _make_request_with_retries(
+        "https://test.com/search", session=session, timeout=10
+    )
+
+    assert response is session.get.return_value
+    session.get.assert_called_once_with("https://test.com/search", timeout=10)
+
+
+def test_store_reuses_session_and_reports_stats(fake_redis):
+    """
+    GIVEN a store instance
+    WHEN its session is accessed repeatedly and stats are reported
+    THEN the same session is returned and only new usage is published.
+    """
+    store = CrystalCommerceStore(
+        name="Test Store",
+        slug="test_store",
+        homepage="https://test.com",
+        search_url="https://test.com/search",
+    )
+    assert store.session is store.session
+
+    store.connection_stats = MagicMock(
+        return_value={
+            "requests": 5,
+            "new_connections": 1,
+            "reused_connections": 4,
+        }
+    )
+    store._report_connection_stats()
+    store.connection_stats.return_value = {
+        "requests": 7,
+        "new_connections": 1,
+        "reused_connections": 6,
+    }
+    store._report_connection_stats()
+
+    metric = fake_redis.hgetall("metrics:http_connections")
+    assert metric[b"test_store:requests"] == b"7"
+    assert metric[b"test_store:new_connections"] == b"1"
+    assert metric[b"test_store:reused_connections"] == b"6"
+
+
+def _run_in_threads(target, count=8):
+    threads = [threading.Thread(target=target) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def test_store_creates_one_session_across_threads():
+    """
+    GIVEN a store whose session has not been created yet
+    WHEN several threads use it at once
+    THEN they all share a single session.
+    """
+    store = CrystalCommerceStore(
+        name="Test Store",
+        slug="test_store",
+        homepage="https://test.com",
+        search_url="https://test.com/search",
+    )
+    sessions = []
+
+    def slow_create_session(**kwargs):
+        time.sleep(0.05)
+        return MagicMock()
+
+    with patch.object(
+        http_session, "create_session", side_effect=slow_create_session
+    ) as create_session:
+        _run_in_threads(lambda: sessions.append(store.session))
+
+    create_session.assert_called_once()
+    assert all(session is sessions[0] for session in sessions)
+
+
+def test_store_reports_each_request_once_across_threads(fake_redis):
+    """
+    GIVEN a store whose threads report connection stats at the same time
+    WHEN every report has finished
+    THEN the published counters match the session's, with nothing counted
+      twice.
+    """
+    store = CrystalCommerceStore(
+        name="Test Store",
+        slug="test_store",
+        homepage="https://test.com",
+        search_url="https://test.com/search",
+    )
+
+    class SlowStats(dict):
+        """Stats whose lookups are slow enough for reports to overlap."""
+
+        def get(self, key, default=None):
+            time.sleep(0.01)
+            return super().get(key, default)
+
+    store._reported_connection_stats = SlowStats(
+        requests=0, new_connections=0, reused_connections=0
+    )
+    store.connection_stats = MagicMock(
+        return_value={
+            "requests": 10,
+            "new_connections": 2,
+            "reused_connections": 8,
+        }
+    )
+    _run_in_threads(store._report_connection_stats)
+
+    metric = fake_redis.hgetall("metrics:http_connections")
+    assert metric[b"test_store:requests"] == b"10"
+    assert metric[b"test_store:reused_connections"] == b"8"
@@ -0,0 +1,92 @@
+"""
+Unit tests for the two-tier product detail cache.
+"""
+
+from managers import metrics_manager
+from managers.store_manager.stores.product_detail_cache import (
+    ProductDetailCache,
+)
+
+PRODUCT_URL = "https://test.com/products/1234-test-card"
+DETAILS = {"name": "Test Card", "set_code": "TST", "collector_number": "123"}
+
+
+def test_miss_then_memory_hit(fake_redis):
+    """
+    GIVEN an empty cache
+    WHEN a product is looked up, stored, and looked up again
+    THEN the first lookup misses and the second is served from memory.
+    """
+    product_cache = ProductDetailCache("test_store")
+
+    assert product_cache.get(PRODUCT_URL) is None
+    product_cache.set(PRODUCT_URL, DETAILS)
+
+    assert product_cache.get(PRODUCT_URL) == DETAILS
+    assert product_cache.stats == {
+        "memory_hits": 1,
+        "redis_hits": 0,
+        "misses": 1,
+    }
+    assert product_cache.hit_ratio() == 0.5
+
+
+def test_redis_tier_is_shared_between_instances(fake_redis):
+    """
+    GIVEN details cached by one worker's cache instance
+    WHEN a different instance for the same store looks them up
+    THEN they are served from Redis with the configured TTL.
+    """
+    ProductDetailCache("test_store").set(PRODUCT_URL, DETAILS)
+    other_worker_cache = ProductDetailCache("test_store")
+
+    assert other_worker_cache.get(PRODUCT_URL) == DETAILS
+    assert other_worker_cache.stats["redis_hits"] == 1
+    assert fake_redis.ttl(f"product_details:test_store:{PRODUCT_URL}") > 0
+
+    # The entry is now promoted to the in-process tier.
+    assert other_worker_cache.get(PRODUCT_URL) == DETAILS
+    assert other_worker_cache.stats["memory_hits"] == 1
+
+
+def test_entries_are_scoped_per_store(fake_redis):
+    """
+    GIVEN the same product URL cached for one store
+    WHEN another store looks it up
+    THEN it is a miss.
+    """
+    ProductDetailCache("store_a").set(PRODUCT_URL, DETAILS)
+
+    assert ProductDetailCache("store_b").get(PRODUCT_URL) is None
+
+
+def test_lru_evicts_least_recently_used(fake_redis):
+    """
+    GIVEN a cache with room for two entries
+    WHEN a third entry is added
+    THEN the least recently used entry leaves the in-process tier.
+    """
+    product_cache = ProductDetailCache("test_store", max_size=2)
+    product_cache.set("a", DETAILS)
+    product_cache.set("b", DETAILS)
+    product_cache.get("a")
+    product_cache.set("c", DETAILS)
+
+    assert list(product_cache._lru.keys()) == ["a", "c"]
+
+
+def test_hits_and_misses_are_published_as_metrics(fake_redis):
+    """
+    GIVEN cache lookups
+    WHEN they hit and miss
+    THEN per-store counters are recorded in the shared metric.
+    """
+    product_cache = ProductDetailCache("test_store")
+    product_cache.get(PRODUCT_URL)
+    product_cache.set(PRODUCT_URL, DETAILS)
+    product_cache.get(PRODUCT_URL)
+
+    assert metrics_manager.get_metric("product_detail_cache") == {
+        "test_store:misses": 1,
+        "test_store:memory_hits": 1,
+    }
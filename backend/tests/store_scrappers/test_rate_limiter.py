@@ -0,0 +1,128 @@
+"""
+Unit tests for the Redis-backed per-store token bucket.
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import pytest
+
+from managers.store_manager.stores.rate_limiter import RedisTokenBucket
+from managers.store_manager.stores.throttle import StoreThrottle
+
+
+def test_bucket_allows_burst_then_throttles(fake_redis):
+    """
+    GIVEN a bucket with a burst of 3 at 2 requests per second
+    WHEN 4 tokens are requested back to back
+    THEN the first 3 pass and the 4th waits about half a second.
+    """
+    bucket = RedisTokenBucket("test_store", rate=2, burst=3)
+
+    waits = [bucket.try_acquire() for _ in range(4)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert 0.4 < waits[3] <= 0.5
+    assert fake_redis.ttl("rate_limit:test_store") > 0
+
+
+def test_bucket_is_shared_between_workers(fake_redis):
+    """
+    GIVEN two limiter instances for the same store, as in two workers
+    WHEN both take tokens
+    THEN they draw on one budget, while other stores are unaffected.
+    """
+    worker_a = RedisTokenBucket("test_store", rate=1, burst=2)
+    worker_b = RedisTokenBucket("test_store", rate=1, burst=2)
+    other_store = RedisTokenBucket("other_store", rate=1, burst=2)
+
+    assert worker_a.try_acquire() == 0.0
+    assert worker_b.try_acquire() == 0.0
+    assert worker_a.try_acquire() > 0
+    assert worker_b.try_acquire() > 0
+    assert other_store.try_acquire() == 0.0
+
+
+def test_bucket_refills_over_time(fake_redis):
+    """
+    GIVEN an exhausted bucket
+    WHEN enough time passes for a token to accumulate
+    THEN the next request is allowed.
+    """
+    bucket = RedisTokenBucket("test_store", rate=50, burst=1)
+    assert bucket.try_acquire() == 0.0
+    assert bucket.try_acquire() > 0
+
+    time.sleep(0.05)
+
+    assert bucket.try_acquire() == 0.0
+
+
+def test_bucket_records_throttling_metric(fake_redis):
+    """
+    GIVEN an exhausted bucket
+    WHEN a request is throttled
+    THEN the throttle count and wait time are recorded.
+    """
+    bucket = RedisTokenBucket("test_store", rate=1, burst=1)
+    bucket.try_acquire()
+    bucket.try_acquire()
+
+    metric = fake_redis.hgetall("metrics:rate_limiter")
+    assert metric[b"test_store:throttled"] == b"1"
+    assert float(metric[b"test_store:wait_seconds"]) > 0
+
+
+def test_bucket_fails_open_without_redis(mocker):
+    """
+    GIVEN Redis is unavailable
+    WHEN a token is requested
+    THEN the request is allowed rather than blocking all scraping.
+    """
+    mocker.patch(
+        "managers.store_manager.stores.rate_limiter.redis_manager"
+        ".get_redis_connection",
+        side_effect=ConnectionError("down"),
+    )
+
+    bucket = RedisTokenBucket("test_store", rate=1, burst=1)
+
+    assert bucket.try_acquire() == 0.0
+
+
+def test_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        RedisTokenBucket("test_store", rate=0, burst=1)
+
+
+def test_throttle_waits_for_rate_limiter(mocker):
+    """
+    GIVEN a throttle whose rate limiter asks the caller to wait once
+    WHEN wait is called
+    THEN it sleeps for the requested time and then takes a token.
+    """
+    mock_sleep = mocker.patch(
+        "managers.store_manager.stores.throttle.time.sleep"
+    )
+    rate_limiter = MagicMock()
+    rate_limiter.try_acquire.side_effect = [0.25, 0.0]
+    throttle = StoreThrottle("test_store", rate_limiter=rate_limiter)
+
+    throttle.wait()
+
+    mock_sleep.assert_called_once_with(0.25)
+    assert rate_limiter.try_acquire.call_count == 2
+
+
+def test_paused_throttle_does_not_take_tokens():
+    """
+    GIVEN a paused throttle
+    WHEN a request asks for permission
+    THEN the pause is reported without spending a rate limiter token.
+    """
+    rate_limiter = MagicMock()
+    throttle = StoreThrottle("test_store", rate_limiter=rate_limiter)
+    throttle.pause(10)
+
+    assert throttle.acquire() > 9
+    rate_limiter.try_acquire.assert_not_called()
@@ -0,0 +1,126 @@
+"""
+Tests for recording store responses into a corpus and replaying them.
+"""
+
+import pytest
+import requests
+
+from managers.store_manager.stores import replay
+from managers.store_manager.stores.storefronts.crystal_commerce_store import (
+    CrystalCommerceStore,
+)
+from tests.store_scrappers import test_crystal_commerce_store as fixtures
+
+HOMEPAGE = "https://test.com"
+SEARCH_URL = "https://test.com/products/search"
+
+
+@pytest.fixture
+def scraper():
+    return CrystalCommerceStore(
+        name="Test Store",
+        slug="test_store",
+        homepage=HOMEPAGE,
+        search_url=SEARCH_URL,
+        max_concurrency=1,
+        rate_limit_per_second=0,
+    )
+
+
+@pytest.fixture
+def corpus():
+    corpus = replay.ResponseCorpus(metadata={"cards": ["Test Card"]})
+    corpus.add(
+        SEARCH_URL,
+        fixtures.SEARCH_RESULTS_HTML,
+        params={"q": "Test Card", "c": 1},
+    )
+    corpus.add(
+        f"{HOMEPAGE}/products/1234-test-card", fixtures.PRODUCT_PAGE_HTML
+    )
+    return corpus
+
+
+def test_corpus_round_trips_through_gzip(corpus, tmp_path):
+    """
+    GIVEN a corpus with recorded pages
+    WHEN it is saved and loaded again
+    THEN its responses and metadata are unchanged
+    """
+    path = tmp_path / "corpus.json.gz"
+    corpus.save(str(path))
+
+    loaded = replay.ResponseCorpus.load(str(path))
+
+    assert loaded.responses == corpus.responses
+    assert loaded.metadata == {"cards": ["Test Card"]}
+
+
+def test_replayed_scrape_needs_no_network(scraper, corpus, mocker):
+    """
+    GIVEN a store whose session replays a corpus
+    WHEN its listings are scraped
+    THEN every page is served from the corpus and parsed as usual
+    """
+    mocker.patch(
+        "managers.store_manager.stores.storefronts.crystal_commerce_store."
+        "set_manager.set_code",
+        return_value="tst",
+    )
+    scraper.session = replay.create_replay_session(corpus)
+
+    listings = scraper._scrape_listings("Test Card")
+
+    assert [(listing.price, listing.finish) for listing in listings] == [
+        (10.0, "non-foil"),
+        (25.0, "foil"),
+    ]
+    assert listings[0].set_code == "tst"
+    assert listings[0].collector_number == "123"
+    adapter = scraper.session.replay_adapter
+    assert (adapter.hits, adapter.misses) == (2, 0)
+
+
+def test_replay_answers_unrecorded_requests_with_404(corpus):
+    """
+    GIVEN a replay session
+    WHEN a request that was never recorded is sent
+    THEN it gets a 404 response and is counted as a miss
+    """
+    session = replay.create_replay_session(corpus)
+
+    response = session.get(f"{HOMEPAGE}/products/9999-missing")
+
+    assert response.status_code == 404
+    assert session.replay_adapter.misses == 1
+
+
+def test_recording_session_saves_decoded_responses(mocker):
+    """
+    GIVEN a recording session
+    WHEN a response is received from the store
+    THEN its decoded body is added to the corpus without transfer headers
+    """
+    corpus = replay.ResponseCorpus()
+    session = replay.create_recording_session(corpus)
+
+    def send(adapter, request, **kwargs):
+        response = requests.Response()
+        response.request = request
+        response.url = request.url
+        response.status_code = 200
+        response.headers["Content-Type"] = "text/html"
+        response.headers["Content-Encoding"] = "gzip"
+        response.encoding = "utf-8"
+        response._content = "<p>Café</p>".encode("utf-8")
+        return response
+
+    mocker.patch.object(requests.adapters.HTTPAdapter, "send", send)
+
+    session.get(SEARCH_URL, params={"q": "Test Card", "c": 1})
+
+    recorded = corpus.get(
+        replay.request_key(SEARCH_URL, {"q": "Test Card", "c": 1})
+    )
+    assert recorded["body"] == "<p>Café</p>"
+    assert recorded["headers"] == {"Content-Type": "text/html"}
@@ -24,6 +24,9 @@ def test_store_registry_loads_from_db(mock_database):
         "https://authoritygames.crystalcommerce.com/products/search"
     )
     mock_store_1.fetch_strategy = "crystal_commerce"
+    mock_store_1.max_concurrency = 2
+    mock_store_1.rate_limit_per_second = 0.5
+    mock_store_1.rate_limit_burst = 3
 
     mock_database.get_all_stores.return_value = [mock_store_1]
 
@@ -49,3 +52,6 @@ def test_store_registry_loads_from_db(mock_database):
         registry["authority_games_mesa_az"].name ==
         "Authority Games (Mesa, AZ)"
     )
+    assert registry["authority_games_mesa_az"].max_concurrency == 2
+    rate_limiter = registry["authority_games_mesa_az"].throttle.rate_limiter
+    assert (rate_limiter.rate, rate_limiter.burst) == (0.5, 3)
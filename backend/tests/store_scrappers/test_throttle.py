@@ -0,0 +1,161 @@
+"""
+Unit tests for the per-store request throttle and its use when retrying
+rate-limited requests.
+"""
+
+from unittest.mock import MagicMock, patch
+
+import requests
+
+from managers.store_manager.stores.throttle import StoreThrottle
+from managers.store_manager.stores.storefronts.crystal_commerce_store import (
+    _make_request_with_retries,
+)
+
+MODULE = "managers.store_manager.stores.storefronts.crystal_commerce_store"
+
+
+def _response(text="ok", status_code=200, headers=None):
+    response = MagicMock()
+    response.text = text
+    response.status_code = status_code
+    response.headers = headers or {}
+    return response
+
+
+def _throttle():
+    throttle = MagicMock()
+    throttle.wait.return_value = True
+    throttle.record_rate_limit.return_value = 0.5
+    return throttle
+
+
+def test_pause_sets_delay_and_only_extends():
+    """
+    GIVEN a throttle
+    WHEN it is paused twice with different durations
+    THEN the longer pause wins and delay reports the remaining time.
+    """
+    throttle = StoreThrottle("test_store")
+    assert throttle.delay() == 0.0
+
+    throttle.pause(10)
+    throttle.pause(1)
+
+    assert 9 < throttle.delay() <= 10
+
+
+def test_wait_blocks_until_pause_expires():
+    """
+    GIVEN a briefly paused throttle
+    WHEN wait is called
+    THEN it returns once the pause has elapsed.
+    """
+    throttle = StoreThrottle("test_store")
+    throttle.pause(0.02)
+
+    throttle.wait()
+
+    assert throttle.delay() == 0.0
+
+
+@patch(f"{MODULE}.time.sleep")
+def test_rate_limit_pauses_the_shared_throttle(mock_sleep):
+    """
+    GIVEN a store that answers 'too many searches' once
+    WHEN a request is retried through a throttle
+    THEN the backoff is applied to the throttle, not just this request.
+    """
+    throttle = _throttle()
+    session = MagicMock()
+    session.get.side_effect = [
+        _response("Sorry, too many searches"),
+        _response("<html></html>"),
+    ]
+
+    response = _make_request_with_retries(
+        "https://test.com/search", session=session, throttle=throttle
+    )
+
+    assert response.text == "<html></html>"
+    throttle.record_rate_limit.assert_called_once_with(None)
+    throttle.record_success.assert_called_once()
+    assert throttle.wait.call_count == 2
+    mock_sleep.assert_not_called()
+
+
+@patch(f"{MODULE}.time.sleep")
+def test_http_429_is_treated_as_rate_limit(mock_sleep):
+    """
+    GIVEN a store that answers HTTP 429
+    WHEN the request is retried through a throttle
+    THEN the throttle backs off for the store's Retry-After delay.
+    """
+    throttle = _throttle()
+    session = MagicMock()
+    session.get.side_effect = [
+        _response(status_code=429, headers={"Retry-After": "7"}),
+        _response(),
+    ]
+
+    _make_request_with_retries(
+        "https://test.com/search", session=session, throttle=throttle
+    )
+
+    throttle.record_rate_limit.assert_called_once_with(7.0)
+    mock_sleep.assert_not_called()
+
+
+@patch(f"{MODULE}.time.sleep")
+def test_other_errors_only_delay_the_failing_request(mock_sleep):
+    """
+    GIVEN a request that fails with a server error
+    WHEN it is retried through a throttle
+    THEN only that request sleeps; the shared throttle is left alone.
+    """
+    throttle = _throttle()
+    failing = _response(status_code=500)
+    failing.raise_for_status.side_effect = requests.exceptions.HTTPError(
+        "500 Server Error"
+    )
+    session = MagicMock()
+    session.get.side_effect = [failing, _response()]
+
+    _make_request_with_retries(
+        "https://test.com/search", session=session, throttle=throttle
+    )
+
+    throttle.record_rate_limit.assert_not_called()
+    mock_sleep.assert_called_once_with(0.5)
+
+
+@patch(f"{MODULE}.time.sleep")
+def test_long_backoff_skips_request_instead_of_sleeping(mock_sleep):
+    """
+    GIVEN a store that is backing off for longer than a job should wait
+    WHEN a request is made through the throttle
+    THEN the request is abandoned without being sent.
+    """
+    throttle = _throttle()
+    throttle.wait.return_value = False
+    session = MagicMock()
+
+    response = _make_request_with_retries(
+        "https://test.com/search", session=session, throttle=throttle
+    )
+
+    assert response is None
+    session.get.assert_not_called()
+    mock_sleep.assert_not_called()
+
+
+def test_wait_gives_up_when_delay_exceeds_max_wait():
+    """
+    GIVEN a throttle paused for 10 seconds
+    WHEN wait is called with a 1 second limit
+    THEN it returns False immediately.
+    """
+    throttle = StoreThrottle("test_store")
+    throttle.pause(10)
+
+    assert throttle.wait(max_wait=1) is False
@@ -1,8 +1,17 @@
 import pytest
 from unittest.mock import MagicMock, call
 
+from data.database.models.orm_models import UserTrackedCards
+from managers import availability_manager
+from managers.availability_manager.availability_singleflight import (
+    WAITING_FLIGHTS_KEY,
+)
+from managers.store_manager.stores import deadline
+from tasks import refresh_scheduler
 from tasks.card_availability_tasks import (
+    release_due_availability_checks,
     update_availability_single_card,
+    update_availability_store_batch,
     update_all_tracked_cards_availability,
 )
 
@@ -13,6 +22,12 @@ def mock_publish_pubsub(mocker):
     return mocker.patch("managers.redis_manager.publish_pubsub")
 
 
+@pytest.fixture
+def release_immediately(mocker):
+    """Makes newly scheduled pairs due at once instead of spread out."""
+    mocker.patch("tasks.refresh_scheduler.REFRESH_SPREAD_SECONDS", 0)
+
+
 def test_update_availability_single_card_success(
     mock_store, mock_publish_pubsub, mock_socket_emit_worker
 ):
@@ -95,34 +110,413 @@ def test_update_availability_single_card_success(
     mock_socket_emit_worker.assert_has_calls(expected_calls, any_order=False)
 
 
+def test_update_availability_single_card_records_check_in_schedule(
+    mock_store, mock_publish_pubsub, mock_socket_emit_worker, mocker,
+    fake_redis
+):
+    """
+    GIVEN a scheduled card whose cached listings differ from what checks find
+    WHEN update_availability_single_card completes a check with the sweep's
+    specifications, and one with a single user's narrower ones
+    THEN only the first is recorded in the refresh schedule, as a change
+    """
+    foil = {"set_code": "C21", "collector_number": "125", "finish": "foil"}
+    etched = {"set_code": "CMR", "collector_number": 1, "finish": "etched"}
+    refresh_scheduler.sync_schedule([{
+        "store": "test-store",
+        "card_name": "Sol Ring",
+        "card_specs": [foil, etched],
+        "users": {"alice": [foil], "bob": [etched]},
+    }])
+    mock_record_check = mocker.patch(
+        "tasks.card_availability_tasks.refresh_scheduler.record_check"
+    )
+    mocker.patch(
+        "tasks.card_availability_tasks.availability_manager"
+        ".get_cached_availability_data",
+        return_value=[{"price": 2.5}],
+    )
+    mock_store_instance = MagicMock()
+    mock_store_instance.fetch_card_availability.return_value = [
+        {"price": 1.99}
+    ]
+    mock_store.get_store.return_value = mock_store_instance
+
+    update_availability_single_card("alice", "test-store", {
+        "name": "Sol Ring",
+        "card_specs": [{**etched, "collector_number": "1"}, foil],
+    })
+    update_availability_single_card(
+        "alice", "test-store", {"name": "Sol Ring", "card_specs": [foil]}
+    )
+
+    mock_record_check.assert_called_once_with("test-store", "Sol Ring", True)
+
+
+def test_update_availability_single_card_joins_scrape_in_flight(
+    mock_store,
+    mock_publish_pubsub,
+    mock_socket_emit_worker,
+    fake_redis,
+):
+    """
+    GIVEN a second user asks for the same card while the first scrape runs
+    WHEN both jobs run
+    THEN the second job ends at once, the store is scraped once, the circuit
+    breaker is consulted once, one result is published, and both users
+    receive the listings
+    """
+    card_data = {"name": "Sol Ring", "card_specs": []}
+    listings = [{"price": 1.99}]
+    mock_store_instance = MagicMock()
+    bob = {}
+
+    def scrape(card_name, card_specs):
+        # Bob's job runs while Alice's scrape is still in flight.
+        bob["result"] = update_availability_single_card(
+            "bob", "test-store", card_data
+        )
+        return listings
+
+    mock_store_instance.fetch_card_availability.side_effect = scrape
+    mock_store.get_store.return_value = mock_store_instance
+
+    assert update_availability_single_card(
+        "alice", "test-store", card_data
+    ) is True
+
+    assert bob["result"] is True
+    mock_store_instance.fetch_card_availability.assert_called_once()
+    mock_store_instance.circuit_breaker.allow_request.assert_called_once()
+    mock_publish_pubsub.assert_called_once()
+    assert [
+        (c.kwargs["room"], c.args[1]["items"])
+        for c in mock_socket_emit_worker.call_args_list
+        if c.args[0] == "card_availability_data"
+    ] == [("alice", listings), ("bob", listings)]
+
+
+def _cut_short_scrape(listings):
+    """A store scrape that runs out of job time after finding `listings`."""
+    def scrape(card_name, card_specs):
+        deadline.current().exceeded = True
+        return listings
+    return scrape
+
+
+def test_update_availability_single_card_requeues_check_cut_short(
+    mock_store,
+    mock_publish_pubsub,
+    mock_socket_emit_worker,
+    mocker,
+    fake_redis,
+):
+    """
+    GIVEN a scrape that runs past its job deadline while a second user waits
+    WHEN update_availability_single_card is called
+    THEN the partial listings are sent flagged as incomplete, but neither
+    published for caching, recorded in the schedule nor kept for reuse, and
+    the check is re-queued on a lower lane for both users
+    """
+    mock_queue_task = mocker.patch(
+        "tasks.card_availability_tasks.task_manager.queue_task"
+    )
+    mock_record_check = mocker.patch(
+        "tasks.card_availability_tasks.refresh_scheduler.record_check"
+    )
+    card_data = {"name": "Sol Ring", "card_specs": []}
+    listings = [{"price": 1.99}]
+    scrape = _cut_short_scrape(listings)
+    mock_store_instance = MagicMock()
+
+    def scrape_while_bob_waits(card_name, card_specs):
+        update_availability_single_card("bob", "test-store", card_data)
+        return scrape(card_name, card_specs)
+
+    mock_store_instance.fetch_card_availability.side_effect = (
+        scrape_while_bob_waits
+    )
+    mock_store.get_store.return_value = mock_store_instance
+
+    assert update_availability_single_card(
+        "alice", "test-store", card_data
+    ) is True
+
+    mock_publish_pubsub.assert_not_called()
+    mock_record_check.assert_not_called()
+    assert [
+        (c.kwargs["room"], c.args[1].get("incomplete"))
+        for c in mock_socket_emit_worker.call_args_list
+        if c.args[0] == "card_availability_data"
+    ] == [("alice", True), ("bob", True)]
+    mock_queue_task.assert_called_once_with(
+        "update_availability_single_card",
+        "alice",
+        "test-store",
+        card_data,
+        lane="user-refresh",
+        resumed_for=["bob"],
+    )
+    # A later request scrapes again instead of reusing partial listings.
+    assert availability_manager.join_flight(
+        "test-store", "Sol Ring", [], "carol"
+    ).leads
+
+
+def test_resumed_single_card_check_is_not_requeued_again(
+    mock_store, mock_publish_pubsub, mock_socket_emit_worker, mocker
+):
+    """
+    GIVEN the continuation of a check that was cut short
+    WHEN it runs past its deadline too
+    THEN it sends what it found to every user without caching it or queuing
+    another.
+    """
+    mock_queue_task = mocker.patch(
+        "tasks.card_availability_tasks.task_manager.queue_task"
+    )
+    mock_store_instance = MagicMock()
+    mock_store_instance.fetch_card_availability.side_effect = (
+        _cut_short_scrape([{"price": 1.99}])
+    )
+    mock_store.get_store.return_value = mock_store_instance
+
+    assert update_availability_single_card(
+        "alice",
+        "test-store",
+        {"name": "Sol Ring", "card_specs": []},
+        resumed_for=["bob"],
+    ) is True
+
+    mock_queue_task.assert_not_called()
+    mock_publish_pubsub.assert_not_called()
+    assert [
+        c.kwargs["room"]
+        for c in mock_socket_emit_worker.call_args_list
+        if c.args[0] == "card_availability_data"
+    ] == ["alice", "bob"]
+
+
+def test_update_availability_single_card_fails_fast_when_circuit_open(
+    mock_store, mock_publish_pubsub, mock_socket_emit_worker
+):
+    """
+    GIVEN a store whose circuit breaker is open
+    WHEN update_availability_single_card is called
+    THEN it returns without contacting the store or publishing a result, and
+    tells the user that the check failed.
+    """
+    mock_store_instance = MagicMock()
+    mock_store_instance.circuit_breaker.allow_request.return_value = False
+    mock_store.get_store.return_value = mock_store_instance
+
+    result = update_availability_single_card(
+        "testuser", "test-store", {"name": "Sol Ring", "card_specs": []}
+    )
+
+    assert result is False
+    mock_store_instance.fetch_card_availability.assert_not_called()
+    mock_publish_pubsub.assert_not_called()
+    mock_socket_emit_worker.assert_called_with(
+        "availability_check_failed",
+        {"store": "test-store", "card": "Sol Ring", "reason": "circuit_open"},
+        room="testuser",
+    )
+    # The failed check does not leave its scrape in flight.
+    assert availability_manager.join_flight(
+        "test-store", "Sol Ring", [], "carol"
+    ).leads
+
+
 def test_update_all_tracked_cards_availability(user_factory,
+                                               store_factory,
+                                               card_factory,
                                                db_session,
-                                               mocker):
+                                               mock_publish_pubsub,
+                                               release_immediately):
     """
     GIVEN users exist in the database (via factories)
     WHEN the system-wide task 'update_all_tracked_cards_availability' is called
-    THEN it queries the DB and calls the update function for each user.
+    THEN it publishes one sweep check per (store, card) pair, naming every
+    user who tracks that card at that store.
     """
     # --- Arrange ---
     # Create real users in the test database instead of mocking the DB layer
-    user_factory(username="user_alpha")
-    user_factory(username="user_beta")
-
-    # Mock the internal function that processes each user
-    mock_update_for_user = mocker.patch(
-        "tasks.card_availability_tasks.update_availability_for_user"
-    )
+    store = store_factory(name="Test Store", slug="test_store")
+    other_store = store_factory(name="Other Store", slug="other_store")
+    card_factory(name="Sol Ring")
+    card_factory(name="Brainstorm")
+    alpha = user_factory(username="user_alpha")
+    beta = user_factory(username="user_beta")
+    alpha.selected_stores.extend([store, other_store])
+    beta.selected_stores.append(store)
+    alpha.cards.append(UserTrackedCards(card_name="Sol Ring", amount=1))
+    beta.cards.append(UserTrackedCards(card_name="Sol Ring", amount=2))
+    beta.cards.append(UserTrackedCards(card_name="Brainstorm", amount=1))
+    db_session.commit()
 
     # --- Act ---
     update_all_tracked_cards_availability()
 
     # --- Assert ---
-    # Verify that the user-specific update function was called for both users
-    expected_calls = [call("user_alpha"), call("user_beta")]
+    # Four user checks collapse into three scrapes, sent as one batch.
+    mock_publish_pubsub.assert_called_once()
+    published_msg = mock_publish_pubsub.call_args.args[0]
+    assert published_msg.name == "availability_sweep_request"
+    commands = {
+        (item.store.slug, item.card.name): set(item.users)
+        for item in published_msg.payload.items
+    }
+    assert commands == {
+        ("test_store", "Sol Ring"): {"user_alpha", "user_beta"},
+        ("other_store", "Sol Ring"): {"user_alpha"},
+        ("test_store", "Brainstorm"): {"user_beta"},
+    }
+
+
+def test_update_all_tracked_cards_availability_skips_fresh_pairs(
+    user_factory, store_factory, card_factory, db_session, mock_store,
+    mock_publish_pubsub, release_immediately
+):
+    """
+    GIVEN a (store, card) pair that was checked moments ago
+    WHEN the system-wide sweep runs
+    THEN only the stale pairs are published
+    """
+    store = store_factory(name="Test Store", slug="test_store")
+    card_factory(name="Sol Ring")
+    card_factory(name="Brainstorm")
+    user = user_factory(username="user_alpha")
+    user.selected_stores.append(store)
+    user.cards.append(UserTrackedCards(card_name="Sol Ring", amount=1))
+    user.cards.append(UserTrackedCards(card_name="Brainstorm", amount=1))
+    db_session.commit()
+    mock_store.get_store.return_value.stale_after_seconds = 1500
+    availability_manager.mark_checked("test_store", "Sol Ring")
+
+    update_all_tracked_cards_availability()
+
+    published_msg = mock_publish_pubsub.call_args.args[0]
+    assert [
+        (item.store.slug, item.card.name)
+        for item in published_msg.payload.items
+    ] == [("test_store", "Brainstorm")]
+
+
+def test_due_checks_wait_in_schedule_while_sweep_lane_is_backlogged(
+    mocker, mock_publish_pubsub
+):
+    mocker.patch(
+        "tasks.card_availability_tasks.task_manager.is_backlogged",
+        return_value=True,
+    )
+    mock_release_due = mocker.patch(
+        "tasks.card_availability_tasks.refresh_scheduler.release_due"
+    )
+
+    release_due_availability_checks()
+
+    mock_release_due.assert_not_called()
+    mock_publish_pubsub.assert_not_called()
 
-    # Check that calls happened regardless of DB return order
-    mock_update_for_user.assert_has_calls(expected_calls, any_order=True)
-    assert mock_update_for_user.call_count == 2
+
+def test_refresh_tick_requeues_checks_whose_scrape_died(
+    mocker, mock_publish_pubsub, fake_redis
+):
+    """
+    GIVEN users attached to a scrape whose job died
+    WHEN the refresh tick runs after the scrape's lock expired
+    THEN the check is queued once more for all of them, and only once
+    """
+    mock_queue_task = mocker.patch(
+        "tasks.card_availability_tasks.task_manager.queue_task"
+    )
+    leader = availability_manager.join_flight(
+        "test-store", "Sol Ring", [], "alice"
+    )
+    availability_manager.join_flight("test-store", "Sol Ring", [], "bob")
+    availability_manager.join_flight("test-store", "Sol Ring", [], "carol")
+    # The lock expired, at the time the flight is indexed by.
+    fake_redis.delete(f"flight:{leader.key}:lock")
+    fake_redis.zadd(WAITING_FLIGHTS_KEY, {leader.key: 0})
+
+    release_due_availability_checks()
+    release_due_availability_checks()
+
+    mock_queue_task.assert_called_once_with(
+        "update_availability_single_card",
+        "bob",
+        "test-store",
+        {"name": "Sol Ring", "card_specs": []},
+        lane="user-refresh",
+        resumed_for=["carol"],
+    )
+
+
+def test_update_availability_store_batch_checks_cards_in_one_job(
+    mock_store, mock_publish_pubsub, mock_socket_emit_worker
+):
+    """
+    GIVEN a batch of two sweep items at one store
+    WHEN update_availability_store_batch is called
+    THEN the store is looked up once, each card is scraped and emitted to
+    its users, and both results are published in a single message.
+    """
+    mock_store_instance = MagicMock()
+    mock_store_instance.max_concurrency = 2
+    mock_store_instance.fetch_listings_many.side_effect = (
+        lambda card_names: [[] for _ in card_names]
+    )
+    mock_store.get_store.return_value = mock_store_instance
+
+    checked = update_availability_store_batch("test-store", [
+        {"card_name": "Sol Ring", "card_specs": [], "users": {"alice": []}},
+        {"card_name": "Opt", "card_specs": [], "users": {"bob": []}},
+    ])
+
+    assert checked == 2
+    mock_store.get_store.assert_called_once_with("test-store")
+    # Both cards are searched for together, within the store's concurrency.
+    mock_store_instance.fetch_listings_many.assert_called_once_with(
+        ["Sol Ring", "Opt"]
+    )
+    mock_publish_pubsub.assert_called_once()
+    published_msg = mock_publish_pubsub.call_args.args[0]
+    assert published_msg.name == "availability_result_batch"
+    assert [
+        (result.store.slug, result.card.card.name)
+        for result in published_msg.payload.results
+    ] == [("test-store", "Sol Ring"), ("test-store", "Opt")]
+    assert [
+        c.kwargs["room"] for c in mock_socket_emit_worker.call_args_list
+        if c.args[0] == "card_availability_data"
+    ] == ["alice", "bob"]
+
+
+def test_update_availability_store_batch_stops_at_open_circuit(
+    mock_store, mock_publish_pubsub, mock_socket_emit_worker
+):
+    mock_store_instance = MagicMock()
+    mock_store_instance.max_concurrency = 1
+    mock_store_instance.fetch_listings_many.side_effect = (
+        lambda card_names: [[] for _ in card_names]
+    )
+    mock_store_instance.circuit_breaker.allow_request.side_effect = [
+        True, False
+    ]
+    mock_store.get_store.return_value = mock_store_instance
+
+    checked = update_availability_store_batch("test-store", [
+        {"card_name": "Sol Ring", "users": {"alice": []}},
+        {"card_name": "Opt", "users": {"alice": []}},
+    ])
+
+    assert checked == 1
+    mock_store_instance.fetch_listings_many.assert_called_once_with(
+        ["Sol Ring"]
+    )
+    published_msg = mock_publish_pubsub.call_args.args[0]
+    assert len(published_msg.payload.results) == 1
 
 
 def test_update_availability_single_card_no_items_found(
@@ -1,6 +1,7 @@
 import pytest  # noqa
 import json
 from unittest.mock import patch, MagicMock
+from managers import redis_manager
 from tasks.catalog_tasks import (
     update_card_catalog,
     update_set_catalog,
@@ -9,18 +10,32 @@ from tasks.catalog_tasks import (
 from datetime import date
 
 
+def published_blobs(fake_redis, publish):
+    """Decodes published blob references and reads the blobs back."""
+    blobs = []
+    for call_args in publish.call_args_list:
+        assert call_args[0][0] == "worker-results"
+        envelope = redis_manager.decode_message(call_args[0][1])
+        if envelope["type"] == "catalog_blob_result":
+            reference = envelope["payload"]
+            records = list(redis_manager.read_blob(
+                fake_redis, reference["key"]
+            ))
+            assert len(records) == reference["records"]
+            blobs.append((reference["kind"], records))
+    return blobs
+
+
 @patch("tasks.catalog_tasks.fetch_scryfall_card_names")
-@patch("managers.redis_manager.redis_manager.get_redis_connection")
-def test_update_card_catalog_success(mock_get_redis, mock_fetch):
+def test_update_card_catalog_success(mock_fetch, mocker, fake_redis):
     """
     GIVEN a list of card names is successfully fetched
     WHEN update_card_catalog is called
-    THEN it should publish the card names to the correct Redis channel.
+    THEN it should write the names to a blob and publish only a reference
+         to it on the correct Redis channel.
     """
     # Arrange
-    mock_redis = MagicMock()
-    mock_get_redis.return_value = mock_redis
-
+    mock_publish = mocker.spy(fake_redis, "publish")
     card_names = ["Sol Ring", "Command Tower"]
     mock_fetch.return_value = card_names
 
@@ -29,17 +44,10 @@ def test_update_card_catalog_success(mock_get_redis, mock_fetch):
 
     # Assert
     mock_fetch.assert_called_once()
-    mock_redis.publish.assert_called_once()
-
-    # Verify arguments
-    call_args = mock_redis.publish.call_args
-    assert call_args[0][0] == "worker-results"
-
-    payload = json.loads(call_args[0][1])
-    message_type = payload.pop("type")
-    payload = payload["payload"]
-    assert message_type == "catalog_card_names_result"
-    assert payload == {"names": card_names}
+    mock_publish.assert_called_once()
+    assert published_blobs(fake_redis, mock_publish) == [
+        ("card_names", card_names)
+    ]
 
 
 @patch("tasks.catalog_tasks.fetch_scryfall_card_names")
@@ -186,20 +194,19 @@ def test_update_set_catalog_handles_missing_keys(mock_get_redis,
 
 
 @patch("tasks.catalog_tasks.fetch_all_card_data")
-@patch("managers.redis_manager.redis_manager.get_redis_connection")
 @patch("tasks.catalog_tasks.update_card_catalog")
 @patch("tasks.catalog_tasks.update_set_catalog")
 def test_update_full_catalog_success(
-    mock_update_set, mock_update_card, mock_get_redis, mock_fetch_cards
+    mock_update_set, mock_update_card, mock_fetch_cards, mocker, fake_redis
 ):
     """
     GIVEN a stream of card data is fetched
     WHEN update_full_catalog is called
-    THEN it should publish printings and finishes in chunks to Redis.
+    THEN it should publish printings in chunked blobs and the finishes
+         inline to Redis.
     """
     # Arrange
-    mock_redis = MagicMock()
-    mock_get_redis.return_value = mock_redis
+    mock_publish = mocker.spy(fake_redis, "publish")
     card_stream = [
         {
             "name": "Sol Ring",
@@ -214,6 +221,12 @@ def test_update_full_catalog_success(
             "finishes": ["nonfoil", "etched"],
         },
         {"name": "Incomplete Card"},  # Should be skipped
+        {
+            "name": "Arcane Signet",
+            "set": "C21",
+            "collector_number": "3",
+            "finishes": ["nonfoil"],
+        },
     ]
     mock_fetch_cards.return_value = card_stream
 
@@ -226,58 +239,71 @@ def test_update_full_catalog_success(
     mock_update_card.assert_called_once()
     mock_fetch_cards.assert_called_once()
 
-    # Verify publish calls
-    expected_printings_chunk = [
-        {
-            "card_name": "Sol Ring",
-            "set_code": "C21",
-            "collector_number": "1",
-            "finishes": ["foil", "nonfoil"],
-        },
-        {
-            "card_name": "Command Tower",
-            "set_code": "C21",
-            "collector_number": "2",
-            "finishes": ["nonfoil", "etched"],
-        },
+    # One blob per full chunk, one for the final partial chunk, and the
+    # finishes.
+    assert mock_publish.call_count == 3
+    assert published_blobs(fake_redis, mock_publish) == [
+        ("printings", [
+            {
+                "card_name": "Sol Ring",
+                "set_code": "C21",
+                "collector_number": "1",
+                "finishes": ["foil", "nonfoil"],
+            },
+            {
+                "card_name": "Command Tower",
+                "set_code": "C21",
+                "collector_number": "2",
+                "finishes": ["nonfoil", "etched"],
+            },
+        ]),
+        ("printings", [
+            {
+                "card_name": "Arcane Signet",
+                "set_code": "C21",
+                "collector_number": "3",
+                "finishes": ["nonfoil"],
+            },
+        ]),
+    ]
+
+    finishes = redis_manager.decode_message(
+        mock_publish.call_args_list[-1][0][1]
+    )
+    assert finishes["type"] == "catalog_finishes_chunk_result"
+    assert sorted(finishes["payload"]["finishes"]) == [
+        "etched", "foil", "nonfoil"
     ]
-    expected_finishes = ["foil", "nonfoil", "etched"]
-
-    #    expected_calls = [
-    #        call(
-    #            "catalog_printings_chunk_result",
-    #            {"printings": expected_printings_chunk},
-    #        ),
-    #        call(
-    #            "catalog_finishes_chunk_result",
-    #            {"finishes": sorted(expected_finishes)},
-    #        ),
-    #    ]
-    # Use any_order because the final finishes chunk could be processed
-    # before the printings chunk in some async scenarios, though not here.
-    # Sorting the list of finishes ensures the test is deterministic.
-    # We need to sort the actual call's list as well.
-    # A bit complex to check, so let's check call count
-    # and contents separately.
-
-    assert mock_redis.publish.call_count == 2
-
-    # Check printings call
-    # We iterate through calls to find the printings chunk
-    calls = mock_redis.publish.call_args_list
-    printings_payload = None
-    finishes_payload = None
-
-    for call_args in calls:
-        data = json.loads(call_args[0][1])
-        inner_payload = data.get("payload", {})
-        if "printings" in inner_payload:
-            printings_payload = inner_payload
-        elif "finishes" in inner_payload:
-            finishes_payload = inner_payload
-
-    assert printings_payload is not None
-    assert printings_payload["printings"] == expected_printings_chunk
-
-    assert finishes_payload is not None
-    assert sorted(finishes_payload["finishes"]) == sorted(expected_finishes)
+    assert not fake_redis.keys("blob:*")
+
+
+@patch("tasks.catalog_tasks.fetch_all_card_data")
+@patch("tasks.catalog_tasks.update_card_catalog")
+@patch("tasks.catalog_tasks.update_set_catalog")
+def test_update_full_catalog_discards_blob_on_error(
+    mock_update_set, mock_update_card, mock_fetch_cards, mocker, fake_redis
+):
+    """
+    GIVEN the card data stream fails part-way through a chunk
+    WHEN update_full_catalog is called
+    THEN the partially written blob is deleted and nothing is published.
+    """
+    mock_publish = mocker.spy(fake_redis, "publish")
+
+    def failing_stream():
+        yield {
+            "name": "Sol Ring",
+            "set": "C21",
+            "collector_number": "1",
+            "finishes": ["nonfoil"],
+        }
+        raise ConnectionError("stream interrupted")
+
+    mock_fetch_cards.return_value = failing_stream()
+
+    # Flush every record to Redis, so there is something to discard.
+    with patch("managers.redis_manager.blob_transfer.BLOB_SEGMENT_BYTES", 1):
+        update_full_catalog()
+
+    mock_publish.assert_not_called()
+    assert not fake_redis.keys("blob:*")
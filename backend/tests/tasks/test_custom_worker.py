@@ -0,0 +1,153 @@
+"""
+Tests for lane ordering, lane latency metrics and warm slots in the custom
+worker.
+"""
+
+import os
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock
+
+import pytest
+from rq import Queue
+
+from managers import metrics_manager
+from tasks import custom_worker
+from tasks.custom_worker import (
+    LANE_LATENCY_METRIC,
+    LGSWorker,
+    WarmWorkerPool,
+    parse_lane_weights,
+)
+
+LANES = ["interactive", "user-refresh", "sweep"]
+
+
+def make_worker(fake_redis, lane_weights=None):
+    queues = [Queue(lane, connection=fake_redis) for lane in LANES]
+    return LGSWorker(
+        queues, connection=fake_redis, lane_weights=lane_weights
+    )
+
+
+def spin(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        pass
+
+
+def first_lanes(worker, rounds):
+    lanes = []
+    for _ in range(rounds):
+        worker.reorder_queues(reference_queue=worker._ordered_queues[0])
+        lanes.append(worker._ordered_queues[0].name)
+    return lanes
+
+
+def test_worker_keeps_strict_priority_without_weights(fake_redis):
+    worker = make_worker(fake_redis)
+
+    assert set(first_lanes(worker, 5)) == {"interactive"}
+    assert [q.name for q in worker._ordered_queues] == LANES
+
+
+def test_worker_shares_turns_by_lane_weight(fake_redis):
+    """
+    GIVEN a worker with weighted lanes
+    WHEN it dequeues repeatedly
+    THEN each lane is tried first in proportion to its weight, and the other
+    lanes keep their priority order behind it
+    """
+    worker = make_worker(
+        fake_redis, parse_lane_weights("interactive=4, user-refresh=2,sweep=1")
+    )
+
+    turns = Counter(first_lanes(worker, 14))
+
+    assert turns == {"interactive": 8, "user-refresh": 4, "sweep": 2}
+    assert [q.name for q in worker._ordered_queues[1:]] == [
+        lane for lane in LANES if lane != worker._ordered_queues[0].name
+    ]
+
+
+def test_worker_records_time_spent_waiting_in_lane(fake_redis):
+    worker = make_worker(fake_redis)
+    queue = Queue("sweep", connection=fake_redis)
+    job = queue.enqueue(print, "hello")
+    job.enqueued_at = datetime.now(timezone.utc) - timedelta(seconds=2)
+
+    worker._record_lane_latency(job, queue)
+
+    latency = metrics_manager.get_metric(LANE_LATENCY_METRIC)
+    assert latency["sweep:jobs"] == 1
+    assert 2000 <= latency["sweep:wait_ms"] < 3000
+    assert latency["sweep:last_wait_ms"] == latency["sweep:wait_ms"]
+
+
+def test_parse_lane_weights_skips_malformed_entries():
+    assert parse_lane_weights("sweep=2,catalog,=x") == {"sweep": 2}
+    assert parse_lane_weights(None) == {}
+
+
+def test_warm_pool_runs_jobs_in_process(fake_redis):
+    """
+    GIVEN jobs queued for a pool of warm slots
+    WHEN the pool works in burst mode
+    THEN every job runs inside the pool's own process
+    """
+    queue = Queue("sweep", connection=fake_redis)
+    jobs = [queue.enqueue(os.getpid) for _ in range(4)]
+
+    WarmWorkerPool([queue], fake_redis, slots=2).work(burst=True)
+
+    assert [job.return_value(refresh=True) for job in jobs] == (
+        [os.getpid()] * 4
+    )
+
+
+def test_warm_slot_enforces_job_timeout(fake_redis):
+    queue = Queue("sweep", connection=fake_redis)
+    job = queue.enqueue(spin, 5, job_timeout=1)
+
+    started = time.monotonic()
+    WarmWorkerPool([queue], fake_redis, slots=1).work(burst=True)
+
+    job.refresh()
+    assert job.is_failed
+    assert "JobTimeoutException" in job.latest_result().exc_string
+    assert time.monotonic() - started < 4
+
+
+def test_warm_pool_shuts_down_like_a_forking_worker(fake_redis, mocker):
+    """
+    GIVEN an idle pool with one slot running an availability check
+    WHEN a shutdown is requested, then requested again
+    THEN the user is told the check was interrupted, every slot stops, and
+    the second request exits at once
+    """
+    mocker.patch.object(custom_worker, "SLOT_POLL_SECONDS", 1)
+    mock_emit = mocker.patch(
+        "tasks.custom_worker.socket_emit.emit_from_worker"
+    )
+    queue = Queue("interactive", connection=fake_redis)
+    pool = WarmWorkerPool([queue], fake_redis, slots=2)
+    running = MagicMock(
+        func_name="tasks.card_availability_tasks"
+        ".update_availability_single_card",
+        args=("alice", "test-store", {"card_name": "Sol Ring"}),
+        kwargs={},
+    )
+    mocker.patch.object(
+        pool.workers[0], "get_current_job", return_value=running
+    )
+
+    threading.Timer(0.2, pool.request_stop).start()
+    pool.work()
+
+    mock_emit.assert_called_once()
+    assert mock_emit.call_args.kwargs["room"] == "alice"
+    assert all(worker._stop_requested for worker in pool.workers)
+    with pytest.raises(SystemExit):
+        pool.request_stop()
@@ -0,0 +1,157 @@
+"""
+Tests for the adaptive (store, card) refresh schedule.
+"""
+
+import pytest
+
+from managers import metrics_manager
+from tasks import refresh_scheduler
+from tasks.refresh_scheduler import (
+    DISPATCH_METRIC,
+    REFRESH_MAX_INTERVAL,
+    REFRESH_MIN_INTERVAL,
+    next_check_interval,
+)
+
+
+@pytest.fixture
+def no_jitter(mocker):
+    """Makes new pairs due at once and intervals exact."""
+    mocker.patch.object(refresh_scheduler, "REFRESH_SPREAD_SECONDS", 0)
+    mocker.patch.object(refresh_scheduler, "REFRESH_JITTER", 0.0)
+
+
+def sweep_item(store, card_name, users=("alice",)):
+    return {
+        "store": store,
+        "card_name": card_name,
+        "card_specs": [],
+        "users": {username: [] for username in users},
+    }
+
+
+def due_times(fake_redis, store):
+    return {
+        card.decode(): score
+        for card, score in fake_redis.zrange(
+            f"refresh:due:{store}", 0, -1, withscores=True
+        )
+    }
+
+
+def test_popular_volatile_cards_are_checked_more_often():
+    long_tail = next_check_interval(watchers=1, volatility=0.0)
+    popular = next_check_interval(watchers=16, volatility=0.0)
+    volatile = next_check_interval(watchers=1, volatility=1.0)
+
+    assert popular < long_tail
+    assert volatile < long_tail
+    assert next_check_interval(1000, 1.0) == REFRESH_MIN_INTERVAL
+    assert long_tail <= REFRESH_MAX_INTERVAL
+    assert next_check_interval(1, 0.0, since_change=600) == 600
+
+
+def test_sync_and_release_due_pairs_within_budget(fake_redis, no_jitter):
+    """
+    GIVEN a synced plan with three new pairs at one store
+    WHEN due pairs are released with a budget of two per store
+    THEN two are released now, the third on the next tick, and pairs
+    dropped from the plan leave the schedule
+    """
+    plan = [
+        sweep_item("store_a", "Sol Ring", users=("alice", "bob")),
+        sweep_item("store_a", "Brainstorm"),
+        sweep_item("store_a", "Counterspell"),
+    ]
+    refresh_scheduler.sync_schedule(plan, now=1000.0)
+
+    first = refresh_scheduler.release_due(now=1000.0, budget=2)
+    second = refresh_scheduler.release_due(now=1000.0, budget=2)
+
+    assert len(first) == 2
+    assert [item["card_name"] for item in second] == [
+        card for card in ("Sol Ring", "Brainstorm", "Counterspell")
+        if card not in {item["card_name"] for item in first}
+    ]
+    assert refresh_scheduler.release_due(now=1000.0, budget=2) == []
+    assert fake_redis.hget("refresh:watchers:store_a", "Sol Ring") == b"2"
+
+    refresh_scheduler.sync_schedule(plan[:1], now=1100.0)
+
+    assert set(due_times(fake_redis, "store_a")) == {"Sol Ring"}
+
+
+def test_record_check_reschedules_by_change_history(
+    fake_redis, no_jitter
+):
+    """
+    GIVEN scheduled pairs
+    WHEN a check finds the listings changed or unchanged
+    THEN a changed pair is due again soon and a stable one later, while a
+    pair that is no longer scheduled is not added back
+    """
+    refresh_scheduler.sync_schedule(
+        [sweep_item("store_a", "Sol Ring"), sweep_item("store_a", "Opt")],
+        now=0.0,
+    )
+
+    changed = refresh_scheduler.record_check(
+        "store_a", "Sol Ring", True, now=1000.0
+    )
+    stable = refresh_scheduler.record_check(
+        "store_a", "Opt", False, now=1000.0
+    )
+    refresh_scheduler.record_check("store_a", "Untracked", False, now=1000.0)
+
+    assert changed == REFRESH_MIN_INTERVAL
+    assert stable > changed
+    assert due_times(fake_redis, "store_a") == {
+        "Sol Ring": 1000.0 + changed,
+        "Opt": 1000.0 + stable,
+    }
+
+
+def test_new_pairs_are_spread_across_the_window(fake_redis, mocker):
+    """
+    GIVEN ten new pairs at one store
+    WHEN they are synced into the schedule
+    THEN each falls in its own slot of the spread window, so the store is
+    paced evenly instead of being hit by all ten at once
+    """
+    mocker.patch.object(refresh_scheduler, "REFRESH_SPREAD_SECONDS", 1000)
+    plan = [sweep_item("store_a", f"Card {i}") for i in range(10)]
+
+    refresh_scheduler.sync_schedule(plan, now=0.0)
+
+    slots = sorted(
+        int(due // 100) for due in due_times(fake_redis, "store_a").values()
+    )
+    assert slots == list(range(10))
+
+
+def test_release_due_reports_planned_and_actual_rates(fake_redis, mocker):
+    """
+    GIVEN six pairs spread over a ten-minute window
+    WHEN the first minute of due pairs is released
+    THEN the dispatch metric shows the planned and released rate per minute
+    """
+    mocker.patch.object(refresh_scheduler, "REFRESH_SPREAD_SECONDS", 600)
+    mocker.patch.object(refresh_scheduler, "REFRESH_TICK_SECONDS", 60)
+    plan = [sweep_item("store_a", f"Card {i}") for i in range(6)]
+    refresh_scheduler.sync_schedule(plan, now=0.0)
+
+    released = refresh_scheduler.release_due(now=100.0, budget=20)
+
+    rates = metrics_manager.get_metric(DISPATCH_METRIC)
+    assert len(released) == 1
+    assert rates["store_a:planned_per_minute"] == 0.6
+    assert rates["store_a:actual_per_minute"] == 1.0
+    assert rates["all:actual_per_minute"] == 1.0
+
+
+def test_listings_changed_ignores_order():
+    old = [{"price": 1.0}, {"price": 2.0}]
+
+    assert refresh_scheduler.listings_changed(old, old[::-1]) is False
+    assert refresh_scheduler.listings_changed(old, old[:1]) is True
+    assert refresh_scheduler.listings_changed(None, old) is None
@@ -8,6 +8,7 @@ from tasks.scheduler_setup import (
     AVAILABILITY_UPDATE_INTERVAL_MINUTES,
 )
 from managers.task_manager import task_definitions
+from tasks.refresh_scheduler import REFRESH_TICK_SECONDS
 
 # Define paths for patching where the objects are used
 SCHEDULER_PATH = "tasks.scheduler_setup.redis_manager.scheduler"
@@ -38,7 +39,7 @@ def test_schedule_recurring_tasks_all_new(mock_scheduler):
     schedule_recurring_tasks()
 
     # Assert
-    assert mock_scheduler.schedule.call_count == 2
+    assert mock_scheduler.schedule.call_count == 3
 
     # Check that each task was scheduled with the correct function and ID
     calls = mock_scheduler.schedule.call_args_list
@@ -59,6 +60,7 @@ def test_schedule_recurring_tasks_all_new(mock_scheduler):
             id=task_definitions.FULL_CATALOG_TASK_ID,
             description="Periodically updates the full card, set, printing, "
                         "and finish catalog from Scryfall.",
+            queue_name="catalog",
         )
         for c in calls
     )
@@ -73,6 +75,22 @@ def test_schedule_recurring_tasks_all_new(mock_scheduler):
             id=task_definitions.AVAILABILITY_TASK_ID,
             description="Periodically checks for card availability for"
             " all users.",
+            queue_name="sweep",
+        )
+        for c in calls
+    )
+
+    # Verify refresh tick task
+    assert any(
+        c == call(
+            scheduled_time=ANY,
+            func="tasks.card_availability_tasks."
+            "release_due_availability_checks",
+            interval=REFRESH_TICK_SECONDS,
+            id=task_definitions.REFRESH_TICK_TASK_ID,
+            description="Releases the availability checks that are due in "
+            "the adaptive refresh schedule.",
+            queue_name="sweep",
         )
         for c in calls
     )
@@ -105,6 +123,7 @@ def test_schedule_recurring_tasks_mixed_state(mock_scheduler):
     # Simulate that catalog tasks exist, but the availability task does not.
     existing_tasks = [
         task_definitions.FULL_CATALOG_TASK_ID,
+        task_definitions.REFRESH_TICK_TASK_ID,
     ]
     mock_scheduler.__contains__.side_effect = (
         lambda task_id: task_id in existing_tasks
@@ -127,6 +146,7 @@ def test_schedule_recurring_tasks_mixed_state(mock_scheduler):
         id=task_definitions.AVAILABILITY_TASK_ID,
         description="Periodically checks for card availability "
                     "for all users.",
+        queue_name="sweep",
     )
 
 
@@ -2,10 +2,18 @@ from rq import Queue
 
 # Import the application factory
 from app_factory import create_worker_app, configure_database
-from tasks.custom_worker import LGSWorker
+from tasks.custom_worker import (
+    LANE_WEIGHTS,
+    WORKER_MODE,
+    WORKER_SLOTS,
+    LGSWorker,
+    WarmWorkerPool,
+)
 from managers import redis_manager
 
-listen = ["default"]
+# Highest priority first; the default queue catches anything queued without
+# a lane.
+listen = redis_manager.PRIORITY_LANES + ["default"]
 
 if __name__ == "__main__":
     # Create a Flask app instance. This is crucial for establishing the
@@ -20,6 +28,18 @@ if __name__ == "__main__":
             Queue(q, connection=redis_manager.get_redis_connection())
             for q in listen
         ]
-        worker = LGSWorker(
-            queues, connection=redis_manager.get_redis_connection())
-        worker.work()
+        if WORKER_MODE == "threads":
+            WarmWorkerPool(
+                queues,
+                redis_manager.get_redis_connection(),
+                slots=WORKER_SLOTS,
+                lane_weights=LANE_WEIGHTS,
+                app=app,
+            ).work()
+        else:
+            worker = LGSWorker(
+                queues,
+                connection=redis_manager.get_redis_connection(),
+                lane_weights=LANE_WEIGHTS,
+            )
+            worker.work()
@@ -0,0 +1,216 @@
+"""
+Compares the wire codecs of the service messages.
+
+A representative message of every `PubSubMessages` type is built, sized
+like production traffic (catalog chunks hold `--chunk-size` entries, sweep
+commands 500 items), and encoded and decoded with each codec. The "legacy"
+row is the previous wire format: a JSON-mode `model_dump` followed by
+`json.dumps`, and `json.loads` on the way back. For each message type and
+codec the script reports encodes and decodes per second, the encoded size,
+and checks that every codec decodes to the same payload.
+
+Usage:
+    python utilities/benchmark_codecs.py --chunk-size 20000
+"""
+
+import argparse
+import datetime
+import json
+import os
+import sys
+import time
+import typing
+
+try:
+    # Support running from the repository root (backend/ next to this
+    # directory) and from inside the backend container (/app).
+    _root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    _backend = os.path.join(_root, "backend")
+    sys.path.insert(0, _backend if os.path.isdir(_backend) else _root)
+
+    from managers.redis_manager import codec
+    from schema.messaging import messages, payload
+except ImportError as e:
+    print(f"❌ Error: Could not import application modules. Details: {e}")
+    sys.exit(1)
+
+LEGACY = "legacy"
+
+
+def _card_preference(n):
+    return {
+        "card": {"name": f"Card {n}"},
+        "amount": 1,
+        "card_specs": [
+            {"set_code": "c21", "collector_number": str(n),
+             "finish": {"name": "foil"}},
+        ],
+    }
+
+
+def _listings(count):
+    return [
+        {
+            "url": f"https://store.example/products/{n}",
+            "name": "Sol Ring",
+            "set_code": "c21",
+            "collector_number": str(n),
+            "finish": "non-foil",
+            "price": 1.99 + n,
+            "condition": "NM",
+            "quantity": 3,
+        }
+        for n in range(count)
+    ]
+
+
+def sample_messages(chunk_size):
+    """Builds one representative message of every pub/sub message type."""
+    result = {
+        "card": _card_preference(1),
+        "store": {"slug": "test-store", "name": "Test Store"},
+        "items": _listings(12),
+    }
+    samples = [
+        messages.AvailabilityRequestCommand(
+            payload=payload.AvailabilityRequestPayload(
+                user={"username": "alice"},
+                store={"slug": "test-store"},
+                card_data=_card_preference(1),
+            )
+        ),
+        messages.QueueAllAvailabilityChecksCommand(payload=payload.Payload()),
+        messages.AvailabilitySweepCommand(
+            payload=payload.AvailabilitySweepPayload(items=[
+                {
+                    "store": {"slug": "test-store"},
+                    "card": {"name": f"Card {n}"},
+                    "card_specs": [{"set_code": "c21", "finish": "foil"}],
+                    "users": {"alice": [], "bob": []},
+                }
+                for n in range(500)
+            ])
+        ),
+        messages.AvailabilityResultMessage(
+            payload=payload.AvailabilityResultPayload(**result)
+        ),
+        messages.AvailabilityResultBatchMessage(
+            payload=payload.AvailabilityResultBatchPayload(
+                results=[result] * 10
+            )
+        ),
+        messages.CatalogCardNamesResultMessage(
+            payload=payload.CatalogCardNamesResultPayload(
+                names=[f"Card {n}" for n in range(chunk_size)]
+            )
+        ),
+        messages.CatalogSetDataResultMessage(
+            payload=payload.CatalogSetDataResultPayload(sets=[
+                {
+                    "code": f"s{n}",
+                    "name": f"Set {n}",
+                    "release_date": datetime.date(2000, 1, 1)
+                    + datetime.timedelta(days=n),
+                }
+                for n in range(1000)
+            ])
+        ),
+        messages.CatalogPrintingsChunkResultMessage(
+            payload=payload.CatalogPrintingsChunkResultPayload(printings=[
+                {
+                    "card_name": f"Card {n}",
+                    "set_code": "c21",
+                    "collector_number": str(n),
+                    "finishes": ["nonfoil", "foil"],
+                }
+                for n in range(chunk_size)
+            ])
+        ),
+        messages.CatalogFinishesChunkResultMessage(
+            payload=payload.CatalogFinishesChunkResultPayload(
+                finishes=["nonfoil", "foil", "etched"]
+            )
+        ),
+        messages.CatalogBlobResultMessage(
+            payload=payload.CatalogBlobResultPayload(
+                kind="printings",
+                key="blob:0123456789abcdef0123456789abcdef",
+                records=chunk_size,
+                compressed_bytes=chunk_size * 12,
+            )
+        ),
+    ]
+    covered = {type(message) for message in samples}
+    missing = set(typing.get_args(typing.get_args(
+        messages.PubSubMessages)[0])) - covered
+    if missing:
+        names = ", ".join(sorted(cls.__name__ for cls in missing))
+        print(f"⚠️ No sample for: {names}")
+    return samples
+
+
+def encode(codec_name, message):
+    if codec_name == LEGACY:
+        return json.dumps({
+            "type": message.name,
+            "payload": message.payload.model_dump(mode="json"),
+        })
+    return codec.encode_message(message.name, message.payload, codec_name)
+
+
+def decode(codec_name, data):
+    if codec_name == LEGACY:
+        return json.loads(data)
+    return codec.decode_message(data)
+
+
+def rate(func, min_seconds):
+    """Calls `func` repeatedly for at least `min_seconds`; returns calls/s."""
+    calls = 0
+    started = time.perf_counter()
+    while True:
+        func()
+        calls += 1
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return calls / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--chunk-size", type=int, default=20000)
+    parser.add_argument(
+        "--seconds",
+        type=float,
+        default=0.5,
+        help="Minimum time spent measuring each operation.",
+    )
+    args = parser.parse_args()
+
+    codec_names = [LEGACY] + list(codec.CODECS)
+    print(
+        f"{'message':<36} {'codec':<8} {'encode/s':>10} {'decode/s':>10} "
+        f"{'bytes':>10}"
+    )
+    mismatches = 0
+    for message in sample_messages(args.chunk_size):
+        expected = message.payload.model_dump(mode="json")
+        for codec_name in codec_names:
+            data = encode(codec_name, message)
+            if decode(codec_name, data)["payload"] != expected:
+                mismatches += 1
+                print(f"❌ {codec_name} changed the {message.name} payload.")
+            encodes = rate(lambda: encode(codec_name, message), args.seconds)
+            decodes = rate(lambda: decode(codec_name, data), args.seconds)
+            print(
+                f"{message.name:<36} {codec_name:<8} {encodes:>10.1f} "
+                f"{decodes:>10.1f} {len(data):>10}"
+            )
+
+    if mismatches:
+        sys.exit(1)
+    print("✅ Every codec round-trips every message type.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Compares the HTML parsing backends used by the store scrapers.
+
+Search result and product pages are generated with the fake storefront and
+wrapped in a store-like layout (navigation, scripts, footer), then parsed
+by each backend, both as a full tree and with the scrapers' strainers. For
+each combination the script reports pages parsed per second and the peak
+memory of a single parse (Python allocations, measured with tracemalloc),
+and checks that every backend extracts the same listings and details.
+
+Usage:
+    python utilities/benchmark_parsers.py --pages 200 --products 24
+"""
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    # Support running from the repository root (backend/ next to this
+    # directory) and from inside the backend container (/app).
+    _root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    _backend = os.path.join(_root, "backend")
+    sys.path.insert(0, _backend if os.path.isdir(_backend) else _root)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from fake_storefront import render_product_page, render_search_page
+    from managers.store_manager.stores import html_parser
+    from managers.store_manager.stores.storefronts.crystal_commerce_store import (  # noqa: E501
+        CrystalCommerceStore,
+    )
+except ImportError as e:
+    print(f"❌ Error: Could not import application modules. Details: {e}")
+    sys.exit(1)
+
+LAYOUT = """<!DOCTYPE html>
+<html><head><title>Fake Store</title>{scripts}</head>
+<body><nav>{navigation}</nav><main>{content}</main>
+<footer>{footer}</footer></body></html>"""
+
+
+def _store_layout(content: str, chrome_links: int) -> str:
+    return LAYOUT.format(
+        scripts="".join(
+            f"<script>window.config{n} = {{\"key\": {n}}};</script>"
+            for n in range(chrome_links // 10)
+        ),
+        navigation="".join(
+            f'<li class="menu-item"><a href="/catalog/{n}">Category {n}</a>'
+            f"</li>"
+            for n in range(chrome_links)
+        ),
+        content=content,
+        footer="".join(
+            f'<p class="footer-link"><a href="/page/{n}">Page {n}</a></p>'
+            for n in range(chrome_links // 4)
+        ),
+    )
+
+
+def _parse(markup, parser, strainer):
+    if strainer is None:
+        return html_parser.parse_html(markup, parser=parser)
+    return html_parser.parse_html(markup, strainer, parser)
+
+
+def _extract(scraper, search_soup, product_soup):
+    """Reads everything the scraper reads from one search and product."""
+    products = scraper._get_product_listings(search_soup)
+    return (
+        [scraper._parse_variants(product) for product in products],
+        [
+            (name, url)
+            for _, name, url in scraper._find_matching_products(
+                search_soup, "Benchmark Card"
+            )
+        ],
+        scraper._parse_product_page_details(product_soup),
+    )
+
+
+def measure(label, parser, strainers, pages, search_page, product_page):
+    search_strainer, product_strainer = strainers
+    started = time.perf_counter()
+    for _ in range(pages):
+        _parse(search_page, parser, search_strainer)
+        _parse(product_page, parser, product_strainer)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    search_soup = _parse(search_page, parser, search_strainer)
+    product_soup = _parse(product_page, parser, product_strainer)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    parsed_pages = pages * 2
+    print(
+        f"{label:<22} {parsed_pages / elapsed:>9.1f} pages/s  "
+        f"{peak / 1024:>9.1f} KiB peak"
+    )
+    return search_soup, product_soup
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument(
+        "--pages",
+        type=int,
+        default=200,
+        help="Search and product page pairs parsed per backend.",
+    )
+    parser.add_argument("--products", type=int, default=24)
+    parser.add_argument(
+        "--chrome-links",
+        type=int,
+        default=300,
+        help="Navigation links around the content, to mimic a real store.",
+    )
+    args = parser.parse_args()
+
+    search_page = _store_layout(
+        render_search_page("Benchmark Card", args.products),
+        args.chrome_links,
+    )
+    product_page = _store_layout(
+        render_product_page(1, "benchmark-card"), args.chrome_links
+    )
+    scraper = CrystalCommerceStore(
+        name="Fake Store",
+        slug="fake_store",
+        homepage="http://127.0.0.1",
+        search_url="http://127.0.0.1/products/search",
+        rate_limit_per_second=0,
+    )
+
+    print(
+        f"📄 search page {len(search_page) / 1024:.0f} KiB, product page "
+        f"{len(product_page) / 1024:.0f} KiB, {args.pages} pages of each"
+    )
+    strained = (
+        html_parser.SEARCH_RESULTS_STRAINER,
+        html_parser.PRODUCT_DETAILS_STRAINER,
+    )
+    backends = [(html_parser.HTML_PARSER, "html.parser")]
+    if html_parser._lxml_available():
+        backends.append((html_parser.LXML_PARSER, "lxml"))
+    else:
+        print("⚠️ lxml is not installed; only html.parser is measured.")
+
+    results = {}
+    for backend, name in backends:
+        for strainers, suffix in (
+            ((None, None), "full"),
+            (strained, "strained"),
+        ):
+            label = f"{name} ({suffix})"
+            search_soup, product_soup = measure(
+                label, backend, strainers, args.pages, search_page,
+                product_page,
+            )
+            results[label] = _extract(scraper, search_soup, product_soup)
+
+    reference = results["html.parser (full)"]
+    mismatched = [label for label, value in results.items()
+                  if value != reference]
+    if mismatched:
+        print(f"❌ Results differ from html.parser for: {mismatched}")
+        sys.exit(1)
+    print("✅ Every backend extracted identical listings and details.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Records store pages once and replays them to benchmark the scraper offline.
+
+`record` searches a Crystal Commerce store for a list of cards through a
+recording session and saves every search and product page it fetched into
+a gzipped corpus. Without `--homepage`, a local fake storefront is recorded
+instead.
+
+`run` replays a corpus with no network I/O and reports where the time of a
+scrape goes, per stage:
+
+- fetch: sending requests through the (replaying) store session,
+- parse: building the search result and product page trees,
+- extract: finding matching products, their variants and page details,
+- validate: building `CardListingSchema` listings,
+- filter: `filter_listings` against the requested specifications,
+
+followed by the end-to-end throughput of `_scrape_listings` itself.
+
+Usage:
+    python utilities/benchmark_replay.py record --homepage \\
+        https://store.example.com --search-url \\
+        https://store.example.com/products/search --cards "Sol Ring" \\
+        --output corpus.json.gz
+    python utilities/benchmark_replay.py run corpus.json.gz --iterations 20
+"""
+
+import argparse
+import os
+import sys
+import time
+from datetime import datetime, timezone
+from urllib.parse import urljoin
+
+try:
+    # Support running from the repository root (backend/ next to this
+    # directory) and from inside the backend container (/app).
+    _root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    _backend = os.path.join(_root, "backend")
+    sys.path.insert(0, _backend if os.path.isdir(_backend) else _root)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from fake_storefront import FakeStorefront
+    from managers.store_manager.filtering import filter_listings
+    from managers.store_manager.stores import html_parser, replay
+    from managers.store_manager.stores.storefronts.crystal_commerce_store import (  # noqa: E501
+        CrystalCommerceStore,
+    )
+    from managers.store_manager.stores.throttle import StoreThrottle
+except ImportError as e:
+    print(f"❌ Error: Could not import application modules. Details: {e}")
+    sys.exit(1)
+
+STAGES = ("fetch", "parse", "extract", "validate", "filter")
+
+
+class _NoCache:
+    """Stands in for the product detail cache so every page is fetched."""
+
+    def get(self, product_url):
+        return None
+
+    def set(self, product_url, details):
+        pass
+
+
+def _make_store(store_info, max_concurrency=1, parser=None):
+    store = CrystalCommerceStore(
+        name=store_info["name"],
+        slug=store_info["slug"],
+        homepage=store_info["homepage"],
+        search_url=store_info["search_url"],
+        max_concurrency=max_concurrency,
+        # Measure the scraper, not the shared per-store request budget.
+        rate_limit_per_second=0,
+    )
+    store.product_cache = _NoCache()
+    # Keep the replay offline: no shared backoff or circuit state in Redis.
+    store.throttle = StoreThrottle(store.slug)
+    store.html_parser = parser
+    return store
+
+
+def record(args):
+    if args.homepage:
+        store_info = {
+            "name": args.name,
+            "slug": args.slug,
+            "homepage": args.homepage,
+            "search_url": args.search_url
+            or urljoin(args.homepage, "/products/search"),
+        }
+        storefront = None
+    else:
+        storefront = FakeStorefront(
+            products_per_search=args.products_per_search
+        ).start()
+        store_info = {
+            "name": "Fake Store",
+            "slug": "fake_store",
+            "homepage": storefront.url,
+            "search_url": storefront.search_url,
+        }
+    card_names = list(args.cards or [])
+    if args.cards_file:
+        with open(args.cards_file, encoding="utf-8") as f:
+            card_names.extend(line.strip() for line in f if line.strip())
+    if not card_names:
+        card_names = [f"Benchmark Card {number}" for number in range(20)]
+
+    corpus = replay.ResponseCorpus(
+        metadata={
+            "store": store_info,
+            "cards": card_names,
+            "recorded_at": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+    store = _make_store(store_info)
+    store.session = replay.create_recording_session(corpus)
+    try:
+        for number, card_name in enumerate(card_names, start=1):
+            listings = store._scrape_listings(card_name)
+            print(
+                f"📥 [{number}/{len(card_names)}] {card_name}: "
+                f"{len(listings)} listings"
+            )
+            if args.delay and number < len(card_names):
+                time.sleep(args.delay)
+    finally:
+        if storefront is not None:
+            storefront.stop()
+
+    corpus.save(args.output)
+    size = os.path.getsize(args.output) / 1024
+    print(f"✅ Saved {len(corpus)} pages to {args.output} ({size:.0f} KiB)")
+
+
+def _scrape_in_stages(store, card_name, timings):
+    """Runs the steps of `_scrape_listings` one stage at a time."""
+    clock = time.perf_counter
+
+    started = clock()
+    response = store.session.get(
+        store.search_url, params={"q": card_name, "c": 1}, timeout=10
+    )
+    timings["fetch"] += clock() - started
+
+    started = clock()
+    soup = html_parser.parse_search_results(response.text, store.html_parser)
+    timings["parse"] += clock() - started
+
+    started = clock()
+    matching = store._find_matching_products(soup, card_name)
+    variants = [store._parse_variants(product) for product, _, _ in matching]
+    timings["extract"] += clock() - started
+
+    all_details = []
+    for _, _, product_url in matching:
+        started = clock()
+        page = store.session.get(urljoin(store.homepage, product_url))
+        timings["fetch"] += clock() - started
+
+        started = clock()
+        page_soup = html_parser.parse_product_page(
+            page.text, store.html_parser
+        )
+        timings["parse"] += clock() - started
+
+        started = clock()
+        all_details.append(store._parse_product_page_details(page_soup))
+        timings["extract"] += clock() - started
+
+    started = clock()
+    listings = []
+    for (_, name, product_url), details, product_variants in zip(
+        matching, all_details, variants
+    ):
+        full_url = urljoin(store.homepage, product_url)
+        for variant in product_variants:
+            listing = store._validate_listing(full_url, name, details, variant)
+            if listing is not None:
+                listings.append(listing)
+    timings["validate"] += clock() - started
+
+    started = clock()
+    filtered = filter_listings(card_name, listings, [])
+    timings["filter"] += clock() - started
+    return filtered
+
+
+def run(args):
+    corpus = replay.ResponseCorpus.load(args.corpus)
+    store_info = corpus.metadata["store"]
+    card_names = corpus.metadata["cards"]
+    store = _make_store(store_info, args.concurrency, args.parser)
+    store.session = replay.create_replay_session(corpus)
+    adapter = store.session.replay_adapter
+    print(
+        f"📼 {len(corpus)} recorded pages, {len(card_names)} cards from "
+        f"{store_info['name']}, {args.iterations} iterations, parser "
+        f"{args.parser or html_parser.DEFAULT_PARSER}"
+    )
+
+    timings = dict.fromkeys(STAGES, 0.0)
+    for _ in range(args.iterations):
+        for card_name in card_names:
+            _scrape_in_stages(store, card_name, timings)
+    total = sum(timings.values())
+    checks = args.iterations * len(card_names)
+    for stage in STAGES:
+        print(
+            f"{stage:<10} {timings[stage] * 1000:>10.1f} ms  "
+            f"{timings[stage] * 1000 / checks:>8.3f} ms/card  "
+            f"{timings[stage] / total:>6.1%}"
+        )
+
+    adapter.hits = 0
+    listings = 0
+    started = time.perf_counter()
+    for _ in range(args.iterations):
+        for card_name in card_names:
+            listings += len(
+                filter_listings(
+                    card_name, store._scrape_listings(card_name), []
+                )
+            )
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'end-to-end':<10} {checks / elapsed:>10.1f} cards/s  "
+        f"{adapter.hits / elapsed:>8.1f} pages/s  "
+        f"{listings / args.iterations:.0f} listings per pass"
+    )
+    if adapter.misses:
+        print(f"❌ {adapter.misses} requests were missing from the corpus.")
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    record_parser = commands.add_parser(
+        "record", help="Capture store pages into a corpus."
+    )
+    record_parser.add_argument(
+        "--homepage",
+        help="Store to record. Records a local fake storefront if omitted.",
+    )
+    record_parser.add_argument("--search-url")
+    record_parser.add_argument("--name", default="Recorded Store")
+    record_parser.add_argument("--slug", default="recorded_store")
+    record_parser.add_argument("--cards", nargs="+")
+    record_parser.add_argument(
+        "--cards-file", help="File with one card name per line."
+    )
+    record_parser.add_argument(
+        "--delay",
+        type=float,
+        default=1.0,
+        help="Seconds to wait between searches, to go easy on the store.",
+    )
+    record_parser.add_argument("--products-per-search", type=int, default=3)
+    record_parser.add_argument("--output", default="corpus.json.gz")
+    record_parser.set_defaults(handler=record)
+
+    run_parser = commands.add_parser(
+        "run", help="Replay a corpus and report per-stage timings."
+    )
+    run_parser.add_argument("corpus")
+    run_parser.add_argument("--iterations", type=int, default=10)
+    run_parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Product page threads for the end-to-end pass.",
+    )
+    run_parser.add_argument(
+        "--parser", help="HTML parser to use, e.g. html.parser or lxml."
+    )
+    run_parser.set_defaults(handler=run)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Compares the blocking and asyncio Crystal Commerce scrapers.
+
+Both scrapers search a local fake storefront for the same cards and resolve
+every product page. The blocking path checks one card at a time, as a single
+RQ job per (card, store) pair does today. The async path checks every card
+from a single event loop, as one job using
+`store_manager.check_availability_concurrently` would.
+
+The product detail cache is bypassed, so every run fetches every page.
+
+Usage:
+    python utilities/benchmark_scrapers.py --cards 50 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+try:
+    # Support running from the repository root (backend/ next to this
+    # directory) and from inside the backend container (/app).
+    _root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    _backend = os.path.join(_root, "backend")
+    sys.path.insert(0, _backend if os.path.isdir(_backend) else _root)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from fake_storefront import FakeStorefront
+    from managers.store_manager.stores import http_session
+    from managers.store_manager.stores.storefronts import (
+        crystal_commerce_async_store,
+        crystal_commerce_store,
+    )
+except ImportError as e:
+    print(f"❌ Error: Could not import application modules. Details: {e}")
+    sys.exit(1)
+
+
+class _NoCache:
+    """Stands in for the product detail cache so every page is fetched."""
+
+    def get(self, product_url):
+        return None
+
+    def set(self, product_url, details):
+        pass
+
+
+def _make_store(store_class, storefront, max_concurrency):
+    store = store_class(
+        name="Fake Store",
+        slug="fake_store",
+        homepage=storefront.url,
+        search_url=storefront.search_url,
+        max_concurrency=max_concurrency,
+        # Measure the scrapers, not the shared per-store request budget.
+        rate_limit_per_second=0,
+    )
+    store.product_cache = _NoCache()
+    return store
+
+
+def run_blocking(storefront, card_names, max_concurrency):
+    store = _make_store(
+        crystal_commerce_store.CrystalCommerceStore,
+        storefront,
+        max_concurrency,
+    )
+    return [store._scrape_listings(name) for name in card_names]
+
+
+def run_async(storefront, card_names, max_concurrency):
+    store = _make_store(
+        crystal_commerce_async_store.AsyncCrystalCommerceStore,
+        storefront,
+        max_concurrency,
+    )
+
+    async def scrape_all():
+        limiter = asyncio.Semaphore(max_concurrency)
+        async with http_session.create_async_session(
+            limit_per_host=max_concurrency
+        ) as client:
+            return await asyncio.gather(
+                *(
+                    store._scrape_listings_async(client, name, limiter)
+                    for name in card_names
+                )
+            )
+
+    return asyncio.run(scrape_all())
+
+
+def measure(label, runner, storefront, card_names, max_concurrency):
+    storefront.request_count = 0
+    started = time.perf_counter()
+    results = runner(storefront, card_names, max_concurrency)
+    elapsed = time.perf_counter() - started
+    pages = storefront.request_count
+    listings = sum(len(listings) for listings in results)
+    print(
+        f"{label:<10} {pages:>6} pages  {elapsed:>8.2f}s  "
+        f"{pages / elapsed:>9.1f} pages/s  {listings:>6} listings"
+    )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--cards", type=int, default=50)
+    parser.add_argument("--products-per-search", type=int, default=3)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Seconds the fake storefront waits before each response.",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=8,
+        help="Per-store concurrency limit used by both scrapers.",
+    )
+    args = parser.parse_args()
+
+    card_names = [f"Benchmark Card {number}" for number in range(args.cards)]
+    with FakeStorefront(
+        products_per_search=args.products_per_search, latency=args.latency
+    ) as storefront:
+        print(
+            f"🏪 {args.cards} cards, {args.products_per_search} products "
+            f"each, {args.latency * 1000:.0f} ms latency, concurrency "
+            f"{args.concurrency}"
+        )
+        blocking = measure(
+            "blocking", run_blocking, storefront, card_names,
+            args.concurrency,
+        )
+        async_results = measure(
+            "async", run_async, storefront, card_names, args.concurrency
+        )
+
+    if blocking != async_results:
+        print("❌ The scrapers returned different listings.")
+        sys.exit(1)
+    print("✅ Both scrapers returned identical listings.")
+
+
+if __name__ == "__main__":
+    main()
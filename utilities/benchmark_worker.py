@@ -0,0 +1,155 @@
+"""
+Compares jobs per second of the forking worker and the warm worker slots.
+
+Every job scrapes one card from a local fake storefront, like a short
+availability check. In "fork" mode each job runs in a fresh child process,
+so it builds its store, HTTP session and connections from scratch. In
+"threads" mode the jobs run on warm slots of one process that keep their
+store and pooled connections between jobs; it is measured with one slot, to
+isolate the cost of forking, and with `--slots` slots.
+
+The jobs are queued on a scratch queue of the Redis server at `REDIS_URL`,
+which must be running. The product detail cache is bypassed, so every job
+fetches every page.
+
+Usage:
+    REDIS_URL=redis://localhost:6379/15 \\
+        python utilities/benchmark_worker.py --jobs 200 --latency 0.01
+"""
+
+import argparse
+import os
+import sys
+import time
+
+try:
+    # Support running from the repository root (backend/ next to this
+    # directory) and from inside the backend container (/app).
+    _root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    _backend = os.path.join(_root, "backend")
+    sys.path.insert(0, _backend if os.path.isdir(_backend) else _root)
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    from rq import Queue
+
+    from fake_storefront import FakeStorefront
+    from managers import redis_manager
+    from managers.store_manager.stores.storefronts import (
+        crystal_commerce_store,
+    )
+    from tasks.custom_worker import LGSWorker, WarmWorkerPool
+except ImportError as e:
+    print(f"❌ Error: Could not import application modules. Details: {e}")
+    sys.exit(1)
+
+QUEUE_NAME = "benchmark-worker"
+
+# Stores built by jobs of this process, by homepage. A forked job starts
+# with an empty registry; a warm slot finds the store built by earlier jobs.
+_stores = {}
+
+
+class _NoCache:
+    """Stands in for the product detail cache so every page is fetched."""
+
+    def get(self, product_url):
+        return None
+
+    def set(self, product_url, details):
+        pass
+
+
+def scrape_card(homepage, search_url, card_name):
+    """The benchmark job: scrapes one card and returns its listing count."""
+    store = _stores.get(homepage)
+    if store is None:
+        store = crystal_commerce_store.CrystalCommerceStore(
+            name="Fake Store",
+            slug="fake_store",
+            homepage=homepage,
+            search_url=search_url,
+            # Measure the workers, not the shared per-store request budget.
+            rate_limit_per_second=0,
+        )
+        store.product_cache = _NoCache()
+        _stores[homepage] = store
+    return len(store.fetch_listings(card_name))
+
+
+def run_fork(queue, slots):
+    LGSWorker([queue], connection=queue.connection).work(burst=True)
+
+
+def run_threads(queue, slots):
+    WarmWorkerPool([queue], queue.connection, slots=slots).work(burst=True)
+
+
+def measure(label, runner, queue, storefront, jobs, slots):
+    queue.empty()
+    for number in range(jobs):
+        queue.enqueue(
+            scrape_card,
+            storefront.url,
+            storefront.search_url,
+            f"Benchmark Card {number}",
+        )
+    started = time.perf_counter()
+    runner(queue, slots)
+    elapsed = time.perf_counter() - started
+    finished = queue.finished_job_registry.count
+    print(
+        f"{label:<12} {finished:>6} jobs  {elapsed:>8.2f}s  "
+        f"{finished / elapsed:>9.1f} jobs/s"
+    )
+    for job_id in queue.finished_job_registry.get_job_ids():
+        queue.finished_job_registry.remove(job_id, delete_job=True)
+    return finished
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--jobs", type=int, default=200)
+    parser.add_argument("--products-per-search", type=int, default=1)
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.01,
+        help="Seconds the fake storefront waits before each response.",
+    )
+    parser.add_argument(
+        "--slots",
+        type=int,
+        default=4,
+        help="Warm slots used by the multi-slot threads run.",
+    )
+    args = parser.parse_args()
+
+    connection = redis_manager.get_redis_connection()
+    if connection is None:
+        print("❌ Error: Could not connect to Redis at REDIS_URL.")
+        sys.exit(1)
+    queue = Queue(QUEUE_NAME, connection=connection)
+
+    with FakeStorefront(
+        products_per_search=args.products_per_search, latency=args.latency
+    ) as storefront:
+        print(
+            f"🏪 {args.jobs} jobs, {args.products_per_search} products per "
+            f"search, {args.latency * 1000:.0f} ms latency"
+        )
+        results = [
+            measure("fork", run_fork, queue, storefront, args.jobs, 1),
+            measure("threads x1", run_threads, queue, storefront,
+                    args.jobs, 1),
+            measure(f"threads x{args.slots}", run_threads, queue,
+                    storefront, args.jobs, args.slots),
+        ]
+
+    if any(finished != args.jobs for finished in results):
+        print("❌ Some jobs did not finish.")
+        sys.exit(1)
+    print("✅ Every job finished in every mode.")
+
+
+if __name__ == "__main__":
+    main()